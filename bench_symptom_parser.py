@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the symptom parser
+
+Times parsing of long, realistic consultation notes:
+- Sequential re.sub / re.search passes (the parser before compilation)
+- The compiled single-pass parser
+- Incremental re-parsing after a one-line edit, as in the consultation flow
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from src.services.diagnosis.symptom_parser import SymptomParser
+
+
+NOTES = {
+    "fever_workup": """
+Pt c/o fever x 5 days, high grade, with chills and rigors. h/o body ache and joint pain.
+Bukhar aa raha hai since monday, sar dard bhi hai. No cough. Mild pet dard.
+Rash over trunk noticed yesterday. Bleeding gums x 1 day. No hematuria.
+O/E: febrile, pulse 110, BP 100/60. Tourniquet test positive. Hepatomegaly present.
+Plan: CBC, platelet count, NS1 antigen, dengue IgM. Oral fluids. Review tomorrow.
+""",
+    "chest_pain": """
+55M, k/c/o DM and HTN, p/w chest pain since 2 hours, radiating to left arm,
+associated with sweating and SOB. Ghabrahat ho rahi hai. No palpitations.
+h/o similar episode on exertion last week, relieved with rest.
+O/E: diaphoretic, BP 160/100, HR 102, SpO2 94%. Chest clear.
+ECG: ST elevation in II, III, aVF. Plan: aspirin, clopidogrel, refer to cardiology.
+""",
+    "pediatric": """
+2 yr old child brought by mother with barking cough x 2 days, stridor at night,
+fever since yesterday. Not feeding well. Loose motions x 3 episodes.
+Ulti bhi ho rahi hai. Lethargic since morning. Sunken eyes, decreased urine output.
+O/E: irritable, RR 48, chest retractions present. Cap refill 3 sec.
+Impression: croup with dehydration. Plan: nebulised adrenaline, ORS, observe.
+""",
+    "obstetric": """
+28F G2P1 at 34 weeks p/w severe headache, blurring of vision and swelling of feet.
+Pet mein dard upper abdomen. No vaginal bleeding. Decreased fetal movements since morning.
+h/o PIH in previous pregnancy. O/E: BP 170/110, pedal edema ++, reflexes brisk.
+Urine albumin 3+. Plan: MgSO4, antihypertensives, urgent obstetric referral.
+""",
+}
+
+# A full day's running note: every template several times over
+LONG_NOTE = "\n".join(list(NOTES.values()) * 5)
+
+
+def sequential_parse(parser: SymptomParser, clinical_notes: str) -> list:
+    """Parse the way SymptomParser did before its patterns were compiled."""
+    text = clinical_notes.lower()
+    for pattern, replacement in parser.abbreviations.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    for pattern, replacement in parser.hinglish_phrases.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+
+    symptoms = set()
+    for symptom_key, patterns in parser.symptom_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, text, re.IGNORECASE):
+                symptoms.add(symptom_key)
+                break
+    return sorted(symptoms)
+
+
+def bench(label: str, func, number: int) -> float:
+    """Time func and print the per-call cost in microseconds."""
+    per_call = min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+    print(f"  {label:<32} {per_call:>10.1f} us")
+    return per_call
+
+
+def main():
+    parser = SymptomParser()
+    notes = dict(NOTES, long_running_note=LONG_NOTE)
+
+    print("\n" + "=" * 80)
+    print("SYMPTOM PARSER MICROBENCHMARKS")
+    print("=" * 80)
+
+    for name, note in notes.items():
+        assert parser.parse(note) == sequential_parse(parser, note)
+        number = 20 if name == "long_running_note" else 100
+
+        print(f"\n{name} ({len(note)} chars, {len(parser.parse(note))} symptoms)")
+        sequential = bench("sequential re.sub/re.search", lambda: sequential_parse(parser, note), number)
+        compiled = bench("compiled single pass", lambda: parser.parse(note), number)
+
+        previous = parser.parse_note(note)
+        edited = note.replace("Plan:", "Plan: recheck tomorrow.", 1)
+        incremental = bench("incremental after one edit", lambda: parser.parse_note(edited, previous), number)
+
+        print(f"  speedup: {sequential / compiled:.1f}x full, {sequential / incremental:.1f}x incremental")
+
+    print("\n" + "=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,11 @@ from pathlib import Path
 
 from src.database import init_db, get_db
 from src.backup.storage import init_storage
+from src.backup.streaming import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
 from src.auth import auth_router
 from src.backup import backup_router
+from src.sync import sync_router
+from src.sync.storage import init_changeset_storage
 
 # Configure logging
 logging.basicConfig(
@@ -32,6 +35,7 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:8000"
     RATE_LIMIT_DOWNLOAD: str = "10/minute"
     RATE_LIMIT_UPLOAD: str = "5/minute"
+    MAX_BACKUP_SIZE_MB: int = 2048
 
     class Config:
         env_file = ".env"
@@ -52,9 +56,12 @@ async def lifespan(app: FastAPI):
     logger.info(f"Database initialized: {settings.DATABASE_PATH}")
 
     # Initialize storage
-    init_storage(settings.BACKUP_STORAGE_PATH)
+    init_storage(settings.BACKUP_STORAGE_PATH, settings.MAX_BACKUP_SIZE_MB * 1024 * 1024)
     logger.info(f"Storage initialized: {settings.BACKUP_STORAGE_PATH}")
 
+    # Initialize change set storage
+    init_changeset_storage(str(Path(settings.BACKUP_STORAGE_PATH) / "changesets"))
+
     yield
 
     # Shutdown
@@ -84,12 +91,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Range", "Accept-Ranges", "ETag"],
+)
+
+# Cut off oversized uploads while they stream, before the form is spooled
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_bytes=settings.MAX_BACKUP_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD,
+    paths=("/backup/upload",),
 )
 
 
 # Include routers
 app.include_router(auth_router)
 app.include_router(backup_router)
+app.include_router(sync_router)
 
 
 # Rate-limited endpoints
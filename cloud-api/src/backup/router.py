@@ -1,15 +1,15 @@
 """Backup API endpoints"""
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import Response, StreamingResponse
 from datetime import datetime
 import uuid
 import logging
 from typing import Optional
-import io
 
 from .models import BackupMetadata, BackupUploadResponse, SyncStatus
-from .storage import get_storage
+from .storage import BackupTooLargeError, EmptyBackupError, get_storage
+from .streaming import RangeNotSatisfiable, parse_range
 from ..auth.jwt import get_current_user
 from ..auth.models import TokenData
 from ..database import get_db
@@ -64,6 +64,8 @@ async def get_latest_backup(
 @router.get("/download/{backup_id}")
 async def download_backup(
     backup_id: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
     current_user: TokenData = Depends(get_current_user)
 ):
     """
@@ -71,6 +73,10 @@ async def download_backup(
 
     Returns the raw encrypted file as a binary stream.
     The client is responsible for decryption using their local key.
+
+    Supports a single HTTP Range (206 Partial Content) so an interrupted
+    sync can resume from the bytes it already has. The ETag is the blob's
+    SHA-256; send it as If-Range to resume safely.
     """
     db = get_db()
     storage = get_storage()
@@ -79,7 +85,7 @@ async def download_backup(
     async with await db.get_connection() as conn:
         cursor = await conn.execute(
             """
-            SELECT backup_id, filename, user_id
+            SELECT backup_id, filename, user_id, checksum
             FROM backups
             WHERE backup_id = ?
             """,
@@ -99,22 +105,48 @@ async def download_backup(
                 detail="Access denied to this backup"
             )
 
-    # Retrieve backup file
     try:
-        backup_content = await storage.get_backup(current_user.user_id, backup_id)
+        size_bytes = storage.get_backup_size(current_user.user_id, backup_id)
     except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Backup file not found in storage"
         )
 
-    # Return as streaming response
+    etag = f'"{backup_row["checksum"]}"'
+    headers = {
+        "Content-Disposition": f"attachment; filename={backup_row['filename']}",
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+    }
+
+    # A stale If-Range means the client's partial copy is of another blob
+    if if_range is not None and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size_bytes)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size_bytes}"}
+        )
+
+    if byte_range is None:
+        start, end = 0, size_bytes - 1
+        status_code = status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size_bytes}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    # Stream from disk in chunks rather than loading the blob
     return StreamingResponse(
-        io.BytesIO(backup_content),
+        storage.iter_backup(current_user.user_id, backup_id, start, end),
+        status_code=status_code,
         media_type="application/octet-stream",
-        headers={
-            "Content-Disposition": f"attachment; filename={backup_row['filename']}"
-        }
+        headers=headers
     )
 
 
@@ -137,24 +169,30 @@ async def upload_backup(
     db = get_db()
     storage = get_storage()
 
-    # Read file content
-    file_content = await file.read()
+    # Generate unique backup ID
+    backup_id = str(uuid.uuid4())
+
+    async def file_chunks():
+        while chunk := await file.read(storage.chunk_size):
+            yield chunk
 
-    if len(file_content) == 0:
+    # Stream to storage, hashing and enforcing the size limit as we go
+    try:
+        checksum, size_bytes = await storage.save_backup_stream(
+            current_user.user_id,
+            backup_id,
+            file_chunks()
+        )
+    except EmptyBackupError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Empty file"
         )
-
-    # Generate unique backup ID
-    backup_id = str(uuid.uuid4())
-
-    # Save to storage
-    checksum, size_bytes = await storage.save_backup(
-        current_user.user_id,
-        backup_id,
-        file_content
-    )
+    except BackupTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Backup too large"
+        )
 
     # Save metadata to database
     async with await db.get_connection() as conn:
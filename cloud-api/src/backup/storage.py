@@ -4,18 +4,37 @@ from pathlib import Path
 import hashlib
 import aiofiles
 import aiofiles.os
-from typing import BinaryIO
+from typing import AsyncIterator, BinaryIO, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bytes moved per read/write; bounds per-transfer memory regardless of blob size
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_BACKUP_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class BackupTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class EmptyBackupError(ValueError):
+    """Raised when an upload contains no data"""
+
 
 class BackupStorage:
     """Manages encrypted backup blob storage"""
 
-    def __init__(self, storage_path: str):
+    def __init__(
+        self,
+        storage_path: str,
+        max_backup_bytes: int = DEFAULT_MAX_BACKUP_BYTES,
+        chunk_size: int = CHUNK_SIZE
+    ):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.max_backup_bytes = max_backup_bytes
+        self.chunk_size = chunk_size
 
     def _get_user_dir(self, user_id: int) -> Path:
         """Get user-specific storage directory"""
@@ -39,16 +58,57 @@ class BackupStorage:
         Returns:
             tuple: (checksum, size_bytes)
         """
-        backup_path = self._get_backup_path(user_id, backup_id)
+        async def single_chunk():
+            yield file_content
 
-        # Calculate checksum
-        checksum = hashlib.sha256(file_content).hexdigest()
+        return await self.save_backup_stream(user_id, backup_id, single_chunk())
 
-        # Write file
-        async with aiofiles.open(backup_path, 'wb') as f:
-            await f.write(file_content)
+    async def save_backup_stream(
+        self,
+        user_id: int,
+        backup_id: str,
+        chunks: AsyncIterator[bytes]
+    ) -> tuple[str, int]:
+        """
+        Save an encrypted backup blob chunk by chunk
 
-        size_bytes = len(file_content)
+        The checksum is computed and the size limit enforced while writing,
+        so memory use stays at one chunk. Data goes to a ``.partial`` file
+        that only replaces the final path once complete.
+
+        Returns:
+            tuple: (checksum, size_bytes)
+
+        Raises:
+            BackupTooLargeError: If the blob exceeds max_backup_bytes
+            EmptyBackupError: If the blob is empty
+        """
+        backup_path = self._get_backup_path(user_id, backup_id)
+        partial_path = backup_path.with_suffix(".partial")
+        digest = hashlib.sha256()
+        size_bytes = 0
+
+        try:
+            async with aiofiles.open(partial_path, 'wb') as f:
+                async for chunk in chunks:
+                    size_bytes += len(chunk)
+                    if size_bytes > self.max_backup_bytes:
+                        raise BackupTooLargeError(
+                            f"Backup exceeds {self.max_backup_bytes} bytes"
+                        )
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+            if size_bytes == 0:
+                raise EmptyBackupError("Empty file")
+
+            await aiofiles.os.replace(partial_path, backup_path)
+        except BaseException:
+            if partial_path.exists():
+                await aiofiles.os.remove(partial_path)
+            raise
+
+        checksum = digest.hexdigest()
         logger.info(
             f"Saved backup {backup_id} for user {user_id}: "
             f"{size_bytes} bytes, checksum={checksum[:8]}..."
@@ -56,6 +116,51 @@ class BackupStorage:
 
         return checksum, size_bytes
 
+    def get_backup_size(self, user_id: int, backup_id: str) -> int:
+        """
+        Get the stored size of a backup blob
+
+        Raises:
+            FileNotFoundError: If backup doesn't exist
+        """
+        backup_path = self._get_backup_path(user_id, backup_id)
+
+        if not backup_path.exists():
+            raise FileNotFoundError(f"Backup {backup_id} not found")
+
+        return backup_path.stat().st_size
+
+    async def iter_backup(
+        self,
+        user_id: int,
+        backup_id: str,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a backup blob, or the inclusive byte range start..end of it
+
+        Raises:
+            FileNotFoundError: If backup doesn't exist
+        """
+        backup_path = self._get_backup_path(user_id, backup_id)
+
+        if not backup_path.exists():
+            raise FileNotFoundError(f"Backup {backup_id} not found")
+
+        if end is None:
+            end = backup_path.stat().st_size - 1
+        remaining = end - start + 1
+
+        async with aiofiles.open(backup_path, 'rb') as f:
+            await f.seek(start)
+            while remaining > 0:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
     async def get_backup(self, user_id: int, backup_id: str) -> bytes:
         """
         Retrieve encrypted backup blob
@@ -109,8 +214,11 @@ def get_storage() -> BackupStorage:
     return _storage
 
 
-def init_storage(storage_path: str) -> BackupStorage:
+def init_storage(
+    storage_path: str,
+    max_backup_bytes: int = DEFAULT_MAX_BACKUP_BYTES
+) -> BackupStorage:
     """Initialize global storage instance"""
     global _storage
-    _storage = BackupStorage(storage_path)
+    _storage = BackupStorage(storage_path, max_backup_bytes)
     return _storage
@@ -0,0 +1,105 @@
+"""HTTP helpers for streaming backup transfers"""
+
+from typing import Optional
+import logging
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries and form fields around the blob
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header lies outside the blob"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` Range header against a blob of ``size`` bytes
+
+    Returns:
+        Inclusive (start, end) offsets, or None to send the whole blob
+        (no header, another unit, or several ranges, which we may ignore)
+
+    Raises:
+        RangeNotSatisfiable: If the range is malformed or past the end
+    """
+    if not header:
+        return None
+
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, sep, last = spec.strip().partition("-")
+    try:
+        if not sep:
+            raise ValueError(spec)
+        if first == "":
+            # Suffix range: the final N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise ValueError(spec)
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            end = min(end, size - 1)
+    except ValueError:
+        raise RangeNotSatisfiable(f"Malformed range: {header}")
+
+    if start < 0 or start >= size or end < start:
+        raise RangeNotSatisfiable(f"Range {header} outside {size} bytes")
+
+    return start, end
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized request bodies on upload paths while they stream in
+
+    Requests declaring a Content-Length over the limit are refused before any
+    body is read; chunked requests are cut off as soon as the running total
+    passes it, rather than after the form parser has spooled the whole body.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int, paths: tuple[str, ...]):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            logger.warning(f"Rejected upload of {int(content_length)} bytes on {scope['path']}")
+            response = JSONResponse(
+                {"detail": "Backup too large"},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Backup too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
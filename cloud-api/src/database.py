@@ -55,7 +55,39 @@ class Database:
                 )
             """)
 
+            # Delta sync change sets (cursor orders them per user)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS changesets (
+                    cursor INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    device_id TEXT NOT NULL,
+                    from_seq INTEGER NOT NULL,
+                    to_seq INTEGER NOT NULL,
+                    row_count INTEGER NOT NULL DEFAULT 0,
+                    blob_id TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    checksum TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (user_id, device_id, to_seq),
+                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                )
+            """)
+
+            # Highest cursor pruned per user; clients behind it need a snapshot
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_retention (
+                    user_id INTEGER PRIMARY KEY,
+                    pruned_cursor INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                )
+            """)
+
             # Create indexes
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_changesets_user_cursor
+                ON changesets(user_id, cursor)
+            """)
+
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_backups_user_id
                 ON backups(user_id)
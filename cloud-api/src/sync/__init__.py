@@ -0,0 +1,5 @@
+"""Delta sync module"""
+
+from .router import router as sync_router
+
+__all__ = ["sync_router"]
@@ -0,0 +1,34 @@
+"""Delta sync data models"""
+
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ChangeSetMetadata(BaseModel):
+    """Change set metadata (the blob itself is client-side encrypted)"""
+    cursor: int
+    device_id: str
+    from_seq: int
+    to_seq: int
+    row_count: int
+    size_bytes: int
+    checksum: str
+    created_at: datetime
+
+
+class ChangeSetUploadResponse(BaseModel):
+    """Response after a change set upload"""
+    cursor: int
+    size_bytes: int
+    duplicate: bool = False
+
+
+class ChangeSetList(BaseModel):
+    """Change sets after a client's cursor"""
+    changesets: list[ChangeSetMetadata]
+    latest_cursor: int
+    has_more: bool
+    # Change sets at or before this cursor were pruned
+    pruned_cursor: int
+    # The client is too far behind; download the latest full backup instead
+    snapshot_required: bool
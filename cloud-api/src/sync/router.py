@@ -0,0 +1,287 @@
+"""Delta sync API endpoints
+
+The desktop publishes encrypted change sets (rows changed since its last
+publish); phones fetch only the change sets after their cursor instead of
+the whole backup. The server never decrypts them.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+import sqlite3
+import uuid
+import logging
+
+from .models import ChangeSetList, ChangeSetMetadata, ChangeSetUploadResponse
+from .storage import get_changeset_storage
+from ..auth.jwt import get_current_user
+from ..auth.models import TokenData
+from ..backup.storage import BackupTooLargeError, EmptyBackupError
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+# Change sets kept per user; older ones are pruned
+CHANGESET_RETENTION = 1000
+
+# Past this fraction of the latest backup's size, a snapshot is cheaper
+SNAPSHOT_RATIO = 0.5
+
+
+@router.post("/changesets", response_model=ChangeSetUploadResponse)
+async def upload_changeset(
+    request: Request,
+    device_id: str = Query(..., min_length=1, max_length=100),
+    from_seq: int = Query(..., ge=0),
+    to_seq: int = Query(..., ge=1),
+    row_count: int = Query(0, ge=0),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Publish an encrypted change set
+
+    - **device_id**: Publishing device
+    - **from_seq** / **to_seq**: The device's change range covered (from_seq, to_seq]
+    - **row_count**: Rows in the change set (for sync statistics)
+
+    The request body is the raw encrypted blob. Re-publishing the same
+    (device_id, to_seq) returns the existing cursor.
+    """
+    if to_seq <= from_seq:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="to_seq must be greater than from_seq"
+        )
+
+    db = get_db()
+    storage = get_changeset_storage()
+
+    async with await db.get_connection() as conn:
+        cursor = await conn.execute(
+            """
+            SELECT cursor, size_bytes FROM changesets
+            WHERE user_id = ? AND device_id = ? AND to_seq = ?
+            """,
+            (current_user.user_id, device_id, to_seq)
+        )
+        existing = await cursor.fetchone()
+
+    if existing:
+        return ChangeSetUploadResponse(
+            cursor=existing["cursor"],
+            size_bytes=existing["size_bytes"],
+            duplicate=True
+        )
+
+    blob_id = str(uuid.uuid4())
+    try:
+        checksum, size_bytes = await storage.save_backup_stream(
+            current_user.user_id,
+            blob_id,
+            request.stream()
+        )
+    except EmptyBackupError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty change set"
+        )
+    except BackupTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Change set too large; upload a full backup instead"
+        )
+
+    async with await db.get_connection() as conn:
+        try:
+            cursor = await conn.execute(
+                """
+                INSERT INTO changesets
+                (user_id, device_id, from_seq, to_seq, row_count, blob_id, size_bytes, checksum)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    current_user.user_id,
+                    device_id,
+                    from_seq,
+                    to_seq,
+                    row_count,
+                    blob_id,
+                    size_bytes,
+                    checksum
+                )
+            )
+        except sqlite3.IntegrityError:
+            # A concurrent publish of the same change set was stored first
+            await conn.rollback()
+            cursor = await conn.execute(
+                """
+                SELECT cursor, size_bytes FROM changesets
+                WHERE user_id = ? AND device_id = ? AND to_seq = ?
+                """,
+                (current_user.user_id, device_id, to_seq)
+            )
+            existing = await cursor.fetchone()
+            if existing is None:
+                await storage.delete_backup(current_user.user_id, blob_id)
+                raise
+        else:
+            changeset_cursor = cursor.lastrowid
+            pruned = await _prune_changesets(conn, current_user.user_id)
+            await conn.commit()
+
+    if existing:
+        await storage.delete_backup(current_user.user_id, blob_id)
+        return ChangeSetUploadResponse(
+            cursor=existing["cursor"],
+            size_bytes=existing["size_bytes"],
+            duplicate=True
+        )
+
+    for old_blob_id in pruned:
+        await storage.delete_backup(current_user.user_id, old_blob_id)
+
+    logger.info(
+        f"Change set published: user={current_user.user_id}, device={device_id}, "
+        f"seq={from_seq}..{to_seq}, cursor={changeset_cursor}, size={size_bytes}"
+    )
+
+    return ChangeSetUploadResponse(cursor=changeset_cursor, size_bytes=size_bytes)
+
+
+async def _prune_changesets(conn, user_id: int) -> list[str]:
+    """Drop change sets beyond the retention window; return their blob IDs"""
+    cursor = await conn.execute(
+        """
+        SELECT cursor, blob_id FROM changesets
+        WHERE user_id = ?
+        ORDER BY cursor DESC
+        LIMIT -1 OFFSET ?
+        """,
+        (user_id, CHANGESET_RETENTION)
+    )
+    rows = await cursor.fetchall()
+    if not rows:
+        return []
+
+    pruned_cursor = rows[0]["cursor"]
+    await conn.execute(
+        "DELETE FROM changesets WHERE user_id = ? AND cursor <= ?",
+        (user_id, pruned_cursor)
+    )
+    await conn.execute(
+        """
+        INSERT INTO sync_retention (user_id, pruned_cursor) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET pruned_cursor = excluded.pruned_cursor
+        """,
+        (user_id, pruned_cursor)
+    )
+    return [row["blob_id"] for row in rows]
+
+
+@router.get("/changesets", response_model=ChangeSetList)
+async def list_changesets(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    List change sets published after a cursor
+
+    - **since**: The last cursor the client applied (0 for none)
+    - **limit**: Maximum change sets to return
+
+    ``snapshot_required`` is set when change sets the client needs were
+    pruned, or when catching up would transfer more than a fresh snapshot.
+    After restoring a snapshot the client continues from ``pruned_cursor``,
+    skipping change sets the snapshot's version vector already contains.
+    """
+    db = get_db()
+
+    async with await db.get_connection() as conn:
+        cursor = await conn.execute(
+            """
+            SELECT cursor, device_id, from_seq, to_seq, row_count,
+                   size_bytes, checksum, created_at
+            FROM changesets
+            WHERE user_id = ? AND cursor > ?
+            ORDER BY cursor
+            LIMIT ?
+            """,
+            (current_user.user_id, since, limit + 1)
+        )
+        rows = await cursor.fetchall()
+
+        cursor = await conn.execute(
+            """
+            SELECT COALESCE(MAX(cursor), 0) AS latest,
+                   COALESCE(SUM(CASE WHEN cursor > ? THEN size_bytes END), 0) AS pending
+            FROM changesets WHERE user_id = ?
+            """,
+            (since, current_user.user_id)
+        )
+        totals = await cursor.fetchone()
+
+        cursor = await conn.execute(
+            "SELECT pruned_cursor FROM sync_retention WHERE user_id = ?",
+            (current_user.user_id,)
+        )
+        retention = await cursor.fetchone()
+
+        cursor = await conn.execute(
+            """
+            SELECT size_bytes FROM backups
+            WHERE user_id = ?
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (current_user.user_id,)
+        )
+        latest_backup = await cursor.fetchone()
+
+    pruned_cursor = retention["pruned_cursor"] if retention else 0
+    too_large = bool(latest_backup) and totals["pending"] > latest_backup["size_bytes"] * SNAPSHOT_RATIO
+
+    return ChangeSetList(
+        changesets=[ChangeSetMetadata(**dict(row)) for row in rows[:limit]],
+        latest_cursor=max(totals["latest"], since),
+        has_more=len(rows) > limit,
+        pruned_cursor=pruned_cursor,
+        snapshot_required=since < pruned_cursor or too_large
+    )
+
+
+@router.get("/changesets/{changeset_cursor}")
+async def download_changeset(
+    changeset_cursor: int,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """
+    Download an encrypted change set blob
+
+    The client decrypts it with the key derived from the account password.
+    """
+    db = get_db()
+    storage = get_changeset_storage()
+
+    async with await db.get_connection() as conn:
+        cursor = await conn.execute(
+            "SELECT blob_id, size_bytes, checksum FROM changesets WHERE cursor = ? AND user_id = ?",
+            (changeset_cursor, current_user.user_id)
+        )
+        row = await cursor.fetchone()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Change set not found"
+        )
+
+    return StreamingResponse(
+        storage.iter_backup(current_user.user_id, row["blob_id"]),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Length": str(row["size_bytes"]),
+            "ETag": f'"{row["checksum"]}"'
+        }
+    )
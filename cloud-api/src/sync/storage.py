@@ -0,0 +1,25 @@
+"""Storage for encrypted change set blobs"""
+
+from ..backup.storage import BackupStorage
+
+# Change sets are small; anything larger should be a full backup
+MAX_CHANGESET_BYTES = 64 * 1024 * 1024
+
+
+# Global change set storage instance
+_storage: BackupStorage = None
+
+
+def get_changeset_storage() -> BackupStorage:
+    """Get global change set storage instance"""
+    global _storage
+    if _storage is None:
+        raise RuntimeError("Change set storage not initialized. Call init_changeset_storage() first.")
+    return _storage
+
+
+def init_changeset_storage(storage_path: str) -> BackupStorage:
+    """Initialize global change set storage instance"""
+    global _storage
+    _storage = BackupStorage(storage_path, MAX_CHANGESET_BYTES)
+    return _storage
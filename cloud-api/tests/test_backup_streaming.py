@@ -0,0 +1,220 @@
+"""Streaming upload/download and HTTP Range tests"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+# Set test environment before importing app
+os.environ.setdefault("DATABASE_PATH", ":memory:")
+os.environ.setdefault("BACKUP_STORAGE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-for-testing-only-min-32-chars-long")
+
+from main import app
+from src.database import init_db
+from src.backup.storage import BackupStorage, BackupTooLargeError, EmptyBackupError, init_storage
+from src.backup.streaming import RangeNotSatisfiable, UploadSizeLimitMiddleware, parse_range
+
+
+async def chunks_of(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create test storage with small chunks"""
+    return BackupStorage(str(tmp_path / "backups"), max_backup_bytes=10_000, chunk_size=1000)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create test client backed by a file database"""
+    db = init_db(str(tmp_path / "cloud_api.db"))
+    asyncio.run(db.initialize())
+    init_storage(str(tmp_path / "backups"), max_backup_bytes=100_000)
+    return TestClient(app)
+
+
+@pytest.fixture
+def token(client):
+    """Register a user and return their access token"""
+    response = client.post(
+        "/auth/register",
+        json={"email": "stream@example.com", "password": "password123", "name": "Dr. Stream"}
+    )
+    return response.json()["access_token"]
+
+
+class TestParseRange:
+    """Test Range header parsing"""
+
+    def test_ranges(self):
+        """Test open, closed, suffix and clamped ranges"""
+        assert parse_range("bytes=0-99", 1000) == (0, 99)
+        assert parse_range("bytes=500-", 1000) == (500, 999)
+        assert parse_range("bytes=-100", 1000) == (900, 999)
+        assert parse_range("bytes=900-5000", 1000) == (900, 999)
+
+    def test_whole_blob(self):
+        """Test missing, foreign-unit and multi-range headers send everything"""
+        assert parse_range(None, 1000) is None
+        assert parse_range("items=0-1", 1000) is None
+        assert parse_range("bytes=0-1,5-6", 1000) is None
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5-2", "bytes=abc", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        """Test ranges outside the blob are rejected"""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(header, 1000)
+
+
+class TestBackupStorageStreaming:
+    """Test chunked storage writes and reads"""
+
+    async def test_save_stream_hashes_incrementally(self, storage):
+        """Test streamed saves match a one-shot checksum"""
+        data = os.urandom(9_500)
+
+        checksum, size = await storage.save_backup_stream(1, "b1", chunks_of(data, 777))
+
+        assert checksum == hashlib.sha256(data).hexdigest()
+        assert size == len(data)
+        assert b"".join([c async for c in storage.iter_backup(1, "b1")]) == data
+
+    async def test_size_limit_enforced_while_streaming(self, storage):
+        """Test an oversized stream stops early and leaves nothing behind"""
+        consumed = []
+
+        async def endless():
+            while True:
+                consumed.append(1)
+                yield b"x" * 1000
+
+        with pytest.raises(BackupTooLargeError):
+            await storage.save_backup_stream(1, "big", endless())
+
+        assert len(consumed) == 11
+        assert list((storage.storage_path / "1").iterdir()) == []
+
+    async def test_empty_stream_rejected(self, storage):
+        """Test an empty upload is refused"""
+        with pytest.raises(EmptyBackupError):
+            await storage.save_backup_stream(1, "empty", chunks_of(b"", 10))
+
+    async def test_iter_range_reads_in_chunks(self, storage):
+        """Test ranged reads yield bounded chunks"""
+        data = os.urandom(5_000)
+        await storage.save_backup(1, "b1", data)
+
+        chunks = [c async for c in storage.iter_backup(1, "b1", 1_500, 3_999)]
+
+        assert b"".join(chunks) == data[1_500:4_000]
+        assert max(len(c) for c in chunks) == 1000
+
+
+class TestStreamingEndpoints:
+    """Test streaming upload and resumable download endpoints"""
+
+    def upload(self, client, token, data):
+        return client.post(
+            "/backup/upload",
+            files={"file": ("backup.enc", data, "application/octet-stream")},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    def test_upload_and_full_download(self, client, token):
+        """Test a streamed round trip with checksum ETag"""
+        data = os.urandom(50_000)
+        backup_id = self.upload(client, token, data).json()["backup_id"]
+
+        response = client.get(
+            f"/backup/download/{backup_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 200
+        assert response.content == data
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+
+    def test_resume_with_range(self, client, token):
+        """Test an interrupted download resumes from a byte offset"""
+        data = os.urandom(50_000)
+        backup_id = self.upload(client, token, data).json()["backup_id"]
+        auth = {"Authorization": f"Bearer {token}"}
+        etag = client.get("/backup/latest", headers=auth).json()["checksum"]
+
+        response = client.get(
+            f"/backup/download/{backup_id}",
+            headers={**auth, "Range": "bytes=20000-", "If-Range": f'"{etag}"'}
+        )
+
+        assert response.status_code == 206
+        assert response.headers["content-range"] == "bytes 20000-49999/50000"
+        assert response.content == data[20_000:]
+
+    def test_stale_if_range_sends_whole_blob(self, client, token):
+        """Test a mismatched If-Range ignores the Range header"""
+        data = os.urandom(1_000)
+        backup_id = self.upload(client, token, data).json()["backup_id"]
+
+        response = client.get(
+            f"/backup/download/{backup_id}",
+            headers={"Authorization": f"Bearer {token}", "Range": "bytes=500-", "If-Range": '"other"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == data
+
+    def test_unsatisfiable_range(self, client, token):
+        """Test a range past the end returns 416"""
+        backup_id = self.upload(client, token, b"x" * 100).json()["backup_id"]
+
+        response = client.get(
+            f"/backup/download/{backup_id}",
+            headers={"Authorization": f"Bearer {token}", "Range": "bytes=100-"}
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+
+    def test_upload_over_limit(self, client, token):
+        """Test uploads over the storage limit are rejected and not recorded"""
+        response = self.upload(client, token, b"x" * 100_001)
+
+        assert response.status_code == 413
+        status = client.get("/backup/sync/status", headers={"Authorization": f"Bearer {token}"})
+        assert status.json()["backup_count"] == 0
+
+
+class TestUploadSizeLimitMiddleware:
+    """Test request bodies are cut off while streaming"""
+
+    @pytest.fixture
+    def limited_client(self):
+        api = FastAPI()
+
+        @api.post("/backup/upload")
+        async def upload(request: Request):
+            return {"size": len(await request.body())}
+
+        api.add_middleware(UploadSizeLimitMiddleware, max_body_bytes=1000, paths=("/backup/upload",))
+        return TestClient(api)
+
+    def test_declared_length_rejected(self, limited_client):
+        """Test a Content-Length over the limit is refused up front"""
+        assert limited_client.post("/backup/upload", content=b"x" * 1001).status_code == 413
+        assert limited_client.post("/backup/upload", content=b"x" * 1000).json() == {"size": 1000}
+
+    def test_chunked_body_cut_off(self, limited_client):
+        """Test a chunked body is rejected once it passes the limit"""
+        def body():
+            for _ in range(10):
+                yield b"x" * 500
+
+        assert limited_client.post("/backup/upload", content=body()).status_code == 413
@@ -0,0 +1,154 @@
+"""Delta sync change set endpoint tests"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Set test environment before importing app
+os.environ.setdefault("DATABASE_PATH", ":memory:")
+os.environ.setdefault("BACKUP_STORAGE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-for-testing-only-min-32-chars-long")
+
+from main import app
+from src.database import init_db
+from src.backup.storage import init_storage
+from src.sync import router as sync_router_module
+from src.sync.storage import get_changeset_storage, init_changeset_storage
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create test client backed by a file database"""
+    db = init_db(str(tmp_path / "cloud_api.db"))
+    asyncio.run(db.initialize())
+    init_storage(str(tmp_path / "backups"))
+    init_changeset_storage(str(tmp_path / "backups" / "changesets"))
+    return TestClient(app)
+
+
+def register(client, email="delta@example.com"):
+    """Register a user and return their auth header"""
+    response = client.post(
+        "/auth/register",
+        json={"email": email, "password": "password123", "name": "Dr. Delta"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def auth(client):
+    return register(client)
+
+
+def publish(client, auth, from_seq, to_seq, body=None, device_id="desktop-1"):
+    return client.post(
+        "/sync/changesets",
+        params={"device_id": device_id, "from_seq": from_seq, "to_seq": to_seq, "row_count": 1},
+        content=body if body is not None else f"changes {from_seq}-{to_seq}".encode(),
+        headers={**auth, "Content-Type": "application/octet-stream"}
+    )
+
+
+class TestPublishChangesets:
+    """Test change set uploads"""
+
+    def test_publish_assigns_increasing_cursors(self, client, auth):
+        """Test each change set gets the next cursor"""
+        first = publish(client, auth, 0, 5)
+        second = publish(client, auth, 5, 9)
+
+        assert first.status_code == 200
+        assert second.json()["cursor"] > first.json()["cursor"]
+        assert first.json()["duplicate"] is False
+
+    def test_republish_is_idempotent(self, client, auth):
+        """Test a retried publish returns the original cursor"""
+        first = publish(client, auth, 0, 5).json()
+        retry = publish(client, auth, 0, 5).json()
+
+        assert retry["cursor"] == first["cursor"]
+        assert retry["duplicate"] is True
+        assert len(client.get("/sync/changesets", headers=auth).json()["changesets"]) == 1
+
+    def test_concurrent_republish_returns_one_cursor(self, client, auth, tmp_path, monkeypatch):
+        """Test racing publishes of one change set store it once"""
+        storage = get_changeset_storage()
+        save = storage.save_backup_stream
+        both_checked = threading.Barrier(2, timeout=10)
+
+        async def save_after_both_checked(*args):
+            both_checked.wait()  # Neither request saw the other's row
+            return await save(*args)
+
+        monkeypatch.setattr(storage, "save_backup_stream", save_after_both_checked)
+        with ThreadPoolExecutor(2) as pool:
+            responses = list(pool.map(lambda _: publish(client, auth, 0, 5), range(2)))
+
+        assert [r.status_code for r in responses] == [200, 200]
+        assert responses[0].json()["cursor"] == responses[1].json()["cursor"]
+        assert sorted(r.json()["duplicate"] for r in responses) == [False, True]
+        assert len(list((tmp_path / "backups" / "changesets").rglob("*.enc"))) == 1
+
+    def test_rejects_bad_ranges_and_empty_bodies(self, client, auth):
+        """Test invalid change sets are rejected"""
+        assert publish(client, auth, 5, 5).status_code == 400
+        assert publish(client, auth, 0, 5, body=b"").status_code == 400
+
+    def test_requires_auth(self, client):
+        """Test publishing needs a token"""
+        assert publish(client, {}, 0, 5).status_code in (401, 403)
+
+
+class TestFetchChangesets:
+    """Test listing and downloading change sets"""
+
+    def test_list_since_cursor_pages(self, client, auth):
+        """Test clients only receive change sets after their cursor"""
+        cursors = [publish(client, auth, i, i + 1).json()["cursor"] for i in range(5)]
+
+        page = client.get("/sync/changesets", params={"since": cursors[1], "limit": 2}, headers=auth).json()
+
+        assert [c["cursor"] for c in page["changesets"]] == cursors[2:4]
+        assert page["has_more"] is True
+        assert page["latest_cursor"] == cursors[-1]
+        assert page["snapshot_required"] is False
+
+    def test_download_returns_blob(self, client, auth):
+        """Test the stored blob is returned byte for byte"""
+        cursor = publish(client, auth, 0, 3, body=b"\x00encrypted\xff" * 100).json()["cursor"]
+
+        response = client.get(f"/sync/changesets/{cursor}", headers=auth)
+
+        assert response.status_code == 200
+        assert response.content == b"\x00encrypted\xff" * 100
+
+    def test_users_are_isolated(self, client, auth):
+        """Test users cannot see each other's change sets"""
+        cursor = publish(client, auth, 0, 3).json()["cursor"]
+        other = register(client, "other@example.com")
+
+        assert client.get(f"/sync/changesets/{cursor}", headers=other).status_code == 404
+        assert client.get("/sync/changesets", headers=other).json()["changesets"] == []
+
+
+class TestRetention:
+    """Test pruning and snapshot fallback"""
+
+    def test_pruned_changesets_require_snapshot(self, client, auth, monkeypatch):
+        """Test clients behind the retention window are sent to a snapshot"""
+        monkeypatch.setattr(sync_router_module, "CHANGESET_RETENTION", 2)
+        cursors = [publish(client, auth, i, i + 1).json()["cursor"] for i in range(4)]
+
+        behind = client.get("/sync/changesets", params={"since": 0}, headers=auth).json()
+        current = client.get("/sync/changesets", params={"since": cursors[1]}, headers=auth).json()
+
+        assert behind["snapshot_required"] is True
+        assert behind["pruned_cursor"] == cursors[1]
+        assert [c["cursor"] for c in behind["changesets"]] == cursors[2:]
+        assert current["snapshot_required"] is False
+        assert client.get(f"/sync/changesets/{cursors[0]}", headers=auth).status_code == 404
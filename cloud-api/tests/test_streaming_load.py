@@ -0,0 +1,174 @@
+"""Memory load test: concurrent large backup transfers
+
+Runs the API under uvicorn and pushes N concurrent uploads and downloads of
+a large blob through it, sampling process RSS. With streaming transfers the
+peak growth stays in the low megabytes per transfer instead of the blob size.
+
+    pytest tests/test_streaming_load.py -m slow -s
+
+Size with LOAD_TRANSFERS (default 4) and LOAD_TRANSFER_MB (default 500).
+"""
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+# Set test environment before importing app
+os.environ.setdefault("DATABASE_PATH", ":memory:")
+os.environ.setdefault("BACKUP_STORAGE_PATH", tempfile.mkdtemp())
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-for-testing-only-min-32-chars-long")
+
+import httpx
+import uvicorn
+
+from main import app
+from src.database import init_db
+from src.backup.storage import init_storage
+
+TRANSFERS = int(os.environ.get("LOAD_TRANSFERS", "4"))
+TRANSFER_BYTES = int(os.environ.get("LOAD_TRANSFER_MB", "500")) * 1024 * 1024
+MB = 1024 * 1024
+
+pytestmark = pytest.mark.slow
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class RssSampler(threading.Thread):
+    """Record peak RSS while transfers run"""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.baseline = rss_bytes()
+        self.peak = self.baseline
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            time.sleep(self.interval)
+
+    def stop(self) -> int:
+        """Stop sampling and return peak growth over the baseline"""
+        self._done.set()
+        self.join()
+        return self.peak - self.baseline
+
+
+class SyntheticBlob:
+    """File-like source of ``size`` pseudo-random bytes, never held in memory"""
+
+    def __init__(self, size: int, seed: int):
+        self.remaining = size
+        self.block = os.urandom(MB - seed)
+
+    def read(self, n: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        data = (self.block * (n // len(self.block) + 1))[:n]
+        self.remaining -= n
+        return data
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve the API from a background thread"""
+    if not os.path.exists("/proc/self/status"):
+        pytest.skip("RSS sampling needs /proc")
+
+    db = init_db(str(tmp_path / "cloud_api.db"))
+    asyncio.run(db.initialize())
+    init_storage(str(tmp_path / "backups"), max_backup_bytes=TRANSFER_BYTES)
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    config = uvicorn.Config(app, lifespan="off", log_level="warning")
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    uvicorn_server.should_exit = True
+    thread.join(timeout=10)
+
+
+async def register(client: httpx.AsyncClient) -> dict:
+    response = await client.post(
+        "/auth/register",
+        json={"email": "load@example.com", "password": "password123", "name": "Dr. Load"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def upload(client: httpx.AsyncClient, auth: dict, seed: int) -> str:
+    response = await client.post(
+        "/backup/upload",
+        files={"file": (f"backup{seed}.enc", SyntheticBlob(TRANSFER_BYTES, seed), "application/octet-stream")},
+        headers=auth
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["size_bytes"] == TRANSFER_BYTES
+    return response.json()["backup_id"]
+
+
+async def download(client: httpx.AsyncClient, auth: dict, backup_id: str) -> int:
+    received = 0
+    async with client.stream("GET", f"/backup/download/{backup_id}", headers=auth) as response:
+        assert response.status_code == 200
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+    return received
+
+
+def test_concurrent_transfers_keep_rss_bounded(server):
+    """Test N concurrent large uploads and downloads hold RSS far below N x blob size"""
+    async def run():
+        async with httpx.AsyncClient(base_url=server, timeout=None) as client:
+            auth = await register(client)
+
+            sampler = RssSampler()
+            sampler.start()
+            started = time.perf_counter()
+            backup_ids = await asyncio.gather(*(upload(client, auth, i) for i in range(TRANSFERS)))
+            upload_seconds = time.perf_counter() - started
+            upload_growth = sampler.stop()
+
+            sampler = RssSampler()
+            sampler.start()
+            started = time.perf_counter()
+            sizes = await asyncio.gather(*(download(client, auth, b) for b in backup_ids))
+            download_seconds = time.perf_counter() - started
+            download_growth = sampler.stop()
+
+            return sizes, upload_growth, upload_seconds, download_growth, download_seconds
+
+    sizes, upload_growth, upload_seconds, download_growth, download_seconds = asyncio.run(run())
+    total_mb = TRANSFERS * TRANSFER_BYTES / MB
+
+    print(f"\n{TRANSFERS} x {TRANSFER_BYTES // MB} MB uploads:   "
+          f"peak RSS +{upload_growth / MB:.1f} MB, {total_mb / upload_seconds:.0f} MB/s")
+    print(f"{TRANSFERS} x {TRANSFER_BYTES // MB} MB downloads: "
+          f"peak RSS +{download_growth / MB:.1f} MB, {total_mb / download_seconds:.0f} MB/s")
+
+    assert sizes == [TRANSFER_BYTES] * TRANSFERS
+    # Buffered transfers would grow by at least one blob per request
+    budget = max(64 * MB, TRANSFER_BYTES // 4)
+    assert upload_growth < budget
+    assert download_growth < budget
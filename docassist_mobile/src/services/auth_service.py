@@ -28,6 +28,7 @@ class AuthState:
     user_name: Optional[str] = None
     token: Optional[str] = None
     encryption_key: Optional[bytes] = None
+    sync_key: Optional[bytes] = None
     biometric_enabled: bool = False
 
 
@@ -104,6 +105,7 @@ class AuthService:
         self.state.user_name = name
         self.state.token = token
         self.state.encryption_key = self._derive_key(password)
+        self.state.sync_key = self._derive_sync_key(password, email)
 
     def _derive_key(self, password: str) -> bytes:
         """
@@ -132,6 +134,22 @@ class AuthService:
                 dklen=32,
             )
 
+    def _derive_sync_key(self, password: str, email: str) -> Optional[bytes]:
+        """
+        Derive the delta sync key (same derivation as the desktop publisher).
+
+        Returns None when the desktop crypto is unavailable; sync then falls
+        back to downloading full backups.
+        """
+        try:
+            import sys
+            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+            from src.services.delta_sync import derive_sync_key
+
+            return derive_sync_key(password, email)
+        except ImportError:
+            return None
+
     def logout(self):
         """Log out and clear credentials."""
         self.state = AuthState()
@@ -151,6 +169,10 @@ class AuthService:
         """Get encryption key."""
         return self.state.encryption_key
 
+    def get_sync_key(self) -> Optional[bytes]:
+        """Get delta sync key (None if delta sync is unavailable)."""
+        return self.state.sync_key
+
     def get_user_info(self) -> Tuple[Optional[str], Optional[str]]:
         """Get user info (name, email)."""
         return self.state.user_name, self.state.user_email
@@ -515,6 +515,121 @@ class LocalDatabase:
         except Exception:
             return False
 
+    # -------------------------------------------------------------------------
+    # Delta Sync
+    # -------------------------------------------------------------------------
+
+    # Tables the desktop publishes change sets for (parents first)
+    SYNC_TABLES = ("patients", "visits", "investigations", "procedures", "vitals", "patient_allergies")
+
+    def _ensure_sync_tables(self, conn: sqlite3.Connection):
+        """Create the sync bookkeeping tables if the snapshot predates them."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_versions (
+                device_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS mobile_sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+    def get_sync_cursor(self) -> int:
+        """Last server change set cursor applied to this database."""
+        conn = self._get_connection()
+        self._ensure_sync_tables(conn)
+        row = conn.execute(
+            "SELECT value FROM mobile_sync_state WHERE key = 'cursor'"
+        ).fetchone()
+        return int(row['value']) if row else 0
+
+    def set_sync_cursor(self, cursor: int):
+        """Record the last server change set cursor applied."""
+        conn = self._get_connection()
+        self._ensure_sync_tables(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO mobile_sync_state (key, value) VALUES ('cursor', ?)",
+            (str(cursor),)
+        )
+        conn.commit()
+
+    def get_version_vector(self) -> Dict[str, int]:
+        """Highest change seq contained in this database, per publishing device."""
+        conn = self._get_connection()
+        self._ensure_sync_tables(conn)
+        rows = conn.execute("SELECT device_id, seq FROM sync_versions").fetchall()
+        return {row['device_id']: row['seq'] for row in rows}
+
+    def apply_changeset(self, changeset: Dict[str, Any], cursor: int):
+        """
+        Apply a decoded change set in one transaction.
+
+        Upserts go parents-first and deletes children-first. Columns the
+        local schema does not have are dropped, so an older app version can
+        still apply change sets from a newer desktop. The device's version
+        and the sync cursor advance in the same transaction, so an
+        interrupted apply is simply retried.
+
+        Args:
+            changeset: Payload from the desktop's encode_changeset()
+            cursor: Server cursor of the change set
+        """
+        conn = self._get_connection()
+        self._ensure_sync_tables(conn)
+        tables = changeset['tables']
+
+        try:
+            for table in self.SYNC_TABLES:
+                change = tables.get(table)
+                if not change or not change['upserts']:
+                    continue
+
+                local_columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+                indexes = [i for i, col in enumerate(change['columns']) if col in local_columns]
+                columns = [change['columns'][i] for i in indexes]
+                if 'id' not in columns:
+                    continue
+
+                updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col != 'id')
+                conn.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' * len(columns))}) "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                    [[values[i] for i in indexes] for values in change['upserts']]
+                )
+
+            for table in reversed(self.SYNC_TABLES):
+                change = tables.get(table)
+                if change and change['deletes']:
+                    conn.executemany(
+                        f"DELETE FROM {table} WHERE id = ?",
+                        [(row_id,) for row_id in change['deletes']]
+                    )
+
+            conn.execute("""
+                INSERT INTO sync_versions (device_id, seq) VALUES (?, ?)
+                ON CONFLICT(device_id) DO UPDATE SET seq = MAX(seq, excluded.seq)
+            """, (changeset['device_id'], changeset['to_seq']))
+            conn.execute(
+                "INSERT OR REPLACE INTO mobile_sync_state (key, value) VALUES ('cursor', ?)",
+                (str(cursor),)
+            )
+
+            # The desktop's change-log triggers came with the snapshot; this
+            # copy never publishes, so drop what applying just logged
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_change_log'"
+            ).fetchone():
+                conn.execute("DELETE FROM sync_change_log")
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
     # -------------------------------------------------------------------------
     # Row Converters
     # -------------------------------------------------------------------------
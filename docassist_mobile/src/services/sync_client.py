@@ -2,12 +2,14 @@
 Sync Client Service - Downloads and decrypts backups from DocAssist Cloud.
 
 This service handles:
+- Applying encrypted change sets published by the desktop (delta sync)
 - Downloading encrypted backup from cloud
 - Decrypting using user's password
 - Extracting SQLite database for local use
 - Background sync with status tracking
 """
 
+import io
 import os
 import zipfile
 import tempfile
@@ -44,8 +46,15 @@ class SyncClient:
 
     Usage:
         client = SyncClient(api_url="https://api.docassist.in")
-        client.authenticate(token, encryption_key)
-        client.sync()  # Downloads and decrypts latest backup
+        client.set_credentials(token, encryption_key, sync_key)
+        client.attach_database(local_db)
+        client.sync()  # Applies new change sets, or downloads latest backup
+
+    With a sync key and a local database, only the change sets published
+    since the last sync are downloaded; the full backup is fetched only on
+    first sync or when the server reports this device is too far behind.
+    Until the server offers a change-set feed, every sync restores the
+    latest full backup.
     """
 
     def __init__(
@@ -57,6 +66,8 @@ class SyncClient:
         self.data_dir = data_dir
         self.token: Optional[str] = None
         self.encryption_key: Optional[bytes] = None
+        self.sync_key: Optional[bytes] = None
+        self.local_db = None
         self.state = SyncState(status=SyncStatus.IDLE)
         self._sync_thread: Optional[threading.Thread] = None
         self._on_status_change: Optional[Callable[[SyncState], None]] = None
@@ -64,10 +75,15 @@ class SyncClient:
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
 
-    def set_credentials(self, token: str, encryption_key: bytes):
+    def set_credentials(self, token: str, encryption_key: bytes, sync_key: Optional[bytes] = None):
         """Set authentication credentials."""
         self.token = token
         self.encryption_key = encryption_key
+        self.sync_key = sync_key
+
+    def attach_database(self, local_db):
+        """Set the LocalDatabase that change sets are applied to."""
+        self.local_db = local_db
 
     def set_status_callback(self, callback: Callable[[SyncState], None]):
         """Set callback for status changes."""
@@ -114,26 +130,10 @@ class SyncClient:
             if not self.token or not self.encryption_key:
                 raise ValueError("Not authenticated. Call set_credentials first.")
 
-            # Step 1: Check for updates (10%)
-            self._update_status(SyncStatus.SYNCING, progress=0.1)
-            latest = self._check_for_updates()
-
-            if not latest:
-                # No updates available
-                self._update_status(SyncStatus.SUCCESS, progress=1.0)
-                return
-
-            # Step 2: Download backup (10% -> 60%)
-            self._update_status(SyncStatus.SYNCING, progress=0.2)
-            encrypted_data = self._download_backup(latest['id'])
-            self._update_status(SyncStatus.SYNCING, progress=0.6)
-
-            # Step 3: Decrypt backup (60% -> 80%)
-            decrypted_data = self._decrypt_backup(encrypted_data)
-            self._update_status(SyncStatus.SYNCING, progress=0.8)
-
-            # Step 4: Extract database (80% -> 100%)
-            self._extract_database(decrypted_data)
+            if self.sync_key and self.local_db is not None:
+                self._delta_sync()
+            else:
+                self._restore_snapshot()
             self._update_status(SyncStatus.SUCCESS, progress=1.0)
 
         except requests.exceptions.ConnectionError:
@@ -141,6 +141,115 @@ class SyncClient:
         except Exception as e:
             self._update_status(SyncStatus.ERROR, error=str(e))
 
+    def _restore_snapshot(self):
+        """Replace the local database with the latest full backup."""
+        # Step 1: Check for updates (10%)
+        self._update_status(SyncStatus.SYNCING, progress=0.1)
+        latest = self._check_for_updates()
+
+        if not latest:
+            # No updates available
+            return
+
+        # Step 2: Download backup (10% -> 60%)
+        self._update_status(SyncStatus.SYNCING, progress=0.2)
+        encrypted_data = self._download_backup(latest['id'])
+        self._update_status(SyncStatus.SYNCING, progress=0.6)
+
+        # Step 3: Decrypt backup (60% -> 80%)
+        decrypted_path = self._decrypt_backup(encrypted_data)
+        self._update_status(SyncStatus.SYNCING, progress=0.8)
+
+        # Step 4: Extract database (80% -> 100%)
+        if self.local_db is not None:
+            self.local_db.close()
+        try:
+            self._extract_database(decrypted_path)
+        finally:
+            if decrypted_path:
+                os.unlink(decrypted_path)
+
+    def _delta_sync(self):
+        """
+        Apply the change sets published since the last sync.
+
+        Change sets already contained in the local database (per its version
+        vector) are skipped. A full snapshot is restored on first sync, when
+        the server says this device is too far behind, or when a change set
+        is missing from a device's sequence; at most once per sync. Without
+        a change-set feed the latest full backup is restored instead.
+        """
+        snapshot_restored = False
+        need_snapshot = not os.path.exists(self.local_db.db_path)
+
+        while True:
+            since = 0 if need_snapshot else self.local_db.get_sync_cursor()
+            listing = self._list_changesets(since)
+            if listing is None:
+                self._restore_snapshot()
+                return
+
+            if (need_snapshot or listing['snapshot_required']) and not snapshot_restored:
+                self._restore_snapshot()
+                # Everything pruned is in the snapshot or older than it
+                self.local_db.set_sync_cursor(listing['pruned_cursor'])
+                snapshot_restored = True
+                need_snapshot = False
+                continue
+
+            vector = self.local_db.get_version_vector()
+            changesets = listing['changesets']
+            for i, meta in enumerate(changesets):
+                applied = vector.get(meta['device_id'], 0)
+                if meta['to_seq'] <= applied:
+                    # Already contained in the snapshot
+                    self.local_db.set_sync_cursor(meta['cursor'])
+                    continue
+                if meta['from_seq'] > applied:
+                    if snapshot_restored:
+                        raise ValueError("Latest backup is older than the oldest available change set")
+                    need_snapshot = True
+                    break
+
+                changeset = self._decode_changeset(self._download_changeset(meta['cursor']))
+                self.local_db.apply_changeset(changeset, meta['cursor'])
+                vector[meta['device_id']] = meta['to_seq']
+                self._update_status(SyncStatus.SYNCING, progress=0.1 + 0.9 * (i + 1) / len(changesets))
+
+            if not need_snapshot and not listing['has_more']:
+                return
+
+    def _list_changesets(self, since: int) -> Optional[dict]:
+        """List change sets published after a cursor (None: no feed on this server)."""
+        response = requests.get(
+            f"{self.api_url}/sync/changesets",
+            params={"since": since},
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=10,
+        )
+        if response.status_code in (404, 501):
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def _download_changeset(self, cursor: int) -> bytes:
+        """Download one encrypted change set."""
+        response = requests.get(
+            f"{self.api_url}/sync/changesets/{cursor}",
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return response.content
+
+    def _decode_changeset(self, blob: bytes) -> dict:
+        """Decrypt and parse a change set with the desktop's format."""
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+        from src.services.delta_sync import decode_changeset
+
+        return decode_changeset(blob, self.sync_key)
+
     def _check_for_updates(self) -> Optional[dict]:
         """Check if there's a newer backup available."""
         try:
@@ -175,45 +284,49 @@ class SyncClient:
             # In production, this would fail
             return b''
 
-    def _decrypt_backup(self, encrypted_data: bytes) -> bytes:
-        """Decrypt backup using encryption key."""
+    def _decrypt_backup(self, encrypted_data: bytes) -> Optional[str]:
+        """Decrypt backup chunk by chunk into a temp file; returns its path."""
         if not encrypted_data:
             # Development mode: no decryption needed
-            return b''
-
-        try:
-            # Import crypto from desktop if available
-            import sys
-            sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
-            from src.services.crypto import CryptoService
-
-            crypto = CryptoService()
-            return crypto.decrypt(encrypted_data, self.encryption_key)
-        except ImportError:
-            # Fallback: basic decryption
-            # In production, this should use PyNaCl
-            return encrypted_data
-
-    def _extract_database(self, decrypted_data: bytes):
-        """Extract SQLite database from decrypted backup."""
-        if not decrypted_data:
+            return None
+
+        # Import crypto from desktop; handles streamed and legacy backups
+        import sys
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+        from src.services.crypto import CryptoService
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.backup') as tmp:
+            try:
+                CryptoService().decrypt_stream(io.BytesIO(encrypted_data), tmp, self.encryption_key)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+            return tmp.name
+
+    def _extract_database(self, decrypted_path: Optional[str]):
+        """Extract SQLite database from decrypted backup.
+
+        Desktop backups are tar streams compressed with zstd or gzip
+        (.tar.zst.enc / .tar.gz.enc); older backups are zip files.
+        """
+        if not decrypted_path:
             # Development mode: skip extraction
             return
 
-        # Create temp file for extraction
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp:
-            tmp.write(decrypted_data)
-            tmp_path = tmp.name
-
-        try:
-            # Extract to data directory
-            with zipfile.ZipFile(tmp_path, 'r') as zip_ref:
+        if zipfile.is_zipfile(decrypted_path):
+            with zipfile.ZipFile(decrypted_path, 'r') as zip_ref:
                 # Extract only clinic.db
                 for name in zip_ref.namelist():
                     if name.endswith('clinic.db'):
                         zip_ref.extract(name, self.data_dir)
-        finally:
-            os.unlink(tmp_path)
+            return
+
+        from src.services.backup_pipeline import extract_archive
+
+        with open(decrypted_path, 'rb') as f:
+            if not extract_archive(f, self.data_dir, names=['clinic.db']):
+                raise ValueError("Backup does not contain clinic.db")
 
     def get_last_sync_text(self) -> str:
         """Get human-readable last sync time."""
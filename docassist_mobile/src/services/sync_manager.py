@@ -242,10 +242,10 @@ class SyncManager:
         """
         try:
             # Trigger sync client download
-            # This will download and decrypt the latest backup
-            success = self.sync_client.sync(background=False)
+            # This applies new change sets, or restores the latest backup
+            self.sync_client.sync(background=False)
 
-            if success:
+            if self.sync_client.state.status == SyncStatus.SUCCESS:
                 logger.info("Downloaded updates from server")
                 return True
             else:
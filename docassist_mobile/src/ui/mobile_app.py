@@ -145,6 +145,7 @@ class DocAssistMobile:
         try:
             db_path = os.path.join(self.sync_client.data_dir, "clinic.db")
             self.local_db = LocalDatabase(db_path)
+            self.sync_client.attach_database(self.local_db)
         except Exception as e:
             print(f"Database initialization error: {e}")
             # Database doesn't exist yet, will be created after first sync
@@ -232,7 +233,7 @@ class DocAssistMobile:
                 # Set credentials for sync
                 token = self.auth_service.get_token()
                 key = self.auth_service.get_encryption_key()
-                self.sync_client.set_credentials(token, key)
+                self.sync_client.set_credentials(token, key, self.auth_service.get_sync_key())
 
                 # Store user name for welcome screen
                 user_name, _ = self.auth_service.get_user_info()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Script to rebuild the materialized patient snapshots in DocAssist EMR.
+
+Run after a bulk import or restore, or with --dirty to refresh only the
+snapshots flagged stale by the change triggers.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.services.database import DatabaseService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Main entry point for snapshot rebuild script."""
+    parser = argparse.ArgumentParser(description="Rebuild patient snapshots")
+    parser.add_argument("--db", help="Path to database (defaults to data/clinic.db)")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Patients per write transaction")
+    parser.add_argument("--dirty", action="store_true",
+                        help="Only refresh snapshots flagged dirty")
+    args = parser.parse_args()
+
+    logger.info("DocAssist EMR Snapshot Rebuild")
+    logger.info("=" * 50)
+
+    db_service = DatabaseService(db_path=args.db)
+    start = time.perf_counter()
+
+    if args.dirty:
+        count = db_service.refresh_dirty_snapshots(batch_size=args.batch_size)
+    else:
+        def report(done, total):
+            logger.info(f"  {done}/{total} snapshots rebuilt")
+
+        count = db_service.rebuild_patient_snapshots(
+            batch_size=args.batch_size,
+            progress_callback=report
+        )
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Refreshed {count} snapshots in {elapsed:.1f}s")
+    db_service.close()
+
+
+if __name__ == "__main__":
+    main()
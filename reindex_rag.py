@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Script to rebuild the DocAssist EMR vector store (RAG index) from the database.
+
+Run after restoring a backup or migrating a clinic. Interrupted runs resume
+from a checkpoint; use --restart to start over.
+
+Examples:
+    python reindex_rag.py
+    python reindex_rag.py --workers 4 --batch-size 512
+    python reindex_rag.py --benchmark 10000
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.services.database import DatabaseService
+from src.services.embeddings import create_embedding_provider
+from src.services.rag import RAGService
+from src.services.rag_reindex import BulkReindexer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def report_progress(stats, total):
+    """Log progress after each page."""
+    logger.info(
+        f"  {stats.patients}/{total} patients, {stats.documents} documents "
+        f"({stats.docs_per_second:.1f} docs/sec)"
+    )
+
+
+def run_reindex(db_service, rag_service, args):
+    """Reindex and log a summary."""
+    reindexer = BulkReindexer(
+        db_service,
+        rag_service,
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    stats = reindexer.run(resume=not args.restart, progress_callback=report_progress)
+
+    logger.info("\n" + "=" * 50)
+    logger.info(f"Patients:   {stats.patients}")
+    logger.info(f"Documents:  {stats.documents} ({stats.embedded} embedded, "
+                f"{stats.unchanged} unchanged, {stats.deleted} removed)")
+    logger.info(f"Time:       {stats.elapsed_seconds:.1f}s")
+    logger.info(f"Throughput: {stats.docs_per_second:.1f} docs/sec")
+    logger.info("=" * 50)
+    return stats
+
+
+def run_benchmark(args):
+    """Index a synthetic clinic in a scratch directory."""
+    from tests.load.data_generator import DataGenerator
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_service = DatabaseService(db_path=str(Path(tmpdir) / "benchmark.db"))
+        rag_service = RAGService(
+            persist_directory=str(Path(tmpdir) / "chroma"),
+            embedding_provider=create_embedding_provider(args.embedding_model)
+        )
+
+        logger.info(f"Generating synthetic clinic with {args.benchmark} patients...")
+        start = time.perf_counter()
+        generator = DataGenerator(db_service)
+        if args.benchmark >= 1000:
+            generator.populate_large_database(args.benchmark)
+        else:
+            generator.populate_medium_database(args.benchmark)
+        logger.info(f"Generated in {time.perf_counter() - start:.1f}s")
+
+        args.restart = True
+        run_reindex(db_service, rag_service, args)
+        db_service.close()
+
+
+def main():
+    """Main entry point for reindex script."""
+    parser = argparse.ArgumentParser(description="Rebuild the RAG vector store")
+    parser.add_argument("--db", help="Path to database (defaults to data/clinic.db)")
+    parser.add_argument("--chroma-dir", help="Vector store directory (defaults to data/chroma)")
+    parser.add_argument("--page-size", type=int, default=500,
+                        help="Patients loaded per page / checkpoint")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="Documents per embedding and upsert call")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Embedding processes (0 = embed in-process; default: CPUs - 1)")
+    parser.add_argument("--embedding-model",
+                        help="Embedding model (defaults to DOCASSIST_EMBEDDING_MODEL or 'default')")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore any checkpoint and start from the first patient")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=10000, metavar="PATIENTS",
+                        help="Index a synthetic clinic (default 10,000 patients) and report timing")
+    args = parser.parse_args()
+
+    logger.info("DocAssist EMR RAG Reindex")
+    logger.info("=" * 50)
+
+    if args.benchmark:
+        run_benchmark(args)
+        return
+
+    db_service = DatabaseService(db_path=args.db)
+    rag_service = RAGService(
+        persist_directory=args.chroma_dir,
+        embedding_provider=create_embedding_provider(args.embedding_model)
+    )
+    run_reindex(db_service, rag_service, args)
+    db_service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -204,6 +204,16 @@ class PatientSnapshot(BaseModel):
     last_updated: Optional[datetime] = None
 
 
+class PatientRecordBundle(BaseModel):
+    """A patient with all child records, loaded in a fixed number of queries."""
+    patient: Patient
+    visits: List[Visit] = Field(default_factory=list)  # Newest first
+    investigations: List[Investigation] = Field(default_factory=list)  # Newest first
+    procedures: List[Procedure] = Field(default_factory=list)  # Newest first
+    allergies: List[str] = Field(default_factory=list)
+    latest_vitals: Optional[dict] = None
+
+
 # ============== SAFETY MODELS ==============
 
 class SafetyAlert(BaseModel):
@@ -5,9 +5,11 @@ from .database import DatabaseService
 
 # LLM (optional - requires Ollama)
 try:
-    from .llm import LLMService
+    from .llm import LLMService, LLMError, CancellationToken
 except ImportError:
     LLMService = None
+    LLMError = None
+    CancellationToken = None
 
 # RAG (Vector-based - optional, for 8GB+ systems, requires chromadb)
 try:
@@ -28,7 +30,15 @@ except ImportError:
     ExportService = None
 
 # Phonetic Search (for Indian names)
-from .phonetic import IndianPhoneticSearch, MultiStrategySearch, get_phonetic_code
+from .phonetic import IndianPhoneticSearch, MultiStrategySearch, PhoneticIndex, get_phonetic_code
+
+# LLM response cache (keyed by patient data version), model residency and scheduling
+from .llm_cache import LLMResponseCache
+from .llm_residency import ModelResidencyManager
+from .llm_scheduler import LLMPriority, LLMScheduler
+
+# Hybrid Search (exact + FTS + phonetic + optional vector, rank-fused)
+from .hybrid_search import HybridSearchEngine, HybridSearchResult, reciprocal_rank_fusion
 
 # Safety Framework
 from .safety import (
@@ -40,6 +50,7 @@ from .safety import (
 
 # SQL-based Context Builder (alternative to vector RAG)
 from .context_builder import ContextBuilder, QueryParser
+from .token_budget import ContextSection, estimate_tokens, fit_context, pack_sections
 
 # App Mode Detection
 from .app_mode import (
@@ -127,6 +138,8 @@ __all__ = [
     "DatabaseService",
     # LLM
     "LLMService",
+    "LLMError",
+    "CancellationToken",
     # RAG
     "RAGService",
     # PDF
@@ -136,7 +149,17 @@ __all__ = [
     # Phonetic
     "IndianPhoneticSearch",
     "MultiStrategySearch",
+    "PhoneticIndex",
     "get_phonetic_code",
+    # LLM response cache, model residency and scheduling
+    "LLMResponseCache",
+    "ModelResidencyManager",
+    "LLMPriority",
+    "LLMScheduler",
+    # Hybrid Search
+    "HybridSearchEngine",
+    "HybridSearchResult",
+    "reciprocal_rank_fusion",
     # Safety
     "PrescriptionSafetyChecker",
     "CriticalInfoBanner",
@@ -145,6 +168,10 @@ __all__ = [
     # Context Builder
     "ContextBuilder",
     "QueryParser",
+    "ContextSection",
+    "estimate_tokens",
+    "fit_context",
+    "pack_sections",
     # App Mode
     "AppMode",
     "AppModeManager",
@@ -48,17 +48,28 @@ class CareGapDetector:
         Returns:
             List of CareGap objects sorted by priority
         """
-        gaps = []
+        # Get patient with visits, investigations, procedures, latest vitals
+        bundle = self.db.get_patient_bundle(patient_id)
+        if not bundle:
+            return []
 
-        # Get patient data
-        patient = self.db.get_patient(patient_id)
-        if not patient:
-            return gaps
+        return self.detect_care_gaps_for_bundle(bundle)
+
+    def detect_care_gaps_for_bundle(self, bundle) -> List[CareGap]:
+        """Detect care gaps from an already-loaded PatientRecordBundle.
 
-        # Get visits, investigations, procedures
-        visits = self.db.get_patient_visits(patient_id)
-        investigations = self.db.get_patient_investigations(patient_id)
-        procedures = self.db.get_patient_procedures(patient_id)
+        Args:
+            bundle: PatientRecordBundle from DatabaseService
+
+        Returns:
+            List of CareGap objects sorted by priority
+        """
+        gaps = []
+        patient = bundle.patient
+        patient_id = patient.id
+        visits = bundle.visits
+        investigations = bundle.investigations
+        procedures = bundle.procedures
 
         # Extract diagnoses and medications from visits
         diagnoses = self._extract_diagnoses(visits)
@@ -66,11 +77,11 @@ class CareGapDetector:
 
         # Check diabetes-related gaps
         if self._has_condition(diagnoses, ["diabetes", "dm", "t2dm", "t1dm", "diabetic"]):
-            gaps.extend(self._check_diabetes_gaps(patient_id, investigations, procedures))
+            gaps.extend(self._check_diabetes_gaps(patient_id, investigations, procedures, visits))
 
         # Check hypertension gaps
         if self._has_condition(diagnoses, ["hypertension", "htn", "high bp", "high blood pressure"]):
-            gaps.extend(self._check_hypertension_gaps(patient_id, investigations))
+            gaps.extend(self._check_hypertension_gaps(patient_id, investigations, bundle.latest_vitals))
 
         # Check medication-specific monitoring
         gaps.extend(self._check_medication_monitoring(medications, investigations))
@@ -186,13 +197,14 @@ class CareGapDetector:
 
         return (latest_date, latest_name) if latest_date else None
 
-    def _check_diabetes_gaps(self, patient_id: int, investigations, procedures) -> List[CareGap]:
+    def _check_diabetes_gaps(self, patient_id: int, investigations, procedures, visits) -> List[CareGap]:
         """Check diabetes-related care gaps.
 
         Args:
             patient_id: Patient ID
             investigations: List of Investigation objects
             procedures: List of Procedure objects
+            visits: List of Visit objects (newest first)
 
         Returns:
             List of CareGap objects
@@ -265,7 +277,6 @@ class CareGapDetector:
 
         # Foot exam - should be documented in visits
         foot_exam_found = False
-        visits = self.db.get_patient_visits(patient_id)
         for visit in visits[:5]:  # Check last 5 visits
             if visit.clinical_notes:
                 notes_lower = visit.clinical_notes.lower()
@@ -286,12 +297,14 @@ class CareGapDetector:
 
         return gaps
 
-    def _check_hypertension_gaps(self, patient_id: int, investigations) -> List[CareGap]:
+    def _check_hypertension_gaps(self, patient_id: int, investigations,
+                                 latest_vitals: Optional[dict] = None) -> List[CareGap]:
         """Check hypertension-related care gaps.
 
         Args:
             patient_id: Patient ID
             investigations: List of Investigation objects
+            latest_vitals: Most recent vitals row, if already loaded
 
         Returns:
             List of CareGap objects
@@ -300,37 +313,39 @@ class CareGapDetector:
         today = date.today()
 
         # Check if BP was recorded recently (via vitals, not investigations)
-        # We'll check this in visits instead
-        visits = self.db.get_patient_visits(patient_id)
-
-        # Try to get vitals from database
         bp_recorded = False
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT recorded_at FROM vitals
-                    WHERE patient_id = ? AND bp_systolic IS NOT NULL
-                    ORDER BY recorded_at DESC LIMIT 1
-                """, (patient_id,))
-                result = cursor.fetchone()
-                if result:
-                    last_bp_date = datetime.fromisoformat(result[0]).date()
-                    days_since = (today - last_bp_date).days
-                    if days_since > 30:
-                        priority = CareGapPriority.URGENT if days_since > 60 else CareGapPriority.SOON
-                        gaps.append(CareGap(
-                            patient_id=patient_id,
-                            category="monitoring",
-                            description="Blood pressure check overdue",
-                            recommendation=f"Record blood pressure (last recorded {days_since} days ago)",
-                            priority=priority,
-                            days_overdue=days_since - 30,
-                            last_done_date=last_bp_date,
-                            details=f"Last BP: {last_bp_date}",
-                            action_type="reminder",
-                        ))
-                    bp_recorded = True
+            if latest_vitals and latest_vitals.get("bp_systolic") is not None:
+                last_bp_at = latest_vitals["recorded_at"]
+            else:
+                # Latest vitals had no BP - look further back
+                with self.db.get_read_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        SELECT recorded_at FROM vitals
+                        WHERE patient_id = ? AND bp_systolic IS NOT NULL
+                        ORDER BY recorded_at DESC LIMIT 1
+                    """, (patient_id,))
+                    result = cursor.fetchone()
+                    last_bp_at = result[0] if result else None
+
+            if last_bp_at:
+                last_bp_date = datetime.fromisoformat(str(last_bp_at)).date()
+                days_since = (today - last_bp_date).days
+                if days_since > 30:
+                    priority = CareGapPriority.URGENT if days_since > 60 else CareGapPriority.SOON
+                    gaps.append(CareGap(
+                        patient_id=patient_id,
+                        category="monitoring",
+                        description="Blood pressure check overdue",
+                        recommendation=f"Record blood pressure (last recorded {days_since} days ago)",
+                        priority=priority,
+                        days_overdue=days_since - 30,
+                        last_done_date=last_bp_date,
+                        details=f"Last BP: {last_bp_date}",
+                        action_type="reminder",
+                    ))
+                bp_recorded = True
         except Exception:
             pass
 
@@ -615,14 +630,14 @@ class CareGapDetector:
         """
         report = {}
 
-        if all_patients:
-            patients = self.db.search_patients("")  # Get all patients
-        else:
+        if not all_patients:
             return report
 
-        for patient in patients:
-            gaps = self.detect_care_gaps(patient.id)
+        # Stream patients in pages; each page is a fixed number of queries
+        for bundle in self.db.iter_patient_bundles():
+            gaps = self.detect_care_gaps_for_bundle(bundle)
             if gaps:
+                patient = bundle.patient
                 uhid = patient.uhid or f"Patient {patient.id}"
                 report[uhid] = gaps
 
@@ -2,8 +2,10 @@
 
 Supports:
 - Local backup (unencrypted for fast access)
+- Incremental local backup (deduplicated chunks + per-backup manifest)
 - Encrypted backup (for cloud upload)
-- Cloud sync via multiple backends
+- Cloud sync via multiple backends, streamed (archive -> compress ->
+  encrypt -> upload) without intermediate files
 
 Security: All cloud backups are encrypted client-side with AES-256-GCM.
 The cloud service never sees plaintext data (zero-knowledge).
@@ -12,6 +14,7 @@ The cloud service never sees plaintext data (zero-knowledge).
 import sqlite3
 import json
 import shutil
+import tempfile
 import zipfile
 from pathlib import Path
 from datetime import datetime
@@ -19,6 +22,8 @@ from typing import List, Optional, Callable, Dict, Any
 from dataclasses import dataclass, asdict
 import os
 
+from .incremental_backup import IncrementalBackupStore
+
 
 @dataclass
 class BackupInfo:
@@ -45,7 +50,9 @@ class BackupService:
         self,
         data_dir: Optional[Path] = None,
         backup_dir: Optional[Path] = None,
-        max_backups: int = 10
+        max_backups: int = 10,
+        incremental: bool = True,
+        database_service=None
     ):
         """Initialize backup service.
 
@@ -53,6 +60,10 @@ class BackupService:
             data_dir: Directory containing clinic.db and chroma/
             backup_dir: Directory to store backups
             max_backups: Maximum number of backups to keep
+            incremental: Make unencrypted automatic backups incremental
+                (only changed chunks are written) instead of full zips
+            database_service: DatabaseService whose changes are published
+                to mobile after each cloud sync (optional)
         """
         if data_dir is None:
             data_dir = Path(os.getenv("DOCASSIST_DATA_DIR", "data"))
@@ -62,6 +73,8 @@ class BackupService:
         self.data_dir = Path(data_dir)
         self.backup_dir = Path(backup_dir)
         self.max_backups = max_backups
+        self.incremental = incremental
+        self.database_service = database_service
 
         # Ensure directories exist
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -71,6 +84,9 @@ class BackupService:
         self.db_path = self.data_dir / "clinic.db"
         self.chroma_dir = self.data_dir / "chroma"
 
+        # Chunk store + manifests for incremental backups
+        self.incremental_store = IncrementalBackupStore(self.backup_dir / "incremental")
+
     def create_backup(
         self,
         encrypt: bool = False,
@@ -135,23 +151,23 @@ class BackupService:
 
                 update_progress("Creating archive...", 60)
 
-                # 4. Create zip file (unencrypted first)
-                temp_zip = temp_dir / "backup.zip"
-                with zipfile.ZipFile(temp_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    for file_path in temp_dir.rglob('*'):
-                        if file_path.is_file() and file_path != temp_zip:
-                            arcname = file_path.relative_to(temp_dir)
-                            zipf.write(file_path, arcname)
-
-                # 5. Encrypt if requested
+                # 4. Create zip file, streamed through encryption if requested
                 if encrypt:
-                    update_progress("Encrypting backup...", 80)
+                    update_progress("Creating encrypted archive...", 60)
                     from .crypto import CryptoService
                     crypto = CryptoService()
-
-                    if not crypto.encrypt_file(temp_zip, backup_path, password):
-                        raise Exception("Encryption failed")
+                    partial_path = backup_path.with_name(backup_path.name + ".partial")
+                    try:
+                        with crypto.open_encrypted_writer(partial_path, password) as out:
+                            self._write_zip(temp_dir, out)
+                        os.replace(partial_path, backup_path)
+                    finally:
+                        partial_path.unlink(missing_ok=True)
                 else:
+                    update_progress("Creating archive...", 60)
+                    temp_zip = temp_dir / "backup.zip"
+                    with open(temp_zip, 'wb') as out:
+                        self._write_zip(temp_dir, out)
                     shutil.move(str(temp_zip), str(backup_path))
 
                 update_progress("Backup complete!", 100)
@@ -167,6 +183,83 @@ class BackupService:
             print(f"Backup failed: {e}")
             return None
 
+    def _write_zip(self, source_dir: Path, out):
+        """Write every file under source_dir into a zip on a binary stream."""
+        with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for file_path in sorted(source_dir.rglob('*')):
+                if file_path.is_file() and file_path.name != "backup.zip":
+                    zipf.write(file_path, file_path.relative_to(source_dir))
+
+    def create_incremental_backup(
+        self,
+        progress_callback: Optional[Callable[[str, int], None]] = None
+    ) -> Optional[Path]:
+        """Create an incremental backup of SQLite DB and ChromaDB folder.
+
+        Only chunks not already in the chunk store are compressed and
+        written; the backup itself is a manifest referencing its chunks.
+
+        Args:
+            progress_callback: Called with (message, percent) updates
+
+        Returns:
+            Path to the backup manifest, or None if failed.
+        """
+        def update_progress(message: str, percent: int):
+            if progress_callback:
+                progress_callback(message, percent)
+
+        try:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            temp_dir = self.backup_dir / f"temp_{timestamp}"
+            temp_dir.mkdir(exist_ok=True)
+
+            try:
+                update_progress("Backing up database...", 10)
+
+                # Consistent snapshot of the live database; Chroma files are
+                # read in place, as the full backup copies them
+                files: Dict[str, Path] = {}
+                if self.db_path.exists():
+                    snapshot = temp_dir / "clinic.db"
+                    self._backup_sqlite(self.db_path, snapshot)
+                    files["clinic.db"] = snapshot
+                else:
+                    print("Warning: clinic.db not found, skipping database backup")
+
+                if self.chroma_dir.exists():
+                    for file_path in self.chroma_dir.rglob('*'):
+                        if file_path.is_file():
+                            files[(Path("chroma") / file_path.relative_to(self.chroma_dir)).as_posix()] = file_path
+                else:
+                    print("Warning: chroma/ not found, skipping vector store backup")
+
+                update_progress("Storing changed chunks...", 30)
+
+                manifest_path, manifest = self.incremental_store.write_backup(
+                    files, metadata=self._create_manifest(), name=f"backup_{timestamp}"
+                )
+
+                stats = manifest["stats"]
+                update_progress("Backup complete!", 100)
+                print(
+                    f"Incremental backup created: {manifest_path} "
+                    f"({stats['bytes_written']:,} bytes written, "
+                    f"{stats['bytes_scanned'] + stats['bytes_skipped']:,} bytes of data)"
+                )
+                return manifest_path
+
+            finally:
+                if temp_dir.exists():
+                    shutil.rmtree(temp_dir)
+
+        except Exception as e:
+            print(f"Incremental backup failed: {e}")
+            return None
+
+    def _is_incremental(self, backup_path: Path) -> bool:
+        return backup_path.suffix == ".json" and backup_path.parent == self.incremental_store.manifest_dir
+
     def _backup_sqlite(self, source_db: Path, dest_db: Path):
         """Backup SQLite database using the backup API.
 
@@ -234,6 +327,9 @@ class BackupService:
                 print(f"Backup file not found: {backup_path}")
                 return False
 
+            if self._is_incremental(backup_path):
+                return self._restore_incremental(backup_path, update_progress)
+
             is_encrypted = ".encrypted" in backup_path.name
 
             if is_encrypted and not password:
@@ -272,29 +368,7 @@ class BackupService:
                         print(f"  Patients: {manifest.get('patient_count', 'unknown')}")
                         print(f"  Visits: {manifest.get('visit_count', 'unknown')}")
 
-                update_progress("Restoring database...", 50)
-
-                # Restore database
-                temp_db = extract_dir / "clinic.db"
-                if temp_db.exists():
-                    if self.db_path.exists():
-                        backup_current = self.db_path.with_suffix('.db.pre-restore')
-                        shutil.copy2(self.db_path, backup_current)
-                    shutil.copy2(temp_db, self.db_path)
-                    print(f"Database restored to {self.db_path}")
-
-                update_progress("Restoring vector store...", 70)
-
-                # Restore ChromaDB
-                temp_chroma = extract_dir / "chroma"
-                if temp_chroma.exists():
-                    if self.chroma_dir.exists():
-                        backup_current = self.chroma_dir.with_name('chroma.pre-restore')
-                        if backup_current.exists():
-                            shutil.rmtree(backup_current)
-                        shutil.move(str(self.chroma_dir), str(backup_current))
-                    shutil.copytree(temp_chroma, self.chroma_dir)
-                    print(f"Vector store restored to {self.chroma_dir}")
+                self._restore_extracted(extract_dir, update_progress)
 
                 update_progress("Restore complete!", 100)
                 print(f"Restore completed successfully from {backup_path}")
@@ -308,6 +382,53 @@ class BackupService:
             print(f"Restore failed: {e}")
             return False
 
+    def _restore_incremental(self, manifest_path: Path, update_progress: Callable[[str, int], None]) -> bool:
+        """Rebuild an incremental backup's files from the chunk store and restore them."""
+        temp_dir = self.backup_dir / f"restore_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        try:
+            update_progress("Reassembling backup...", 10)
+            manifest = self.incremental_store.restore(manifest_path, temp_dir)
+            print(f"Restoring backup from {manifest.get('created_at')}")
+            print(f"  Patients: {manifest.get('patient_count', 'unknown')}")
+            print(f"  Visits: {manifest.get('visit_count', 'unknown')}")
+
+            self._restore_extracted(temp_dir, update_progress)
+
+            update_progress("Restore complete!", 100)
+            print(f"Restore completed successfully from {manifest_path}")
+            return True
+        finally:
+            if temp_dir.exists():
+                shutil.rmtree(temp_dir)
+
+    def _restore_extracted(self, extract_dir: Path, update_progress: Callable[[str, int], None]):
+        """Put an extracted backup (clinic.db and chroma/) in place of the live data."""
+        update_progress("Restoring database...", 50)
+
+        # Restore database
+        temp_db = extract_dir / "clinic.db"
+        if temp_db.exists():
+            if self.db_path.exists():
+                backup_current = self.db_path.with_suffix('.db.pre-restore')
+                self._backup_sqlite(self.db_path, backup_current)
+            # Copy pages into the live file so open (pooled)
+            # connections see the restored data
+            self._backup_sqlite(temp_db, self.db_path)
+            print(f"Database restored to {self.db_path}")
+
+        update_progress("Restoring vector store...", 70)
+
+        # Restore ChromaDB
+        temp_chroma = extract_dir / "chroma"
+        if temp_chroma.exists():
+            if self.chroma_dir.exists():
+                backup_current = self.chroma_dir.with_name('chroma.pre-restore')
+                if backup_current.exists():
+                    shutil.rmtree(backup_current)
+                shutil.move(str(self.chroma_dir), str(backup_current))
+            shutil.copytree(temp_chroma, self.chroma_dir)
+            print(f"Vector store restored to {self.chroma_dir}")
+
     def list_backups(self) -> List[BackupInfo]:
         """List all available backups with metadata.
 
@@ -367,6 +488,22 @@ class BackupService:
 
             backups.append(backup_info)
 
+        # Incremental backups: size is what that backup added to the store
+        for manifest_path in self.incremental_store.manifests():
+            try:
+                manifest = self.incremental_store.read_manifest(manifest_path)
+            except Exception as e:
+                print(f"Error reading manifest {manifest_path}: {e}")
+                continue
+            backups.append(BackupInfo(
+                path=manifest_path,
+                filename=manifest_path.name,
+                created_at=manifest.get("created_at", ""),
+                size_bytes=manifest.get("stats", {}).get("bytes_written", manifest_path.stat().st_size),
+                patient_count=manifest.get("patient_count", 0),
+                visit_count=manifest.get("visit_count", 0),
+            ))
+
         # Sort by created_at (newest first)
         backups.sort(key=lambda x: x.created_at, reverse=True)
         return backups
@@ -398,6 +535,14 @@ class BackupService:
                     except Exception as e:
                         print(f"Error deleting backup {backup.filename}: {e}")
 
+        # Drop chunks only deleted incremental backups referenced
+        try:
+            freed = self.incremental_store.collect_garbage()
+            if freed:
+                print(f"Freed {freed:,} bytes of unreferenced backup chunks")
+        except Exception as e:
+            print(f"Error cleaning up backup chunks: {e}")
+
     def get_last_backup_time(self) -> Optional[datetime]:
         """Get timestamp of most recent backup.
 
@@ -423,12 +568,43 @@ class BackupService:
         Returns:
             True if backup was created successfully
         """
-        backup_path = self.create_backup(encrypt=encrypt, password=password)
+        if self.incremental and not encrypt:
+            backup_path = self.create_incremental_backup()
+        else:
+            backup_path = self.create_backup(encrypt=encrypt, password=password)
         if backup_path:
             self.cleanup_old_backups()
             return True
         return False
 
+    def _create_backend(self, backend_config: Dict[str, Any]):
+        """Create the storage backend described by a cloud configuration."""
+        from .sync import (
+            LocalStorageBackend, S3StorageBackend,
+            DocAssistCloudBackend, get_or_create_device_id
+        )
+
+        backend_type = backend_config.get("type", "local")
+
+        if backend_type == "local":
+            return LocalStorageBackend(Path(backend_config["path"]))
+        elif backend_type == "s3":
+            return S3StorageBackend(
+                bucket=backend_config["bucket"],
+                access_key=backend_config["access_key"],
+                secret_key=backend_config["secret_key"],
+                endpoint_url=backend_config.get("endpoint_url"),
+                region=backend_config.get("region", "us-east-1")
+            )
+        elif backend_type == "docassist":
+            device_id = get_or_create_device_id(self.data_dir)
+            return DocAssistCloudBackend(
+                api_key=backend_config["api_key"],
+                device_id=device_id
+            )
+        else:
+            raise ValueError(f"Unknown backend type: {backend_type}")
+
     def sync_to_cloud(
         self,
         password: str,
@@ -437,6 +613,12 @@ class BackupService:
     ) -> bool:
         """Create encrypted backup and upload to cloud.
 
+        The backup is streamed straight to the backend: archived,
+        compressed, encrypted and uploaded in parallel stages, without
+        writing a zip or an encrypted copy to disk first. Uploads left
+        unfinished by an earlier sync are resumed (or discarded) first.
+        Afterwards, database changes are published for mobile delta sync.
+
         Args:
             password: Encryption password
             backend_config: Cloud backend configuration
@@ -445,61 +627,98 @@ class BackupService:
         Returns:
             True if successful
         """
-        from .sync import (
-            SyncService, LocalStorageBackend, S3StorageBackend,
-            DocAssistCloudBackend, get_or_create_device_id
-        )
+        from .sync import SyncService
+        from .backup_pipeline import BackupPipeline
 
         def update_progress(message: str, percent: int):
             if progress_callback:
                 progress_callback(message, percent)
 
-        try:
-            # Create encrypted backup
-            update_progress("Creating encrypted backup...", 10)
-            backup_path = self.create_backup(encrypt=True, password=password)
-            if not backup_path:
-                return False
+        percent = [10]
 
-            # Initialize backend
-            update_progress("Connecting to cloud...", 30)
-            backend_type = backend_config.get("type", "local")
-
-            if backend_type == "local":
-                backend = LocalStorageBackend(Path(backend_config["path"]))
-            elif backend_type == "s3":
-                backend = S3StorageBackend(
-                    bucket=backend_config["bucket"],
-                    access_key=backend_config["access_key"],
-                    secret_key=backend_config["secret_key"],
-                    endpoint_url=backend_config.get("endpoint_url"),
-                    region=backend_config.get("region", "us-east-1")
-                )
-            elif backend_type == "docassist":
-                device_id = get_or_create_device_id(self.data_dir)
-                backend = DocAssistCloudBackend(
-                    api_key=backend_config["api_key"],
-                    device_id=device_id
-                )
-            else:
-                raise ValueError(f"Unknown backend type: {backend_type}")
+        def on_stage(stage: str, done: int, total: int):
+            # Percent follows the read stage (the others trail it by at most
+            # a few queued blocks); uploads report bytes actually sent
+            if stage == "read" and total:
+                percent[0] = 10 + int(85 * min(done, total) / total)
+                update_progress(f"Backing up... {done / 1024 / 1024:.1f} MB read", percent[0])
+            elif stage == "upload":
+                update_progress(f"Uploading... {done / 1024 / 1024:.1f} MB uploaded", percent[0])
 
-            # Upload
-            update_progress("Uploading backup...", 50)
+        try:
+            update_progress("Connecting to cloud...", 5)
+            backend = self._create_backend(backend_config)
             sync = SyncService(backend, self.backup_dir)
-            success = sync.upload_backup(backup_path)
+            resumed = sync.resume_pending_uploads()
+            if resumed:
+                print(f"Resumed {resumed} interrupted backup upload(s)")
 
-            if success:
-                update_progress("Sync complete!", 100)
-            else:
-                update_progress("Sync failed", 0)
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as snapshot_dir:
+                update_progress("Snapshotting database...", 8)
+                files = {}
+                if self.db_path.exists():
+                    snapshot = Path(snapshot_dir) / "clinic.db"
+                    self._backup_sqlite(self.db_path, snapshot)
+                    files["clinic.db"] = snapshot
+                else:
+                    print("Warning: clinic.db not found, skipping database backup")
+                if self.chroma_dir.exists():
+                    files["chroma"] = self.chroma_dir
+                else:
+                    print("Warning: chroma/ not found, skipping vector store backup")
 
-            return success
+                manifest = self._create_manifest()
+                manifest["encrypted"] = True
+                pipeline = BackupPipeline(backend, progress_callback=on_stage,
+                                          state_dir=sync.transfer.state_dir)
+                result = pipeline.upload(
+                    files, password,
+                    members={"backup_manifest.json": json.dumps(manifest, indent=2).encode()}
+                )
+
+            print(f"Backup uploaded: {result.remote_key} ({result.bytes_uploaded:,} bytes)")
+            self._publish_changes(password, backend_config)
+            update_progress("Sync complete!", 100)
+            return True
 
         except Exception as e:
             print(f"Cloud sync failed: {e}")
+            update_progress("Sync failed", 0)
             return False
 
+    def _publish_changes(self, password: str, backend_config: Dict[str, Any]):
+        """Publish database changes to mobile, then cap the change log.
+
+        Only DocAssist Cloud serves change sets, and the key needs the
+        account email; phones on other setups keep restoring the full
+        backup. A failed publish does not fail the backup: the change sets
+        are sent with the next sync.
+        """
+        if self.database_service is None:
+            return
+
+        from .sync import DocAssistCloudBackend, get_or_create_device_id
+        from .delta_sync import DeltaSyncError, DeltaSyncPublisher, derive_sync_key
+
+        device_id = get_or_create_device_id(self.data_dir)
+        email = backend_config.get("email")
+        if backend_config.get("type") == "docassist" and email:
+            publisher = DeltaSyncPublisher(
+                self.database_service,
+                backend_config.get("api_url") or DocAssistCloudBackend.DEFAULT_API_URL,
+                backend_config["api_key"],
+                derive_sync_key(password, email),
+                device_id,
+            )
+            try:
+                published = publisher.publish()
+                if published:
+                    print(f"Published {published} change set(s) for mobile sync")
+            except DeltaSyncError as e:
+                print(f"Change set publish failed: {e}")
+
+        self.database_service.prune_sync_change_log(device_id)
+
     def restore_from_cloud(
         self,
         remote_key: str,
@@ -518,38 +737,29 @@ class BackupService:
         Returns:
             True if successful
         """
-        from .sync import (
-            SyncService, LocalStorageBackend, S3StorageBackend,
-            DocAssistCloudBackend, get_or_create_device_id
-        )
+        from .sync import SyncService, TRANSFER_STATE_DIR
+        from .backup_pipeline import BackupPipeline, PIPELINE_SUFFIXES
 
         def update_progress(message: str, percent: int):
             if progress_callback:
                 progress_callback(message, percent)
 
         try:
-            # Initialize backend
             update_progress("Connecting to cloud...", 10)
-            backend_type = backend_config.get("type", "local")
-
-            if backend_type == "local":
-                backend = LocalStorageBackend(Path(backend_config["path"]))
-            elif backend_type == "s3":
-                backend = S3StorageBackend(
-                    bucket=backend_config["bucket"],
-                    access_key=backend_config["access_key"],
-                    secret_key=backend_config["secret_key"],
-                    endpoint_url=backend_config.get("endpoint_url"),
-                    region=backend_config.get("region", "us-east-1")
-                )
-            elif backend_type == "docassist":
-                device_id = get_or_create_device_id(self.data_dir)
-                backend = DocAssistCloudBackend(
-                    api_key=backend_config["api_key"],
-                    device_id=device_id
-                )
-            else:
-                raise ValueError(f"Unknown backend type: {backend_type}")
+            backend = self._create_backend(backend_config)
+
+            if remote_key.endswith(PIPELINE_SUFFIXES):
+                # Streamed backup: download, then decrypt + unpack as one stream
+                update_progress("Downloading backup...", 30)
+                temp_dir = self.backup_dir / f"restore_temp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                try:
+                    state_dir = self.backup_dir / TRANSFER_STATE_DIR
+                    BackupPipeline(backend, state_dir=state_dir).restore(remote_key, password, temp_dir)
+                    self._restore_extracted(temp_dir, update_progress)
+                finally:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                update_progress("Restore complete!", 100)
+                return True
 
             # Download
             update_progress("Downloading backup...", 30)
@@ -576,34 +786,10 @@ class BackupService:
         Returns:
             List of backup info dicts
         """
-        from .sync import (
-            SyncService, LocalStorageBackend, S3StorageBackend,
-            DocAssistCloudBackend, get_or_create_device_id
-        )
+        from .sync import SyncService
 
         try:
-            backend_type = backend_config.get("type", "local")
-
-            if backend_type == "local":
-                backend = LocalStorageBackend(Path(backend_config["path"]))
-            elif backend_type == "s3":
-                backend = S3StorageBackend(
-                    bucket=backend_config["bucket"],
-                    access_key=backend_config["access_key"],
-                    secret_key=backend_config["secret_key"],
-                    endpoint_url=backend_config.get("endpoint_url"),
-                    region=backend_config.get("region", "us-east-1")
-                )
-            elif backend_type == "docassist":
-                device_id = get_or_create_device_id(self.data_dir)
-                backend = DocAssistCloudBackend(
-                    api_key=backend_config["api_key"],
-                    device_id=device_id
-                )
-            else:
-                return []
-
-            sync = SyncService(backend, self.backup_dir)
+            sync = SyncService(self._create_backend(backend_config), self.backup_dir)
             return sync.list_cloud_backups()
 
         except Exception as e:
@@ -0,0 +1,578 @@
+"""Streaming cloud backups: archive, compress, encrypt and upload at once.
+
+A cloud backup used to make four passes over the disk: copy to a temp
+directory, zip, encrypt the zip, then upload the encrypted file.
+BackupPipeline runs each step as a stage in its own thread, connected by
+bounded queues:
+
+    read (tar) -> compress (zstd, or gzip) -> encrypt -> multipart upload
+
+so a backup takes about as long as its slowest stage rather than the sum
+of all of them, and memory stays bounded by the queue sizes and the
+upload parts in flight. Nothing but the SQLite snapshot touches the disk.
+
+Restore reverses it: download, then decrypt, decompress and untar as one
+stream.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import queue
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional; falls back to gzip
+    zstandard = None
+
+from .crypto import CryptoService
+from .sync import DEFAULT_PART_SIZE, MultipartTransfer, StorageBackend, write_part_manifest
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 1024 * 1024  # Unit of work passed between stages
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_QUEUE_BLOCKS = 4
+
+ZSTD_SUFFIX = ".tar.zst.enc"
+GZIP_SUFFIX = ".tar.gz.enc"
+PIPELINE_SUFFIXES = (ZSTD_SUFFIX, GZIP_SUFFIX)
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+GZIP_MAGIC = b"\x1f\x8b"
+
+STAGES = ("read", "compress", "encrypt", "upload")
+
+
+class _Aborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of a pipelined backup upload."""
+    remote_key: str
+    bytes_read: int
+    bytes_compressed: int
+    bytes_uploaded: int
+    parts: int
+    duration_seconds: float
+    # Time each stage spent working rather than waiting on its neighbours
+    # (for upload: time with at least one part in flight)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class _QueueWriter(io.RawIOBase):
+    """Write end of the read stage: tarfile writes blocks into a queue."""
+
+    def __init__(self, pipeline: 'BackupPipeline', sink: queue.Queue):
+        super().__init__()
+        self._pipeline = pipeline
+        self._sink = sink
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._pipeline._advance("read", len(data))
+        self._pipeline._put(self._sink, data, "read")
+        return len(data)
+
+
+class _IterReader(io.RawIOBase):
+    """Readable stream over an iterator of byte blocks."""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        super().__init__()
+        self._blocks = blocks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._blocks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+class BackupPipeline:
+    """Streams a backup through compression and encryption into cloud storage.
+
+    Usage:
+        pipeline = BackupPipeline(backend)
+        result = pipeline.upload({"clinic.db": snapshot, "chroma": chroma_dir}, password)
+        pipeline.restore(result.remote_key, password, restore_dir)
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        crypto: Optional[CryptoService] = None,
+        compression: Optional[str] = None,
+        compression_level: Optional[int] = None,
+        compression_threads: Optional[int] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+        queue_blocks: int = DEFAULT_QUEUE_BLOCKS,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        state_dir: Optional[Path] = None
+    ):
+        """Initialize pipeline.
+
+        Args:
+            backend: Storage backend to upload to (multipart)
+            crypto: CryptoService (created if not given)
+            compression: "zstd" or "gzip" (default: zstd if installed)
+            compression_level: Codec level (env DOCASSIST_BACKUP_COMPRESSION_LEVEL;
+                default 3 for zstd, 6 for gzip)
+            compression_threads: zstd worker threads, 0 = compress on the
+                stage thread (env DOCASSIST_BACKUP_COMPRESSION_THREADS, default 0)
+            part_size: Bytes per multipart upload part
+            upload_workers: Parts uploaded concurrently
+            queue_blocks: Blocks buffered between adjacent stages
+            progress_callback: Called with (stage, bytes_done, total_input_bytes)
+                as each stage makes progress
+            state_dir: Directory for transfer state. Unfinished uploads are
+                recorded there (see SyncService.resume_pending_uploads) and
+                interrupted restore downloads resume from it. Default: none
+                kept between runs.
+        """
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard not installed; compressing backup with gzip")
+            compression = "gzip"
+        if compression not in ("zstd", "gzip"):
+            raise ValueError(f"Unknown compression: {compression}")
+
+        if compression_level is None:
+            env_level = os.getenv("DOCASSIST_BACKUP_COMPRESSION_LEVEL")
+            compression_level = int(env_level) if env_level else (3 if compression == "zstd" else 6)
+        if compression_threads is None:
+            compression_threads = int(os.getenv("DOCASSIST_BACKUP_COMPRESSION_THREADS", "0"))
+
+        self.backend = backend
+        self.crypto = crypto or CryptoService()
+        self.compression = compression
+        self.compression_level = compression_level
+        self.compression_threads = compression_threads
+        self.part_size = part_size
+        self.upload_workers = upload_workers
+        self.queue_blocks = queue_blocks
+        self.progress_callback = progress_callback
+        self.state_dir = Path(state_dir) if state_dir is not None else None
+
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._errors: List[BaseException] = []
+        self._done: Dict[str, int] = {}
+        self._waited: Dict[str, float] = {}
+        self._busy: Dict[str, float] = {}
+        self._total_input = 0
+
+    @property
+    def suffix(self) -> str:
+        """Remote key suffix identifying this pipeline's format."""
+        return ZSTD_SUFFIX if self.compression == "zstd" else GZIP_SUFFIX
+
+    # ---------------------------------------------------------------- stages
+
+    def _fail(self, error: BaseException):
+        with self._lock:
+            self._errors.append(error)
+        self._failed.set()
+
+    def _advance(self, stage: str, nbytes: int):
+        with self._lock:
+            self._done[stage] += nbytes
+            done = self._done[stage]
+            if self.progress_callback:
+                self.progress_callback(stage, done, self._total_input)
+
+    def _put(self, q: queue.Queue, item, stage: str):
+        started = time.perf_counter()
+        try:
+            while not self._failed.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            raise _Aborted()
+        finally:
+            self._waited[stage] += time.perf_counter() - started
+
+    def _get(self, q: queue.Queue, stage: str):
+        started = time.perf_counter()
+        try:
+            while not self._failed.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            raise _Aborted()
+        finally:
+            self._waited[stage] += time.perf_counter() - started
+
+    def _run_stage(self, stage: str, target: Callable, *args):
+        """Thread body: run a stage, turning its failure into a pipeline abort."""
+        try:
+            target(*args)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            logger.error(f"Backup pipeline {stage} stage failed: {e}")
+            self._fail(e)
+
+    def _read(self, files: Dict[str, Path], members: Dict[str, bytes], sink: queue.Queue):
+        writer = _QueueWriter(self, sink)
+        with tarfile.open(fileobj=writer, mode="w|", bufsize=BLOCK_SIZE, copybufsize=BLOCK_SIZE) as tar:
+            for name, data in members.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                tar.addfile(info, io.BytesIO(data))
+            for arcname, path in files.items():
+                tar.add(str(path), arcname=arcname)
+        self._put(sink, None, "read")
+
+    def _transform(self, stage: str, source: queue.Queue, sink: queue.Queue, update, finish):
+        while True:
+            block = self._get(source, stage)
+            if block is None:
+                break
+            out = update(block)
+            if out:
+                self._advance(stage, len(out))
+                self._put(sink, out, stage)
+        out = finish()
+        if out:
+            self._advance(stage, len(out))
+            self._put(sink, out, stage)
+        self._put(sink, None, stage)
+
+    def _compressor(self):
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(
+                level=self.compression_level, threads=self.compression_threads
+            ).compressobj()
+        return zlib.compressobj(self.compression_level, zlib.DEFLATED, 31)  # gzip container
+
+    def _upload(self, source: queue.Queue, remote_key: str, upload_id: str) -> List[Dict]:
+        slots = threading.Semaphore(self.upload_workers)
+        futures = []
+        buffer = bytearray()
+        in_flight = {"parts": 0, "since": 0.0}
+
+        def send(number: int, data: bytes) -> Dict:
+            # Upload busy time is the time at least one part is on the wire
+            with self._lock:
+                if in_flight["parts"] == 0:
+                    in_flight["since"] = time.perf_counter()
+                in_flight["parts"] += 1
+            try:
+                if self._failed.is_set():
+                    raise _Aborted()
+                checksum = hashlib.sha256(data).hexdigest()
+                etag = self.backend.upload_part(remote_key, upload_id, number, data, checksum=checksum)
+                self._advance("upload", len(data))
+                return {'PartNumber': number, 'ETag': etag, 'sha256': checksum}
+            except _Aborted:
+                raise
+            except BaseException as e:
+                self._fail(e)
+                raise
+            finally:
+                with self._lock:
+                    in_flight["parts"] -= 1
+                    if in_flight["parts"] == 0:
+                        self._busy["upload"] += time.perf_counter() - in_flight["since"]
+                slots.release()
+
+        with ThreadPoolExecutor(self.upload_workers, thread_name_prefix="BackupUpload") as pool:
+            def submit(data: bytes):
+                # Bound parts held in memory: wait for a free upload slot
+                while not slots.acquire(timeout=0.1):
+                    if self._failed.is_set():
+                        raise _Aborted()
+                futures.append(pool.submit(send, len(futures) + 1, data))
+
+            try:
+                while True:
+                    block = self._get(source, "upload")
+                    if block is None:
+                        break
+                    buffer += block
+                    while len(buffer) >= self.part_size:
+                        submit(bytes(buffer[:self.part_size]))
+                        del buffer[:self.part_size]
+                if buffer or not futures:
+                    submit(bytes(buffer))
+            except _Aborted:
+                pass
+            parts = []
+            for future in futures:
+                try:
+                    parts.append(future.result())
+                except BaseException:
+                    pass
+        return parts
+
+    def _upload_whole(self, source: queue.Queue, remote_key: str):
+        """Upload stage for backends without multipart support.
+
+        The encrypted stream is written to a local file and sent in one
+        request once it is complete.
+        """
+        if self.state_dir is not None:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.state_dir) as tmp:
+            path = Path(tmp) / "backup.enc"
+            with open(path, 'wb') as f:
+                while True:
+                    block = self._get(source, "upload")
+                    if block is None:
+                        break
+                    f.write(block)
+
+            started = time.perf_counter()
+            if not self.backend.upload(path, remote_key):
+                raise IOError(f"Could not upload {remote_key}")
+            self._busy["upload"] += time.perf_counter() - started
+            self._advance("upload", path.stat().st_size)
+
+    # ------------------------------------------------------------------- API
+
+    def upload(
+        self,
+        files: Dict[str, Path],
+        password: str,
+        remote_key: Optional[str] = None,
+        members: Optional[Dict[str, bytes]] = None
+    ) -> PipelineResult:
+        """Archive, compress, encrypt and upload files as one stream.
+
+        Args:
+            files: Archive name -> file or directory to include. Files must
+                not change while being read (snapshot databases first).
+            password: Encryption password
+            remote_key: Destination key (default: backups/backup_<timestamp><suffix>)
+            members: Extra in-memory archive members (e.g. the manifest)
+
+        Returns:
+            PipelineResult with per-stage byte counts and timings
+
+        Raises:
+            Exception: The first error from any stage; the multipart upload
+                is aborted and nothing is left at remote_key
+        """
+        members = members or {}
+        if remote_key is None:
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            remote_key = f"backups/backup_{timestamp}{self.suffix}"
+
+        self._failed.clear()
+        self._errors = []
+        self._done = dict.fromkeys(STAGES, 0)
+        self._waited = dict.fromkeys(STAGES, 0.0)
+        self._busy = dict.fromkeys(STAGES, 0.0)
+        self._total_input = sum(len(data) for data in members.values()) + sum(
+            _tree_size(Path(path)) for path in files.values()
+        )
+
+        # Key derivation is deliberately slow; do it before the clock starts
+        encryptor = self.crypto.stream_encryptor(password)
+        compressor = self._compressor()
+        multipart = self.backend.supports_multipart
+        transfer = self._transfer(self.state_dir) if self.state_dir is not None else None
+        upload_id = None
+        if multipart:
+            upload_id = self.backend.create_multipart_upload(remote_key)
+            if transfer is not None:
+                transfer.track_stream(remote_key, upload_id)
+
+        raw, compressed, encrypted = (queue.Queue(self.queue_blocks) for _ in range(3))
+        stages = [
+            ("read", self._read, files, members, raw),
+            ("compress", self._transform, "compress", raw, compressed, compressor.compress, compressor.flush),
+            ("encrypt", self._transform, "encrypt", compressed, encrypted, encryptor.update, encryptor.finalize),
+        ]
+        started = time.perf_counter()
+        stage_started = {}
+        threads = []
+        for stage, target, *args in stages:
+            thread = threading.Thread(
+                target=self._run_stage, args=(stage, target, *args),
+                name=f"BackupPipeline-{stage}", daemon=True
+            )
+            stage_started[stage] = time.perf_counter()
+            thread.start()
+            threads.append((stage, thread))
+
+        parts = []
+        try:
+            if multipart:
+                parts = self._upload(encrypted, remote_key, upload_id)
+            else:
+                self._upload_whole(encrypted, remote_key)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+        for stage, thread in threads:
+            thread.join()
+            self._busy[stage] = max(0.0, time.perf_counter() - stage_started[stage] - self._waited[stage])
+
+        if multipart:
+            completed = [{'PartNumber': p['PartNumber'], 'ETag': p['ETag']} for p in parts]
+            if not self._errors and not self.backend.complete_multipart_upload(remote_key, upload_id, completed):
+                self._errors.append(IOError(f"Could not complete upload of {remote_key}"))
+            if self._errors:
+                self.backend.abort_multipart_upload(remote_key, upload_id)
+            if transfer is not None:
+                transfer.untrack_stream(remote_key)
+        if self._errors:
+            raise self._errors[0]
+
+        if multipart:
+            # Lets restores download in parallel, verified parts
+            write_part_manifest(self.backend, remote_key, self._done["upload"], self.part_size,
+                                [p['sha256'] for p in parts])
+
+        duration = time.perf_counter() - started
+        result = PipelineResult(
+            remote_key=remote_key,
+            bytes_read=self._done["read"],
+            bytes_compressed=self._done["compress"],
+            bytes_uploaded=self._done["upload"],
+            parts=len(parts) if multipart else 1,
+            duration_seconds=duration,
+            stage_seconds=dict(self._busy),
+        )
+        logger.info(
+            f"Pipelined backup {remote_key}: {result.bytes_read:,} bytes read, "
+            f"{result.bytes_uploaded:,} uploaded in {result.parts} part(s), {duration:.2f}s"
+        )
+        return result
+
+    def restore(self, remote_key: str, password: str, dest_dir: Path) -> Path:
+        """Download a pipelined backup and unpack it into dest_dir.
+
+        Args:
+            remote_key: Key of a backup written by upload()
+            password: Decryption password
+            dest_dir: Directory to extract into
+
+        Returns:
+            dest_dir
+
+        Raises:
+            DecryptionError: Wrong password or corrupted backup
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            if self.state_dir is None:
+                transfer, download_dir = self._transfer(Path(tmp) / "state"), Path(tmp)
+            else:
+                # A failed download keeps its fetched parts for the next attempt
+                transfer, download_dir = self._transfer(self.state_dir), self.state_dir / "downloads"
+            download_dir.mkdir(parents=True, exist_ok=True)
+            local_path = download_dir / PurePosixPath(remote_key).name
+            if not transfer.download(remote_key, local_path):
+                raise IOError(f"Could not download {remote_key}")
+
+            try:
+                with open(local_path, 'rb') as f:
+                    extract_archive(_IterReader(self.crypto.iter_decrypt(f, password)), dest_dir)
+            finally:
+                local_path.unlink(missing_ok=True)
+        return dest_dir
+
+    def _transfer(self, state_dir: Path) -> MultipartTransfer:
+        return MultipartTransfer(self.backend, state_dir, part_size=self.part_size,
+                                 max_workers=self.upload_workers)
+
+
+def extract_archive(plaintext: BinaryIO, dest_dir: Path, names: Optional[Iterable[str]] = None) -> List[str]:
+    """Decompress and untar a decrypted pipelined backup as one stream.
+
+    The codec is detected from the data, so callers that only have the
+    backup's bytes (not its remote key) can unpack either format.
+
+    Args:
+        plaintext: Decrypted backup stream (tar.zst or tar.gz)
+        dest_dir: Directory to extract into
+        names: Extract only these archive members (default: all)
+
+    Returns:
+        Names of the extracted members
+
+    Raises:
+        ValueError: Not a tar.zst / tar.gz stream, or an unsafe member
+    """
+    wanted = set(names) if names is not None else None
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    if not isinstance(plaintext, io.BufferedReader):
+        plaintext = io.BufferedReader(plaintext, BLOCK_SIZE)
+    magic = plaintext.peek(len(ZSTD_MAGIC))[:len(ZSTD_MAGIC)]
+    if magic.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError("zstandard required to restore this backup: pip install zstandard")
+        stream, mode = zstandard.ZstdDecompressor().stream_reader(plaintext), "r|"
+    elif magic.startswith(GZIP_MAGIC):
+        stream, mode = plaintext, "r|gz"
+    else:
+        raise ValueError("Not a streamed (tar.zst / tar.gz) backup")
+
+    extracted = []
+    with tarfile.open(fileobj=stream, mode=mode, bufsize=BLOCK_SIZE) as tar:
+        for member in tar:
+            _check_member(member)
+            if wanted is not None and member.name not in wanted:
+                continue
+            if hasattr(tarfile, "data_filter"):
+                tar.extract(member, dest_dir, filter="data")
+            else:
+                tar.extract(member, dest_dir)
+            extracted.append(member.name)
+    return extracted
+
+
+def _tree_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+    return 0
+
+
+def _check_member(member: tarfile.TarInfo):
+    """Reject archive members that could write outside the restore directory."""
+    name = PurePosixPath(member.name)
+    if name.is_absolute() or ".." in name.parts:
+        raise ValueError(f"Unsafe path in backup: {member.name}")
+    if not (member.isfile() or member.isdir()):
+        raise ValueError(f"Unsupported entry in backup: {member.name}")
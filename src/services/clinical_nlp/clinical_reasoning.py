@@ -8,6 +8,7 @@ import json
 from typing import List, Dict, Optional
 from dataclasses import asdict
 
+from ..llm_scheduler import LLMPriority
 from .entities import (
     Symptom, Diagnosis, Investigation, Differential, RedFlag,
     SOAPNote, ClinicalContext, Severity
@@ -694,7 +695,10 @@ SOAP Note:
 
 Create a 2-3 sentence clinical summary suitable for a medical note."""
 
-        success, response = self.llm_service.generate(prompt, json_mode=False, max_tokens=200)
+        # Nice-to-have polish: queue behind the doctor's own requests
+        success, response = self.llm_service.generate(
+            prompt, json_mode=False, max_tokens=200, priority=LLMPriority.BACKGROUND
+        )
         if success:
             return response.strip()
 
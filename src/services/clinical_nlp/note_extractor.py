@@ -5,7 +5,7 @@ Handles Hindi, English, and code-mixed speech common in Indian healthcare.
 
 import re
 import json
-from typing import List, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 from datetime import datetime
 
 from ...models.schemas import Medication, Vitals
@@ -14,6 +14,9 @@ from .entities import (
     Severity, Onset, Symptom
 )
 
+if TYPE_CHECKING:
+    from ..llm import LLMService
+
 
 class ClinicalNoteExtractor:
     """Extract structured clinical data from natural language transcripts."""
@@ -92,7 +95,7 @@ class ClinicalNoteExtractor:
     # Frequency patterns (Indian style)
     FREQUENCY_PATTERN = r"\b(OD|BD|TDS|QID|HS|SOS|stat|once daily|twice daily|thrice daily|four times daily|at bedtime|as needed)\b"
 
-    def __init__(self, llm_service=None):
+    def __init__(self, llm_service: Optional["LLMService"] = None):
         """Initialize extractor with optional LLM service for complex extraction."""
         self.llm_service = llm_service
 
@@ -463,7 +466,10 @@ Expected format:
 
 JSON:"""
 
-        success, response = self.llm_service.generate(prompt, json_mode=True)
+        # The prompt is built only from the transcript, so repeats can be cached
+        success, response = self.llm_service.generate_cached(
+            prompt, json_mode=True, flow="medication_extraction"
+        )
         if success:
             try:
                 data = json.loads(response)
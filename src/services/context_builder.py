@@ -10,6 +10,7 @@ from typing import List, Dict, Any, Optional
 from datetime import date, timedelta
 
 from ..models.schemas import PatientSnapshot
+from .token_budget import ContextSection, pack_sections
 
 
 class QueryParser:
@@ -222,76 +223,108 @@ class ContextBuilder:
         self.db = db_service
         self.parser = QueryParser()
 
-    def build_context(self, patient_id: int, question: str) -> str:
+    # Section priorities for packing (lower = more relevant)
+    PRIORITY_HEADER = 0
+    PRIORITY_ROUTED = 1
+    PRIORITY_FTS = 2
+
+    def build_context(self, patient_id: int, question: str, max_tokens: Optional[int] = None) -> str:
         """
         Build context for answering a question about a patient.
 
         Args:
             patient_id: The patient ID
             question: The natural language question
+            max_tokens: Token budget for the context (e.g. from
+                LLMService.context_token_budget). Sections are packed by
+                relevance - snapshot header, then query-routed sections,
+                then keyword (FTS) hits - and the least relevant are
+                shortened or dropped to fit. None means no limit.
 
         Returns:
             Formatted context string for LLM
         """
+        sections = self.build_sections(patient_id, question, include_fts=max_tokens is not None)
+        if max_tokens is None:
+            return "\n\n".join(section.text for section in sections)
+        return pack_sections(sections, max_tokens)
+
+    def build_sections(self, patient_id: int, question: str, include_fts: bool = False) -> List[ContextSection]:
+        """
+        Build the ranked context sections for a question.
+
+        Args:
+            patient_id: The patient ID
+            question: The natural language question
+            include_fts: Always add keyword (FTS) hits as the lowest-priority
+                section; otherwise they are added only when the other
+                sections are thin
+
+        Returns:
+            Non-empty ContextSections, most relevant first
+        """
         parsed = self.parser.parse(question, patient_id)
 
-        context_parts = []
+        sections = []
+
+        def add(name: str, text: str, priority: int = self.PRIORITY_ROUTED):
+            if text:
+                sections.append(ContextSection(text=text, priority=priority, name=name))
 
         # Always start with patient snapshot header
         snapshot = self.db.get_patient_snapshot(patient_id)
         if snapshot:
-            context_parts.append(self._format_snapshot_header(snapshot))
+            add("header", self._format_snapshot_header(snapshot), self.PRIORITY_HEADER)
         else:
             # Generate snapshot if not exists
             try:
                 snapshot = self.db.compute_patient_snapshot(patient_id)
-                context_parts.append(self._format_snapshot_header(snapshot))
+                add("header", self._format_snapshot_header(snapshot), self.PRIORITY_HEADER)
             except Exception:
                 patient = self.db.get_patient(patient_id)
                 if patient:
-                    context_parts.append(f"Patient: {patient.name}, {patient.age}{patient.gender}")
+                    add("header", f"Patient: {patient.name}, {patient.age}{patient.gender}", self.PRIORITY_HEADER)
 
         # Route to appropriate context builders based on parsed query
         if parsed['query_type'] == 'consultation_lookup' and parsed['specialty']:
-            context_parts.append(self._get_consultation_context(patient_id, parsed['specialty']))
+            add("consultations", self._get_consultation_context(patient_id, parsed['specialty']))
 
         elif parsed['query_type'] == 'doctor_lookup' and parsed['doctor_name']:
-            context_parts.append(self._get_doctor_context(patient_id, parsed['doctor_name']))
+            add("doctor", self._get_doctor_context(patient_id, parsed['doctor_name']))
 
         elif parsed['query_type'] == 'trend_analysis' and parsed['test_name']:
-            context_parts.append(self._get_trend_context(patient_id, parsed['test_name']))
+            add("trend", self._get_trend_context(patient_id, parsed['test_name']))
 
         else:
             # General context building based on categories
             for category in parsed['categories']:
                 if category == 'lab':
                     if parsed['test_name']:
-                        context_parts.append(self._get_specific_lab_context(
+                        add("lab", self._get_specific_lab_context(
                             patient_id, parsed['test_name'], parsed['time_filter']
                         ))
                     else:
-                        context_parts.append(self._get_lab_context(patient_id, parsed['time_filter']))
+                        add("lab", self._get_lab_context(patient_id, parsed['time_filter']))
 
                 elif category == 'medication':
-                    context_parts.append(self._get_medication_context(patient_id))
+                    add("medication", self._get_medication_context(patient_id))
 
                 elif category == 'procedure':
-                    context_parts.append(self._get_procedure_context(patient_id))
+                    add("procedure", self._get_procedure_context(patient_id))
 
                 elif category == 'history':
-                    context_parts.append(self._get_visit_history_context(patient_id, parsed['time_filter']))
+                    add("history", self._get_visit_history_context(patient_id, parsed['time_filter']))
 
                 elif category == 'general':
                     # Include a bit of everything
-                    context_parts.append(self._get_recent_summary_context(patient_id))
+                    add("summary", self._get_recent_summary_context(patient_id))
 
         # Use FTS for keyword search if we have keywords and context is thin
-        if parsed['keywords'] and len(''.join(context_parts)) < 500:
-            fts_context = self._get_fts_context(patient_id, ' '.join(parsed['keywords']))
-            if fts_context:
-                context_parts.append(fts_context)
+        thin = len(''.join(section.text for section in sections)) < 500
+        if parsed['keywords'] and (include_fts or thin):
+            add("fts", self._get_fts_context(patient_id, ' '.join(parsed['keywords'])), self.PRIORITY_FTS)
 
-        return "\n\n".join(filter(None, context_parts))
+        return sections
 
     def _format_snapshot_header(self, snapshot: PatientSnapshot) -> str:
         """Format patient snapshot as context header."""
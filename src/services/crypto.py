@@ -4,6 +4,8 @@ Implements WhatsApp-style zero-knowledge encryption:
 - Client-side encryption with NaCl SecretBox (XSalsa20-Poly1305)
 - Key derivation from password using Argon2id
 - All encryption happens locally - server never sees plaintext or keys
+- Files are encrypted as a stream of fixed-size authenticated chunks, so
+  multi-GB backups encrypt and decrypt in constant memory
 
 Security model:
 - Password -> Argon2id KDF -> 256-bit encryption key
@@ -12,12 +14,13 @@ Security model:
 - Without password, data is unrecoverable (zero-knowledge)
 """
 
+import io
 import os
 import base64
 import hashlib
 import secrets
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Iterator, Optional, Tuple
 from dataclasses import dataclass
 
 # Try to import PyNaCl (preferred) or fall back to cryptography
@@ -49,6 +52,20 @@ SALT_SIZE = 16  # 128 bits (required by nacl.pwhash.argon2id)
 NONCE_SIZE = 24  # For XSalsa20 (NaCl) or 12 for AES-GCM
 KEY_SIZE = 32   # 256 bits
 CHUNK_SIZE = 1024 * 1024  # 1 MB chunks for large files
+TAG_SIZE = 16   # Poly1305 / GCM authentication tag
+
+# Streaming format (version 2):
+#   header: version (1) + algorithm (1) + chunk size (4) + salt (16) + file nonce (16)
+#   body:   chunks of (chunk size + TAG_SIZE) bytes, the last one shorter
+# Each chunk is sealed with a per-file subkey derived from the key and the
+# whole header, under a nonce built from the chunk index and a final flag,
+# so reordered, dropped, truncated or appended chunks fail authentication.
+LEGACY_VERSION = 1
+STREAM_VERSION = 2
+STREAM_ALG_XSALSA20_POLY1305 = 1
+STREAM_ALG_AES256_GCM = 2
+STREAM_HEADER_SIZE = 1 + 1 + 4 + SALT_SIZE + 16
+MAX_STREAM_CHUNK_SIZE = 64 * 1024 * 1024
 
 # Argon2 parameters (tuned for security vs. usability)
 # These should take ~0.5-1 second on modern hardware
@@ -102,6 +119,197 @@ class EncryptedData:
         return cls.from_bytes(base64.b64decode(data))
 
 
+class StreamEncryptor:
+    """Incrementally encrypts data into the chunked streaming format.
+
+    Feed plaintext with update() and finish with finalize(); each call
+    returns the ciphertext bytes ready to be written. At most one chunk
+    of plaintext is buffered.
+    """
+
+    def __init__(self, key: bytes, salt: bytes, use_nacl: bool, chunk_size: int = CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_STREAM_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_STREAM_CHUNK_SIZE}")
+        algorithm = STREAM_ALG_XSALSA20_POLY1305 if use_nacl else STREAM_ALG_AES256_GCM
+        self.header = (
+            STREAM_VERSION.to_bytes(1, 'big') +
+            algorithm.to_bytes(1, 'big') +
+            chunk_size.to_bytes(4, 'big') +
+            salt +
+            secrets.token_bytes(16)
+        )
+        self.chunk_size = chunk_size
+        self._seal = _chunk_cipher(key, self.header, algorithm, encrypt=True)
+        self._buffer = bytearray()
+        self._index = 0
+        self._header_sent = False
+        self._finalized = False
+
+    def _take_header(self) -> bytes:
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self.header
+
+    def update(self, data: bytes) -> bytes:
+        """Add plaintext; returns any completed ciphertext."""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._buffer += data
+        out = [self._take_header()]
+        # Hold back a full chunk: it may turn out to be the last one
+        while len(self._buffer) > self.chunk_size:
+            out.append(self._seal(self._index, False, bytes(self._buffer[:self.chunk_size])))
+            del self._buffer[:self.chunk_size]
+            self._index += 1
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """Seal the remaining plaintext as the final chunk."""
+        if self._finalized:
+            raise ValueError("Encryptor already finalized")
+        self._finalized = True
+        out = self._take_header() + self._seal(self._index, True, bytes(self._buffer))
+        self._buffer.clear()
+        return out
+
+
+class StreamDecryptor:
+    """Incrementally decrypts the chunked streaming format.
+
+    Plaintext is only returned once its chunk has been authenticated;
+    finalize() raises DecryptionError if the stream was truncated.
+    """
+
+    def __init__(self, header: bytes, key: bytes):
+        version, algorithm, chunk_size = parse_stream_header(header)
+        self.chunk_size = chunk_size
+        self._sealed_size = chunk_size + TAG_SIZE
+        self._open = _chunk_cipher(key, header[:STREAM_HEADER_SIZE], algorithm, encrypt=False)
+        self._buffer = bytearray()
+        self._index = 0
+        self._finalized = False
+
+    def _open_chunk(self, sealed: bytes, final: bool) -> bytes:
+        try:
+            return self._open(self._index, final, sealed)
+        except Exception as e:
+            if self._index == 0:
+                raise DecryptionError("Decryption failed - wrong password?") from e
+            raise DecryptionError(f"Encrypted stream corrupted at chunk {self._index}") from e
+        finally:
+            self._index += 1
+
+    def update(self, data: bytes) -> bytes:
+        """Add ciphertext; returns any authenticated plaintext."""
+        if self._finalized:
+            raise DecryptionError("Data after end of encrypted stream")
+        self._buffer += data
+        out = []
+        # Keep the last full chunk until we know whether it is final
+        while len(self._buffer) > self._sealed_size:
+            out.append(self._open_chunk(bytes(self._buffer[:self._sealed_size]), False))
+            del self._buffer[:self._sealed_size]
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """Authenticate the final chunk."""
+        if self._finalized:
+            raise DecryptionError("Decryptor already finalized")
+        self._finalized = True
+        if len(self._buffer) < TAG_SIZE:
+            raise DecryptionError("Encrypted stream truncated")
+        out = self._open_chunk(bytes(self._buffer), True)
+        self._buffer.clear()
+        return out
+
+
+class EncryptedWriter(io.RawIOBase):
+    """Writable stream that encrypts into another binary stream.
+
+    Not seekable, so zipfile writes to it in streaming mode:
+
+        with crypto.open_encrypted_writer(path, password) as out:
+            with zipfile.ZipFile(out, 'w') as zipf:
+                ...
+    """
+
+    def __init__(self, dest: BinaryIO, encryptor: StreamEncryptor, close_dest: bool = False):
+        super().__init__()
+        self._dest = dest
+        self._encryptor = encryptor
+        self._close_dest = close_dest
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._dest.write(self._encryptor.update(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._dest.write(self._encryptor.finalize())
+            self._dest.flush()
+        finally:
+            if self._close_dest:
+                self._dest.close()
+            super().close()
+
+
+def parse_stream_header(header: bytes) -> Tuple[int, int, int]:
+    """Validate a streaming header; returns (version, algorithm, chunk_size)."""
+    if len(header) < STREAM_HEADER_SIZE:
+        raise DecryptionError("Invalid encrypted stream: header too short")
+    version, algorithm = header[0], header[1]
+    chunk_size = int.from_bytes(header[2:6], 'big')
+    if version != STREAM_VERSION:
+        raise DecryptionError(f"Unsupported encrypted stream version: {version}")
+    if not 0 < chunk_size <= MAX_STREAM_CHUNK_SIZE:
+        raise DecryptionError("Invalid encrypted stream: bad chunk size")
+    if algorithm == STREAM_ALG_XSALSA20_POLY1305 and not _nacl_available:
+        raise DecryptionError("Stream was encrypted with PyNaCl, which is not installed")
+    if algorithm == STREAM_ALG_AES256_GCM and not _crypto_available:
+        raise DecryptionError("Stream was encrypted with cryptography (AES-GCM), which is not installed")
+    if algorithm not in (STREAM_ALG_XSALSA20_POLY1305, STREAM_ALG_AES256_GCM):
+        raise DecryptionError(f"Unknown encrypted stream algorithm: {algorithm}")
+    return version, algorithm, chunk_size
+
+
+def stream_header_salt(header: bytes) -> bytes:
+    """Password salt stored in a streaming header."""
+    return header[6:6 + SALT_SIZE]
+
+
+def _chunk_cipher(key: bytes, header: bytes, algorithm: int, encrypt: bool):
+    """Build a (index, final, data) -> bytes function sealing or opening one chunk."""
+    # Binding the subkey to the header authenticates the header too
+    subkey = hashlib.blake2b(header, key=key, digest_size=KEY_SIZE, person=b"DocAssistStream").digest()
+
+    if algorithm == STREAM_ALG_XSALSA20_POLY1305:
+        box = nacl.secret.SecretBox(subkey)
+        nonce_size = nacl.secret.SecretBox.NONCE_SIZE
+
+        def seal(index, final, data):
+            nonce = index.to_bytes(nonce_size - 1, 'big') + (b"\x01" if final else b"\x00")
+            if encrypt:
+                return box.encrypt(data, nonce).ciphertext
+            return box.decrypt(data, nonce)
+    else:
+        aesgcm = AESGCM(subkey)
+
+        def seal(index, final, data):
+            nonce = index.to_bytes(11, 'big') + (b"\x01" if final else b"\x00")
+            if encrypt:
+                return aesgcm.encrypt(nonce, data, None)
+            return aesgcm.decrypt(nonce, data, None)
+
+    return seal
+
+
 class CryptoService:
     """Zero-knowledge encryption service for backup data.
 
@@ -119,6 +327,10 @@ class CryptoService:
 
         # Encrypt with recovery key instead of password
         encrypted = crypto.encrypt_with_key(plaintext_bytes, recovery_key)
+
+        # Encrypt/decrypt large files in constant memory
+        crypto.encrypt_file(backup_zip, encrypted_path, "user_password")
+        crypto.decrypt_file(encrypted_path, restored_zip, "user_password")
     """
 
     def __init__(self):
@@ -224,6 +436,14 @@ class CryptoService:
         salt = self.generate_salt()  # Still need salt for format consistency
         return self._encrypt_with_key_bytes(plaintext, key, salt)
 
+    def encrypt_with_key(self, plaintext: bytes, key: bytes) -> EncryptedData:
+        """Encrypt data with an already-derived 32-byte key.
+
+        For many small messages under one password, derive the key once
+        with derive_key() instead of paying for Argon2id per message.
+        """
+        return self._encrypt_with_key_bytes(plaintext, key, self.generate_salt())
+
     def _encrypt_with_key_bytes(self, plaintext: bytes, key: bytes, salt: bytes) -> EncryptedData:
         """Internal encryption with raw key bytes."""
         if self.use_nacl:
@@ -272,6 +492,14 @@ class CryptoService:
         key = self.recovery_key_to_bytes(recovery_key)
         return self._decrypt_with_key_bytes(encrypted, key)
 
+    def decrypt_with_key(self, encrypted: EncryptedData, key: bytes) -> bytes:
+        """Decrypt data sealed by encrypt_with_key().
+
+        Raises:
+            DecryptionError: If the key is wrong or the data was modified
+        """
+        return self._decrypt_with_key_bytes(encrypted, key)
+
     def _decrypt_with_key_bytes(self, encrypted: EncryptedData, key: bytes) -> bytes:
         """Internal decryption with raw key bytes."""
         if self.use_nacl:
@@ -287,8 +515,120 @@ class CryptoService:
             except Exception as e:
                 raise DecryptionError("Decryption failed - wrong password?") from e
 
+    def stream_encryptor(self, password: str, chunk_size: int = CHUNK_SIZE) -> StreamEncryptor:
+        """Create an incremental encryptor for the streaming format.
+
+        Args:
+            password: Encryption password
+            chunk_size: Plaintext bytes per authenticated chunk
+
+        Returns:
+            StreamEncryptor whose output starts with the stream header
+        """
+        salt = self.generate_salt()
+        return StreamEncryptor(self.derive_key(password, salt), salt, self.use_nacl, chunk_size)
+
+    def stream_decryptor(self, header: bytes, password: str) -> StreamDecryptor:
+        """Create an incremental decryptor from a stream header.
+
+        Args:
+            header: First STREAM_HEADER_SIZE bytes of the stream
+            password: Decryption password
+
+        Returns:
+            StreamDecryptor to feed the remaining bytes to
+        """
+        parse_stream_header(header)
+        return StreamDecryptor(header, self.derive_key(password, stream_header_salt(header)))
+
+    def open_encrypted_writer(
+        self,
+        dest,
+        password: str,
+        chunk_size: int = CHUNK_SIZE
+    ) -> EncryptedWriter:
+        """Open a writable stream that encrypts into a file or binary stream.
+
+        Args:
+            dest: Output path, or a writable binary stream (e.g. an upload)
+            password: Encryption password
+            chunk_size: Plaintext bytes per authenticated chunk
+
+        Returns:
+            EncryptedWriter; closing it writes the final chunk
+        """
+        encryptor = self.stream_encryptor(password, chunk_size)
+        if isinstance(dest, (str, Path)):
+            return EncryptedWriter(open(dest, 'wb'), encryptor, close_dest=True)
+        return EncryptedWriter(dest, encryptor)
+
+    def encrypt_stream(
+        self,
+        source: BinaryIO,
+        dest: BinaryIO,
+        password: str,
+        chunk_size: int = CHUNK_SIZE
+    ) -> int:
+        """Encrypt a binary stream into another in constant memory.
+
+        Args:
+            source: Readable plaintext stream
+            dest: Writable stream for the encrypted output
+            password: Encryption password
+            chunk_size: Plaintext bytes per authenticated chunk
+
+        Returns:
+            Number of plaintext bytes encrypted
+        """
+        encryptor = self.stream_encryptor(password, chunk_size)
+        total = 0
+        while True:
+            block = source.read(chunk_size)
+            if not block:
+                break
+            total += len(block)
+            dest.write(encryptor.update(block))
+        dest.write(encryptor.finalize())
+        return total
+
+    def iter_decrypt(self, source: BinaryIO, password: str) -> Iterator[bytes]:
+        """Decrypt a stream, yielding authenticated plaintext chunks.
+
+        Legacy (version 1) EncryptedData blobs are decrypted whole.
+
+        Raises:
+            DecryptionError: Wrong password, corrupted or truncated data
+        """
+        header = source.read(STREAM_HEADER_SIZE)
+        if header[:1] == LEGACY_VERSION.to_bytes(1, 'big'):
+            encrypted = EncryptedData.from_bytes(header + source.read())
+            yield self.decrypt(encrypted, password)
+            return
+
+        decryptor = self.stream_decryptor(header, password)
+        while True:
+            block = source.read(decryptor.chunk_size + TAG_SIZE)
+            if not block:
+                break
+            plaintext = decryptor.update(block)
+            if plaintext:
+                yield plaintext
+        yield decryptor.finalize()
+
+    def decrypt_stream(self, source: BinaryIO, dest: BinaryIO, password: str) -> int:
+        """Decrypt a stream (streaming or legacy format) into another.
+
+        Returns:
+            Number of plaintext bytes written
+        """
+        total = 0
+        for plaintext in self.iter_decrypt(source, password):
+            dest.write(plaintext)
+            total += len(plaintext)
+        return total
+
     def encrypt_file(self, input_path: Path, output_path: Path, password: str) -> bool:
-        """Encrypt a file to another file.
+        """Encrypt a file to another file using the streaming format.
 
         Args:
             input_path: Path to plaintext file
@@ -299,14 +639,8 @@ class CryptoService:
             True if successful
         """
         try:
-            with open(input_path, 'rb') as f:
-                plaintext = f.read()
-
-            encrypted = self.encrypt(plaintext, password)
-
-            with open(output_path, 'wb') as f:
-                f.write(encrypted.to_bytes())
-
+            with open(input_path, 'rb') as src, open(output_path, 'wb') as dst:
+                self.encrypt_stream(src, dst, password)
             return True
         except Exception as e:
             print(f"Encryption failed: {e}")
@@ -315,6 +649,9 @@ class CryptoService:
     def decrypt_file(self, input_path: Path, output_path: Path, password: str) -> bool:
         """Decrypt a file to another file.
 
+        Reads both the streaming format and legacy EncryptedData files.
+        Nothing is left at output_path if decryption fails.
+
         Args:
             input_path: Path to encrypted file
             output_path: Path to write decrypted file
@@ -323,19 +660,16 @@ class CryptoService:
         Returns:
             True if successful
         """
+        output_path = Path(output_path)
+        temp_path = output_path.with_name(output_path.name + ".partial")
         try:
-            with open(input_path, 'rb') as f:
-                data = f.read()
-
-            encrypted = EncryptedData.from_bytes(data)
-            plaintext = self.decrypt(encrypted, password)
-
-            with open(output_path, 'wb') as f:
-                f.write(plaintext)
-
+            with open(input_path, 'rb') as src, open(temp_path, 'wb') as dst:
+                self.decrypt_stream(src, dst, password)
+            os.replace(temp_path, output_path)
             return True
         except Exception as e:
             print(f"Decryption failed: {e}")
+            temp_path.unlink(missing_ok=True)
             return False
 
     def compute_checksum(self, data: bytes) -> str:
@@ -4,12 +4,19 @@ import logging
 import sqlite3
 import json
 import os
+import re
+import weakref
 from pathlib import Path
 from datetime import datetime, date
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 from contextlib import contextmanager
 
-from ..models.schemas import Patient, Visit, Investigation, Procedure
+from ..models.schemas import (
+    Patient, Visit, Investigation, Procedure, Vitals, Medication, PatientSnapshot,
+    PatientRecordBundle,
+)
+from .db_pool import SQLiteConnectionPool
+from .phonetic import IndianPhoneticSearch
 
 logger = logging.getLogger(__name__)
 
@@ -18,29 +25,116 @@ class DatabaseService:
     """Handles all SQLite database operations."""
 
     # Current schema version
-    SCHEMA_VERSION = 1
-
-    def __init__(self, db_path: Optional[str] = None):
+    SCHEMA_VERSION = 7
+
+    # clinical_fts rowid = source id * 4 + code, so each source row maps to
+    # exactly one index row without a lookup table
+    _FTS_DOC_CODES = {"visit": 1, "investigation": 2, "procedure": 3}
+
+    # (title, body) expressions per source table; {row} is new/old or a table alias
+    _FTS_SOURCE_SQL = {
+        "visit": (
+            "coalesce({row}.diagnosis, ''), "
+            "replace(trim(coalesce({row}.chief_complaint, '') || ' ' || coalesce({row}.clinical_notes, '') || ' ' || "
+            "CASE WHEN json_valid({row}.prescription_json) THEN coalesce(("
+            "SELECT group_concat(json_extract(value, '$.drug_name'), ' ') "
+            "FROM json_each({row}.prescription_json, '$.medications') WHERE type = 'object'), '') ELSE '' END), '  ', ' ')"
+        ),
+        "investigation": (
+            "{row}.test_name, "
+            "trim(coalesce({row}.result, '') || ' ' || coalesce({row}.unit, '') || "
+            "CASE WHEN {row}.is_abnormal THEN ' abnormal' ELSE '' END)"
+        ),
+        "procedure": (
+            "{row}.procedure_name, "
+            "trim(coalesce({row}.details, '') || ' ' || coalesce({row}.notes, ''))"
+        ),
+    }
+
+    _FTS_DATE_COLUMNS = {
+        "visit": "{row}.visit_date",
+        "investigation": "{row}.test_date",
+        "procedure": "{row}.procedure_date",
+    }
+
+    # Drugs that set PatientSnapshot.on_anticoagulation
+    ANTICOAGULANTS = (
+        "warfarin", "acenocoumarol", "heparin", "enoxaparin", "dabigatran",
+        "rivaroxaban", "apixaban", "edoxaban", "fondaparinux",
+    )
+
+    # Child record types a PatientRecordBundle can carry
+    BUNDLE_PARTS = ("visits", "investigations", "procedures", "allergies", "vitals")
+
+    # Patient IDs per IN (...) list; stays well under SQLite's variable limit
+    BUNDLE_BATCH_SIZE = 500
+
+    # Number of pooled read-only connections
+    READER_POOL_SIZE = 4
+
+    # Tables whose row changes are logged for delta sync to mobile
+    SYNC_TABLES = ("patients", "visits", "investigations", "procedures", "vitals", "patient_allergies")
+
+    # Change-log entries older than this are dropped even if never published
+    SYNC_LOG_MAX_AGE_DAYS = 30
+
+    def __init__(self, db_path: Optional[str] = None, reader_pool_size: Optional[int] = None):
         if db_path is None:
             db_path = os.getenv("DOCASSIST_DB_PATH", "data/clinic.db")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One writer connection (SQLite allows a single writer anyway) plus
+        # a reader pool so reads never wait behind a write transaction
+        self._writer_pool = SQLiteConnectionPool(self.db_path, max_size=1)
+        self._reader_pool = SQLiteConnectionPool(
+            self.db_path,
+            max_size=reader_pool_size or self.READER_POOL_SIZE,
+            readonly=True,
+        )
+
+        self._phonetic = IndianPhoneticSearch()
+        self._phonetic_code_listeners: List[weakref.WeakMethod] = []
         self._init_database()
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        """Context manager for a pooled read-write connection.
+
+        Nested calls on the same thread share the outer connection and
+        transaction; the commit happens when the outermost block exits.
+        """
+        outermost = self._writer_pool.held_connection() is None
+        with self._writer_pool.connection() as conn:
+            try:
+                yield conn
+                if outermost:
+                    conn.commit()
+            except Exception as e:
+                if outermost:
+                    logger.error(f"Database transaction error: {e}")
+                    conn.rollback()
+                raise
+
+    @contextmanager
+    def get_read_connection(self):
+        """Context manager for a pooled read-only connection.
+
+        If the calling thread is inside a write transaction, its writer
+        connection is reused so the read sees its own uncommitted changes.
+        """
+        held = self._writer_pool.held_connection()
+        if held is not None:
+            yield held
+            return
+
+        with self._reader_pool.connection() as conn:
             yield conn
-            conn.commit()
-        except Exception as e:
-            logger.error(f"Database transaction error: {e}")
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+
+    def close(self):
+        """Close all pooled connections."""
+        self._reader_pool.close()
+        self._writer_pool.close()
 
     def _init_database(self):
         """Initialize database and run migrations."""
@@ -58,6 +152,11 @@ class DatabaseService:
         # Run any pending migrations
         self._run_migrations()
 
+        # Patients inserted without add_patient (imports, raw SQL) since the last run
+        backfilled = self.backfill_phonetic_codes()
+        if backfilled:
+            logger.info(f"Backfilled phonetic codes for {backfilled} patients")
+
     def _get_schema_version(self) -> int:
         """Get the current schema version from database."""
         with self.get_connection() as conn:
@@ -173,20 +272,377 @@ class DatabaseService:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_procedures_patient ON procedures(patient_id)")
 
     def _migration_v2(self):
-        """Sample placeholder migration - v2.
+        """Full-text search indexes - v2.
+
+        patients_fts is an external-content FTS5 index over patient
+        demographics. clinical_fts holds searchable text for visits,
+        investigations and procedures (rowid encodes source table + id).
+        Triggers keep both in sync; existing rows are backfilled.
+        """
+        logger.info("Creating full-text search indexes (v2)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+                    name, uhid, phone, address,
+                    content='patients',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                )
+            """)
+
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS clinical_fts USING fts5(
+                    title, body,
+                    patient_id UNINDEXED,
+                    doc_type UNINDEXED,
+                    doc_id UNINDEXED,
+                    doc_date UNINDEXED,
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='3'
+                )
+            """)
 
-        This is an example of how to add future migrations.
-        When you need to modify the schema, increment SCHEMA_VERSION
-        and add the migration logic here.
+            # patients -> patients_fts
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+                    INSERT INTO patients_fts(rowid, name, uhid, phone, address)
+                    VALUES (new.id, new.name, new.uhid, new.phone, new.address);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+                    INSERT INTO patients_fts(patients_fts, rowid, name, uhid, phone, address)
+                    VALUES ('delete', old.id, old.name, old.uhid, old.phone, old.address);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE ON patients BEGIN
+                    INSERT INTO patients_fts(patients_fts, rowid, name, uhid, phone, address)
+                    VALUES ('delete', old.id, old.name, old.uhid, old.phone, old.address);
+                    INSERT INTO patients_fts(rowid, name, uhid, phone, address)
+                    VALUES (new.id, new.name, new.uhid, new.phone, new.address);
+                END
+            """)
 
-        Example:
-            # Add a new column to patients table
-            cursor.execute("ALTER TABLE patients ADD COLUMN email TEXT")
+            # visits/investigations/procedures -> clinical_fts
+            for table, doc_type in (("visits", "visit"),
+                                    ("investigations", "investigation"),
+                                    ("procedures", "procedure")):
+                rowid_expr = f"{{row}}.id * 4 + {self._FTS_DOC_CODES[doc_type]}"
+                insert_sql = (
+                    "INSERT INTO clinical_fts(rowid, title, body, patient_id, doc_type, doc_id, doc_date) "
+                    f"VALUES ({rowid_expr.format(row='new')}, "
+                    f"{self._FTS_SOURCE_SQL[doc_type].format(row='new')}, "
+                    f"new.patient_id, '{doc_type}', new.id, {self._FTS_DATE_COLUMNS[doc_type].format(row='new')});"
+                )
+                delete_sql = f"DELETE FROM clinical_fts WHERE rowid = {rowid_expr.format(row='old')};"
+
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+                        {insert_sql}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+                        {delete_sql}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE ON {table} BEGIN
+                        {delete_sql}
+                        {insert_sql}
+                    END
+                """)
+
+            self._rebuild_fts_indexes(cursor)
+
+    def _migration_v3(self):
+        """Allergies, vitals and materialized patient snapshots - v3.
+
+        patient_snapshots holds one pre-computed PatientSnapshot per patient.
+        Triggers on every table that feeds a snapshot set is_dirty, and the
+        snapshot is recomputed on next read (or by refresh/rebuild).
         """
-        logger.info("Running migration v2 (placeholder - no changes)")
-        # This migration intentionally does nothing
-        # It's here as a template for future migrations
-        pass
+        logger.info("Creating allergies, vitals and patient snapshot tables (v3)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patient_allergies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    patient_id INTEGER NOT NULL,
+                    allergen TEXT NOT NULL,
+                    reaction TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (patient_id) REFERENCES patients(id)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS vitals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    patient_id INTEGER NOT NULL,
+                    visit_id INTEGER,
+                    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    bp_systolic INTEGER,
+                    bp_diastolic INTEGER,
+                    pulse INTEGER,
+                    temperature REAL,
+                    spo2 INTEGER,
+                    respiratory_rate INTEGER,
+                    weight REAL,
+                    height REAL,
+                    bmi REAL,
+                    blood_sugar REAL,
+                    sugar_type TEXT,
+                    notes TEXT,
+                    FOREIGN KEY (patient_id) REFERENCES patients(id),
+                    FOREIGN KEY (visit_id) REFERENCES visits(id)
+                )
+            """)
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patient_snapshots (
+                    patient_id INTEGER PRIMARY KEY,
+                    snapshot_json TEXT,
+                    is_dirty INTEGER NOT NULL DEFAULT 1,
+                    updated_at TIMESTAMP,
+                    FOREIGN KEY (patient_id) REFERENCES patients(id)
+                )
+            """)
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_allergies_patient ON patient_allergies(patient_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_vitals_patient ON vitals(patient_id, recorded_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_dirty ON patient_snapshots(is_dirty)")
+
+            mark_dirty = (
+                "INSERT INTO patient_snapshots (patient_id, is_dirty) VALUES ({row}.patient_id, 1) "
+                "ON CONFLICT(patient_id) DO UPDATE SET is_dirty = 1;"
+            )
+            for table in ("visits", "investigations", "procedures", "vitals", "patient_allergies"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_snapshot_ai AFTER INSERT ON {table} BEGIN
+                        {mark_dirty.format(row='new')}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_snapshot_au AFTER UPDATE ON {table} BEGIN
+                        {mark_dirty.format(row='old')}
+                        {mark_dirty.format(row='new')}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_snapshot_ad AFTER DELETE ON {table} BEGIN
+                        {mark_dirty.format(row='old')}
+                    END
+                """)
+
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_snapshot_au AFTER UPDATE ON patients BEGIN
+                    UPDATE patient_snapshots SET is_dirty = 1 WHERE patient_id = new.id;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_snapshot_ad AFTER DELETE ON patients BEGIN
+                    DELETE FROM patient_snapshots WHERE patient_id = old.id;
+                END
+            """)
+
+    def _migration_v4(self):
+        """RAG change journal - v4.
+
+        Triggers append one row per inserted/updated/deleted visit,
+        investigation, procedure or patient, so the vector index can be
+        brought up to date without re-reading every patient.
+        """
+        logger.info("Creating RAG change journal (v4)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rag_change_journal (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    patient_id INTEGER NOT NULL,
+                    doc_type TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    operation TEXT NOT NULL,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_rag_journal_patient ON rag_change_journal(patient_id)")
+
+            journal = (
+                "INSERT INTO rag_change_journal (patient_id, doc_type, doc_id, operation) "
+                "VALUES ({patient}, '{doc_type}', {row}.id, '{op}');"
+            )
+            sources = (
+                ("visits", "visit", "{row}.patient_id"),
+                ("investigations", "investigation", "{row}.patient_id"),
+                ("procedures", "procedure", "{row}.patient_id"),
+                ("patients", "patient", "{row}.id"),
+            )
+            for table, doc_type, patient in sources:
+                for suffix, event, row, op in (("ai", "INSERT", "new", "insert"),
+                                               ("au", "UPDATE", "new", "update"),
+                                               ("ad", "DELETE", "old", "delete")):
+                    entry = journal.format(patient=patient.format(row=row), doc_type=doc_type, row=row, op=op)
+                    if table != "patients" and event == "UPDATE":
+                        # A row can move between patients; re-index the old one too
+                        entry += (
+                            "\nINSERT INTO rag_change_journal (patient_id, doc_type, doc_id, operation) "
+                            "SELECT old.patient_id, '{doc_type}', old.id, 'update' "
+                            "WHERE old.patient_id IS NOT new.patient_id;"
+                        ).format(doc_type=doc_type)
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {table}_rag_{suffix} AFTER {event} ON {table} BEGIN
+                            {entry}
+                        END
+                    """)
+
+    def _migration_v5(self):
+        """Phonetic name codes - v5.
+
+        patient_phonetic_codes stores IndianPhoneticSearch codes per patient
+        and patient_phonetic_tokens one row per word of the code. Both are
+        indexed, so phonetic search looks up a small candidate bucket instead
+        of encoding every patient's name on every keystroke. Codes are
+        computed in Python, so add_patient/update_patient maintain them;
+        existing patients are backfilled here.
+        """
+        logger.info("Creating phonetic code index (v5)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patient_phonetic_codes (
+                    patient_id INTEGER PRIMARY KEY,
+                    phonetic_code TEXT NOT NULL,
+                    phonetic_code_aggressive TEXT NOT NULL,
+                    FOREIGN KEY (patient_id) REFERENCES patients(id)
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patient_phonetic_tokens (
+                    token TEXT NOT NULL,
+                    patient_id INTEGER NOT NULL,
+                    PRIMARY KEY (token, patient_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_phonetic_code ON patient_phonetic_codes(phonetic_code)")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_phonetic_code_aggressive "
+                "ON patient_phonetic_codes(phonetic_code_aggressive)"
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_phonetic_tokens_patient ON patient_phonetic_tokens(patient_id)")
+
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_phonetic_ad AFTER DELETE ON patients BEGIN
+                    DELETE FROM patient_phonetic_codes WHERE patient_id = old.id;
+                    DELETE FROM patient_phonetic_tokens WHERE patient_id = old.id;
+                END
+            """)
+
+            backfilled = self._backfill_phonetic_codes(cursor)
+            logger.info(f"Backfilled phonetic codes for {backfilled} patients")
+
+    def _migration_v6(self):
+        """Per-patient data versions - v6.
+
+        patient_data_versions holds a counter per patient that triggers bump
+        whenever the patient row or any of their clinical records change,
+        so caches of patient-specific results (e.g. LLM answers) can tell
+        when they are stale without re-reading the records.
+        """
+        logger.info("Creating per-patient data versions (v6)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patient_data_versions (
+                    patient_id INTEGER PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (patient_id) REFERENCES patients(id)
+                )
+            """)
+
+            bump = (
+                "INSERT INTO patient_data_versions (patient_id, version) VALUES ({patient}, 1) "
+                "ON CONFLICT(patient_id) DO UPDATE SET version = version + 1;"
+            )
+            for table in ("visits", "investigations", "procedures", "vitals", "patient_allergies"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} BEGIN
+                        {bump.format(patient='new.patient_id')}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE ON {table} BEGIN
+                        {bump.format(patient='old.patient_id')}
+                        {bump.format(patient='new.patient_id')}
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} BEGIN
+                        {bump.format(patient='old.patient_id')}
+                    END
+                """)
+
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS patients_version_au AFTER UPDATE ON patients BEGIN
+                    {bump.format(patient='new.id')}
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS patients_version_ad AFTER DELETE ON patients BEGIN
+                    DELETE FROM patient_data_versions WHERE patient_id = old.id;
+                END
+            """)
+
+    def _migration_v7(self):
+        """Delta sync change log - v7.
+
+        sync_change_log gets one row per inserted/updated/deleted row of a
+        synced table; its seq is this database's change counter. Published
+        change sets carry the rows changed in a seq range, and sync_versions
+        records the highest seq published per device, so a snapshot of this
+        database says which change sets it already contains.
+        """
+        logger.info("Creating delta sync change log (v7)")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sync_change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    operation TEXT NOT NULL,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sync_versions (
+                    device_id TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+            log = (
+                "INSERT INTO sync_change_log (table_name, row_id, operation) "
+                "VALUES ('{table}', {row}.id, '{op}');"
+            )
+            for table in self.SYNC_TABLES:
+                for suffix, event, row, op in (("ai", "INSERT", "new", "upsert"),
+                                               ("au", "UPDATE", "new", "upsert"),
+                                               ("ad", "DELETE", "old", "delete")):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS {table}_sync_{suffix} AFTER {event} ON {table} BEGIN
+                            {log.format(table=table, row=row, op=op)}
+                        END
+                    """)
 
     # Migration mapping - add new migrations here
     @property
@@ -194,7 +650,12 @@ class DatabaseService:
         """Map of version numbers to migration functions."""
         return {
             1: self._migration_v1,
-            # 2: self._migration_v2,  # Uncomment when ready to apply v2
+            2: self._migration_v2,
+            3: self._migration_v3,
+            4: self._migration_v4,
+            5: self._migration_v5,
+            6: self._migration_v6,
+            7: self._migration_v7,
         }
 
     def _generate_uhid(self) -> str:
@@ -220,12 +681,13 @@ class DatabaseService:
                   patient.phone, patient.address))
             patient.id = cursor.lastrowid
             patient.uhid = uhid
+            self._save_phonetic_codes(cursor, [(patient.id, patient.name)])
         self.mark_data_changed()
         return patient
 
     def get_patient(self, patient_id: int) -> Optional[Patient]:
         """Get patient by ID."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
             row = cursor.fetchone()
@@ -235,22 +697,84 @@ class DatabaseService:
 
     def get_all_patients(self) -> List[Patient]:
         """Get all patients."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM patients ORDER BY name")
             return [Patient(**dict(row)) for row in cursor.fetchall()]
 
+    def get_patients_by_ids(self, patient_ids: Iterable[int]) -> Dict[int, Patient]:
+        """Load many patients through the batched bundle loader, without child records.
+
+        Returns:
+            Dict of patient ID to Patient, in the order requested. Unknown
+            IDs are left out.
+        """
+        bundles = self.get_patient_bundles(patient_ids, include=())
+        return {pid: bundle.patient for pid, bundle in bundles.items()}
+
+    def get_patient_names(self) -> List[Tuple[int, str]]:
+        """Get (id, name) for every patient, without loading full rows."""
+        with self.get_read_connection() as conn:
+            return [(row[0], row[1]) for row in conn.execute("SELECT id, name FROM patients")]
+
+    def find_patient_ids_by_identifier(self, query: str, limit: int = 20) -> List[int]:
+        """Patients whose UHID matches exactly or by prefix, or whose phone ends with the digits.
+
+        Exact UHID matches come first.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+
+        with self.get_read_connection() as conn:
+            rows = conn.execute("""
+                SELECT id FROM patients
+                WHERE uhid = ? COLLATE NOCASE OR uhid LIKE ?
+                ORDER BY uhid = ? COLLATE NOCASE DESC, uhid
+                LIMIT ?
+            """, (query, f"{query}%", query, limit)).fetchall()
+            ids = [row[0] for row in rows]
+
+            digits = re.sub(r"\D", "", query)
+            if len(digits) >= 4 and re.fullmatch(r"\+?[\d\s-]+", query):
+                rows = conn.execute("""
+                    SELECT id FROM patients WHERE phone LIKE ? LIMIT ?
+                """, (f"%{digits}", limit)).fetchall()
+                ids.extend(row[0] for row in rows if row[0] not in ids)
+
+        return ids[:limit]
+
     def search_patients_basic(self, query: str) -> List[Patient]:
-        """Basic text search on patient name and UHID."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        """Basic text search on patient name and UHID.
+
+        Whole-word prefix hits from the FTS5 index come first, followed by
+        any other substring matches (e.g. an infix fragment such as "harm"),
+        so the results always include everything the LIKE scan finds.
+        """
+        fts_rows = []
+        fts_query = self._build_fts_query(query, columns=("name", "uhid"))
+        with self.get_read_connection() as conn:
+            if fts_query:
+                try:
+                    fts_rows = conn.execute("""
+                        SELECT p.* FROM patients_fts f
+                        JOIN patients p ON p.id = f.rowid
+                        WHERE patients_fts MATCH ?
+                        ORDER BY p.name
+                    """, (fts_query,)).fetchall()
+                except sqlite3.OperationalError as e:
+                    logger.warning(f"FTS patient search failed, using LIKE: {e}")
+
             search_term = f"%{query}%"
-            cursor.execute("""
+            like_rows = conn.execute("""
                 SELECT * FROM patients
                 WHERE name LIKE ? OR uhid LIKE ?
                 ORDER BY name
-            """, (search_term, search_term))
-            return [Patient(**dict(row)) for row in cursor.fetchall()]
+            """, (search_term, search_term)).fetchall()
+
+        fts_ids = {row["id"] for row in fts_rows}
+        rows = fts_rows + [row for row in like_rows if row["id"] not in fts_ids]
+        return [Patient(**dict(row)) for row in rows]
 
     def update_patient(self, patient: Patient) -> bool:
         """Update patient details."""
@@ -263,6 +787,8 @@ class DatabaseService:
             """, (patient.name, patient.age, patient.gender,
                   patient.phone, patient.address, patient.id))
             updated = cursor.rowcount > 0
+            if updated:
+                self._save_phonetic_codes(cursor, [(patient.id, patient.name)])
         if updated:
             self.mark_data_changed()
         return updated
@@ -286,7 +812,7 @@ class DatabaseService:
 
     def get_patient_visits(self, patient_id: int) -> List[Visit]:
         """Get all visits for a patient."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM visits WHERE patient_id = ?
@@ -331,7 +857,7 @@ class DatabaseService:
 
     def get_patient_investigations(self, patient_id: int) -> List[Investigation]:
         """Get all investigations for a patient."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM investigations WHERE patient_id = ?
@@ -358,7 +884,7 @@ class DatabaseService:
 
     def get_patient_procedures(self, patient_id: int) -> List[Procedure]:
         """Get all procedures for a patient."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM procedures WHERE patient_id = ?
@@ -366,14 +892,731 @@ class DatabaseService:
             """, (patient_id,))
             return [Procedure(**dict(row)) for row in cursor.fetchall()]
 
+    # ============== ALLERGY OPERATIONS ==============
+
+    def add_allergy(self, patient_id: int, allergen: str, reaction: str = "") -> int:
+        """Record a drug/food allergy for a patient.
+
+        Returns:
+            ID of the new allergy record
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO patient_allergies (patient_id, allergen, reaction)
+                VALUES (?, ?, ?)
+            """, (patient_id, allergen.strip(), reaction))
+            allergy_id = cursor.lastrowid
+        self.mark_data_changed()
+        return allergy_id
+
+    def get_patient_allergies(self, patient_id: int) -> List[dict]:
+        """Get all recorded allergies for a patient."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM patient_allergies WHERE patient_id = ?
+                ORDER BY created_at, id
+            """, (patient_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def check_allergy(self, patient_id: int, allergen: str) -> bool:
+        """Check whether a patient has a recorded allergy matching allergen."""
+        allergen = allergen.strip().lower()
+        if not allergen:
+            return False
+        return any(
+            allergen in a["allergen"].lower() or a["allergen"].lower() in allergen
+            for a in self.get_patient_allergies(patient_id)
+        )
+
+    # ============== VITALS OPERATIONS ==============
+
+    def add_vitals(self, vitals: Union[Vitals, dict]) -> Vitals:
+        """Record a set of vitals. BMI is derived when weight and height are given."""
+        if isinstance(vitals, dict):
+            vitals = Vitals(**vitals)
+        if vitals.bmi is None and vitals.weight and vitals.height:
+            vitals.bmi = round(vitals.weight / ((vitals.height / 100) ** 2), 1)
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            recorded_at = vitals.recorded_at or datetime.now()
+            cursor.execute("""
+                INSERT INTO vitals (patient_id, visit_id, recorded_at, bp_systolic,
+                                    bp_diastolic, pulse, temperature, spo2,
+                                    respiratory_rate, weight, height, bmi,
+                                    blood_sugar, sugar_type, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (vitals.patient_id, vitals.visit_id, recorded_at,
+                  vitals.bp_systolic, vitals.bp_diastolic, vitals.pulse,
+                  vitals.temperature, vitals.spo2, vitals.respiratory_rate,
+                  vitals.weight, vitals.height, vitals.bmi,
+                  vitals.blood_sugar, vitals.sugar_type, vitals.notes))
+            vitals.id = cursor.lastrowid
+            vitals.recorded_at = recorded_at
+        self.mark_data_changed()
+        return vitals
+
+    def get_latest_vitals(self, patient_id: int) -> Optional[dict]:
+        """Get the most recently recorded vitals for a patient."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM vitals WHERE patient_id = ?
+                ORDER BY recorded_at DESC, id DESC
+                LIMIT 1
+            """, (patient_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    # ============== PATIENT RECORD BUNDLES ==============
+
+    def get_patient_bundle(
+        self,
+        patient_id: int,
+        include: Optional[Sequence[str]] = None
+    ) -> Optional[PatientRecordBundle]:
+        """Load one patient with all child records on a single connection.
+
+        Args:
+            patient_id: Patient ID
+            include: Subset of BUNDLE_PARTS to load (default: all)
+
+        Returns:
+            PatientRecordBundle, or None if the patient does not exist
+        """
+        return self.get_patient_bundles([patient_id], include=include).get(patient_id)
+
+    def get_patient_bundles(
+        self,
+        patient_ids: Iterable[int],
+        include: Optional[Sequence[str]] = None
+    ) -> Dict[int, PatientRecordBundle]:
+        """Load many patients with their child records in batched queries.
+
+        Issues one query per record type per BUNDLE_BATCH_SIZE patients,
+        however many rows each patient has.
+
+        Args:
+            patient_ids: Patient IDs to load
+            include: Subset of BUNDLE_PARTS to load (default: all)
+
+        Returns:
+            Dict of patient ID to bundle, in the order requested. Unknown
+            IDs are left out.
+        """
+        ids = list(dict.fromkeys(patient_ids))
+        loaded: Dict[int, PatientRecordBundle] = {}
+
+        with self.get_read_connection() as conn:
+            for start in range(0, len(ids), self.BUNDLE_BATCH_SIZE):
+                batch = ids[start:start + self.BUNDLE_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(f"""
+                    SELECT * FROM patients WHERE id IN ({placeholders})
+                """, batch).fetchall()
+                patients = [Patient(**dict(row)) for row in rows]
+                loaded.update(self._load_bundle_children(conn, patients, include))
+
+        return {pid: loaded[pid] for pid in ids if pid in loaded}
+
+    def iter_patient_bundles(
+        self,
+        batch_size: Optional[int] = None,
+        include: Optional[Sequence[str]] = None,
+        start_after: int = 0
+    ) -> Iterator[PatientRecordBundle]:
+        """Stream every patient's bundle, ordered by patient ID.
+
+        Pages through patients by primary key, so memory and query count
+        depend on batch_size rather than on clinic size.
+
+        Args:
+            batch_size: Patients per page (default: BUNDLE_BATCH_SIZE)
+            include: Subset of BUNDLE_PARTS to load (default: all)
+            start_after: Only patients with a higher ID (for resuming)
+        """
+        batch_size = batch_size or self.BUNDLE_BATCH_SIZE
+        last_id = start_after
+
+        while True:
+            with self.get_read_connection() as conn:
+                rows = conn.execute("""
+                    SELECT * FROM patients WHERE id > ? ORDER BY id LIMIT ?
+                """, (last_id, batch_size)).fetchall()
+                if not rows:
+                    return
+                patients = [Patient(**dict(row)) for row in rows]
+                page = self._load_bundle_children(conn, patients, include)
+
+            yield from page.values()
+            last_id = patients[-1].id
+
+    def _iter_patient_id_pages(self, batch_size: int) -> Iterator[List[int]]:
+        """Yield patient IDs in ascending pages (keyset pagination)."""
+        last_id = 0
+        while True:
+            with self.get_read_connection() as conn:
+                patient_ids = [row[0] for row in conn.execute("""
+                    SELECT id FROM patients WHERE id > ? ORDER BY id LIMIT ?
+                """, (last_id, batch_size)).fetchall()]
+            if not patient_ids:
+                return
+            yield patient_ids
+            last_id = patient_ids[-1]
+
+    def _load_bundle_children(
+        self,
+        conn: sqlite3.Connection,
+        patients: List[Patient],
+        include: Optional[Sequence[str]] = None
+    ) -> Dict[int, PatientRecordBundle]:
+        """Attach child rows to already-loaded patients, one query per type."""
+        bundles = {p.id: PatientRecordBundle(patient=p) for p in patients}
+        if not bundles:
+            return bundles
+
+        parts = self.BUNDLE_PARTS if include is None else include
+        unknown = set(parts) - set(self.BUNDLE_PARTS)
+        if unknown:
+            raise ValueError(f"Unknown bundle parts: {sorted(unknown)}")
+
+        ids = list(bundles)
+        placeholders = ",".join("?" * len(ids))
+
+        # Same per-patient ordering as get_patient_visits() & co.
+        child_queries = (
+            ("visits", Visit, "visits", "visit_date DESC, created_at DESC"),
+            ("investigations", Investigation, "investigations", "test_date DESC, id DESC"),
+            ("procedures", Procedure, "procedures", "procedure_date DESC, id DESC"),
+        )
+        for part, model, table, order in child_queries:
+            if part not in parts:
+                continue
+            for row in conn.execute(f"""
+                SELECT * FROM {table} WHERE patient_id IN ({placeholders})
+                ORDER BY patient_id, {order}
+            """, ids):
+                getattr(bundles[row["patient_id"]], part).append(model(**dict(row)))
+
+        if "allergies" in parts:
+            for row in conn.execute(f"""
+                SELECT patient_id, allergen FROM patient_allergies
+                WHERE patient_id IN ({placeholders})
+                ORDER BY patient_id, created_at, id
+            """, ids):
+                bundles[row["patient_id"]].allergies.append(row["allergen"])
+
+        if "vitals" in parts:
+            for row in conn.execute(f"""
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY patient_id ORDER BY recorded_at DESC, id DESC
+                    ) AS rn
+                    FROM vitals WHERE patient_id IN ({placeholders})
+                ) WHERE rn = 1
+            """, ids):
+                latest = dict(row)
+                latest.pop("rn")
+                bundles[row["patient_id"]].latest_vitals = latest
+
+        return bundles
+
+    # ============== PATIENT SNAPSHOTS ==============
+
+    def compute_patient_snapshot(self, patient_id: int) -> PatientSnapshot:
+        """Build a PatientSnapshot from the patient's full record.
+
+        This loads the whole record bundle; use get_patient_snapshot() for
+        the cached version.
+
+        Raises:
+            ValueError: If the patient does not exist
+        """
+        bundle = self.get_patient_bundle(patient_id)
+        if not bundle:
+            raise ValueError(f"Patient {patient_id} not found")
+        return self._build_snapshot(bundle)
+
+    def _build_snapshot(self, bundle: PatientRecordBundle) -> PatientSnapshot:
+        """Assemble a snapshot from an already-loaded record bundle."""
+        patient = bundle.patient
+        visits = bundle.visits
+        latest_vitals = bundle.latest_vitals
+
+        demographics = patient.name
+        if patient.age is not None or patient.gender:
+            demographics += f", {patient.age if patient.age is not None else ''}{patient.gender or ''}"
+
+        # Active problems: distinct diagnoses, most recent first
+        active_problems: List[str] = []
+        for visit in visits:
+            diagnosis = (visit.diagnosis or "").strip()
+            if diagnosis and diagnosis not in active_problems:
+                active_problems.append(diagnosis)
+
+        # Current medications: from the latest visit that has a prescription
+        current_medications: List[Medication] = []
+        for visit in visits:
+            if not visit.prescription_json:
+                continue
+            try:
+                rx = json.loads(visit.prescription_json)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Could not parse prescription JSON for visit {visit.id}: {e}")
+                continue
+            meds = rx.get("medications") if isinstance(rx, dict) else None
+            if not meds:
+                continue
+            for med in meds:
+                try:
+                    current_medications.append(Medication(**med))
+                except (TypeError, ValueError):
+                    logger.warning(f"Skipping malformed medication in visit {visit.id}: {med!r}")
+            break
+
+        # Key labs: latest result per test
+        key_labs = {}
+        for inv in bundle.investigations:
+            key = inv.test_name.strip().lower()
+            if key and key not in key_labs:
+                key_labs[key] = {
+                    "value": inv.result,
+                    "unit": inv.unit,
+                    "date": str(inv.test_date) if inv.test_date else None,
+                    "abnormal": bool(inv.is_abnormal),
+                }
+
+        vitals = {}
+        if latest_vitals:
+            if latest_vitals.get("bp_systolic") and latest_vitals.get("bp_diastolic"):
+                vitals["BP"] = f"{latest_vitals['bp_systolic']}/{latest_vitals['bp_diastolic']}"
+            for column, label, unit in (("pulse", "Pulse", "/min"), ("spo2", "SpO2", "%"),
+                                        ("temperature", "Temp", "°F"), ("weight", "Weight", "kg"),
+                                        ("bmi", "BMI", ""), ("blood_sugar", "Sugar", "mg/dL")):
+                if latest_vitals.get(column) is not None:
+                    vitals[label] = f"{latest_vitals[column]}{unit}"
+            vitals["recorded_at"] = str(latest_vitals.get("recorded_at"))
+
+        anticoag_drug = next(
+            (m.drug_name for m in current_medications
+             if any(drug in m.drug_name.lower() for drug in self.ANTICOAGULANTS)),
+            None
+        )
+
+        major_events = [
+            f"{proc.procedure_name} - {proc.procedure_date}" if proc.procedure_date else proc.procedure_name
+            for proc in bundle.procedures[:5]
+        ]
+
+        return PatientSnapshot(
+            patient_id=patient.id,
+            uhid=patient.uhid or "",
+            demographics=demographics,
+            active_problems=active_problems[:10],
+            current_medications=current_medications,
+            allergies=bundle.allergies,
+            key_labs=key_labs,
+            vitals=vitals,
+            on_anticoagulation=anticoag_drug is not None,
+            anticoag_drug=anticoag_drug,
+            last_visit_date=visits[0].visit_date if visits else None,
+            major_events=major_events,
+            last_updated=datetime.now(),
+        )
+
+    def save_patient_snapshot(self, snapshot: PatientSnapshot):
+        """Persist a snapshot and clear its dirty flag."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO patient_snapshots (patient_id, snapshot_json, is_dirty, updated_at)
+                VALUES (?, ?, 0, CURRENT_TIMESTAMP)
+                ON CONFLICT(patient_id) DO UPDATE SET
+                    snapshot_json = excluded.snapshot_json,
+                    is_dirty = 0,
+                    updated_at = excluded.updated_at
+            """, (snapshot.patient_id, snapshot.model_dump_json()))
+
+    def get_patient_snapshot(self, patient_id: int) -> Optional[PatientSnapshot]:
+        """Get a patient's snapshot with a single primary-key read.
+
+        A missing or dirty snapshot is recomputed and stored first.
+
+        Returns:
+            PatientSnapshot, or None if the patient does not exist
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT snapshot_json, is_dirty FROM patient_snapshots WHERE patient_id = ?
+            """, (patient_id,))
+            row = cursor.fetchone()
+
+        if row and not row["is_dirty"] and row["snapshot_json"]:
+            return PatientSnapshot.model_validate_json(row["snapshot_json"])
+
+        return self.refresh_patient_snapshot(patient_id)
+
+    def refresh_patient_snapshot(self, patient_id: int) -> Optional[PatientSnapshot]:
+        """Recompute and store one patient's snapshot.
+
+        Runs inside a single write transaction so a concurrent change
+        can't be lost between computing and clearing the dirty flag.
+        """
+        with self.get_connection():
+            try:
+                snapshot = self.compute_patient_snapshot(patient_id)
+            except ValueError:
+                return None
+            self.save_patient_snapshot(snapshot)
+        return snapshot
+
+    def refresh_dirty_snapshots(self, batch_size: int = 100) -> int:
+        """Recompute snapshots flagged dirty by the change triggers.
+
+        Returns:
+            Number of snapshots refreshed
+        """
+        refreshed = 0
+        while True:
+            with self.get_read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT patient_id FROM patient_snapshots
+                    WHERE is_dirty = 1
+                    LIMIT ?
+                """, (batch_size,))
+                patient_ids = [row[0] for row in cursor.fetchall()]
+
+            if not patient_ids:
+                return refreshed
+
+            with self.get_connection() as conn:
+                bundles = self.get_patient_bundles(patient_ids)
+                for patient_id in patient_ids:
+                    if patient_id in bundles:
+                        self.save_patient_snapshot(self._build_snapshot(bundles[patient_id]))
+                    else:
+                        # Orphaned row (patient gone) - drop it so we don't loop
+                        conn.execute("DELETE FROM patient_snapshots WHERE patient_id = ?", (patient_id,))
+                    refreshed += 1
+
+    def rebuild_patient_snapshots(
+        self,
+        batch_size: int = 500,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Recompute every patient's snapshot in batched transactions.
+
+        Args:
+            batch_size: Patients per write transaction
+            progress_callback: Called with (done, total) after each batch
+
+        Returns:
+            Number of snapshots written
+        """
+        total = self.get_total_patients()
+        done = 0
+
+        for patient_ids in self._iter_patient_id_pages(batch_size):
+            # Load inside the write transaction so no change slips in
+            # between reading a record and clearing its dirty flag
+            with self.get_connection():
+                for bundle in self.get_patient_bundles(patient_ids).values():
+                    self.save_patient_snapshot(self._build_snapshot(bundle))
+
+            done += len(patient_ids)
+            if progress_callback:
+                progress_callback(done, total)
+
+        logger.info(f"Rebuilt {done} patient snapshots")
+        return done
+
+    # ============== FULL-TEXT SEARCH ==============
+
+    @staticmethod
+    def _build_fts_query(text: str, columns: Tuple[str, ...] = (), match_all: bool = True) -> str:
+        """Turn free text into a safe FTS5 MATCH expression.
+
+        Every word becomes a quoted prefix term, so user input can never
+        inject FTS5 syntax. Returns "" when the text has no searchable words.
+        """
+        tokens = re.findall(r"\w+", (text or "").lower())
+        if not tokens:
+            return ""
+
+        joiner = " AND " if match_all else " OR "
+        expr = joiner.join(f'"{token}"*' for token in tokens)
+        if columns:
+            expr = "{" + " ".join(columns) + "} : (" + expr + ")"
+        return expr
+
+    def _rebuild_fts_indexes(self, cursor):
+        """Repopulate both FTS indexes from the source tables."""
+        cursor.execute("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')")
+
+        cursor.execute("DELETE FROM clinical_fts")
+        for table, doc_type in (("visits", "visit"),
+                                ("investigations", "investigation"),
+                                ("procedures", "procedure")):
+            cursor.execute(f"""
+                INSERT INTO clinical_fts(rowid, title, body, patient_id, doc_type, doc_id, doc_date)
+                SELECT t.id * 4 + {self._FTS_DOC_CODES[doc_type]},
+                       {self._FTS_SOURCE_SQL[doc_type].format(row='t')},
+                       t.patient_id, '{doc_type}', t.id,
+                       {self._FTS_DATE_COLUMNS[doc_type].format(row='t')}
+                FROM {table} t
+            """)
+
+    def rebuild_fts_indexes(self):
+        """Rebuild full-text indexes (e.g. after a bulk import or restore)."""
+        with self.get_connection() as conn:
+            self._rebuild_fts_indexes(conn.cursor())
+            conn.execute("INSERT INTO patients_fts(patients_fts) VALUES ('optimize')")
+            conn.execute("INSERT INTO clinical_fts(clinical_fts) VALUES ('optimize')")
+
+    def fts_search_patients(self, query: str, limit: int = 20) -> List[Patient]:
+        """Full-text search over patient name, UHID, phone and address.
+
+        Results are BM25-ranked with name matches weighted highest.
+        """
+        fts_query = self._build_fts_query(query)
+        if not fts_query:
+            return []
+
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT p.* FROM patients_fts f
+                JOIN patients p ON p.id = f.rowid
+                WHERE patients_fts MATCH ?
+                ORDER BY bm25(patients_fts, 10.0, 5.0, 2.0, 1.0)
+                LIMIT ?
+            """, (fts_query, limit))
+            return [Patient(**dict(row)) for row in cursor.fetchall()]
+
+    def fts_search_patient_ids(self, query: str, limit: int = 20) -> List[int]:
+        """Like fts_search_patients, but returns only the ranked patient IDs."""
+        fts_query = self._build_fts_query(query)
+        if not fts_query:
+            return []
+
+        with self.get_read_connection() as conn:
+            rows = conn.execute("""
+                SELECT rowid FROM patients_fts
+                WHERE patients_fts MATCH ?
+                ORDER BY bm25(patients_fts, 10.0, 5.0, 2.0, 1.0)
+                LIMIT ?
+            """, (fts_query, limit)).fetchall()
+            return [row[0] for row in rows]
+
+    def fts_search_clinical(
+        self,
+        query: str,
+        patient_id: Optional[int] = None,
+        limit: int = 10,
+        doc_types: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """Full-text search over visits, investigations and procedures.
+
+        Any query word may match (OR); rows matching more words rank higher
+        under BM25, with title (diagnosis/test/procedure name) weighted over body.
+
+        Args:
+            query: Free-text query
+            patient_id: Restrict to one patient
+            limit: Maximum results
+            doc_types: Restrict to 'visit', 'investigation' and/or 'procedure'
+
+        Returns:
+            List of dicts with doc_type, doc_id, patient_id, doc_date,
+            content, snippet and score (higher is better)
+        """
+        fts_query = self._build_fts_query(query, match_all=False)
+        if not fts_query:
+            return []
+
+        sql = """
+            SELECT doc_type, doc_id, patient_id, doc_date, title, body,
+                   snippet(clinical_fts, -1, '[', ']', '...', 12) AS snippet,
+                   bm25(clinical_fts, 3.0, 1.0) AS rank
+            FROM clinical_fts
+            WHERE clinical_fts MATCH ?
+        """
+        params: list = [fts_query]
+        if patient_id is not None:
+            sql += " AND patient_id = ?"
+            params.append(patient_id)
+        if doc_types:
+            sql += f" AND doc_type IN ({','.join('?' * len(doc_types))})"
+            params.extend(doc_types)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            results = []
+            for row in cursor.fetchall():
+                content = row["title"] or ""
+                if row["body"]:
+                    content = f"{content}: {row['body']}" if content else row["body"]
+                results.append({
+                    "doc_type": row["doc_type"],
+                    "doc_id": row["doc_id"],
+                    "patient_id": row["patient_id"],
+                    "doc_date": row["doc_date"],
+                    "content": content,
+                    "snippet": row["snippet"],
+                    "score": -row["rank"],
+                })
+            return results
+
+    # ============== PHONETIC INDEX ==============
+
+    def _save_phonetic_codes(self, cursor, patients: Sequence[Tuple[int, str]]):
+        """Store phonetic codes and code tokens for (patient_id, name) pairs."""
+        codes = []
+        tokens = []
+        for patient_id, name in patients:
+            code = self._phonetic.get_phonetic_code(name)
+            codes.append((patient_id, code, self._phonetic.get_phonetic_code_aggressive(name)))
+            tokens.extend((token, patient_id) for token in set(code.split()))
+
+        cursor.executemany(
+            "DELETE FROM patient_phonetic_tokens WHERE patient_id = ?",
+            [(patient_id,) for patient_id, _ in patients]
+        )
+        cursor.executemany("""
+            INSERT OR REPLACE INTO patient_phonetic_codes
+                (patient_id, phonetic_code, phonetic_code_aggressive)
+            VALUES (?, ?, ?)
+        """, codes)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO patient_phonetic_tokens (token, patient_id) VALUES (?, ?)",
+            tokens
+        )
+
+        aggressive_codes = {code for _, _, code in codes}
+        for listener in list(self._phonetic_code_listeners):
+            callback = listener()
+            if callback is None:
+                self._phonetic_code_listeners.remove(listener)
+            else:
+                callback(aggressive_codes)
+
+    def add_phonetic_code_listener(self, callback: Callable[[Set[str]], None]):
+        """Call a bound method with the aggressive codes of every encoded batch.
+
+        Lets in-memory indexes (PhoneticIndex) stay current from the write
+        path. Only a weak reference is kept, so the listener's owner can be
+        garbage collected.
+        """
+        self._phonetic_code_listeners.append(weakref.WeakMethod(callback))
+
+    def _backfill_phonetic_codes(self, cursor, batch_size: int = 1000) -> int:
+        """Encode patients that have no phonetic codes yet."""
+        rows = cursor.execute("""
+            SELECT p.id, p.name FROM patients p
+            LEFT JOIN patient_phonetic_codes c ON c.patient_id = p.id
+            WHERE c.patient_id IS NULL
+        """).fetchall()
+        for start in range(0, len(rows), batch_size):
+            self._save_phonetic_codes(cursor, [(row[0], row[1]) for row in rows[start:start + batch_size]])
+        return len(rows)
+
+    def backfill_phonetic_codes(self) -> int:
+        """Encode patients inserted without going through add_patient.
+
+        Runs at startup; bulk importers that insert patients directly call
+        it after the import.
+
+        Returns:
+            Number of patients encoded
+        """
+        with self.get_connection() as conn:
+            return self._backfill_phonetic_codes(conn.cursor())
+
+    def rebuild_phonetic_codes(self) -> int:
+        """Re-encode every patient (e.g. after the phonetic rules change)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM patient_phonetic_tokens")
+            cursor.execute("DELETE FROM patient_phonetic_codes")
+            return self._backfill_phonetic_codes(cursor)
+
+    def get_phonetic_codes_aggressive(self) -> List[str]:
+        """Distinct aggressive phonetic codes across all patients."""
+        with self.get_read_connection() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT phonetic_code_aggressive FROM patient_phonetic_codes"
+            )]
+
+    def find_phonetic_candidates(
+        self,
+        token_prefixes: Sequence[str] = (),
+        aggressive_codes: Sequence[str] = (),
+        tokens: Sequence[str] = ()
+    ) -> List[Tuple[int, str, str]]:
+        """Patients in the phonetic candidate bucket for a query.
+
+        A patient is a candidate when any word of their code starts with one
+        of ``token_prefixes`` or equals one of ``tokens``, or their
+        aggressive code is one of ``aggressive_codes``. All lookups are
+        index range/equality scans.
+
+        Returns:
+            List of (patient_id, name, phonetic_code)
+        """
+        clauses = []
+        params: list = []
+        for prefix in token_prefixes:
+            # Codes are A-Z only, so "~" sorts after every continuation
+            clauses.append("SELECT patient_id FROM patient_phonetic_tokens WHERE token >= ? AND token < ?")
+            params.extend([prefix, prefix + "~"])
+        words = list(tokens)
+        for start in range(0, len(words), self.BUNDLE_BATCH_SIZE):
+            batch = words[start:start + self.BUNDLE_BATCH_SIZE]
+            clauses.append(
+                "SELECT patient_id FROM patient_phonetic_tokens "
+                f"WHERE token IN ({','.join('?' * len(batch))})"
+            )
+            params.extend(batch)
+        codes = list(aggressive_codes)
+        for start in range(0, len(codes), self.BUNDLE_BATCH_SIZE):
+            batch = codes[start:start + self.BUNDLE_BATCH_SIZE]
+            clauses.append(
+                "SELECT patient_id FROM patient_phonetic_codes "
+                f"WHERE phonetic_code_aggressive IN ({','.join('?' * len(batch))})"
+            )
+            params.extend(batch)
+        if not clauses:
+            return []
+
+        with self.get_read_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT c.patient_id, p.name, c.phonetic_code
+                FROM patient_phonetic_codes c
+                JOIN patients p ON p.id = c.patient_id
+                WHERE c.patient_id IN ({" UNION ".join(clauses)})
+            """, params).fetchall()
+            return [(row[0], row[1], row[2]) for row in rows]
+
     # ============== RAG HELPER METHODS ==============
 
     def get_patient_summary(self, patient_id: int) -> str:
         """Get a text summary of patient for embedding."""
-        patient = self.get_patient(patient_id)
-        if not patient:
+        bundle = self.get_patient_bundle(patient_id, include=("visits", "procedures"))
+        if not bundle:
             return ""
+        return self.summarize_bundle(bundle)
 
+    @staticmethod
+    def summarize_bundle(bundle: PatientRecordBundle) -> str:
+        """Text summary of a loaded bundle (see get_patient_summary)."""
+        patient = bundle.patient
         parts = [f"Patient: {patient.name}"]
         if patient.uhid:
             parts.append(f"UHID: {patient.uhid}")
@@ -383,18 +1626,16 @@ class DatabaseService:
             parts.append(f"Gender: {patient.gender}")
 
         # Add key diagnoses from visits
-        visits = self.get_patient_visits(patient_id)
-        diagnoses = set()
-        for visit in visits[:10]:  # Last 10 visits
-            if visit.diagnosis:
-                diagnoses.add(visit.diagnosis)
+        diagnoses = dict.fromkeys(
+            visit.diagnosis for visit in bundle.visits[:10]  # Last 10 visits
+            if visit.diagnosis
+        )
         if diagnoses:
             parts.append(f"Diagnoses: {', '.join(diagnoses)}")
 
         # Add procedures
-        procedures = self.get_patient_procedures(patient_id)
-        if procedures:
-            proc_names = [p.procedure_name for p in procedures[:5]]
+        if bundle.procedures:
+            proc_names = [p.procedure_name for p in bundle.procedures[:5]]
             parts.append(f"Procedures: {', '.join(proc_names)}")
 
         return ". ".join(parts)
@@ -404,10 +1645,21 @@ class DatabaseService:
 
         Returns list of (doc_id, content, metadata) tuples.
         """
+        bundle = self.get_patient_bundle(
+            patient_id, include=("visits", "investigations", "procedures")
+        )
+        if not bundle:
+            return []
+        return self.bundle_documents_for_rag(bundle)
+
+    @staticmethod
+    def bundle_documents_for_rag(bundle: PatientRecordBundle) -> List[Tuple[str, str, dict]]:
+        """RAG documents for a loaded bundle (see get_patient_documents_for_rag)."""
+        patient_id = bundle.patient.id
         documents = []
 
         # Visits
-        for visit in self.get_patient_visits(patient_id):
+        for visit in bundle.visits:
             doc_id = f"visit_{visit.id}"
             content = f"Visit on {visit.visit_date}: "
             if visit.chief_complaint:
@@ -433,7 +1685,7 @@ class DatabaseService:
             documents.append((doc_id, content, metadata))
 
         # Investigations
-        for inv in self.get_patient_investigations(patient_id):
+        for inv in bundle.investigations:
             doc_id = f"investigation_{inv.id}"
             content = f"Investigation on {inv.test_date}: {inv.test_name}"
             if inv.result:
@@ -452,7 +1704,7 @@ class DatabaseService:
             documents.append((doc_id, content, metadata))
 
         # Procedures
-        for proc in self.get_patient_procedures(patient_id):
+        for proc in bundle.procedures:
             doc_id = f"procedure_{proc.id}"
             content = f"Procedure on {proc.procedure_date}: {proc.procedure_name}"
             if proc.details:
@@ -469,6 +1721,166 @@ class DatabaseService:
 
         return documents
 
+    # ============== RAG CHANGE JOURNAL ==============
+
+    def get_rag_changes(self, limit: int = 500) -> List[dict]:
+        """Get the oldest un-acknowledged RAG journal entries.
+
+        Args:
+            limit: Maximum entries to return
+
+        Returns:
+            List of dicts with id, patient_id, doc_type, doc_id, operation, changed_at
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM rag_change_journal ORDER BY id LIMIT ?
+            """, (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def ack_rag_changes(self, up_to_id: int) -> int:
+        """Remove journal entries that have been applied to the vector index.
+
+        Args:
+            up_to_id: Highest journal ID that was processed
+
+        Returns:
+            Number of entries removed
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM rag_change_journal WHERE id <= ?", (up_to_id,))
+            return cursor.rowcount
+
+    def has_pending_rag_changes(self, patient_id: Optional[int] = None) -> bool:
+        """Check whether the journal has entries (optionally for one patient)."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            if patient_id is None:
+                cursor.execute("SELECT 1 FROM rag_change_journal LIMIT 1")
+            else:
+                cursor.execute(
+                    "SELECT 1 FROM rag_change_journal WHERE patient_id = ? LIMIT 1",
+                    (patient_id,)
+                )
+            return cursor.fetchone() is not None
+
+    # ============== DELTA SYNC CHANGE LOG ==============
+
+    def get_sync_changes(self, after_seq: int = 0, limit: int = 5000) -> Tuple[int, Dict[str, dict]]:
+        """Collect rows changed after a change-log position.
+
+        Multiple changes to one row collapse to its current state: the row
+        values if it still exists, otherwise a delete. Rows are read after
+        the log, so they may already include later changes; those are sent
+        again with the next change set, which is harmless because applying
+        a change set is an idempotent upsert.
+
+        Args:
+            after_seq: Last change-log seq already published
+            limit: Maximum log entries to cover
+
+        Returns:
+            (to_seq, {table: {'columns': [...], 'upserts': [[...]], 'deletes': [ids]}}),
+            where to_seq == after_seq if nothing changed
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT seq, table_name, row_id FROM sync_change_log
+                WHERE seq > ? ORDER BY seq LIMIT ?
+            """, (after_seq, limit))
+            entries = cursor.fetchall()
+            if not entries:
+                return after_seq, {}
+
+            changed: Dict[str, set] = {}
+            for entry in entries:
+                changed.setdefault(entry["table_name"], set()).add(entry["row_id"])
+
+            tables = {}
+            for table, row_ids in changed.items():
+                if table not in self.SYNC_TABLES:
+                    continue
+                ids = sorted(row_ids)
+                rows = []
+                for start in range(0, len(ids), self.BUNDLE_BATCH_SIZE):
+                    batch = ids[start:start + self.BUNDLE_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    cursor.execute(f"SELECT * FROM {table} WHERE id IN ({placeholders})", batch)
+                    rows.extend(cursor.fetchall())
+
+                columns = list(rows[0].keys()) if rows else []
+                present = {row["id"] for row in rows}
+                tables[table] = {
+                    "columns": columns,
+                    "upserts": [list(row) for row in rows],
+                    "deletes": [row_id for row_id in ids if row_id not in present],
+                }
+
+            return entries[-1]["seq"], tables
+
+    def get_sync_seq(self) -> int:
+        """Highest change-log seq recorded so far."""
+        with self.get_read_connection() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sync_change_log'").fetchone()
+            return row[0] if row else 0
+
+    def get_sync_version(self, device_id: str) -> int:
+        """Highest seq published by a device (0 if none)."""
+        with self.get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT seq FROM sync_versions WHERE device_id = ?", (device_id,)
+            ).fetchone()
+            return row[0] if row else 0
+
+    def set_sync_version(self, device_id: str, seq: int):
+        """Record that a device's changes up to seq have been published.
+
+        Change-log entries up to seq are no longer needed and are removed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO sync_versions (device_id, seq) VALUES (?, ?)
+                ON CONFLICT(device_id) DO UPDATE SET seq = excluded.seq
+            """, (device_id, seq))
+            cursor.execute("DELETE FROM sync_change_log WHERE seq <= ?", (seq,))
+
+    def prune_sync_change_log(self, device_id: str, max_age_days: Optional[int] = None) -> int:
+        """Drop change-log entries older than max_age_days, published or not.
+
+        Entries are normally removed as they are published; this caps the
+        log when nothing publishes it. Dropped entries count as published
+        by device_id, so its next change set starts after them and a phone
+        that never received them restores a full snapshot instead.
+
+        Args:
+            device_id: This desktop's device ID
+            max_age_days: Age limit (default: SYNC_LOG_MAX_AGE_DAYS)
+
+        Returns:
+            Number of entries removed
+        """
+        if max_age_days is None:
+            max_age_days = self.SYNC_LOG_MAX_AGE_DAYS
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT MAX(seq) FROM sync_change_log
+                WHERE changed_at < datetime('now', ?)
+            """, (f"-{max_age_days} days",))
+            seq = cursor.fetchone()[0]
+            if seq is None:
+                return 0
+            cursor.execute("""
+                INSERT INTO sync_versions (device_id, seq) VALUES (?, ?)
+                ON CONFLICT(device_id) DO UPDATE SET seq = MAX(seq, excluded.seq)
+            """, (device_id, seq))
+            cursor.execute("DELETE FROM sync_change_log WHERE seq <= ?", (seq,))
+            return cursor.rowcount
+
     # ============== CHANGE TRACKING ==============
 
     def mark_data_changed(self):
@@ -484,6 +1896,27 @@ class DatabaseService:
                 VALUES ('last_modified', ?, CURRENT_TIMESTAMP)
             """, (datetime.now().isoformat(),))
 
+    def get_data_version(self) -> str:
+        """Opaque token that changes whenever data is modified (for caches)."""
+        with self.get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT value FROM metadata WHERE key = 'last_modified'"
+            ).fetchone()
+            return row[0] if row else ""
+
+    def get_patient_data_version(self, patient_id: int) -> str:
+        """Opaque token that changes whenever one patient's records are modified.
+
+        Covers the patient row, visits, investigations, procedures, vitals
+        and allergies. Tokens differ between patients.
+        """
+        with self.get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM patient_data_versions WHERE patient_id = ?",
+                (patient_id,)
+            ).fetchone()
+            return f"{patient_id}.{row[0] if row else 0}"
+
     def has_changes_since(self, timestamp: datetime) -> bool:
         """Check if there are changes since the given timestamp.
 
@@ -493,7 +1926,7 @@ class DatabaseService:
         Returns:
             True if data has been modified since timestamp, False otherwise
         """
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
 
             # Check metadata table for last modification
@@ -521,14 +1954,19 @@ class DatabaseService:
 
     def get_total_patients(self) -> int:
         """Get total count of patients."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM patients")
             return cursor.fetchone()[0]
 
+    def get_all_patient_ids(self) -> Set[int]:
+        """Get the IDs of every patient."""
+        with self.get_read_connection() as conn:
+            return {row[0] for row in conn.execute("SELECT id FROM patients")}
+
     def get_patients_this_month(self) -> int:
         """Get count of new patients this month."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM patients
@@ -538,7 +1976,7 @@ class DatabaseService:
 
     def get_visits_today(self) -> int:
         """Get count of visits today."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM visits
@@ -548,7 +1986,7 @@ class DatabaseService:
 
     def get_visits_this_week(self) -> int:
         """Get count of visits in the last 7 days."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM visits
@@ -558,7 +1996,7 @@ class DatabaseService:
 
     def get_visits_by_date(self, target_date: date) -> List[dict]:
         """Get all visits for a specific date."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT v.*, p.name as patient_name, p.phone
@@ -571,7 +2009,7 @@ class DatabaseService:
 
     def get_visits_by_date_range(self, start_date: date, end_date: date) -> List[dict]:
         """Get all visits in a date range."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT v.*, p.name as patient_name, p.phone
@@ -584,7 +2022,7 @@ class DatabaseService:
 
     def get_top_diagnoses(self, limit: int = 10) -> List[Tuple[str, int]]:
         """Get most common diagnoses."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT diagnosis, COUNT(*) as count
@@ -598,7 +2036,7 @@ class DatabaseService:
 
     def get_patient_demographics(self) -> dict:
         """Get patient demographics (age and gender distribution)."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
 
             # Gender distribution
@@ -635,7 +2073,7 @@ class DatabaseService:
 
     def get_new_patients_by_month(self, months: int = 12) -> List[Tuple[str, int]]:
         """Get new patients grouped by month."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT strftime('%Y-%m', created_at) as month, COUNT(*) as count
@@ -648,7 +2086,7 @@ class DatabaseService:
 
     def get_patient_visit_counts(self) -> List[dict]:
         """Get all patients with their visit counts."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT
@@ -666,7 +2104,7 @@ class DatabaseService:
 
     def get_returning_patients(self) -> int:
         """Get count of patients with more than one visit."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(DISTINCT patient_id) FROM (
@@ -680,7 +2118,7 @@ class DatabaseService:
 
     def get_visits_by_hour(self) -> dict:
         """Get visit distribution by hour of day."""
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             # Since we don't have time in visit_date, estimate based on creation time
             cursor.execute("""
@@ -692,12 +2130,28 @@ class DatabaseService:
             """)
             return {int(row[0]): row[1] for row in cursor.fetchall()}
 
+    def get_prescribed_drug_counts(self) -> Dict[str, int]:
+        """Get how often each drug name was prescribed, from visit prescriptions."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT lower(trim(json_extract(m.value, '$.drug_name'))) as drug, COUNT(*) as count
+                FROM visits v, json_each(
+                    CASE WHEN json_valid(v.prescription_json) THEN v.prescription_json ELSE '{}' END,
+                    '$.medications'
+                ) m
+                WHERE m.type = 'object'
+                GROUP BY drug
+                HAVING drug IS NOT NULL AND drug != ''
+            """)
+            return {row[0]: row[1] for row in cursor.fetchall()}
+
     def get_all_patients_with_stats(self, as_of_date: date = None) -> List[dict]:
         """Get all patients with computed statistics."""
         if as_of_date is None:
             as_of_date = date.today()
 
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT
@@ -0,0 +1,204 @@
+"""Record-level delta sync from desktop to mobile.
+
+Mobile used to pull the latest full encrypted backup on every sync, so a
+doctor looking up one patient downloaded the whole clinic database every
+few minutes. Instead the desktop publishes change sets: the rows changed
+since its last publish (from the ``sync_change_log`` that database
+triggers maintain), gzip-compressed and encrypted client-side with a key
+only the doctor's devices can derive. The cloud API stores them opaquely
+and hands them out in order; mobile applies each one in a transaction and
+only falls back to a full snapshot when it is too far behind.
+
+Each device numbers its own changes (``seq``); the highest seq published
+per device forms a version vector that travels inside every snapshot
+(``sync_versions``), so after a snapshot mobile knows which change sets it
+already contains.
+
+Change set payload (before compression and encryption)::
+
+    {"format": 1, "device_id": "...", "from_seq": 40, "to_seq": 57,
+     "created_at": "...",
+     "tables": {"visits": {"columns": [...], "upserts": [[...]], "deletes": [3]}}}
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from typing import Optional
+
+from .crypto import CryptoService, EncryptedData
+
+logger = logging.getLogger(__name__)
+
+CHANGESET_FORMAT = 1
+
+# Change-log entries per change set; keeps each upload and apply small
+DEFAULT_MAX_CHANGES = 5000
+
+_SYNC_KEY_PERSON = b"DocAssistSync"
+
+
+class DeltaSyncError(Exception):
+    """Publishing a change set to the cloud API failed."""
+
+
+def sync_key_salt(email: str) -> bytes:
+    """Per-account 16-byte salt for the change set key."""
+    return hashlib.blake2b(
+        email.strip().lower().encode("utf-8"), digest_size=16, person=_SYNC_KEY_PERSON
+    ).digest()
+
+
+def derive_sync_key(password: str, email: str, crypto: Optional[CryptoService] = None) -> bytes:
+    """Derive the change set key shared by the doctor's desktop and phone.
+
+    Both sides know the account email and password, so they derive the
+    same key without it ever reaching the server. Argon2id runs once per
+    session rather than once per change set.
+    """
+    crypto = crypto or CryptoService()
+    return crypto.derive_key(password, sync_key_salt(email))
+
+
+def encode_changeset(changeset: dict, key: bytes, crypto: Optional[CryptoService] = None) -> bytes:
+    """Serialize, compress and encrypt a change set."""
+    crypto = crypto or CryptoService()
+    payload = gzip.compress(json.dumps(changeset, separators=(",", ":")).encode("utf-8"))
+    return crypto.encrypt_with_key(payload, key).to_bytes()
+
+
+def decode_changeset(blob: bytes, key: bytes, crypto: Optional[CryptoService] = None) -> dict:
+    """Decrypt and parse a change set produced by encode_changeset().
+
+    Raises:
+        DecryptionError: If the key is wrong or the blob was modified
+        ValueError: If the payload is not a supported change set
+    """
+    crypto = crypto or CryptoService()
+    payload = crypto.decrypt_with_key(EncryptedData.from_bytes(blob), key)
+    changeset = json.loads(gzip.decompress(payload))
+    if changeset.get("format") != CHANGESET_FORMAT:
+        raise ValueError(f"Unsupported change set format: {changeset.get('format')}")
+    return changeset
+
+
+def changeset_row_count(changeset: dict) -> int:
+    """Number of upserted and deleted rows in a change set."""
+    return sum(len(t["upserts"]) + len(t["deletes"]) for t in changeset["tables"].values())
+
+
+class DeltaSyncPublisher:
+    """Publishes this desktop's database changes as encrypted change sets.
+
+    Usage:
+        key = derive_sync_key(password, email)
+        publisher = DeltaSyncPublisher(db, api_url, token, key, device_id)
+        publisher.publish()  # after saving visits, or on the backup schedule
+    """
+
+    def __init__(
+        self,
+        db,
+        api_url: str,
+        token: str,
+        sync_key: bytes,
+        device_id: str,
+        max_changes: int = DEFAULT_MAX_CHANGES,
+        crypto: Optional[CryptoService] = None,
+    ):
+        """
+        Args:
+            db: DatabaseService whose change log is published
+            api_url: Cloud API base URL
+            token: Cloud API access token
+            sync_key: Key from derive_sync_key()
+            device_id: This desktop's device ID
+            max_changes: Change-log entries per change set
+        """
+        self.db = db
+        self.api_url = api_url.rstrip("/")
+        self.token = token
+        self.sync_key = sync_key
+        self.device_id = device_id
+        self.max_changes = max_changes
+        self.crypto = crypto or CryptoService()
+
+    def pending_changes(self) -> int:
+        """Change-log entries not yet published."""
+        return max(0, self.db.get_sync_seq() - self.db.get_sync_version(self.device_id))
+
+    def build_changeset(self) -> Optional[dict]:
+        """Collect the next unpublished change set, or None if up to date."""
+        from_seq = self.db.get_sync_version(self.device_id)
+        to_seq, tables = self.db.get_sync_changes(from_seq, self.max_changes)
+        if to_seq == from_seq:
+            return None
+
+        return {
+            "format": CHANGESET_FORMAT,
+            "device_id": self.device_id,
+            "from_seq": from_seq,
+            "to_seq": to_seq,
+            "created_at": datetime.now().isoformat(),
+            "tables": tables,
+        }
+
+    def publish(self) -> int:
+        """Upload every pending change set.
+
+        The published seq is only recorded after the server accepts a
+        change set, so an interrupted publish resends it next time; the
+        server ignores a duplicate (device_id, to_seq).
+
+        Returns:
+            Number of change sets published
+
+        Raises:
+            DeltaSyncError: If the cloud API rejects or cannot be reached
+        """
+        published = 0
+        while True:
+            changeset = self.build_changeset()
+            if changeset is None:
+                return published
+
+            blob = encode_changeset(changeset, self.sync_key, self.crypto)
+            cursor = self._post_changeset(blob, changeset)
+            self.db.set_sync_version(self.device_id, changeset["to_seq"])
+            published += 1
+            logger.info(
+                f"Published change set {changeset['from_seq']}..{changeset['to_seq']} "
+                f"as cursor {cursor} ({len(blob)} bytes)"
+            )
+
+    def _post_changeset(self, blob: bytes, changeset: dict) -> int:
+        """Upload one encrypted change set and return its server cursor."""
+        query = urllib.parse.urlencode({
+            "device_id": self.device_id,
+            "from_seq": changeset["from_seq"],
+            "to_seq": changeset["to_seq"],
+            "row_count": changeset_row_count(changeset),
+        })
+        request = urllib.request.Request(
+            f"{self.api_url}/sync/changesets?{query}",
+            data=blob,
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Content-Type": "application/octet-stream",
+                "User-Agent": "DocAssist-EMR/1.0",
+            },
+            method="POST",
+        )
+
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return json.loads(response.read())["cursor"]
+        except urllib.error.HTTPError as e:
+            raise DeltaSyncError(f"Change set rejected: {e.code} {e.reason}") from e
+        except urllib.error.URLError as e:
+            raise DeltaSyncError(f"Network error: {e.reason}") from e
@@ -6,7 +6,7 @@ optimized for Indian medical practice.
 """
 
 from .differential_engine import DifferentialEngine, Differential
-from .red_flag_detector import RedFlagDetector, RedFlag, UrgencyLevel
+from .red_flag_detector import RedFlagDetector, RedFlag, RedFlagEvaluation, UrgencyLevel
 from .protocol_engine import (
     ProtocolEngine,
     TreatmentProtocol,
@@ -19,6 +19,7 @@ __all__ = [
     "Differential",
     "RedFlagDetector",
     "RedFlag",
+    "RedFlagEvaluation",
     "UrgencyLevel",
     "ProtocolEngine",
     "TreatmentProtocol",
@@ -8,7 +8,11 @@ India-specific disease prevalence priors.
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 import math
-from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python scoring
+    np = None
 
 
 @dataclass
@@ -41,11 +45,61 @@ class DifferentialEngine:
     India-specific disease prevalence as priors.
     """
 
+    # Posterior below which a diagnosis is dropped before normalizing
+    MIN_PROBABILITY = 0.01
+
+    # Differentials returned per presentation
+    TOP_K = 10
+
+    # Presentations scored per matrix product in batch mode
+    BATCH_BLOCK = 4096
+
+    # Prior multipliers by patient context (see _prior_context)
+    PRIOR_ADJUSTMENTS = {
+        # Age adjustments
+        ("age", "pediatric"): {  # < 18
+            "viral_fever": 2.0,
+            "upper_respiratory_tract_infection": 1.5,
+            "acute_coronary_syndrome": 0.01,
+            "type_2_diabetes": 0.1,
+        },
+        ("age", "geriatric"): {  # > 60
+            "acute_coronary_syndrome": 3.0,
+            "stroke": 4.0,
+            "type_2_diabetes": 1.5,
+            "hypertension": 1.8,
+        },
+        # Seasonal adjustments
+        ("season", "monsoon"): {
+            "dengue": 5.0,
+            "malaria": 4.0,
+            "leptospirosis": 10.0,
+            "chikungunya": 5.0,
+        },
+        ("season", "summer"): {
+            "dengue": 2.0,
+            "typhoid": 2.0,
+        },
+        # Location adjustments
+        ("location", "rural"): {
+            "malaria": 2.0,
+            "tuberculosis": 1.5,
+            "leptospirosis": 3.0,
+        },
+        # Gender adjustments
+        ("gender", "F"): {
+            "urinary_tract_infection": 3.0,
+            "hypothyroidism": 2.0,
+            "anemia": 1.5,
+        },
+    }
+
     def __init__(self):
         """Initialize with India-specific disease prevalence priors."""
         self._load_india_prevalence()
         self._load_symptom_likelihood_ratios()
         self._load_disease_features()
+        self._compile_tables()
 
     def _load_india_prevalence(self) -> None:
         """Load base rate prevalence for common diseases in India."""
@@ -598,130 +652,219 @@ class DifferentialEngine:
         Returns:
             List of Differential objects sorted by probability (highest first)
         """
-        if not symptoms:
-            return []
+        return self.calculate_differentials_batch([symptoms], [patient])[0]
 
-        # Start with all diagnoses and their prior probabilities
-        posterior_probs = {}
-        supporting_features = defaultdict(list)
-
-        # Adjust priors based on patient context
-        priors = self._adjust_priors(patient)
-
-        # Calculate posterior probability for each diagnosis
-        for diagnosis, prior in priors.items():
-            # Start with prior probability (base rate)
-            log_odds = math.log(prior / (1 - prior))
-
-            # Update with likelihood ratios from symptoms
-            for symptom in symptoms:
-                if symptom in self.likelihood_ratios:
-                    lr_dict = self.likelihood_ratios[symptom]
-                    if diagnosis in lr_dict:
-                        lr = lr_dict[diagnosis]
-                        log_odds += math.log(lr)
-                        supporting_features[diagnosis].append(symptom)
-
-            # Convert log odds back to probability
-            odds = math.exp(log_odds)
-            posterior_probs[diagnosis] = odds / (1 + odds)
-
-        # Filter out very low probability diagnoses
-        threshold = 0.01  # 1%
-        significant_diagnoses = {
-            dx: prob for dx, prob in posterior_probs.items() if prob >= threshold
-        }
+    def calculate_differentials_batch(
+        self,
+        presentations: List[List[str]],
+        patients: Optional[List[Optional[Dict]]] = None,
+    ) -> List[List[Differential]]:
+        """
+        Calculate differential diagnoses for many presentations at once.
 
-        # Normalize probabilities to sum to 1
-        total_prob = sum(significant_diagnoses.values())
-        if total_prob > 0:
-            normalized_probs = {
-                dx: prob / total_prob for dx, prob in significant_diagnoses.items()
-            }
-        else:
-            normalized_probs = {}
+        Each block of presentations is scored with one matrix product, so
+        re-ranking on every keystroke or auditing the whole visit history
+        costs a few array operations rather than nested Python loops.
 
-        # Create Differential objects
-        differentials = []
-        for diagnosis, probability in normalized_probs.items():
-            diff = Differential(
-                diagnosis=diagnosis,
-                probability=probability,
-                supporting_features=supporting_features[diagnosis],
-                against_features=[],  # Can be calculated by checking absent expected features
-                suggested_tests=self._get_diagnostic_tests(diagnosis),
-            )
-            differentials.append(diff)
+        Args:
+            presentations: Symptom lists, one per presentation
+            patients: Optional patient context per presentation (same length)
 
-        # Sort by probability (highest first)
-        differentials.sort(key=lambda x: x.probability, reverse=True)
+        Returns:
+            One list of differentials per presentation, as from calculate_differentials()
+        """
+        if patients is None:
+            patients = [None] * len(presentations)
+        elif len(patients) != len(presentations):
+            raise ValueError("patients must have one entry per presentation")
+
+        symptom_ids = [
+            [self._symptom_index[s] for s in symptoms if s in self._symptom_index]
+            for symptoms in presentations
+        ]
+        log_priors = [self._log_priors(patient) for patient in patients]
+
+        ranked: List[List[Tuple[int, float]]] = []
+        if np is not None:
+            for start in range(0, len(presentations), self.BATCH_BLOCK):
+                stop = start + self.BATCH_BLOCK
+                ranked.extend(self._rank_numpy(symptom_ids[start:stop], log_priors[start:stop]))
+        else:
+            ranked = [self._rank_python(ids, priors) for ids, priors in zip(symptom_ids, log_priors)]
 
-        # Limit to top 10 most likely diagnoses
-        return differentials[:10]
+        return [
+            self._build_differentials(symptoms, ranking) if symptoms else []
+            for symptoms, ranking in zip(presentations, ranked)
+        ]
 
-    def _adjust_priors(self, patient: Optional[Dict] = None) -> Dict[str, float]:
+    def _compile_tables(self) -> None:
         """
-        Adjust prior probabilities based on patient demographics and context.
+        Compile prevalence and likelihood ratios into index-based tables.
 
-        Args:
-            patient: Dict with keys like age, gender, location, season, comorbidities
+        Diagnoses and symptoms get fixed indices and each symptom row holds
+        the log LR+ per diagnosis (0 where the symptom is uninformative), so
+        scoring is a gather-and-sum over symptom rows. Call again after
+        editing prevalence, likelihood_ratios or PRIOR_ADJUSTMENTS.
+        """
+        self._diagnoses = list(self.prevalence)
+        self._diagnosis_index = {dx: i for i, dx in enumerate(self._diagnoses)}
+        self._symptom_index = {symptom: j for j, symptom in enumerate(self.likelihood_ratios)}
+
+        # Sparse rows: symptom index -> [(diagnosis index, log LR+)]
+        self._log_lr_rows = [
+            [(self._diagnosis_index[dx], math.log(lr)) for dx, lr in lrs.items() if dx in self._diagnosis_index]
+            for lrs in self.likelihood_ratios.values()
+        ]
+        # Per diagnosis: symptoms that support it, and its suggested tests
+        self._supporting_symptoms = [set() for _ in self._diagnoses]
+        for symptom, row in zip(self.likelihood_ratios, self._log_lr_rows):
+            for i, _ in row:
+                self._supporting_symptoms[i].add(symptom)
+        self._suggested_tests = [self._get_diagnostic_tests(dx) for dx in self._diagnoses]
+
+        base_priors = [self.prevalence[dx] for dx in self._diagnoses]
+        adjustments = {
+            key: [multipliers.get(dx, 1.0) for dx in self._diagnoses]
+            for key, multipliers in self.PRIOR_ADJUSTMENTS.items()
+        }
 
-        Returns:
-            Adjusted prior probabilities
+        if np is not None:
+            self._log_lr_matrix = np.zeros((len(self._symptom_index), len(self._diagnoses)))
+            for j, row in enumerate(self._log_lr_rows):
+                for i, log_lr in row:
+                    self._log_lr_matrix[j, i] = log_lr
+            base_priors = np.array(base_priors)
+            adjustments = {key: np.array(vector) for key, vector in adjustments.items()}
+
+        self._base_priors = base_priors
+        self._adjustment_vectors = adjustments
+        # Log prior odds per patient context; there are only a few dozen contexts
+        self._log_prior_cache: Dict[Optional[Tuple], object] = {}
+
+    def _rank_numpy(self, symptom_ids: List[List[int]], log_priors: List) -> List[List[Tuple[int, float]]]:
+        """Score a block of presentations; return top (diagnosis index, probability) pairs per row."""
+        rows = len(symptom_ids)
+        counts = np.zeros((rows, len(self._symptom_index)))
+        row_ids = np.repeat(np.arange(rows), [len(ids) for ids in symptom_ids])
+        col_ids = np.fromiter((j for ids in symptom_ids for j in ids), dtype=np.intp, count=len(row_ids))
+        # Repeated symptoms count once per mention, as in the sequential update
+        np.add.at(counts, (row_ids, col_ids), 1.0)
+
+        log_odds = np.vstack(log_priors) + counts @ self._log_lr_matrix
+        posterior = 1.0 / (1.0 + np.exp(-log_odds))
+        posterior[posterior < self.MIN_PROBABILITY] = 0.0
+
+        totals = posterior.sum(axis=1, keepdims=True)
+        probs = np.divide(posterior, totals, out=np.zeros_like(posterior), where=totals > 0)
+        order = np.argsort(-probs, axis=1, kind="stable")[:, :self.TOP_K]
+        top = np.take_along_axis(probs, order, axis=1)
+
+        return [
+            [(int(i), float(p)) for i, p in zip(row_order, row_probs) if p > 0]
+            for row_order, row_probs in zip(order, top)
+        ]
+
+    def _rank_python(self, symptom_ids: List[int], log_priors: List[float]) -> List[Tuple[int, float]]:
+        """Score one presentation without NumPy; same result as _rank_numpy()."""
+        log_odds = list(log_priors)
+        for j in symptom_ids:
+            for i, log_lr in self._log_lr_rows[j]:
+                log_odds[i] += log_lr
+
+        significant = []
+        for i, value in enumerate(log_odds):
+            probability = 1.0 / (1.0 + math.exp(-value))
+            if probability >= self.MIN_PROBABILITY:
+                significant.append((i, probability))
+
+        total = sum(p for _, p in significant)
+        if total <= 0:
+            return []
+        ranked = sorted(((i, p / total) for i, p in significant), key=lambda x: x[1], reverse=True)
+        return ranked[:self.TOP_K]
+
+    def _build_differentials(self, symptoms: List[str], ranking: List[Tuple[int, float]]) -> List[Differential]:
+        """Create Differential objects for ranked (diagnosis index, probability) pairs."""
+        differentials = []
+        for i, probability in ranking:
+            supporting = self._supporting_symptoms[i]
+            differentials.append(Differential(
+                diagnosis=self._diagnoses[i],
+                probability=probability,
+                supporting_features=[s for s in symptoms if s in supporting],
+                against_features=[],  # Can be calculated by checking absent expected features
+                suggested_tests=list(self._suggested_tests[i]),
+            ))
+        return differentials
+
+    def _prior_context(self, patient: Optional[Dict]) -> Optional[Tuple[Tuple[str, str], ...]]:
         """
-        priors = self.prevalence.copy()
+        PRIOR_ADJUSTMENTS keys that apply to a patient, in application order.
 
+        None without patient context: the raw prevalence is used, unclipped.
+        """
         if not patient:
-            return priors
+            return None
 
+        context = []
         age = patient.get("age")
-        gender = patient.get("gender")
-        season = patient.get("season")  # monsoon, summer, winter
-        location = patient.get("location")  # urban, rural
-
-        # Age adjustments
         if age:
             if age < 18:
-                # Pediatric adjustments
-                priors["viral_fever"] *= 2.0
-                priors["upper_respiratory_tract_infection"] *= 1.5
-                priors["acute_coronary_syndrome"] *= 0.01
-                priors["type_2_diabetes"] *= 0.1
+                context.append(("age", "pediatric"))
             elif age > 60:
-                # Geriatric adjustments
-                priors["acute_coronary_syndrome"] *= 3.0
-                priors["stroke"] *= 4.0
-                priors["type_2_diabetes"] *= 1.5
-                priors["hypertension"] *= 1.8
+                context.append(("age", "geriatric"))
 
-        # Seasonal adjustments
-        if season == "monsoon":
-            priors["dengue"] *= 5.0
-            priors["malaria"] *= 4.0
-            priors["leptospirosis"] *= 10.0
-            priors["chikungunya"] *= 5.0
-        elif season == "summer":
-            priors["dengue"] *= 2.0
-            priors["typhoid"] *= 2.0
+        # season: monsoon, summer, winter; location: urban, rural
+        for key in ("season", "location", "gender"):
+            value = patient.get(key)
+            if isinstance(value, str) and (key, value) in self.PRIOR_ADJUSTMENTS:
+                context.append((key, value))
 
-        # Location adjustments
-        if location == "rural":
-            priors["malaria"] *= 2.0
-            priors["tuberculosis"] *= 1.5
-            priors["leptospirosis"] *= 3.0
+        return tuple(context)
 
-        # Gender adjustments
-        if gender == "F":
-            priors["urinary_tract_infection"] *= 3.0
-            priors["hypothyroidism"] *= 2.0
-            priors["anemia"] *= 1.5
+    def _context_priors(self, context: Optional[Tuple[Tuple[str, str], ...]]):
+        """Prior vector (diagnosis order) after applying the context's multipliers."""
+        priors = self._base_priors
+        if context is None:
+            return priors
+
+        for key in context:
+            vector = self._adjustment_vectors[key]
+            if np is not None:
+                priors = priors * vector
+            else:
+                priors = [p * m for p, m in zip(priors, vector)]
+
+        # Ensure probabilities are valid: floor at 0.01%, cap at 99%
+        if np is not None:
+            return np.clip(priors, 0.0001, 0.99)
+        return [min(max(p, 0.0001), 0.99) for p in priors]
+
+    def _log_priors(self, patient: Optional[Dict]):
+        """Log prior odds vector for a patient, cached per context."""
+        context = self._prior_context(patient)
+        log_priors = self._log_prior_cache.get(context)
+        if log_priors is None:
+            priors = self._context_priors(context)
+            if np is not None:
+                log_priors = np.log(priors / (1 - priors))
+            else:
+                log_priors = [math.log(p / (1 - p)) for p in priors]
+            self._log_prior_cache[context] = log_priors
+        return log_priors
+
+    def _adjust_priors(self, patient: Optional[Dict] = None) -> Dict[str, float]:
+        """
+        Adjust prior probabilities based on patient demographics and context.
 
-        # Ensure probabilities are valid
-        for diagnosis in priors:
-            priors[diagnosis] = min(priors[diagnosis], 0.99)  # Cap at 99%
-            priors[diagnosis] = max(priors[diagnosis], 0.0001)  # Floor at 0.01%
+        Args:
+            patient: Dict with keys like age, gender, location, season, comorbidities
 
-        return priors
+        Returns:
+            Adjusted prior probabilities
+        """
+        priors = self._context_priors(self._prior_context(patient))
+        return {dx: float(p) for dx, p in zip(self._diagnoses, priors)}
 
     def _get_diagnostic_tests(self, diagnosis: str) -> List[str]:
         """Get recommended diagnostic tests for a diagnosis."""
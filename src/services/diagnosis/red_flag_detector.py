@@ -6,7 +6,7 @@ immediate intervention.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 from enum import Enum
 
 
@@ -41,9 +41,16 @@ class RedFlagDetector:
     common life-threatening presentations.
     """
 
+    URGENCY_ORDER = {
+        UrgencyLevel.EMERGENCY: 0,
+        UrgencyLevel.URGENT: 1,
+        UrgencyLevel.WARNING: 2,
+    }
+
     def __init__(self):
         """Initialize red flag patterns."""
         self._load_red_flag_patterns()
+        self._compile_rules()
 
     def _load_red_flag_patterns(self) -> None:
         """
@@ -507,6 +514,33 @@ class RedFlagDetector:
             },
         ]
 
+    def _compile_rules(self) -> None:
+        """
+        Index patterns by the features they reference.
+
+        A presentation then only touches the patterns its features appear
+        in; required and any_of hits are counted per pattern instead of
+        walking every pattern's lists. Patterns that need no feature at all
+        are always evaluated. Call again after editing self.patterns.
+        """
+        # Feature -> (pattern index, is_required), once per mention
+        self._rule_index: Dict[str, List[Tuple[int, bool]]] = {}
+        self._required_counts: List[int] = []
+        self._thresholds: List[int] = []
+        self._unconditional: List[int] = []
+
+        for index, pattern in enumerate(self.patterns):
+            for feature in pattern["required"]:
+                self._rule_index.setdefault(feature, []).append((index, True))
+            for feature in pattern["any_of"]:
+                self._rule_index.setdefault(feature, []).append((index, False))
+
+            threshold = pattern.get("threshold", 1)
+            self._required_counts.append(len(pattern["required"]))
+            self._thresholds.append(threshold)
+            if not pattern["required"] and threshold <= 0:
+                self._unconditional.append(index)
+
     def check(self, presentation: Dict[str, any]) -> List[RedFlag]:
         """
         Check for red flag conditions in a clinical presentation.
@@ -523,9 +557,36 @@ class RedFlagDetector:
         Returns:
             List of detected red flags, sorted by urgency
         """
-        detected_flags = []
+        present_features = self._present_features(presentation)
+        required_hits, any_hits = self._count_hits(present_features)
+
+        candidates = set(self._unconditional)
+        candidates.update(required_hits)
+        candidates.update(any_hits)
+        matched = [
+            index for index in sorted(candidates)
+            if self._rule_matches(index, required_hits, any_hits)
+        ]
+
+        return self._build_flags(matched, present_features)
+
+    def evaluate(self, presentation: Dict[str, any]) -> "RedFlagEvaluation":
+        """
+        Start an incremental evaluation of a presentation.
+
+        Use during a consultation: update the returned evaluation as features
+        change rather than calling check() on the whole presentation again.
 
-        # Convert presentation to set of present features
+        Args:
+            presentation: Dict containing clinical features (as for check())
+
+        Returns:
+            RedFlagEvaluation whose flags match check(presentation)
+        """
+        return RedFlagEvaluation(self, self._present_features(presentation))
+
+    def _present_features(self, presentation: Dict[str, any]) -> Set[str]:
+        """Convert presentation to set of present features."""
         present_features = set()
         for key, value in presentation.items():
             if isinstance(value, bool) and value:
@@ -546,53 +607,56 @@ class RedFlagDetector:
                     present_features.add("respiratory_rate_above_30")
                 elif key == "heart_rate" and value > 120:
                     present_features.add("tachycardia_above_120")
-
-        # Check each pattern
-        for pattern in self.patterns:
-            if self._matches_pattern(pattern, present_features):
-                # Find which features triggered this flag
-                matching_features = []
-                for req in pattern["required"]:
-                    if req in present_features:
-                        matching_features.append(req)
-                for feat in pattern["any_of"]:
-                    if feat in present_features:
-                        matching_features.append(feat)
-
-                red_flag = RedFlag(
-                    category=pattern["category"],
-                    description=pattern["description"],
-                    urgency=pattern["urgency"],
-                    recommended_action=pattern["action"],
-                    time_critical=pattern["time_critical"],
-                    matching_features=matching_features,
-                    differential_concerns=pattern["concerns"],
-                )
-                detected_flags.append(red_flag)
+        return present_features
+
+    def _count_hits(self, present_features: Set[str]) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Count present required and any_of features per touched pattern."""
+        required_hits: Dict[int, int] = {}
+        any_hits: Dict[int, int] = {}
+        for feature in present_features:
+            for index, is_required in self._rule_index.get(feature, ()):
+                hits = required_hits if is_required else any_hits
+                hits[index] = hits.get(index, 0) + 1
+        return required_hits, any_hits
+
+    def _rule_matches(self, index: int, required_hits: Dict[int, int], any_hits: Dict[int, int]) -> bool:
+        """Check a pattern's counters: all required present, any_of at threshold."""
+        return (
+            required_hits.get(index, 0) == self._required_counts[index]
+            and any_hits.get(index, 0) >= self._thresholds[index]
+        )
+
+    def _build_flags(self, matched: List[int], present_features: Set[str]) -> List[RedFlag]:
+        """Build red flags for matched pattern indices, sorted by urgency."""
+        detected_flags = []
+        for index in matched:
+            pattern = self.patterns[index]
+
+            # Find which features triggered this flag
+            matching_features = []
+            for req in pattern["required"]:
+                if req in present_features:
+                    matching_features.append(req)
+            for feat in pattern["any_of"]:
+                if feat in present_features:
+                    matching_features.append(feat)
+
+            red_flag = RedFlag(
+                category=pattern["category"],
+                description=pattern["description"],
+                urgency=pattern["urgency"],
+                recommended_action=pattern["action"],
+                time_critical=pattern["time_critical"],
+                matching_features=matching_features,
+                differential_concerns=pattern["concerns"],
+            )
+            detected_flags.append(red_flag)
 
         # Sort by urgency (EMERGENCY first)
-        urgency_order = {
-            UrgencyLevel.EMERGENCY: 0,
-            UrgencyLevel.URGENT: 1,
-            UrgencyLevel.WARNING: 2,
-        }
-        detected_flags.sort(key=lambda x: urgency_order[x.urgency])
+        detected_flags.sort(key=lambda x: self.URGENCY_ORDER[x.urgency])
 
         return detected_flags
 
-    def _matches_pattern(self, pattern: Dict, present_features: Set[str]) -> bool:
-        """Check if a pattern matches the present features."""
-        # Check all required features are present
-        for req in pattern["required"]:
-            if req not in present_features:
-                return False
-
-        # Check threshold for any_of features
-        threshold = pattern.get("threshold", 1)
-        any_of_matches = sum(1 for feat in pattern["any_of"] if feat in present_features)
-
-        return any_of_matches >= threshold
-
     def get_immediate_action(self, red_flag: RedFlag) -> str:
         """
         Get immediate action steps for a red flag.
@@ -650,3 +714,86 @@ class RedFlagDetector:
 
         # Otherwise, Semi-urgent
         return "Semi-urgent (Yellow)"
+
+
+class RedFlagEvaluation:
+    """
+    Red flags for a presentation that changes feature by feature.
+
+    Keeps the detector's per-pattern counters, so toggling a feature only
+    re-evaluates the patterns that mention it. Create with
+    RedFlagDetector.evaluate().
+    """
+
+    def __init__(self, detector: RedFlagDetector, present_features: Set[str]):
+        self.detector = detector
+        self.features: Set[str] = set(present_features)
+        self._required_hits, self._any_hits = detector._count_hits(self.features)
+
+        candidates = set(detector._unconditional)
+        candidates.update(self._required_hits)
+        candidates.update(self._any_hits)
+        self._matched: Set[int] = {
+            index for index in candidates
+            if detector._rule_matches(index, self._required_hits, self._any_hits)
+        }
+
+    def set_feature(self, feature: str, present: bool) -> bool:
+        """
+        Mark a single feature present or absent.
+
+        Args:
+            feature: Feature name (e.g. "chest_pain", "spo2_below_90")
+            present: Whether the feature is now present
+
+        Returns:
+            True if the set of detected red flags changed
+        """
+        if (feature in self.features) == present:
+            return False
+
+        if present:
+            self.features.add(feature)
+        else:
+            self.features.discard(feature)
+
+        changed = False
+        step = 1 if present else -1
+        for index, is_required in self.detector._rule_index.get(feature, ()):
+            hits = self._required_hits if is_required else self._any_hits
+            hits[index] = hits.get(index, 0) + step
+
+            matches = self.detector._rule_matches(index, self._required_hits, self._any_hits)
+            if matches != (index in self._matched):
+                changed = True
+                if matches:
+                    self._matched.add(index)
+                else:
+                    self._matched.discard(index)
+        return changed
+
+    def update(self, presentation: Dict[str, any]) -> bool:
+        """
+        Re-evaluate against a new version of the presentation.
+
+        Only features that appeared or disappeared since the last update
+        are applied.
+
+        Args:
+            presentation: Dict containing clinical features (as for check())
+
+        Returns:
+            True if the set of detected red flags changed
+        """
+        features = self.detector._present_features(presentation)
+        changed = False
+        for feature in self.features - features:
+            changed |= self.set_feature(feature, False)
+        for feature in features - self.features:
+            changed |= self.set_feature(feature, True)
+        return changed
+
+    @property
+    def flags(self) -> List[RedFlag]:
+        """Detected red flags, sorted by urgency (as returned by check())."""
+        return self.detector._build_flags(sorted(self._matched), self.features)
@@ -6,7 +6,126 @@ English, and Hinglish.
 """
 
 import re
-from typing import List, Set
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+# Word tokens, as delimited by \b
+_TOKEN = re.compile(r'\w+')
+
+# Characters IGNORECASE matches against an ASCII letter that str.lower()
+# leaves alone; folded before prefiltering so no match is skipped
+_FOLD = str.maketrans('ıſ', 'is')
+
+# Compiled rewrite alternations kept per set of candidate rules
+_REWRITE_CACHE_SIZE = 256
+
+# Line breaks no pattern can match across: the last non-space character
+# before, or the first after, is punctuation. Patterns only cross a line
+# break inside whitespace between two words, and `.` stops at newlines.
+_SAFE_BREAK = re.compile(r'[^\w\s][^\S\n]*\n|\n(?=\s*(?:[^\w\s]|\Z))')
+
+
+def _leading_literal(pattern: str) -> str:
+    """Lowercased text every match of a pattern starts with (may be empty)."""
+    if '|' in pattern:
+        return ''
+    literal = []
+    i = 2 if pattern.startswith('\\b') else 0
+    while i < len(pattern) and (pattern[i].isalnum() or pattern[i] in ' /-'):
+        if i + 1 < len(pattern) and pattern[i + 1] in '?*{':
+            break
+        literal.append(pattern[i])
+        i += 1
+    return ''.join(literal).lower()
+
+
+def _required_tokens(pattern: str) -> Set[str]:
+    """
+    Words a pattern can only match as whole tokens.
+
+    Conservative: plain letter/digit runs outside groups and classes with a
+    word boundary or mandatory whitespace on both sides. An empty set means
+    the pattern cannot be prefiltered and must always be searched.
+    """
+    atoms = []  # 'B' boundary, 'S' mandatory whitespace, 'X' anything else, or a character
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '|':
+            return set()
+        if c == '\\' and i + 1 < n:
+            nxt = pattern[i + 1]
+            atom = 'B' if nxt == 'b' else 'S' if nxt == 's' else 'X'
+            i += 2
+        elif c in '[(':
+            # Skip the class or group, honouring nesting and escapes
+            depth, closing = 0, ']' if c == '[' else ')'
+            while i < n:
+                if pattern[i] == '\\':
+                    i += 2
+                    continue
+                if pattern[i] == c:
+                    depth += 1
+                elif pattern[i] == closing:
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            atom = 'X'
+            i += 1
+        elif c == ' ':
+            atom = 'S'
+            i += 1
+        else:
+            atom = c.lower() if c.isalnum() else 'X'
+            i += 1
+
+        if i < n and pattern[i] in '?*+{':
+            mandatory_space = atom == 'S' and pattern[i] == '+'
+            i = pattern.index('}', i) + 1 if pattern[i] == '{' else i + 1
+            if i < n and pattern[i] == '?':
+                i += 1  # lazy
+            atom = 'S' if mandatory_space else 'X'
+        atoms.append(atom)
+
+    tokens = set()
+    start = None
+    for i, atom in enumerate(atoms + ['X']):
+        if len(atom) == 1 and atom not in 'BSX':
+            if start is None:
+                start = i
+            continue
+        if start is not None:
+            if start > 0 and atoms[start - 1] in ('B', 'S') and atom in ('B', 'S'):
+                tokens.add(''.join(atoms[start:i]))
+            start = None
+    return tokens
+
+
+@dataclass(frozen=True)
+class SymptomMatch:
+    """A symptom found in a note, with its span in the original text."""
+
+    key: str
+    start: int
+    end: int
+
+
+@dataclass
+class ParsedNote:
+    """
+    Result of SymptomParser.parse_note().
+
+    Pass it back as ``previous`` when the note is edited: unchanged parts of
+    the note are not scanned again.
+    """
+
+    text: str
+    symptoms: List[str]
+    matches: List[SymptomMatch]
+    # Chunk text -> (key, start, end) relative to the chunk
+    _chunks: Dict[str, List[Tuple[str, int, int]]] = field(default_factory=dict, repr=False)
 
 
 class SymptomParser:
@@ -23,6 +142,7 @@ class SymptomParser:
         """Initialize symptom patterns and mappings."""
         self._load_abbreviations()
         self._load_symptom_patterns()
+        self._compile_patterns()
 
     def _load_abbreviations(self) -> None:
         """Load common medical abbreviations."""
@@ -636,6 +756,39 @@ class SymptomParser:
             ],
         }
 
+    def _compile_patterns(self) -> None:
+        """
+        Compile abbreviations, Hinglish phrases and symptom patterns.
+
+        All rewrites become one alternation applied in a single pass, in
+        table order, so the first rule wins where several match (the tables
+        were previously applied one re.sub at a time in that order). Each
+        symptom pattern is indexed by the whole words it requires, so a note
+        is tokenized once and only patterns whose words all occur are run.
+        Call again after editing the tables.
+        """
+        rules = list(self.abbreviations.items()) + list(self.hinglish_phrases.items())
+        self._rewrite_literals = [_leading_literal(pattern) for pattern, _ in rules]
+        self._rewrite_regexes: Dict[Tuple[int, ...], re.Pattern] = {}
+        self._rewrite_rules = [
+            (re.compile(pattern, re.IGNORECASE), replacement, '\\' in replacement)
+            for pattern, replacement in rules
+        ]
+
+        self._patterns: List[Tuple[str, re.Pattern, Set[str]]] = []
+        self._token_index: Dict[str, List[int]] = {}
+        self._unindexed: List[int] = []
+        for symptom_key, patterns in self.symptom_patterns.items():
+            for pattern in patterns:
+                pattern_id = len(self._patterns)
+                required = _required_tokens(pattern)
+                self._patterns.append((symptom_key, re.compile(pattern, re.IGNORECASE), required))
+                if required:
+                    anchor = max(required, key=len)
+                    self._token_index.setdefault(anchor, []).append(pattern_id)
+                else:
+                    self._unindexed.append(pattern_id)
+
     def parse(self, clinical_notes: str) -> List[str]:
         """
         Parse clinical notes to extract symptom keys.
@@ -649,28 +802,148 @@ class SymptomParser:
         if not clinical_notes:
             return []
 
-        # Normalize text
-        text = clinical_notes.lower()
+        return self.parse_note(clinical_notes).symptoms
 
-        # Expand abbreviations
-        for abbrev, expansion in self.abbreviations.items():
-            text = re.sub(abbrev, expansion, text, flags=re.IGNORECASE)
+    def parse_note(self, clinical_notes: str, previous: Optional[ParsedNote] = None) -> ParsedNote:
+        """
+        Parse clinical notes to symptom keys with the spans that matched.
 
-        # Translate Hinglish
-        for phrase, translation in self.hinglish_phrases.items():
-            text = re.sub(phrase, translation, text, flags=re.IGNORECASE)
+        The note is split at line breaks no pattern can match across; with
+        ``previous`` (the result for an earlier version of the note), only
+        the parts that changed are scanned again. The result is the same as
+        parsing from scratch.
 
-        # Extract symptoms
-        found_symptoms: Set[str] = set()
+        Args:
+            clinical_notes: Raw clinical notes
+            previous: Earlier result for the same note, if any
 
-        for symptom_key, patterns in self.symptom_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    found_symptoms.add(symptom_key)
-                    break  # Don't duplicate if multiple patterns match
+        Returns:
+            ParsedNote with sorted symptom keys and matches in note order
+        """
+        text = clinical_notes or ""
+        cache = previous._chunks if previous is not None else {}
+        chunks: Dict[str, List[Tuple[str, int, int]]] = {}
+        matches: List[SymptomMatch] = []
+
+        offset = 0
+        for chunk in self._split_chunks(text):
+            found = chunks.get(chunk)
+            if found is None:
+                found = cache.get(chunk)
+                if found is None:
+                    found = self._scan_chunk(chunk)
+                chunks[chunk] = found
+            matches.extend(SymptomMatch(key, offset + start, offset + end) for key, start, end in found)
+            offset += len(chunk)
+
+        matches.sort(key=lambda m: (m.start, m.end, m.key))
+        return ParsedNote(
+            text=text,
+            symptoms=sorted({m.key for m in matches}),
+            matches=matches,
+            _chunks=chunks,
+        )
+
+    def _split_chunks(self, text: str) -> List[str]:
+        """Split text after each safe line break."""
+        chunks = []
+        start = 0
+        for match in _SAFE_BREAK.finditer(text):
+            chunks.append(text[start:match.end()])
+            start = match.end()
+        if start < len(text):
+            chunks.append(text[start:])
+        return chunks
+
+    def _scan_chunk(self, chunk: str) -> List[Tuple[str, int, int]]:
+        """Find symptom matches in one chunk; spans are relative to the chunk."""
+        text, anchors = self._rewrite(chunk.lower())
+        tokens = set(_TOKEN.findall(text.translate(_FOLD)))
+
+        candidates = list(self._unindexed)
+        for token in tokens.intersection(self._token_index):
+            for pattern_id in self._token_index[token]:
+                if self._patterns[pattern_id][2] <= tokens:
+                    candidates.append(pattern_id)
+
+        found = set()
+        rewritten_starts = [anchor[0] for anchor in anchors]
+        for pattern_id in candidates:
+            symptom_key, regex, _ = self._patterns[pattern_id]
+            for match in regex.finditer(text):
+                start = self._original_offset(rewritten_starts, anchors, match.start(), False)
+                end = self._original_offset(rewritten_starts, anchors, match.end(), True)
+                found.add((symptom_key, min(start, len(chunk)), min(end, len(chunk))))
+        return sorted(found, key=lambda m: (m[1], m[2], m[0]))
+
+    def _rewrite(self, text: str) -> Tuple[str, List[Tuple[int, int, int, int]]]:
+        """
+        Expand abbreviations and translate Hinglish in one pass.
+
+        Returns:
+            (rewritten text, [(new_start, new_end, old_start, old_end)] per replacement)
+        """
+        regex = self._rewrite_regex(text)
+        if regex is None:
+            return text, []
+
+        pieces = []
+        anchors = []
+        position = 0
+        length = 0
+        for match in regex.finditer(text):
+            regex, replacement, is_template = self._rewrite_rules[int(match.lastgroup[1:])]
+            if is_template:
+                replacement = regex.match(text, match.start()).expand(replacement)
+            pieces.append(text[position:match.start()])
+            length += match.start() - position
+            anchors.append((length, length + len(replacement), match.start(), match.end()))
+            pieces.append(replacement)
+            length += len(replacement)
+            position = match.end()
+        pieces.append(text[position:])
+        return ''.join(pieces), anchors
+
+    def _rewrite_regex(self, text: str) -> Optional[re.Pattern]:
+        """
+        Alternation of the rewrite rules that can match text, in table order.
+
+        Rules whose leading literal is absent are left out, so the regex only
+        tries the few rules a note can use. None if no rule can match.
+        """
+        folded = text.translate(_FOLD)
+        active = tuple(i for i, literal in enumerate(self._rewrite_literals) if literal in folded)
+        if not active:
+            return None
+
+        regex = self._rewrite_regexes.get(active)
+        if regex is None:
+            patterns = [self._rewrite_rules[i][0].pattern for i in active]
+            # Hoist a shared leading \b so branches are only tried at word edges
+            prefix = '\\b' if all(p.startswith('\\b') for p in patterns) else ''
+            regex = re.compile(
+                prefix + '(?:' + '|'.join(
+                    f'(?P<r{i}>{pattern[len(prefix):]})' for i, pattern in zip(active, patterns)
+                ) + ')',
+                re.IGNORECASE,
+            )
+            if len(self._rewrite_regexes) >= _REWRITE_CACHE_SIZE:
+                self._rewrite_regexes.clear()
+            self._rewrite_regexes[active] = regex
+        return regex
 
-        # Return sorted for consistency
-        return sorted(list(found_symptoms))
+    @staticmethod
+    def _original_offset(rewritten_starts: List[int], anchors: List[Tuple[int, int, int, int]],
+                         offset: int, is_end: bool) -> int:
+        """Map an offset in rewritten text back to the original text."""
+        index = bisect_right(rewritten_starts, offset - 1 if is_end else offset) - 1
+        if index < 0:
+            return offset
+        new_start, new_end, old_start, old_end = anchors[index]
+        if offset >= new_end:
+            return offset - new_end + old_end
+        # Inside a replacement: widen to the whole original phrase
+        return old_end if is_end else old_start
 
     def extract_vitals(self, clinical_notes: str) -> dict:
         """
@@ -1,6 +1,6 @@
 """Drug services for clinical decision support"""
 from .drug_database import DrugDatabase, Drug, DrugFormulation
-from .interaction_checker import InteractionChecker, Interaction, Alert, Severity
+from .interaction_checker import InteractionChecker, Interaction, Alert, Severity, PatientMedications
 from .dose_calculator import DoseCalculator, DoseRecommendation
 
 __all__ = [
@@ -11,6 +11,7 @@ __all__ = [
     'Interaction',
     'Alert',
     'Severity',
+    'PatientMedications',
     'DoseCalculator',
     'DoseRecommendation',
 ]
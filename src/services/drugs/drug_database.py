@@ -1,7 +1,11 @@
 """India-specific drug database with search and lookup"""
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
+from bisect import bisect_left, bisect_right
+from collections import Counter
+import heapq
 import json
+import math
 import os
 from pathlib import Path
 
@@ -26,15 +30,152 @@ class Drug:
     lactation_safe: bool
     requires_monitoring: List[str]  # what labs to monitor
 
+class DrugSearchIndex:
+    """
+    In-memory autocomplete index over generic, brand and salt names.
+
+    Every name, and every word within a name, is kept in one sorted array,
+    so prefix matches are a binary search. A trigram index finds infix
+    matches and, when those run short, near misses for typos. Results are
+    ranked by match type first, then by how often the doctor prescribes
+    the drug.
+    """
+
+    # Match types, best first
+    EXACT, PREFIX, WORD_PREFIX, INFIX, FUZZY = range(5)
+
+    # Name kinds, preferred first when everything else ties
+    GENERIC, BRAND, SALT = range(3)
+
+    # Share of the query's trigrams a name needs for a typo match
+    FUZZY_MIN_SIMILARITY = 0.5
+    FUZZY_MIN_LENGTH = 4
+
+    def __init__(self, names: Dict[str, Tuple[int, List[str]]]):
+        """
+        Args:
+            names: Lowercase name -> (kind, lowercase generic names it covers)
+        """
+        self.names = sorted(names)
+        self.name_ids = {name: name_id for name_id, name in enumerate(self.names)}
+        self.kinds = [names[name][0] for name in self.names]
+        self.generics = [tuple(names[name][1]) for name in self.names]
+        self.frequency: Dict[str, int] = {}  # generic -> times prescribed
+
+        prefixes = []
+        self.trigrams: Dict[str, List[int]] = {}
+        for name_id, name in enumerate(self.names):
+            for start in range(len(name)):
+                if start == 0 or (not name[start - 1].isalnum() and name[start].isalnum()):
+                    prefixes.append((name[start:], name_id, start))
+            # Name ids are appended in order, so postings stay sorted
+            for gram in set(self._trigrams(f" {name} ")):
+                self.trigrams.setdefault(gram, []).append(name_id)
+        prefixes.sort()
+        self.prefix_keys = [key for key, _, _ in prefixes]
+        # Rank key and generics per prefix entry, so a wide range is cheap to walk
+        self.prefix_ranks = [
+            (self.WORD_PREFIX if start else self.PREFIX, 0.0, self.kinds[name_id], len(self.names[name_id]))
+            for _, name_id, start in prefixes
+        ]
+        self.prefix_generics = [self.generics[name_id] for _, name_id, _ in prefixes]
+
+    @staticmethod
+    def _trigrams(text: str) -> List[str]:
+        return [text[i:i + 3] for i in range(len(text) - 2)]
+
+    def search(self, query: str, limit: int) -> List[str]:
+        """
+        Find generic names matching a lowercase query, best first.
+
+        Every generic with a name containing the query is a candidate, as
+        with a substring scan; typo matches are added only when there are
+        fewer than ``limit`` of those.
+        """
+        # Generic -> best (match type, -similarity, kind, name length) so far
+        best: Dict[str, Tuple[int, float, int, int]] = {}
+
+        def add(name_id: int, match_type: int, similarity: float = 1.0):
+            key = (match_type, -similarity, self.kinds[name_id], len(self.names[name_id]))
+            for generic in self.generics[name_id]:
+                current = best.get(generic)
+                if current is None or key < current:
+                    best[generic] = key
+
+        lo = bisect_left(self.prefix_keys, query)
+        hi = bisect_right(self.prefix_keys, query + '\U0010ffff', lo)
+        ranks, generics = self.prefix_ranks, self.prefix_generics
+        for i in range(lo, hi):
+            key = ranks[i]
+            for generic in generics[i]:
+                current = best.get(generic)
+                if current is None or key < current:
+                    best[generic] = key
+        if query in self.name_ids:
+            add(self.name_ids[query], self.EXACT)
+
+        # Infix matches rank below every prefix match, so only look for them
+        # while the prefix matches do not fill the results
+        if len(best) < limit:
+            for name_id in self._containing(query):
+                add(name_id, self.INFIX)
+
+        if len(best) < limit and len(query) >= self.FUZZY_MIN_LENGTH:
+            for name_id, similarity in self._similar(query):
+                add(name_id, self.FUZZY, similarity)
+
+        frequency = self.frequency
+        return [
+            ranked[-1] for ranked in heapq.nsmallest(limit, (
+                (key[0], key[1], -frequency.get(generic, 0), key[2], key[3], generic)
+                for generic, key in best.items()
+            ))
+        ]
+
+    def _containing(self, query: str) -> List[int]:
+        """Names containing query anywhere."""
+        if len(query) < 3:
+            # No trigram to look up; short queries scan the names
+            return [name_id for name_id, name in enumerate(self.names) if query in name]
+
+        # Any name containing the query has its rarest trigram
+        rarest = min((self.trigrams.get(gram, ()) for gram in set(self._trigrams(query))), key=len)
+        names = self.names
+        return [name_id for name_id in rarest if query in names[name_id]]
+
+    def _similar(self, query: str) -> List[Tuple[int, float]]:
+        """Names sharing at least FUZZY_MIN_SIMILARITY of the query's trigrams."""
+        grams = self._trigrams(f" {query} ")
+        needed = math.ceil(self.FUZZY_MIN_SIMILARITY * len(grams))
+        postings = sorted((self.trigrams.get(gram, []) for gram in set(grams)), key=len)
+        # A name sharing `needed` trigrams appears in at least one of the
+        # len(postings) - needed + 1 rarest postings; only those are
+        # candidates, and the common postings just add to their counts
+        split = len(postings) - needed + 1
+        if split <= 0:
+            return []
+        shared = Counter()
+        for posting in postings[:split]:
+            shared.update(posting)
+        candidates = set(shared)
+        for posting in postings[split:]:
+            shared.update(candidates.intersection(posting))
+
+        return [(name_id, count / len(grams)) for name_id, count in shared.items() if count >= needed]
+
+
 class DrugDatabase:
     """Searchable drug database with India-specific data"""
 
-    def __init__(self, data_path: str = "data/drugs"):
+    def __init__(self, data_path: str = "data/drugs", db_service=None):
         self.data_path = data_path
         self.drugs: Dict[str, Drug] = {}
         self.salt_index: Dict[str, List[str]] = {}  # salt -> generic names
         self.brand_index: Dict[str, str] = {}  # brand -> generic name
         self._load_database()
+        self._build_search_index()
+        if db_service is not None:
+            self.load_prescribing_frequency(db_service)
 
     def _load_database(self):
         """Load drug data from JSON files"""
@@ -174,37 +315,61 @@ class DrugDatabase:
             )
             self.drugs[drug.generic_name.lower()] = drug
 
-    def search(self, query: str, limit: int = 20) -> List[Drug]:
-        """Search drugs by name, salt, or brand"""
-        if not query:
-            return []
-
-        query_lower = query.lower()
-        results = []
-        seen = set()
+    def _build_search_index(self):
+        """Index generic, brand and salt names for search()"""
+        names: Dict[str, Tuple[int, List[str]]] = {}
 
-        # Search by generic name
-        for name, drug in self.drugs.items():
-            if query_lower in name and drug.generic_name not in seen:
-                results.append(drug)
-                seen.add(drug.generic_name)
+        def add(name: str, kind: int, generics: List[str]):
+            generics = [g.lower() for g in generics if g.lower() in self.drugs]
+            if not generics:
+                return
+            if name in names:
+                old_kind, old_generics = names[name]
+                generics = old_generics + [g for g in generics if g not in old_generics]
+                kind = min(kind, old_kind)
+            names[name] = (kind, generics)
 
-        # Search by brand name
+        for name in self.drugs:
+            add(name, DrugSearchIndex.GENERIC, [name])
         for brand, generic in self.brand_index.items():
-            if query_lower in brand and generic not in seen:
-                if generic.lower() in self.drugs:
-                    results.append(self.drugs[generic.lower()])
-                    seen.add(generic)
-
-        # Search by salt
+            add(brand, DrugSearchIndex.BRAND, [generic])
         for salt, generics in self.salt_index.items():
-            if query_lower in salt:
-                for generic in generics:
-                    if generic not in seen and generic.lower() in self.drugs:
-                        results.append(self.drugs[generic.lower()])
-                        seen.add(generic)
+            add(salt, DrugSearchIndex.SALT, generics)
+
+        self._search_index = DrugSearchIndex(names)
+
+    def set_prescribing_frequency(self, counts: Dict[str, int]):
+        """
+        Set how often each drug was prescribed, to rank search results.
+
+        Args:
+            counts: Drug name as prescribed (generic, brand or salt) -> count
+        """
+        frequency: Dict[str, int] = {}
+        for name, count in counts.items():
+            name = name.strip().lower()
+            if name in self.drugs:
+                generic = name
+            elif name in self.brand_index:
+                generic = self.brand_index[name].lower()
+            elif len(self.salt_index.get(name, [])) == 1:
+                generic = self.salt_index[name][0].lower()
+            else:
+                continue
+            frequency[generic] = frequency.get(generic, 0) + count
+        self._search_index.frequency = frequency
+
+    def load_prescribing_frequency(self, db_service):
+        """Rank search results by this doctor's past prescriptions"""
+        self.set_prescribing_frequency(db_service.get_prescribed_drug_counts())
+
+    def search(self, query: str, limit: int = 20) -> List[Drug]:
+        """Search drugs by name, salt, or brand"""
+        if not query:
+            return []
 
-        return results[:limit]
+        generics = self._search_index.search(query.lower(), limit)
+        return [self.drugs[generic] for generic in generics]
 
     def get_by_generic_name(self, name: str) -> Optional[Drug]:
         """Get drug by generic name"""
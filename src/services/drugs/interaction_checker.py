@@ -1,10 +1,12 @@
 """Drug-drug and drug-disease interaction checking"""
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Dict, Tuple
+from typing import List, Optional, Dict, Iterable, Set, Tuple
 import json
 from pathlib import Path
 
+from .drug_database import DrugDatabase
+
 class Severity(Enum):
     CRITICAL = "critical"    # Block prescription, life-threatening
     MAJOR = "major"          # Strong warning, serious harm possible
@@ -32,15 +34,53 @@ class Alert:
     can_override: bool
     override_requires_reason: bool
 
+@dataclass
+class PatientMedications:
+    """A patient's active medications and context, for batch re-screening"""
+    patient_id: int
+    drugs: List[str]
+    conditions: List[str] = field(default_factory=list)
+    allergies: List[str] = field(default_factory=list)
+    age: int = 0
+    gender: str = ""
+    pregnant: bool = False
+    lactating: bool = False
+    creatinine: Optional[float] = None
+    egfr: Optional[float] = None
+
 class InteractionChecker:
     """Check drug-drug and drug-disease interactions"""
 
-    def __init__(self, data_path: str = "data/interactions"):
+    # Special-population lists (drug or class names); special_populations.json overrides
+    PREGNANCY_CONTRAINDICATED = ['warfarin', 'atorvastatin', 'ace inhibitor']
+    RENAL_DOSE_ADJUSTMENT = ['metformin', 'digoxin', 'gabapentin']
+    BEERS_CRITERIA = ['diazepam', 'diphenhydramine', 'amitriptyline']
+
+    DATA_FILES = [
+        "common_interactions.json",
+        "contraindications.json",
+        "cross_allergies.json",
+        "drug_classes.json",
+        "special_populations.json",
+    ]
+
+    def __init__(self, data_path: str = "data/interactions", drug_database: Optional[DrugDatabase] = None):
+        self.data_path = data_path
+        self.drug_database = drug_database  # brand and salt aliases, if given
+        self._load(data_path)
+
+    def _load(self, data_path: str):
+        """Load interaction data and build the interaction graph"""
         self.interactions: Dict[Tuple[str, str], Interaction] = {}
         self.contraindications: Dict[Tuple[str, str], dict] = {}  # (drug, condition)
         self.cross_allergies: Dict[str, List[str]] = {}  # drug class -> cross-reactive classes
         self.drug_classes: Dict[str, str] = {}  # drug -> class
+        self.pregnancy_contraindicated: List[str] = list(self.PREGNANCY_CONTRAINDICATED)
+        self.renal_dose_adjustment: List[str] = list(self.RENAL_DOSE_ADJUSTMENT)
+        self.beers_criteria: List[str] = list(self.BEERS_CRITERIA)
+        self._data_signature = self._get_data_signature()
         self._load_data(data_path)
+        self._build_graph()
 
     def _load_data(self, data_path: str):
         """Load interaction data"""
@@ -109,15 +149,127 @@ class InteractionChecker:
                     data = json.load(f)
                     self.drug_classes = data.get('drug_classes', {})
 
+            # Load special-population drug lists
+            populations_file = Path(data_path) / "special_populations.json"
+            if populations_file.exists():
+                with open(populations_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    self.pregnancy_contraindicated = data.get('pregnancy_contraindicated', self.pregnancy_contraindicated)
+                    self.renal_dose_adjustment = data.get('renal_dose_adjustment', self.renal_dose_adjustment)
+                    self.beers_criteria = data.get('beers_criteria', self.beers_criteria)
+
             print(f"Loaded {len(self.interactions)} interactions")
 
         except Exception as e:
             print(f"Error loading interaction data: {e}")
 
+    def _build_graph(self):
+        """
+        Build the normalized interaction graph.
+
+        Drug names resolve to canonical IDs (lowercase generic names) through
+        the drug database's brand and salt aliases. Interactions become
+        symmetric adjacency maps keyed by ID. An interaction naming a drug
+        class is expanded to every member of the class, without replacing
+        pairs that have their own entry.
+        """
+        self._aliases: Dict[str, str] = {}
+        if self.drug_database:
+            for salt, generics in self.drug_database.salt_index.items():
+                if len(generics) == 1:  # a salt shared by several generics is ambiguous
+                    self._aliases[salt] = generics[0].lower()
+            for brand, generic in self.drug_database.brand_index.items():
+                self._aliases[brand] = generic.lower()
+            for generic in self.drug_database.drugs:
+                self._aliases[generic] = generic
+
+        self._drug_class: Dict[str, str] = {}  # drug ID -> class
+        if self.drug_database:
+            for generic, drug in self.drug_database.drugs.items():
+                if drug.drug_class:
+                    self._drug_class[generic] = drug.drug_class.lower()
+        for drug, drug_class in self.drug_classes.items():
+            self._drug_class[self.resolve(drug)] = drug_class.lower()
+
+        self.cross_allergies = {
+            drug_class.lower(): [related.lower() for related in related_classes]
+            for drug_class, related_classes in self.cross_allergies.items()
+        }
+
+        self._class_members: Dict[str, Set[str]] = {}
+        for drug_id, drug_class in self._drug_class.items():
+            self._class_members.setdefault(drug_class, set()).add(drug_id)
+
+        self._graph: Dict[str, Dict[str, Interaction]] = {}
+        for (drug1, drug2), interaction in self.interactions.items():
+            self._graph.setdefault(self.resolve(drug1), {})[self.resolve(drug2)] = interaction
+
+        # Class-level edges, most severe first so it wins among expansions
+        severity_rank = list(Severity).index
+        class_edges = sorted(
+            (
+                (id1, id2, interaction)
+                for id1, neighbors in self._graph.items()
+                for id2, interaction in neighbors.items()
+                if id1 in self._class_members or id2 in self._class_members
+            ),
+            key=lambda edge: severity_rank(edge[2].severity),
+        )
+        for id1, id2, interaction in class_edges:
+            for member1 in self._class_members.get(id1, {id1}):
+                neighbors = self._graph.setdefault(member1, {})
+                for member2 in self._class_members.get(id2, {id2}):
+                    if member1 != member2 and member2 not in neighbors:
+                        neighbors[member2] = interaction
+                        self._graph.setdefault(member2, {})[member1] = interaction
+
+        self._contraindications_by_drug: Dict[str, Dict[str, dict]] = {}
+        for (drug, condition), contra in self.contraindications.items():
+            self._contraindications_by_drug.setdefault(self.resolve(drug), {})[condition] = contra
+
+        self._pregnancy_ids = self._expand_classes(self.pregnancy_contraindicated)
+        self._renal_ids = self._expand_classes(self.renal_dose_adjustment)
+        self._beers_ids = self._expand_classes(self.beers_criteria)
+
+    def _expand_classes(self, names: List[str]) -> Set[str]:
+        """Resolve drug and class names to the set of drug IDs they cover"""
+        ids = set()
+        for name in names:
+            drug_id = self.resolve(name)
+            ids.add(drug_id)
+            ids.update(self._class_members.get(drug_id, ()))
+        return ids
+
+    def resolve(self, drug: str) -> str:
+        """Resolve a generic, brand or salt name to its canonical drug ID"""
+        key = drug.strip().lower()
+        return self._aliases.get(key, key)
+
+    def _get_data_signature(self) -> Tuple:
+        """Modification times of the data files, to detect updates"""
+        signature = []
+        for name in self.DATA_FILES:
+            path = Path(self.data_path) / name
+            signature.append(path.stat().st_mtime_ns if path.exists() else None)
+        return tuple(signature)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload interaction data if any data file changed on disk.
+
+        Returns:
+            True if the data was reloaded (active patients should be
+            re-screened with check_prescriptions_batch())
+        """
+        if self._get_data_signature() == self._data_signature:
+            return False
+        self._load(self.data_path)
+        return True
+
     def check_pair(self, drug1: str, drug2: str) -> Optional[Interaction]:
         """Check interaction between two drugs"""
-        key = (drug1.lower(), drug2.lower())
-        return self.interactions.get(key)
+        neighbors = self._graph.get(self.resolve(drug1))
+        return neighbors.get(self.resolve(drug2)) if neighbors else None
 
     def check_prescription(self,
                           new_drugs: List[str],
@@ -143,12 +295,17 @@ class InteractionChecker:
         """
         alerts = []
         all_drugs = new_drugs + current_drugs
+        drug_ids = [self.resolve(drug) for drug in all_drugs]
 
         # Check drug-drug interactions
         for i, drug1 in enumerate(new_drugs):
-            for drug2 in all_drugs[i+1:]:
-                interaction = self.check_pair(drug1, drug2)
+            neighbors = self._graph.get(drug_ids[i])
+            if not neighbors:
+                continue
+            for j in range(i + 1, len(all_drugs)):
+                interaction = neighbors.get(drug_ids[j])
                 if interaction:
+                    drug2 = all_drugs[j]
                     alerts.append(Alert(
                         alert_type="interaction",
                         severity=interaction.severity,
@@ -171,7 +328,9 @@ class InteractionChecker:
                 alerts.append(allergy_alert)
 
         # Check contraindications
-        for drug in new_drugs:
+        for i, drug in enumerate(new_drugs):
+            if drug_ids[i] not in self._contraindications_by_drug:
+                continue
             for condition in patient_conditions:
                 contra_alert = self.check_contraindication(drug, condition)
                 if contra_alert:
@@ -183,9 +342,8 @@ class InteractionChecker:
 
         # Check pregnancy/lactation
         if patient_pregnant:
-            for drug in new_drugs:
-                # Placeholder - would need pregnancy category data
-                if drug.lower() in ['warfarin', 'atorvastatin', 'ace inhibitor']:
+            for i, drug in enumerate(new_drugs):
+                if drug_ids[i] in self._pregnancy_ids:
                     alerts.append(Alert(
                         alert_type="pregnancy",
                         severity=Severity.CRITICAL,
@@ -199,8 +357,8 @@ class InteractionChecker:
 
         # Check renal dosing
         if egfr and egfr < 60:
-            for drug in new_drugs:
-                if drug.lower() in ['metformin', 'digoxin', 'gabapentin']:
+            for i, drug in enumerate(new_drugs):
+                if drug_ids[i] in self._renal_ids:
                     alerts.append(Alert(
                         alert_type="renal",
                         severity=Severity.MAJOR,
@@ -214,9 +372,8 @@ class InteractionChecker:
 
         # Check geriatric concerns
         if patient_age >= 65:
-            beers_criteria = ['diazepam', 'diphenhydramine', 'amitriptyline']
-            for drug in new_drugs:
-                if drug.lower() in beers_criteria:
+            for i, drug in enumerate(new_drugs):
+                if drug_ids[i] in self._beers_ids:
                     alerts.append(Alert(
                         alert_type="geriatric",
                         severity=Severity.MODERATE,
@@ -230,12 +387,41 @@ class InteractionChecker:
 
         return sorted(alerts, key=lambda a: list(Severity).index(a.severity))
 
+    def check_prescriptions_batch(self, patients: Iterable[PatientMedications]) -> Dict[int, List[Alert]]:
+        """
+        Re-screen many patients' active medications.
+
+        Run after the interaction data is updated (see reload_if_changed()).
+        Each patient's drugs are all checked as new, so every pair,
+        contraindication and allergy is screened.
+
+        Returns:
+            Alerts by patient ID; patients without alerts are omitted
+        """
+        results = {}
+        for patient in patients:
+            alerts = self.check_prescription(
+                new_drugs=patient.drugs,
+                current_drugs=[],
+                patient_conditions=patient.conditions,
+                patient_allergies=patient.allergies,
+                patient_age=patient.age,
+                patient_gender=patient.gender,
+                patient_pregnant=patient.pregnant,
+                patient_lactating=patient.lactating,
+                creatinine=patient.creatinine,
+                egfr=patient.egfr,
+            )
+            if alerts:
+                results[patient.patient_id] = alerts
+        return results
+
     def check_allergy(self, drug: str, allergies: List[str]) -> Optional[Alert]:
         """Check if drug is contraindicated due to allergies"""
-        drug_lower = drug.lower()
+        drug_id = self.resolve(drug)
 
         # Direct allergy match
-        if drug_lower in [a.lower() for a in allergies]:
+        if drug_id in [self.resolve(a) for a in allergies]:
             return Alert(
                 alert_type="allergy",
                 severity=Severity.CRITICAL,
@@ -248,10 +434,10 @@ class InteractionChecker:
             )
 
         # Check cross-allergies
-        drug_class = self.drug_classes.get(drug_lower, '')
+        drug_class = self._drug_class.get(drug_id, '')
         if drug_class:
             for allergy in allergies:
-                allergy_class = self.drug_classes.get(allergy.lower(), '')
+                allergy_class = self._drug_class.get(self.resolve(allergy), '')
                 if allergy_class and allergy_class in self.cross_allergies.get(drug_class, []):
                     return Alert(
                         alert_type="cross_allergy",
@@ -268,8 +454,7 @@ class InteractionChecker:
 
     def check_contraindication(self, drug: str, condition: str) -> Optional[Alert]:
         """Check if drug is contraindicated for a condition"""
-        key = (drug.lower(), condition.lower())
-        contra = self.contraindications.get(key)
+        contra = self._contraindications_by_drug.get(self.resolve(drug), {}).get(condition.lower())
 
         if contra:
             severity_map = {
@@ -299,7 +484,7 @@ class InteractionChecker:
         class_counts = {}
 
         for drug in drugs:
-            drug_class = self.drug_classes.get(drug.lower(), '')
+            drug_class = self._drug_class.get(self.resolve(drug), '')
             if drug_class:
                 if drug_class not in class_counts:
                     class_counts[drug_class] = []
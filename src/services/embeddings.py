@@ -0,0 +1,346 @@
+"""Local embedding providers and the query embedding cache used by RAGService.
+
+RAGService embeds documents and queries explicitly through an
+``EmbeddingProvider`` instead of relying on Chroma's implicit embedding
+function. This lets a clinic pick a smaller model on low-RAM machines and
+lets repeat queries ("last HbA1c") skip the model entirely via
+``QueryEmbeddingCache``.
+
+Configuration (environment):
+    DOCASSIST_EMBEDDING_MODEL: "default" (Chroma's ONNX all-MiniLM-L6-v2)
+        or any sentence-transformers model name, e.g. "paraphrase-MiniLM-L3-v2"
+    DOCASSIST_EMBEDDING_BATCH_SIZE: Texts per model call (default 32)
+    DOCASSIST_EMBEDDING_THREADS: CPU threads used for inference (default: all)
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "default"
+DEFAULT_BATCH_SIZE = 32
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for a query: lowercased with whitespace collapsed."""
+    return " ".join(text.lower().split())
+
+
+# ============== PROVIDERS ==============
+
+class EmbeddingProvider(ABC):
+    """Base class for local embedding models.
+
+    Subclasses implement ``_load`` and ``_embed``, applying ``num_threads``
+    to their runtime when loading. The model is loaded lazily on first use
+    and is not pickled, so a provider can be handed to worker processes
+    (see ``rag_reindex``) and load its own copy there.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_threads: Optional[int] = None):
+        """Initialize provider.
+
+        Args:
+            model_name: Model identifier
+            batch_size: Texts per model call
+            num_threads: CPU threads for inference (None = library default)
+        """
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.num_threads = num_threads
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_model"] = None
+        del state["_load_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._load_lock = threading.Lock()
+
+    @property
+    def collection_suffix(self) -> str:
+        """Suffix for Chroma collection names.
+
+        Vectors from different models are not comparable (and usually differ
+        in dimension), so each model gets its own collections.
+        """
+        if self.model_name == DEFAULT_MODEL:
+            return ""
+        return "__" + re.sub(r"[^a-zA-Z0-9]+", "_", self.model_name).strip("_").lower()
+
+    @property
+    def model(self):
+        """The loaded model (loaded on first access)."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = self._load()
+                    logger.info(
+                        f"Loaded embedding model {self.model_name} in "
+                        f"{(time.perf_counter() - start) * 1000:.0f}ms"
+                    )
+        return self._model
+
+    @abstractmethod
+    def _load(self):
+        """Load and return the model, limited to ``num_threads`` if set."""
+
+    @abstractmethod
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch of texts with the loaded model."""
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts in ``batch_size`` chunks.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One vector (list of floats) per text, in order
+        """
+        vectors: List[List[float]] = []
+        for i in range(0, len(texts), self.batch_size):
+            batch = list(texts[i:i + self.batch_size])
+            vectors.extend([float(x) for x in vector] for vector in self._embed(batch))
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query text."""
+        return self.embed_documents([text])[0]
+
+    def __call__(self, input: Sequence[str]) -> List[List[float]]:
+        """Embedding-function interface (``fn(texts) -> vectors``)."""
+        return self.embed_documents(input)
+
+    def clone(self) -> "EmbeddingProvider":
+        """Fresh, unloaded copy with the same settings (picklable factory)."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.__setstate__(self.__getstate__())
+        return clone
+
+
+class OnnxMiniLMEmbeddingProvider(EmbeddingProvider):
+    """Chroma's bundled ONNX all-MiniLM-L6-v2 (no torch required)."""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, num_threads: Optional[int] = None):
+        super().__init__(DEFAULT_MODEL, batch_size=batch_size, num_threads=num_threads)
+
+    def _load(self):
+        from chromadb.utils import embedding_functions
+        embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        if self.num_threads:
+            # Chroma builds its InferenceSession with default options on first
+            # use; build it here instead so the thread limit reaches onnxruntime
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.num_threads
+            options.inter_op_num_threads = 1
+            options.log_severity_level = 3
+            embedding_function._download_model_if_not_exists()
+            model_path = (
+                Path(embedding_function.DOWNLOAD_PATH)
+                / embedding_function.EXTRACTED_FOLDER_NAME / "model.onnx"
+            )
+            embedding_function.model = onnxruntime.InferenceSession(
+                str(model_path),
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+        return embedding_function
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        return self.model(texts)
+
+
+class SentenceTransformerEmbeddingProvider(EmbeddingProvider):
+    """Any sentence-transformers model, run on CPU by default."""
+
+    def __init__(self, model_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 num_threads: Optional[int] = None, device: str = "cpu"):
+        super().__init__(model_name, batch_size=batch_size, num_threads=num_threads)
+        self.device = device
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+        if self.num_threads:
+            import torch
+            torch.set_num_threads(self.num_threads)
+        return SentenceTransformer(self.model_name, device=self.device)
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).tolist()
+
+
+def create_embedding_provider(
+    model_name: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    num_threads: Optional[int] = None
+) -> EmbeddingProvider:
+    """Create the configured embedding provider.
+
+    Arguments override the DOCASSIST_EMBEDDING_* environment variables.
+
+    Args:
+        model_name: "default" or a sentence-transformers model name
+        batch_size: Texts per model call
+        num_threads: CPU threads for inference
+
+    Returns:
+        EmbeddingProvider (model not yet loaded)
+    """
+    model_name = model_name or os.getenv("DOCASSIST_EMBEDDING_MODEL", DEFAULT_MODEL)
+    if batch_size is None:
+        batch_size = int(os.getenv("DOCASSIST_EMBEDDING_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    if num_threads is None and os.getenv("DOCASSIST_EMBEDDING_THREADS"):
+        num_threads = int(os.getenv("DOCASSIST_EMBEDDING_THREADS"))
+
+    if model_name == DEFAULT_MODEL:
+        return OnnxMiniLMEmbeddingProvider(batch_size=batch_size, num_threads=num_threads)
+    return SentenceTransformerEmbeddingProvider(
+        model_name, batch_size=batch_size, num_threads=num_threads
+    )
+
+
+# ============== QUERY CACHE ==============
+
+class QueryEmbeddingCache:
+    """LRU cache of query embeddings keyed by normalized query text.
+
+    Optionally backed by a SQLite file so frequent questions stay cached
+    across restarts. Entries are namespaced by model name.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 1024, path: Optional[str] = None):
+        """Initialize cache.
+
+        Args:
+            model_name: Embedding model the vectors belong to
+            max_entries: In-memory (and on-disk) entry limit
+            path: SQLite file for persistence (None = memory only)
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS query_embeddings (
+                        model TEXT NOT NULL,
+                        query TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        last_used REAL NOT NULL,
+                        PRIMARY KEY (model, query)
+                    )
+                """)
+                self._conn.commit()
+                self._load_from_disk()
+            except sqlite3.Error as e:
+                logger.warning(f"Query embedding cache at {path} unavailable, using memory only: {e}")
+                self._conn = None
+
+    def _load_from_disk(self):
+        """Warm the LRU with the most recently used persisted entries."""
+        rows = self._conn.execute(
+            """
+            SELECT query, vector FROM query_embeddings
+            WHERE model = ? ORDER BY last_used DESC LIMIT ?
+            """,
+            (self.model_name, self.max_entries)
+        ).fetchall()
+        for query, blob in reversed(rows):
+            self._entries[query] = array("f", blob).tolist()
+
+        # Drop entries that fell off the end of the LRU
+        self._conn.execute(
+            """
+            DELETE FROM query_embeddings WHERE model = ? AND query NOT IN (
+                SELECT query FROM query_embeddings WHERE model = ?
+                ORDER BY last_used DESC LIMIT ?
+            )
+            """,
+            (self.model_name, self.model_name, self.max_entries)
+        )
+        self._conn.commit()
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """Cached vector for a query, or None."""
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, query: str, vector: Sequence[float]):
+        """Store a query vector, evicting the least recently used entry if full."""
+        key = normalize_query(query)
+        vector = list(vector)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?, ?)",
+                        (self.model_name, key, array("f", vector).tobytes(), time.time())
+                    )
+                    self._conn.executemany(
+                        "DELETE FROM query_embeddings WHERE model = ? AND query = ?",
+                        [(self.model_name, q) for q in evicted]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist query embedding: {e}")
+
+    def clear(self):
+        """Drop all cached vectors for this model."""
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_embeddings WHERE model = ?", (self.model_name,))
+                self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        """Close the backing database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
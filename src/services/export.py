@@ -60,14 +60,17 @@ class ExportService:
         Raises:
             ValueError: If patient not found
         """
-        patient = self.db.get_patient(patient_id)
-        if not patient:
+        bundle = self.db.get_patient_bundle(
+            patient_id, include=("visits", "investigations", "procedures")
+        )
+        if not bundle:
             raise ValueError(f"Patient with ID {patient_id} not found")
 
         # Get all patient data
-        visits = self.db.get_patient_visits(patient_id)
-        investigations = self.db.get_patient_investigations(patient_id)
-        procedures = self.db.get_patient_procedures(patient_id)
+        patient = bundle.patient
+        visits = bundle.visits
+        investigations = bundle.investigations
+        procedures = bundle.procedures
 
         # Generate filename if not provided
         if output_path is None:
@@ -227,14 +230,17 @@ class ExportService:
         Raises:
             ValueError: If patient not found
         """
-        patient = self.db.get_patient(patient_id)
-        if not patient:
+        bundle = self.db.get_patient_bundle(
+            patient_id, include=("visits", "investigations", "procedures")
+        )
+        if not bundle:
             raise ValueError(f"Patient with ID {patient_id} not found")
 
         # Get all patient data
-        visits = self.db.get_patient_visits(patient_id)
-        investigations = self.db.get_patient_investigations(patient_id)
-        procedures = self.db.get_patient_procedures(patient_id)
+        patient = bundle.patient
+        visits = bundle.visits
+        investigations = bundle.investigations
+        procedures = bundle.procedures
 
         # Generate filename if not provided
         if output_path is None:
@@ -318,9 +324,9 @@ class ExportService:
         patients = self.db.get_all_patients()
         all_visits = []
 
+        bundles = self.db.get_patient_bundles((p.id for p in patients), include=("visits",))
         for patient in patients:
-            visits = self.db.get_patient_visits(patient.id)
-            for visit in visits:
+            for visit in bundles[patient.id].visits:
                 all_visits.append({
                     "patient_uhid": patient.uhid,
                     "patient_name": patient.name,
@@ -370,9 +376,9 @@ class ExportService:
         patients = self.db.get_all_patients()
         all_investigations = []
 
+        bundles = self.db.get_patient_bundles((p.id for p in patients), include=("investigations",))
         for patient in patients:
-            investigations = self.db.get_patient_investigations(patient.id)
-            for inv in investigations:
+            for inv in bundles[patient.id].investigations:
                 all_investigations.append({
                     "patient_uhid": patient.uhid,
                     "patient_name": patient.name,
@@ -424,9 +430,9 @@ class ExportService:
         patients = self.db.get_all_patients()
         all_procedures = []
 
+        bundles = self.db.get_patient_bundles((p.id for p in patients), include=("procedures",))
         for patient in patients:
-            procedures = self.db.get_patient_procedures(patient.id)
-            for proc in procedures:
+            for proc in bundles[patient.id].procedures:
                 all_procedures.append({
                     "patient_uhid": patient.uhid,
                     "patient_name": patient.name,
@@ -480,10 +486,14 @@ class ExportService:
         all_investigations = []
         all_procedures = []
 
-        for patient in patients:
-            all_visits.extend(self.db.get_patient_visits(patient.id))
-            all_investigations.extend(self.db.get_patient_investigations(patient.id))
-            all_procedures.extend(self.db.get_patient_procedures(patient.id))
+        # A handful of batched queries instead of three per patient
+        bundles = self.db.get_patient_bundles(
+            (p.id for p in patients), include=("visits", "investigations", "procedures")
+        )
+        for bundle in bundles.values():
+            all_visits.extend(bundle.visits)
+            all_investigations.extend(bundle.investigations)
+            all_procedures.extend(bundle.procedures)
 
         # Build export data
         export_data = {
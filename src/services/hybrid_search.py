@@ -0,0 +1,254 @@
+"""Hybrid patient search fusing exact, FTS5, phonetic and vector retrieval.
+
+Each retriever returns a ranked list of patient IDs. The retrievers run
+concurrently on a small thread pool and their rankings are combined with
+reciprocal-rank fusion (RRF):
+
+    score(patient) = sum(weight[r] / (RRF_K + rank_r(patient)))
+
+RRF needs no score calibration between BM25, phonetic similarity and
+vector distance, and a patient found by several retrievers rises to the
+top. Only the winning patients are then loaded, in one batched query.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.schemas import Patient
+from .phonetic import PhoneticIndex
+
+logger = logging.getLogger(__name__)
+
+# Damping constant from the original RRF paper; larger values flatten rank differences
+RRF_K = 60
+
+# Relative trust in each retriever
+DEFAULT_WEIGHTS = {
+    "exact": 2.0,
+    "fts": 1.0,
+    "clinical": 0.8,
+    "phonetic": 0.8,
+    "vector": 1.0,
+}
+
+
+@dataclass
+class HybridSearchResult:
+    """A fused search hit."""
+    patient: Patient
+    score: float
+    # Retriever name -> 1-based rank in that retriever's list
+    ranks: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def match_type(self) -> str:
+        """Retriever that ranked this patient highest."""
+        return min(self.ranks, key=self.ranks.get) if self.ranks else ""
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[int]],
+    weights: Optional[Dict[str, float]] = None,
+    k: int = RRF_K
+) -> List[Tuple[int, float, Dict[str, int]]]:
+    """Fuse ranked ID lists.
+
+    Args:
+        rankings: Retriever name -> patient IDs, best first
+        weights: Retriever name -> weight (default 1.0)
+        k: RRF damping constant
+
+    Returns:
+        List of (patient_id, fused_score, ranks) sorted by score descending
+    """
+    weights = weights or {}
+    scores: Dict[int, float] = {}
+    ranks: Dict[int, Dict[str, int]] = {}
+
+    for name, ids in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, patient_id in enumerate(dict.fromkeys(ids), start=1):
+            scores[patient_id] = scores.get(patient_id, 0.0) + weight / (k + rank)
+            ranks.setdefault(patient_id, {})[name] = rank
+
+    fused = sorted(scores.items(), key=lambda item: -item[1])
+    return [(patient_id, score, ranks[patient_id]) for patient_id, score in fused]
+
+
+class HybridSearchEngine:
+    """Unified patient search over every available index.
+
+    Retrievers:
+        exact: UHID exact/prefix and phone-number suffix
+        fts: patients_fts (name, UHID, phone, address)
+        clinical: clinical_fts (diagnoses, tests, procedures)
+        phonetic: PhoneticIndex (stored phonetic codes of patient names)
+        vector: RAGService.search_patients (skipped for single-word queries
+            and when no RAGService is given)
+
+    Results are cached per normalized query and invalidated when the
+    database changes, so search-as-you-type re-serves earlier prefixes
+    (backspacing) without querying again.
+    """
+
+    def __init__(
+        self,
+        db_service,
+        rag_service=None,
+        weights: Optional[Dict[str, float]] = None,
+        candidates_per_retriever: int = 50,
+        timeout: float = 0.5,
+        vector_min_words: int = 2,
+        cache_size: int = 256,
+        max_workers: int = 5
+    ):
+        """Initialize search engine.
+
+        Args:
+            db_service: DatabaseService
+            rag_service: Optional RAGService for vector retrieval
+            weights: Per-retriever RRF weights (default: DEFAULT_WEIGHTS)
+            candidates_per_retriever: IDs requested from each retriever
+            timeout: Seconds to wait for retrievers; late ones are left out
+                of this search
+            vector_min_words: Minimum query words before vector search runs
+            cache_size: Number of cached queries
+            max_workers: Retriever threads
+        """
+        self.db = db_service
+        self.rag = rag_service
+        self.phonetic = PhoneticIndex(db_service)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.candidates_per_retriever = candidates_per_retriever
+        self.timeout = timeout
+        self.vector_min_words = vector_min_words
+        self.cache_size = cache_size
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid-search")
+        self._cache: "OrderedDict[Tuple[str, int], List[Tuple[int, float, Dict[str, int]]]]" = OrderedDict()
+        self._cache_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # ============== RETRIEVERS ==============
+
+    def _retrieve_exact(self, query: str, limit: int) -> List[int]:
+        return self.db.find_patient_ids_by_identifier(query, limit=limit)
+
+    def _retrieve_fts(self, query: str, limit: int) -> List[int]:
+        return self.db.fts_search_patient_ids(query, limit=limit)
+
+    def _retrieve_clinical(self, query: str, limit: int) -> List[int]:
+        hits = self.db.fts_search_clinical(query, limit=limit * 2)
+        return list(dict.fromkeys(hit["patient_id"] for hit in hits))[:limit]
+
+    def _retrieve_phonetic(self, query: str, limit: int) -> List[int]:
+        return [patient_id for patient_id, _, _ in self.phonetic.search(query, limit=limit)]
+
+    def _retrieve_vector(self, query: str, limit: int) -> List[int]:
+        return [patient_id for patient_id, _, _ in self.rag.search_patients(query, n_results=limit)]
+
+    def _retrievers(self, query: str) -> Dict[str, Callable[[str, int], List[int]]]:
+        """Retrievers that apply to this query."""
+        retrievers = {
+            "exact": self._retrieve_exact,
+            "fts": self._retrieve_fts,
+            "clinical": self._retrieve_clinical,
+            "phonetic": self._retrieve_phonetic,
+        }
+        if self.rag is not None and len(query.split()) >= self.vector_min_words:
+            retrievers["vector"] = self._retrieve_vector
+        return retrievers
+
+    # ============== SEARCH ==============
+
+    def search(self, query: str, limit: int = 20) -> List[HybridSearchResult]:
+        """Search patients with all retrievers and fuse the rankings.
+
+        Args:
+            query: Name, UHID, phone number or natural-language description
+            limit: Maximum results
+
+        Returns:
+            HybridSearchResult list, best first
+        """
+        key = " ".join((query or "").lower().split())
+        if not key:
+            return []
+
+        self._check_data_version()
+        with self._lock:
+            fused = self._cache.get((key, limit))
+            if fused is not None:
+                self._cache.move_to_end((key, limit))
+
+        if fused is None:
+            fused, complete = self._fuse(key, limit)
+            # Results missing a timed-out retriever are not worth keeping
+            if complete:
+                with self._lock:
+                    self._cache[(key, limit)] = fused
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+        patients = self.db.get_patients_by_ids(patient_id for patient_id, _, _ in fused)
+        return [
+            HybridSearchResult(patient=patients[patient_id], score=score, ranks=ranks)
+            for patient_id, score, ranks in fused
+            if patient_id in patients
+        ]
+
+    def search_as_you_type(self, query: str, limit: int = 20) -> List[Patient]:
+        """Patients for the current search-box text (cached per prefix)."""
+        return [result.patient for result in self.search(query, limit=limit)]
+
+    def _fuse(self, query: str, limit: int) -> Tuple[List[Tuple[int, float, Dict[str, int]]], bool]:
+        """Run the retrievers concurrently and fuse whatever finishes in time.
+
+        Returns:
+            (fused rankings, whether every retriever finished)
+        """
+        start = time.perf_counter()
+        futures = {
+            self._executor.submit(retriever, query, self.candidates_per_retriever): name
+            for name, retriever in self._retrievers(query).items()
+        }
+        done, not_done = wait(futures, timeout=self.timeout)
+
+        rankings: Dict[str, List[int]] = {}
+        for future in done:
+            name = futures[future]
+            try:
+                rankings[name] = future.result()
+            except Exception as e:
+                logger.warning(f"Hybrid search retriever '{name}' failed: {e}")
+        if not_done:
+            logger.debug(f"Hybrid search skipped slow retrievers: {sorted(futures[f] for f in not_done)}")
+
+        fused = reciprocal_rank_fusion(rankings, self.weights)[:limit]
+        logger.debug(
+            f"Hybrid search '{query}': {len(fused)} results in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return fused, not not_done
+
+    def _check_data_version(self):
+        """Drop cached results when the database has changed."""
+        version = self.db.get_data_version()
+        with self._lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+
+    def clear_cache(self):
+        """Forget all cached results."""
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """Stop the retriever threads."""
+        self._executor.shutdown(wait=False)
@@ -6,18 +6,53 @@ Key improvements from original:
 3. Implements fallback ladder if preferred model unavailable
 4. Adds context length limits to prevent OOM
 5. Supports model override via environment variable
+6. Streams tokens as they are generated, with cooperative cancellation
+7. Caches answers per patient data version (see llm_cache)
 """
 
+import asyncio
 import json
+import logging
 import os
 import gc
+import threading
+import time
 import requests
 import psutil
-from typing import Optional, Tuple, List
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple, List
 from pathlib import Path
 from datetime import datetime
 
 from ..models.schemas import Prescription
+from .llm_cache import LLMResponseCache, response_cache_key
+from .llm_scheduler import LLMPriority, LLMScheduler
+from .token_budget import estimate_tokens, fit_context
+from .metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Raised by streaming generation when Ollama cannot produce an answer."""
+
+
+class CancellationToken:
+    """Cooperative cancellation flag shared between a UI and a generation.
+
+    The generating thread checks the token between tokens; cancelling
+    closes the HTTP stream, which makes Ollama stop generating.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Request that the generation stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
 
 
 class LLMService:
@@ -47,13 +82,28 @@ class LLMService:
     # Minimum RAM reserve (don't use if less than this available)
     MIN_RAM_RESERVE_GB = 1.0
 
-    def __init__(self, base_url: Optional[str] = None, model_override: Optional[str] = None):
+    # Share of num_ctx kept free for the answer
+    RESPONSE_RESERVE_FRACTION = 0.25
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        model_override: Optional[str] = None,
+        response_cache_size: int = 512,
+        response_cache_path: Optional[str] = None,
+        max_concurrency: Optional[int] = None
+    ):
         """
         Initialize LLM service.
 
         Args:
             base_url: Ollama API URL (default: http://localhost:11434)
             model_override: Force specific model (ignores RAM-based selection)
+            response_cache_size: Cached answers (0 disables the response cache)
+            response_cache_path: SQLite file for cached answers
+                (default: DOCASSIST_LLM_CACHE_PATH or data/llm_cache.db)
+            max_concurrency: Generations sent to Ollama at once
+                (default: DOCASSIST_LLM_MAX_CONCURRENCY or 1)
         """
         if base_url is None:
             base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -63,9 +113,27 @@ class LLMService:
         self.model_override = model_override or os.getenv("EMR_LLM_MODEL")
         self.model, self.context_length = self._select_model()
 
-        # Track model load status
+        # Track model load status (kept current by generations and
+        # load_model/unload_model; acted on by ModelResidencyManager)
         self._model_loaded = False
         self._last_used = None
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+        # Ollama keep_alive sent with every request (None = Ollama default)
+        self.keep_alive: Optional[object] = None
+
+        self.response_cache: Optional[LLMResponseCache] = None
+        if response_cache_size > 0:
+            self.response_cache = LLMResponseCache(
+                max_entries=response_cache_size,
+                path=response_cache_path or os.getenv("DOCASSIST_LLM_CACHE_PATH", "data/llm_cache.db")
+            )
+
+        # Every generation waits here for a slot, interactive requests first
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("DOCASSIST_LLM_MAX_CONCURRENCY", "1"))
+        self.scheduler = LLMScheduler(max_workers=max_concurrency)
 
         self._load_prompts()
 
@@ -122,6 +190,22 @@ class LLMService:
         else:
             return self.context_length
 
+    def prompt_token_budget(self) -> int:
+        """Tokens available for the prompt under the current context length."""
+        context_len = self._get_conservative_context_length()
+        return context_len - int(context_len * self.RESPONSE_RESERVE_FRACTION)
+
+    def context_token_budget(self, prompt_without_context: str) -> int:
+        """Tokens left for retrieved context once the rest of the prompt is counted.
+
+        Args:
+            prompt_without_context: The full prompt with the context left empty
+
+        Returns:
+            Budget for ContextBuilder.build_context(max_tokens=...) or fit_context
+        """
+        return max(0, self.prompt_token_budget() - estimate_tokens(prompt_without_context))
+
     def _load_prompts(self):
         """Load prompt templates from prompts/*.txt files."""
         prompts_dir = Path(__file__).parent.parent.parent / "prompts"
@@ -239,26 +323,14 @@ ANSWER:"""
         except requests.RequestException as e:
             return False, f"Error checking/pulling model: {str(e)}"
 
-    def generate(
-        self,
-        prompt: str,
-        json_mode: bool = False,
-        timeout: int = 120,
-        max_tokens: Optional[int] = None
-    ) -> Tuple[bool, str]:
-        """Generate response from LLM with memory-aware settings.
-
-        Args:
-            prompt: The prompt to send
-            json_mode: If True, expect JSON output
-            timeout: Request timeout in seconds
-            max_tokens: Maximum tokens to generate (default: auto based on RAM)
+    def _check_ready(self) -> Optional[str]:
+        """Check Ollama is running and enough RAM is free.
 
         Returns:
-            (success, response_or_error)
+            Error message, or None if generation can proceed
         """
         if not self.is_available():
-            return False, "Ollama is not running. Please start Ollama."
+            return "Ollama is not running. Please start Ollama."
 
         # Check RAM before generation
         available_ram = self._get_available_ram_gb()
@@ -267,32 +339,89 @@ ANSWER:"""
             gc.collect()
             available_ram = self._get_available_ram_gb()
             if available_ram < self.MIN_RAM_RESERVE_GB:
-                return False, f"Insufficient RAM ({available_ram:.1f}GB). Close other applications."
+                return f"Insufficient RAM ({available_ram:.1f}GB). Close other applications."
+        return None
 
+    def _build_payload(
+        self,
+        prompt: str,
+        json_mode: bool,
+        max_tokens: Optional[int],
+        stream: bool
+    ) -> Tuple[str, dict]:
+        """Build the /api/generate payload with memory-aware settings.
+
+        Returns:
+            (possibly truncated prompt, payload)
+        """
         # Get conservative context length based on current RAM
         context_len = self._get_conservative_context_length()
 
-        # Truncate prompt if too long (rough estimate: 4 chars per token)
-        max_prompt_chars = context_len * 3  # Leave room for response
-        if len(prompt) > max_prompt_chars:
-            prompt = prompt[:max_prompt_chars] + "\n[TRUNCATED - Context too long]"
-            print(f"Warning: Prompt truncated to {max_prompt_chars} chars")
-
-        try:
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "num_ctx": context_len,
-                    "num_predict": max_tokens or 1024,
-                }
+        # Last resort for prompts nobody packed: keep the head within budget.
+        # Callers with retrieved context should fit it first (see
+        # context_token_budget) so the question is never cut off.
+        budget = self.prompt_token_budget()
+        prompt_tokens = estimate_tokens(prompt)
+        if prompt_tokens > budget:
+            keep_chars = int(len(prompt) * budget / prompt_tokens)
+            prompt = prompt[:keep_chars] + "\n[TRUNCATED - Context too long]"
+            logger.warning(f"Prompt of ~{prompt_tokens} tokens truncated to ~{budget} (num_ctx {context_len})")
+
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "num_ctx": context_len,
+                "num_predict": max_tokens or 1024,
             }
-            if json_mode:
-                payload["format"] = "json"
+        }
+        if json_mode:
+            payload["format"] = "json"
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
 
-            self._last_used = datetime.now()
+        self._last_used = datetime.now()
+        return prompt, payload
+
+    def generate(
+        self,
+        prompt: str,
+        json_mode: bool = False,
+        timeout: int = 120,
+        max_tokens: Optional[int] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> Tuple[bool, str]:
+        """Generate response from LLM with memory-aware settings.
+
+        Waits for a scheduler slot; an identical request already queued or
+        running is shared rather than generated twice.
+
+        Args:
+            prompt: The prompt to send
+            json_mode: If True, expect JSON output
+            timeout: Request timeout in seconds
+            max_tokens: Maximum tokens to generate (default: auto based on RAM)
+            priority: INTERACTIVE for the doctor, BACKGROUND for batch work
 
+        Returns:
+            (success, response_or_error)
+        """
+        error = self._check_ready()
+        if error:
+            return False, error
+
+        prompt, payload = self._build_payload(prompt, json_mode, max_tokens, stream=False)
+        return self.scheduler.run(
+            lambda: self._post_generate(prompt, payload, json_mode, timeout),
+            priority=priority,
+            key=json.dumps(payload, sort_keys=True)
+        )
+
+    def _post_generate(self, prompt: str, payload: dict, json_mode: bool, timeout: int) -> Tuple[bool, str]:
+        """Send a non-streaming generation request (caller holds a scheduler slot)."""
+        self._begin_request()
+        try:
             response = requests.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
@@ -301,6 +430,7 @@ ANSWER:"""
 
             if response.status_code == 200:
                 result = response.json()
+                self._mark_loaded(result)
                 return True, result.get("response", "")
 
             # Handle specific error codes
@@ -318,6 +448,350 @@ ANSWER:"""
             return False, "Request timed out. The model may be too large for your system."
         except requests.RequestException as e:
             return False, f"Request failed: {str(e)}"
+        finally:
+            self._end_request()
+
+    def generate_stream(
+        self,
+        prompt: str,
+        json_mode: bool = False,
+        timeout: int = 120,
+        max_tokens: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> Iterator[str]:
+        """Stream a response from the LLM token by token.
+
+        Uses Ollama's NDJSON streaming, so the first token arrives as soon
+        as the model produces it instead of after the whole answer. Records
+        llm.time_to_first_token, llm.generation and llm.tokens_per_second.
+
+        Args:
+            prompt: The prompt to send
+            json_mode: If True, expect JSON output
+            timeout: Seconds to wait for the connection and for each token
+            max_tokens: Maximum tokens to generate (default: auto based on RAM)
+            cancel_token: Stops the stream (and Ollama) when cancelled
+            priority: INTERACTIVE for the doctor, BACKGROUND for batch work
+
+        Yields:
+            Response text fragments in order
+
+        Raises:
+            LLMError: If Ollama is unavailable or generation fails
+        """
+        error = self._check_ready()
+        if error:
+            raise LLMError(error)
+        if cancel_token is not None and cancel_token.cancelled:
+            return
+
+        prompt, payload = self._build_payload(prompt, json_mode, max_tokens, stream=True)
+
+        with self.scheduler.slot(priority):
+            if cancel_token is not None and cancel_token.cancelled:
+                return  # Cancelled while queued
+            yield from self._stream_response(prompt, payload, json_mode, timeout, cancel_token)
+
+    def _stream_response(
+        self,
+        prompt: str,
+        payload: dict,
+        json_mode: bool,
+        timeout: int,
+        cancel_token: Optional[CancellationToken]
+    ) -> Iterator[str]:
+        """Send a streaming generation request (caller holds a scheduler slot)."""
+        start = time.perf_counter()
+        self._begin_request()
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=timeout,
+                stream=True
+            )
+        except requests.Timeout:
+            self._end_request()
+            raise LLMError("Request timed out. The model may be too large for your system.")
+        except requests.RequestException as e:
+            self._end_request()
+            raise LLMError(f"Request failed: {str(e)}")
+
+        first_token_at = None
+        token_count = 0
+        final = {}
+        cancelled = False
+        try:
+            if response.status_code != 200:
+                error_text = response.text.lower()
+                if response.status_code == 500 and ("out of memory" in error_text or "oom" in error_text):
+                    raise LLMError("Out of memory. Try closing other applications or using a smaller model.")
+                if response.status_code == 500 and "model not found" in error_text:
+                    # Fallback models answer in one piece
+                    success, text = self._generate_with_fallback(prompt, json_mode, timeout)
+                    if not success:
+                        raise LLMError(text)
+                    yield text
+                    return
+                raise LLMError(f"API error: {response.status_code} - {response.text[:200]}")
+
+            for line in response.iter_lines():
+                if cancel_token is not None and cancel_token.cancelled:
+                    cancelled = True
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise LLMError(f"API error: {chunk['error']}")
+                token = chunk.get("response", "")
+                if token:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        self._record_metric("timing", "llm.time_to_first_token", (first_token_at - start) * 1000)
+                    token_count += 1
+                    yield token
+                if chunk.get("done"):
+                    final = chunk
+                    self._mark_loaded(final)
+                    break
+            if not final and not (cancel_token is not None and cancel_token.cancelled):
+                # Connection dropped mid-answer; the text so far is incomplete
+                raise LLMError("Stream ended before the model finished. The answer is incomplete.")
+        except requests.Timeout:
+            raise LLMError("Request timed out. The model may be too large for your system.")
+        except requests.RequestException as e:
+            raise LLMError(f"Request failed: {str(e)}")
+        except GeneratorExit:
+            # Consumer stopped reading; treat like a cancellation
+            cancelled = True
+            raise
+        finally:
+            response.close()
+            self._end_request()
+            if first_token_at is not None:
+                self._record_stream_metrics(start, first_token_at, token_count, final, cancelled)
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        json_mode: bool = False,
+        timeout: int = 120,
+        max_tokens: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Async iterator over generate_stream for asyncio callers.
+
+        The blocking HTTP stream is read on the default executor. Closing
+        the iterator or cancelling the awaiting task also cancels the
+        generation.
+        """
+        cancel_token = cancel_token or CancellationToken()
+        stream = self.generate_stream(
+            prompt, json_mode=json_mode, timeout=timeout,
+            max_tokens=max_tokens, cancel_token=cancel_token, priority=priority
+        )
+        loop = asyncio.get_running_loop()
+        done = object()
+        try:
+            while True:
+                token = await loop.run_in_executor(None, next, stream, done)
+                if token is done:
+                    break
+                yield token
+        finally:
+            cancel_token.cancel()
+            try:
+                stream.close()
+            except ValueError:
+                pass  # Still running in the executor; it stops at the next token
+
+    def _begin_request(self):
+        with self._in_flight_lock:
+            self._in_flight += 1
+
+    def _end_request(self):
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    @property
+    def busy(self) -> bool:
+        """Whether a generation is in progress."""
+        return self._in_flight > 0
+
+    def _mark_loaded(self, result: dict):
+        """Note that the model is resident after a completed request.
+
+        Ollama reports load_duration (ns); when the model was not loaded
+        before, that is the cold-start cost this request paid.
+        """
+        was_loaded = self._model_loaded
+        self._model_loaded = True
+        self._last_used = datetime.now()
+        load_ns = result.get("load_duration") or 0
+        if not was_loaded and load_ns:
+            self._record_metric("timing", "llm.cold_start", load_ns / 1e6)
+
+    def load_model(self, keep_alive: Optional[object] = None, timeout: int = 300) -> bool:
+        """Load the model into memory without generating anything.
+
+        On an already loaded model this only updates its keep_alive.
+
+        Args:
+            keep_alive: Ollama keep_alive for the loaded model (e.g. -1 to
+                pin it, "10m"); default: self.keep_alive
+            timeout: Seconds to wait for the load
+
+        Returns:
+            True if the model is loaded
+        """
+        payload = {"model": self.model}
+        keep_alive = keep_alive if keep_alive is not None else self.keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+
+        was_loaded = self._model_loaded
+        start = time.perf_counter()
+        try:
+            response = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+        except requests.RequestException as e:
+            logger.warning(f"Could not load model {self.model}: {e}")
+            return False
+        if response.status_code != 200:
+            logger.warning(f"Could not load model {self.model}: {response.status_code} - {response.text[:200]}")
+            return False
+
+        if not was_loaded:
+            self._record_metric("timing", "llm.model_load", (time.perf_counter() - start) * 1000)
+        self._mark_loaded(response.json())
+        return True
+
+    def _record_stream_metrics(
+        self,
+        start: float,
+        first_token_at: float,
+        token_count: int,
+        final: dict,
+        cancelled: bool
+    ):
+        """Record total latency and throughput of a streamed generation."""
+        end = time.perf_counter()
+        self._record_metric(
+            "timing", "llm.generation", (end - start) * 1000, cancelled=str(cancelled).lower()
+        )
+
+        # Prefer Ollama's own counters (nanoseconds); fall back to wall clock
+        if final.get("eval_count") and final.get("eval_duration"):
+            tokens_per_second = final["eval_count"] / (final["eval_duration"] / 1e9)
+        elif end > first_token_at:
+            tokens_per_second = token_count / (end - first_token_at)
+        else:
+            return
+        self._record_metric("gauge", "llm.tokens_per_second", tokens_per_second)
+
+    def _record_metric(self, kind: str, name: str, value: float, **tags):
+        """Send a timing or gauge to the metrics collector when monitoring is running."""
+        collector = get_metrics_collector()
+        if collector is None:
+            return
+        tags = {"model": self.model, **tags}
+        if kind == "timing":
+            collector.record_timing(name, value, tags=tags)
+        else:
+            collector.record_gauge(name, value, tags=tags)
+
+    def _complete(
+        self,
+        prompt: str,
+        json_mode: bool,
+        on_token: Optional[Callable[[str], None]],
+        cancel_token: Optional[CancellationToken],
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> Tuple[bool, str]:
+        """Generate a full response, streaming it when a token callback or cancel token is given."""
+        if on_token is None and cancel_token is None:
+            return self.generate(prompt, json_mode=json_mode, priority=priority)
+
+        parts = []
+        try:
+            stream = self.generate_stream(prompt, json_mode=json_mode, cancel_token=cancel_token, priority=priority)
+            for token in stream:
+                parts.append(token)
+                if on_token is not None:
+                    on_token(token)
+        except LLMError as e:
+            return False, str(e)
+
+        if cancel_token is not None and cancel_token.cancelled:
+            return False, "Generation cancelled."
+        return True, "".join(parts)
+
+    def _cached(
+        self,
+        flow: str,
+        template: str,
+        question: str,
+        data_version: Optional[str],
+        produce: Callable[[], Tuple[bool, str]],
+        on_token: Optional[Callable[[str], None]] = None,
+        normalize: bool = True
+    ) -> Tuple[bool, str]:
+        """Serve a response from the cache, or produce and cache it.
+
+        Nothing is cached when data_version is None or the cache is disabled.
+        A hit is delivered to on_token in one piece. normalize=False keys on
+        the exact question text.
+        """
+        if self.response_cache is None or data_version is None:
+            return produce()
+
+        key = response_cache_key(self.model, template, question, data_version, normalize=normalize)
+        cached = self.response_cache.get(key, flow=flow)
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return True, cached
+
+        success, response = produce()
+        if success:
+            self.response_cache.put(key, response)
+        return success, response
+
+    def generate_cached(
+        self,
+        prompt: str,
+        json_mode: bool = False,
+        flow: str = "generate",
+        data_version: str = "",
+        use_cache: bool = True,
+        priority: LLMPriority = LLMPriority.INTERACTIVE
+    ) -> Tuple[bool, str]:
+        """generate() with the response cache, for prompts that fully determine the answer.
+
+        The key is the exact prompt: prompts differing only in case (drug
+        names, doses) are cached separately.
+
+        Args:
+            prompt: The prompt to send
+            json_mode: If True, expect JSON output
+            flow: Name of the calling flow (metrics tag)
+            data_version: Stamp of any data the prompt was built from
+            use_cache: False for flows that want a fresh sample every time
+            priority: INTERACTIVE for the doctor, BACKGROUND for batch work
+
+        Returns:
+            (success, response_or_error)
+        """
+        return self._cached(
+            flow,
+            "json" if json_mode else "text",
+            prompt,
+            data_version if use_cache else None,
+            lambda: self.generate(prompt, json_mode=json_mode, priority=priority),
+            normalize=False
+        )
 
     def _generate_with_fallback(
         self,
@@ -362,6 +836,7 @@ ANSWER:"""
 
     def unload_model(self) -> bool:
         """Attempt to unload model from memory (if supported by Ollama)."""
+        start = time.perf_counter()
         try:
             # Ollama doesn't have explicit unload, but we can try
             # to minimize memory by calling garbage collection
@@ -378,19 +853,30 @@ ANSWER:"""
                 timeout=5
             )
             self._model_loaded = False
+            self._record_metric("timing", "llm.model_unload", (time.perf_counter() - start) * 1000)
             return True
         except Exception:
             return False
 
-    def generate_prescription(self, clinical_notes: str) -> Tuple[bool, Optional[Prescription], str]:
+    def generate_prescription(
+        self,
+        clinical_notes: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[bool, Optional[Prescription], str]:
         """Generate structured prescription from clinical notes.
 
+        Args:
+            clinical_notes: Doctor's notes
+            on_token: Called with each JSON fragment as it streams in
+            cancel_token: Abandons generation when cancelled
+
         Returns:
             (success, prescription_object, raw_json_or_error)
         """
         full_prompt = self.prescription_prompt + clinical_notes
 
-        success, response = self.generate(full_prompt, json_mode=True)
+        success, response = self._complete(full_prompt, True, on_token, cancel_token)
         if not success:
             return False, None, response
 
@@ -413,18 +899,40 @@ ANSWER:"""
         except Exception as e:
             return False, None, f"Failed to parse prescription: {str(e)}"
 
-    def query_patient_records(self, context: str, question: str) -> Tuple[bool, str]:
+    def query_patient_records(
+        self,
+        context: str,
+        question: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        data_version: Optional[str] = None,
+        use_cache: bool = True
+    ) -> Tuple[bool, str]:
         """Answer a question about patient records using RAG context.
 
         Args:
             context: Retrieved documents about the patient
             question: Doctor's question
+            on_token: Called with each answer fragment as it streams in
+            cancel_token: Abandons generation when cancelled
+            data_version: DatabaseService.get_patient_data_version() of the
+                patient; when given, answers are cached until it changes
+            use_cache: False to always generate a fresh answer
 
         Returns:
             (success, answer_or_error)
         """
-        full_prompt = self.rag_prompt.format(context=context, question=question)
-        return self.generate(full_prompt, json_mode=False)
+        # Drop the least relevant records rather than the end of the prompt
+        budget = self.context_token_budget(self.rag_prompt.format(context="", question=question))
+        full_prompt = self.rag_prompt.format(context=fit_context(context, budget), question=question)
+        return self._cached(
+            "patient_query",
+            self.rag_prompt,
+            question,
+            data_version if use_cache else None,
+            lambda: self._complete(full_prompt, False, on_token, cancel_token),
+            on_token=on_token
+        )
 
     def get_model_info(self) -> dict:
         """Get detailed information about the current model and system."""
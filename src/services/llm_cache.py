@@ -0,0 +1,178 @@
+"""Persistent cache of LLM responses.
+
+CPU inference takes seconds per answer, and doctors often ask the same
+question about the same patient several times in a consultation. Responses
+are cached under a key built from the model, a hash of the prompt template,
+the normalized question and a data-version stamp (for patient questions,
+DatabaseService.get_patient_data_version), so an answer is reused only
+while the records it was generated from are unchanged.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .embeddings import normalize_query
+from .metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+
+def template_version(template: str) -> str:
+    """Short hash identifying a prompt template, so edited prompts miss the cache."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+
+def response_cache_key(
+    model: str,
+    template: str,
+    question: str,
+    data_version: str = "",
+    normalize: bool = True
+) -> str:
+    """Cache key for a generation.
+
+    Args:
+        model: Ollama model name
+        template: Prompt template (hashed)
+        question: Question or input text
+        data_version: Stamp of the data the answer depends on
+        normalize: Fold case and whitespace in the question, for free-text
+            questions; False keys on the exact text (e.g. a transcript in
+            which "5mg" and "5MG" or drug name casing may matter)
+    """
+    text = normalize_query(question) if normalize else question
+    parts = (model, template_version(template), text, data_version)
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """LRU cache of LLM responses, optionally persisted in SQLite.
+
+    The SQLite file is opened on first use, so services that never cache
+    anything do not create it. Hits and misses are counted here and sent to
+    the MetricsCollector as llm.cache_hit / llm.cache_miss, tagged by flow.
+    """
+
+    def __init__(self, max_entries: int = 512, path: Optional[str] = None):
+        """Initialize cache.
+
+        Args:
+            max_entries: In-memory (and on-disk) entry limit
+            path: SQLite file for persistence (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._opened = False
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open the backing database and warm the LRU (caller holds the lock)."""
+        if self._opened or not self.path:
+            return self._conn
+        self._opened = True
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            rows = self._conn.execute(
+                "SELECT key, response FROM llm_responses ORDER BY last_used DESC LIMIT ?",
+                (self.max_entries,)
+            ).fetchall()
+            for key, response in reversed(rows):
+                self._entries[key] = response
+
+            # Drop entries that fell off the end of the LRU
+            self._conn.execute(
+                """
+                DELETE FROM llm_responses WHERE key NOT IN (
+                    SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT ?
+                )
+                """,
+                (self.max_entries,)
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache at {self.path} unavailable, using memory only: {e}")
+            self._conn = None
+        return self._conn
+
+    def _record(self, result: str, flow: str):
+        collector = get_metrics_collector()
+        if collector is not None:
+            collector.record_count(f"llm.cache_{result}", tags={"flow": flow})
+
+    def get(self, key: str, flow: str = "generate") -> Optional[str]:
+        """Cached response for a key, or None."""
+        with self._lock:
+            conn = self._connection()
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if conn is not None:
+                    try:
+                        conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                        conn.commit()
+                    except sqlite3.Error as e:
+                        logger.warning(f"Could not update LLM cache entry: {e}")
+        self._record("hit" if response is not None else "miss", flow)
+        return response
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting the least recently used entry if full."""
+        with self._lock:
+            conn = self._connection()
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+
+            if conn is not None:
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?)",
+                        (key, response, time.time())
+                    )
+                    conn.executemany("DELETE FROM llm_responses WHERE key = ?", [(k,) for k in evicted])
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not persist LLM response: {e}")
+
+    def clear(self):
+        """Drop all cached responses."""
+        with self._lock:
+            conn = self._connection()
+            self._entries.clear()
+            if conn is not None:
+                conn.execute("DELETE FROM llm_responses")
+                conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        """Close the backing database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
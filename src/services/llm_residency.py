@@ -0,0 +1,244 @@
+"""Keeps the Ollama model resident while it is needed, and only then.
+
+Loading a model from disk costs 10-30 s on clinic hardware, and Ollama's
+default keep_alive unloads it after five minutes, so the first prescription
+of the day (or after a break) pays that cold start. ModelResidencyManager:
+
+- warms the model in the background when the app starts
+- pins it (keep_alive -1) while a consultation is active
+- unloads it once it has been idle for a configurable period, or straight
+  away when free RAM drops below LLMService.MIN_RAM_RESERVE_GB
+
+Unloads never interrupt a generation in progress. Load, unload and
+cold-start timings are reported by LLMService as llm.model_load,
+llm.model_unload and llm.cold_start.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Workflow states during which the model stays pinned
+ACTIVE_STATES = ("consultation_active", "listening", "prescribing", "reviewing", "saving")
+
+
+def _idle_unload_seconds_from_env() -> float:
+    minutes = os.getenv("DOCASSIST_LLM_IDLE_UNLOAD_MINUTES", "15")
+    try:
+        return float(minutes) * 60
+    except ValueError:
+        logger.warning(f"Invalid DOCASSIST_LLM_IDLE_UNLOAD_MINUTES={minutes!r}, using 15")
+        return 15 * 60.0
+
+
+class ModelResidencyManager:
+    """Loads, pins and unloads the LLMService model.
+
+    Features:
+    - Background warm-up at startup
+    - Pinning driven by WorkflowEngine states or consultation events
+    - Idle and low-RAM unloading, checked on a fixed interval
+    """
+
+    def __init__(
+        self,
+        llm_service,
+        idle_unload_seconds: Optional[float] = None,
+        check_interval: float = 30.0,
+        warm_up_on_start: bool = True
+    ):
+        """Initialize manager.
+
+        Args:
+            llm_service: LLMService whose model is managed
+            idle_unload_seconds: Unload after this long without use
+                (default: DOCASSIST_LLM_IDLE_UNLOAD_MINUTES, 15 min; 0 = never)
+            check_interval: Seconds between residency checks
+            warm_up_on_start: Load the model as soon as start() is called
+        """
+        self.llm = llm_service
+        self.idle_unload_seconds = (
+            idle_unload_seconds if idle_unload_seconds is not None else _idle_unload_seconds_from_env()
+        )
+        self.check_interval = check_interval
+        self.warm_up_on_start = warm_up_on_start
+
+        self._pinned = False
+        self._keep_alive_pending = False
+        self._started_at = datetime.now()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._lock = threading.Lock()
+
+        self.llm.keep_alive = self._idle_keep_alive()
+
+    def _idle_keep_alive(self):
+        """keep_alive for an unpinned model: Ollama unloads it when we would."""
+        if self.idle_unload_seconds <= 0:
+            return -1
+        return f"{int(self.idle_unload_seconds)}s"
+
+    @property
+    def pinned(self) -> bool:
+        return self._pinned
+
+    def _ram_low(self) -> bool:
+        return self.llm._get_available_ram_gb() < self.llm.MIN_RAM_RESERVE_GB
+
+    def idle_seconds(self) -> float:
+        """Seconds since the model was last used (or since startup)."""
+        last_used = self.llm._last_used or self._started_at
+        return (datetime.now() - last_used).total_seconds()
+
+    def warm_up(self) -> bool:
+        """Load the model now, unless Ollama is down or RAM is short.
+
+        Returns:
+            True if the model is loaded
+        """
+        if self.llm._model_loaded:
+            return True
+        if self._ram_low():
+            logger.info("Skipping model warm-up: available RAM below reserve")
+            return False
+        if not self.llm.is_available():
+            return False
+        keep_alive = -1 if self._pinned else self.llm.keep_alive
+        loaded = self.llm.load_model(keep_alive=keep_alive)
+        if loaded:
+            logger.info(f"Model {self.llm.model} warmed up")
+        return loaded
+
+    def _apply_keep_alive(self):
+        """Send the current keep_alive to an already loaded model.
+
+        Ollama keeps whatever keep_alive the model's last request carried,
+        so pinning a warm model must tell Ollama again. Runs on the
+        residency thread, outside the lock, once no generation is running
+        (its request would overwrite the value when it ends).
+        """
+        with self._lock:
+            if not self.llm._model_loaded:
+                self._keep_alive_pending = False  # The next load sends it
+                return
+            keep_alive = self.llm.keep_alive
+            self._keep_alive_pending = False
+        if not self.llm.load_model(keep_alive=keep_alive):
+            with self._lock:
+                self._keep_alive_pending = True
+
+    def pin(self):
+        """Keep the model loaded until unpin(); loads it in the background."""
+        with self._lock:
+            self._pinned = True
+            self.llm.keep_alive = -1
+            self._keep_alive_pending = True
+        self._wake_event.set()
+
+    def unpin(self):
+        """Let the model unload once idle again."""
+        with self._lock:
+            self._pinned = False
+            self.llm.keep_alive = self._idle_keep_alive()
+            self._keep_alive_pending = True
+        self._wake_event.set()
+
+    def check(self) -> Optional[str]:
+        """Apply the residency policy once.
+
+        Returns:
+            "loaded" or "unloaded" if the model was loaded or unloaded,
+            otherwise None
+        """
+        if self.llm.busy:
+            return None
+        if not self.llm._model_loaded:
+            with self._lock:
+                self._keep_alive_pending = False  # The load sends it
+            return "loaded" if self._pinned and self.warm_up() else None
+
+        reason = None
+        if self._ram_low():
+            reason = "available RAM below reserve"
+        elif (not self._pinned and self.idle_unload_seconds > 0
+              and self.idle_seconds() >= self.idle_unload_seconds):
+            reason = f"idle for {self.idle_seconds() / 60:.0f} min"
+
+        if reason and self.llm.unload_model():
+            logger.info(f"Unloaded model {self.llm.model}: {reason}")
+            return "unloaded"
+        if self._keep_alive_pending:
+            self._apply_keep_alive()
+        return None
+
+    def attach_workflow(self, workflow):
+        """Pin during WorkflowEngine consultation states, unpin on leaving them."""
+        from .integration.workflow_engine import WorkflowState
+
+        for state in WorkflowState:
+            if state.value in ACTIVE_STATES:
+                workflow.on_state_entry(state, lambda _state: self.pin())
+            else:
+                workflow.on_state_entry(state, lambda _state: self.unpin())
+
+    def attach_event_bus(self, event_bus):
+        """Pin between CONSULTATION_STARTED and COMPLETED/CANCELLED events."""
+        from .integration.event_bus import EventType
+
+        event_bus.subscribe(EventType.CONSULTATION_STARTED, self._on_consultation_started)
+        event_bus.subscribe(EventType.CONSULTATION_COMPLETED, self._on_consultation_ended)
+        event_bus.subscribe(EventType.CONSULTATION_CANCELLED, self._on_consultation_ended)
+
+    def _on_consultation_started(self, event):
+        self.pin()
+
+    def _on_consultation_ended(self, event):
+        self.unpin()
+
+    def start(self):
+        """Start the residency thread (warms up first if configured)."""
+        if self._running:
+            logger.warning("Model residency manager already running")
+            return
+
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._residency_loop, daemon=True, name="ModelResidency")
+        self._thread.start()
+        logger.info(f"Model residency manager started (idle unload: {self.idle_unload_seconds:.0f}s)")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the residency thread. The model is left to Ollama's keep_alive."""
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("Model residency manager stopped")
+
+    def _residency_loop(self):
+        if self.warm_up_on_start:
+            try:
+                self.warm_up()
+            except Exception as e:
+                logger.error(f"Model warm-up failed: {e}", exc_info=True)
+
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.check_interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Model residency check failed: {e}", exc_info=True)
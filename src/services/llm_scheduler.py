@@ -0,0 +1,221 @@
+"""Priority scheduling and concurrency limiting for LLM requests.
+
+A CPU-bound Ollama instance serves one generation well and several badly:
+concurrent requests share the cores and the model's RAM, so every one of
+them slows down. All LLMService generations therefore pass through an
+LLMScheduler, which:
+
+- runs at most ``max_workers`` generations at a time
+- hands a free slot to interactive (doctor-facing) requests before any
+  queued background work (summaries, WhatsApp triage, note enhancement)
+- keeps a slot free for interactive requests when ``max_workers`` > 1
+- coalesces identical prompts, so a duplicate waits for the generation
+  already in flight instead of queueing its own
+- reports llm.queue_depth (gauge) and llm.queue_wait (timing), tagged by
+  priority, and llm.coalesced (count)
+
+Generations already running are never interrupted: Ollama cannot pause a
+generation, and abandoning one throws away the CPU time it has used.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, TypeVar
+
+from .metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMPriority(IntEnum):
+    """Scheduling class of an LLM request (lower runs first)."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    @property
+    def tag(self) -> str:
+        return self.name.lower()
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "enqueued_at")
+
+    def __init__(self, priority: LLMPriority, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+
+    def order(self):
+        return (self.priority, self.seq)
+
+
+class LLMScheduler:
+    """Bounded, priority-ordered gate in front of the LLM."""
+
+    def __init__(self, max_workers: int = 1, background_workers: Optional[int] = None):
+        """Initialize scheduler.
+
+        Args:
+            max_workers: Generations allowed to run at once
+            background_workers: Of those, how many background requests may
+                hold (default: max_workers - 1, at least 1)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.background_workers = (
+            background_workers if background_workers is not None else max(1, max_workers - 1)
+        )
+
+        self._condition = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting: List[_Waiter] = []
+        self._running = {priority: 0 for priority in LLMPriority}
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._leaders: Dict[Hashable, _Waiter] = {}
+
+    @property
+    def running(self) -> int:
+        """Generations currently holding a slot."""
+        return sum(self._running.values())
+
+    def queue_depth(self, priority: Optional[LLMPriority] = None) -> int:
+        """Requests waiting for a slot (optionally of one priority)."""
+        with self._condition:
+            return sum(1 for w in self._waiting if priority is None or w.priority == priority)
+
+    def _record(self, kind: str, name: str, value: float, priority: LLMPriority):
+        collector = get_metrics_collector()
+        if collector is None:
+            return
+        tags = {"priority": priority.tag}
+        if kind == "timing":
+            collector.record_timing(name, value, tags=tags)
+        elif kind == "count":
+            collector.record_count(name, value, tags=tags)
+        else:
+            collector.record_gauge(name, value, tags=tags)
+
+    def _can_start(self, waiter: _Waiter) -> bool:
+        """Whether waiter may take a slot now (caller holds the condition)."""
+        if self.running >= self.max_workers:
+            return False
+        if (waiter.priority == LLMPriority.BACKGROUND
+                and self._running[LLMPriority.BACKGROUND] >= self.background_workers):
+            return False
+        # Only the first eligible waiter in priority order starts
+        for other in self._waiting:
+            if other is waiter or other.order() > waiter.order():
+                continue
+            if other.priority == LLMPriority.BACKGROUND and self._running[other.priority] >= self.background_workers:
+                continue
+            return False
+        return True
+
+    def _acquire(self, waiter: _Waiter) -> LLMPriority:
+        with self._condition:
+            self._waiting.append(waiter)
+            depth = self._depth(waiter.priority)
+        self._record("gauge", "llm.queue_depth", depth, waiter.priority)
+
+        with self._condition:
+            while not self._can_start(waiter):
+                self._condition.wait()
+            self._waiting.remove(waiter)
+            priority = waiter.priority
+            self._running[priority] += 1
+            depth = self._depth(priority)
+
+        self._record("gauge", "llm.queue_depth", depth, priority)
+        self._record("timing", "llm.queue_wait", (time.perf_counter() - waiter.enqueued_at) * 1000, priority)
+        return priority
+
+    def _release(self, priority: LLMPriority):
+        with self._condition:
+            self._running[priority] -= 1
+            self._condition.notify_all()
+
+    def _depth(self, priority: LLMPriority) -> int:
+        return sum(1 for w in self._waiting if w.priority == priority)
+
+    @contextmanager
+    def slot(self, priority: LLMPriority = LLMPriority.INTERACTIVE) -> Iterator[None]:
+        """Hold one of the worker slots for the duration of a generation."""
+        held = self._acquire(_Waiter(priority, next(self._seq)))
+        try:
+            yield
+        finally:
+            self._release(held)
+
+    def run(
+        self,
+        fn: Callable[[], T],
+        priority: LLMPriority = LLMPriority.INTERACTIVE,
+        key: Optional[Hashable] = None
+    ) -> T:
+        """Run fn in a worker slot, sharing the result of an identical request.
+
+        Args:
+            fn: The generation to run
+            priority: Scheduling class
+            key: Identity of the request; a call whose key matches one
+                already queued or running waits for that result instead.
+                A waiting interactive duplicate promotes a queued
+                background request to interactive.
+
+        Returns:
+            fn's result
+        """
+        if key is None:
+            with self.slot(priority):
+                return fn()
+
+        waiter = None
+        with self._condition:
+            future = self._in_flight.get(key)
+            if future is not None:
+                leader = self._leaders.get(key)
+                if leader is not None and priority < leader.priority:
+                    leader.priority = priority
+                    self._condition.notify_all()
+            else:
+                future = Future()
+                waiter = _Waiter(priority, next(self._seq))
+                self._in_flight[key] = future
+                self._leaders[key] = waiter
+
+        if waiter is None:
+            self._record("count", "llm.coalesced", 1, priority)
+            return future.result()
+
+        try:
+            held = self._acquire(waiter)
+        except BaseException as e:
+            future.set_exception(e)
+            with self._condition:
+                self._in_flight.pop(key, None)
+                self._leaders.pop(key, None)
+            raise
+        with self._condition:
+            # Running now; later duplicates no longer promote it
+            self._leaders.pop(key, None)
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._release(held)
+            with self._condition:
+                self._in_flight.pop(key, None)
@@ -0,0 +1,15 @@
+"""Optional access to the monitoring metrics collector.
+
+Services that report timings import ``get_metrics_collector`` from here
+rather than from ``monitoring`` directly, so they keep working when the
+monitoring extras (psutil, requests) are not installed.
+"""
+
+try:
+    from .monitoring.decorators import get_metrics_collector
+except ImportError:  # monitoring extras not installed
+    def get_metrics_collector():
+        """No collector without the monitoring extras."""
+        return None
+
+__all__ = ["get_metrics_collector"]
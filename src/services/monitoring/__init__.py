@@ -45,6 +45,7 @@ from .dashboard_data import MonitoringDashboard, DashboardData
 # Decorators
 from .decorators import (
     set_monitoring_instances,
+    get_metrics_collector,
     monitor_performance,
     capture_errors,
     alert_on_failure,
@@ -282,6 +283,7 @@ __all__ = [
 
     # Decorators
     'set_monitoring_instances',
+    'get_metrics_collector',
     'monitor_performance',
     'capture_errors',
     'alert_on_failure',
@@ -49,6 +49,11 @@ def set_monitoring_instances(
         _alerting_service = alerting_service
 
 
+def get_metrics_collector() -> Optional[MetricsCollector]:
+    """Get the global metrics collector (None until monitoring is initialized)"""
+    return _metrics_collector
+
+
 def monitor_performance(operation_name: Optional[str] = None):
     """
     Decorator to monitor function performance
@@ -7,7 +7,44 @@ Handles common transliteration variants in Hindi/Indian names:
 """
 
 import re
-from typing import List, Tuple, Optional
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def levenshtein(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Levenshtein edit distance, optionally bounded.
+
+    Args:
+        s1: First string
+        s2: Second string
+        max_distance: If given, return max_distance + 1 as soon as every
+            cell of a DP row exceeds it (the distance can only grow)
+
+    Returns:
+        Integer edit distance
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if max_distance is not None and len(s1) - len(s2) > max_distance:
+        return max_distance + 1
+    if len(s2) == 0:
+        return len(s1)
+
+    prev_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        curr_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            # Cost is 0 if characters match, 1 otherwise
+            insertions = prev_row[j + 1] + 1
+            deletions = curr_row[j] + 1
+            substitutions = prev_row[j] + (c1 != c2)
+            curr_row.append(min(insertions, deletions, substitutions))
+        if max_distance is not None and min(curr_row) > max_distance:
+            return max_distance + 1
+        prev_row = curr_row
+
+    return prev_row[-1]
 
 
 class IndianPhoneticSearch:
@@ -167,8 +204,23 @@ class IndianPhoneticSearch:
         if not query or not candidate:
             return 0.0
 
-        q_code = self.get_phonetic_code(query)
-        c_code = self.get_phonetic_code(candidate)
+        return self.match_codes(self.get_phonetic_code(query), self.get_phonetic_code(candidate))
+
+    def match_codes(self, q_code: str, c_code: str, min_score: float = 0.0) -> float:
+        """
+        Similarity score between two precomputed phonetic codes.
+
+        Args:
+            q_code: Phonetic code of the query
+            c_code: Phonetic code of the candidate
+            min_score: Scores below this may be reported as 0.0 (lets
+                clearly different lengths skip the edit-distance step)
+
+        Returns:
+            Float between 0.0 (no match) and 1.0 (perfect match)
+        """
+        if not q_code or not c_code:
+            return 0.0
 
         # Exact phonetic match
         if q_code == c_code:
@@ -196,43 +248,40 @@ class IndianPhoneticSearch:
                         return 0.75
 
         # Calculate edit distance similarity
-        distance = self._levenshtein(q_code.replace(' ', ''), c_code.replace(' ', ''))
-        max_len = max(len(q_code.replace(' ', '')), len(c_code.replace(' ', '')))
+        q_flat = q_code.replace(' ', '')
+        c_flat = c_code.replace(' ', '')
+        max_len = max(len(q_flat), len(c_flat))
 
         if max_len == 0:
             return 0.0
 
+        # Largest distance that can still reach min_score. The length
+        # difference is a lower bound on the distance, and the bounded
+        # Levenshtein stops as soon as the bound is exceeded.
+        max_distance = int(max_len * (1 - min_score / 0.7) + 1e-9)
+        if abs(len(q_flat) - len(c_flat)) > max_distance:
+            return 0.0
+
+        distance = self._levenshtein(q_flat, c_flat, max_distance)
+        if distance > max_distance:
+            return 0.0
+
         similarity = 1 - (distance / max_len)
         return max(0, similarity * 0.7)  # Scale down edit-distance matches
 
-    def _levenshtein(self, s1: str, s2: str) -> int:
+    def _levenshtein(self, s1: str, s2: str, max_distance: Optional[int] = None) -> int:
         """
         Calculate Levenshtein edit distance between two strings.
 
         Args:
             s1: First string
             s2: Second string
+            max_distance: Stop early once the distance must exceed this
 
         Returns:
-            Integer edit distance
+            Integer edit distance (max_distance + 1 if it stopped early)
         """
-        if len(s1) < len(s2):
-            return self._levenshtein(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-
-        prev_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            curr_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                # Cost is 0 if characters match, 1 otherwise
-                insertions = prev_row[j + 1] + 1
-                deletions = curr_row[j] + 1
-                substitutions = prev_row[j] + (c1 != c2)
-                curr_row.append(min(insertions, deletions, substitutions))
-            prev_row = curr_row
-
-        return prev_row[-1]
+        return levenshtein(s1, s2, max_distance)
 
     def search(
         self,
@@ -263,6 +312,156 @@ class IndianPhoneticSearch:
         return results
 
 
+class BKTree:
+    """Burkhard-Keller tree for finding strings within an edit distance.
+
+    Each child edge is labelled with its distance to the parent, so a
+    radius-r lookup only descends into edges labelled d-r..d+r.
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        # Node: (word, {distance: child node})
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self._words: Set[str] = set()
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._words
+
+    def add(self, word: str):
+        """Insert a word (duplicates are ignored)."""
+        if word in self._words:
+            return
+        self._words.add(word)
+        if self._root is None:
+            self._root = (word, {})
+            return
+
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[str, int]]:
+        """Words within ``radius`` edits of ``word``, as (word, distance) pairs."""
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= radius:
+                matches.append((node_word, distance))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+class PhoneticIndex:
+    """Phonetic patient lookup over the codes stored by DatabaseService.
+
+    The candidate bucket for a query is every patient with a code word
+    starting with one of the query's code words (exact, prefix and
+    any-word matches), every patient with a code word that is a prefix of
+    one of the query's ("Suresh" for "Sureshkumar"), plus every patient
+    whose aggressive code is within edit distance of the query's (typo
+    tolerance, found with a BK-tree over distinct codes). Only that bucket
+    is scored with ``match_codes``.
+
+    Unlike scoring every name with ``search``, a code found only in the
+    middle of a word ("RM" in "SRM", i.e. Ram in Sharma) is not a match.
+    """
+
+    def __init__(self, db_service, phonetic: Optional[IndianPhoneticSearch] = None):
+        """
+        Initialize with a database service.
+
+        Args:
+            db_service: The DatabaseService instance
+            phonetic: Encoder/scorer (default: a new IndianPhoneticSearch)
+        """
+        self.db = db_service
+        self.phonetic = phonetic or IndianPhoneticSearch()
+        self._tree = BKTree()
+        self._loaded = False
+        self._lock = threading.Lock()
+        # New codes arrive from the write path, so searches never write or rescan
+        db_service.add_phonetic_code_listener(self._add_codes)
+
+    def _add_codes(self, codes: Iterable[str]):
+        """Add codes written by DatabaseService (codes only accumulate; a
+        stale code simply matches nobody)."""
+        with self._lock:
+            for code in codes:
+                self._tree.add(code)
+
+    def _load(self):
+        """Read the stored codes into the BK-tree on first search."""
+        with self._lock:
+            if self._loaded:
+                return
+            for code in self.db.get_phonetic_codes_aggressive():
+                self._tree.add(code)
+            self._loaded = True
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        threshold: float = 0.6
+    ) -> List[Tuple[int, str, float]]:
+        """
+        Search patients by phonetic similarity of their names.
+
+        Args:
+            query: The search query
+            limit: Maximum results
+            threshold: Minimum match score to include (0.0 to 1.0)
+
+        Returns:
+            List of (patient_id, name, score) tuples, sorted by score descending
+        """
+        q_code = self.phonetic.get_phonetic_code(query)
+        if not q_code:
+            return []
+        q_flat = q_code.replace(' ', '')
+
+        self._load()
+
+        # Same bound match_codes applies: edits that can still reach threshold
+        ratio = threshold / 0.7
+        radius = int((1 - ratio) * len(q_flat) / ratio + 1e-9) if ratio > 0 else len(q_flat)
+        with self._lock:
+            similar_codes = [code for code, _ in self._tree.search(q_flat, radius)] if radius > 0 else [q_flat]
+
+        q_words = set(q_code.split())
+        candidates = self.db.find_phonetic_candidates(
+            token_prefixes=sorted(q_words),
+            aggressive_codes=similar_codes,
+            tokens=sorted({word[:end] for word in q_words for end in range(1, len(word))})
+        )
+
+        results = []
+        for patient_id, name, c_code in candidates:
+            score = self.phonetic.match_codes(q_code, c_code, min_score=threshold)
+            if score >= threshold:
+                results.append((patient_id, name, score))
+
+        results.sort(key=lambda x: (-x[2], x[1]))
+        return results[:limit]
+
+
 class MultiStrategySearch:
     """
     Combines multiple search strategies for best results:
@@ -281,6 +480,7 @@ class MultiStrategySearch:
         """
         self.db = db_service
         self.phonetic = IndianPhoneticSearch()
+        self.phonetic_index = PhoneticIndex(db_service, self.phonetic)
 
     def search_patients(
         self,
@@ -334,15 +534,15 @@ class MultiStrategySearch:
 
         # 4. Phonetic search (for remaining slots)
         if len(results) < limit:
-            all_patients = self.db.get_all_patients()
-            candidates = [(p.id, p.name) for p in all_patients if p.id not in results]
-            phonetic_matches = self.phonetic.search(query, candidates, threshold=0.6)
-
-            for id_, name, score in phonetic_matches:
-                if id_ not in results and len(results) < limit:
-                    patient = next((p for p in all_patients if p.id == id_), None)
-                    if patient:
-                        results[patient.id] = (patient, score, 'phonetic')
+            phonetic_matches = [
+                (id_, score) for id_, _, score in self.phonetic_index.search(query, limit=limit * 2)
+                if id_ not in results
+            ][:limit - len(results)]
+            patients = self.db.get_patients_by_ids(id_ for id_, _ in phonetic_matches)
+
+            for id_, score in phonetic_matches:
+                if id_ in patients:
+                    results[id_] = (patients[id_], score, 'phonetic')
 
         # Sort by score and return
         sorted_results = sorted(results.values(), key=lambda x: -x[1])
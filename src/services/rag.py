@@ -4,9 +4,13 @@ import logging
 import chromadb
 from chromadb.config import Settings
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import hashlib
 import os
+import time
+
+from .embeddings import EmbeddingProvider, QueryEmbeddingCache, create_embedding_provider
+from .metrics import get_metrics_collector
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +18,19 @@ logger = logging.getLogger(__name__)
 class RAGService:
     """Handles vector storage and retrieval for patient records."""
 
-    def __init__(self, persist_directory: Optional[str] = None):
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        query_cache_size: int = 1024
+    ):
+        """Initialize RAG service.
+
+        Args:
+            persist_directory: Chroma directory (default: DOCASSIST_CHROMA_DIR or data/chroma)
+            embedding_provider: Embedding model (default: from DOCASSIST_EMBEDDING_* settings)
+            query_cache_size: Query embeddings kept in the cache (0 disables it)
+        """
         if persist_directory is None:
             persist_directory = os.getenv("DOCASSIST_CHROMA_DIR", "data/chroma")
         self.persist_dir = Path(persist_directory)
@@ -26,46 +42,132 @@ class RAGService:
             settings=Settings(anonymized_telemetry=False)
         )
 
+        # Documents and queries are embedded explicitly, never by Chroma
+        self.embedder = embedding_provider or create_embedding_provider()
+        suffix = self.embedder.collection_suffix
+
+        self.query_cache: Optional[QueryEmbeddingCache] = None
+        if query_cache_size > 0:
+            self.query_cache = QueryEmbeddingCache(
+                self.embedder.model_name,
+                max_entries=query_cache_size,
+                path=str(self.persist_dir / "query_embeddings.db")
+            )
+
         # Two collections: patient summaries (for search) and patient documents (for RAG)
         self.patient_summaries = self.client.get_or_create_collection(
-            name="patient_summaries",
-            metadata={"description": "Patient summaries for search"}
+            name="patient_summaries" + suffix,
+            metadata={"description": "Patient summaries for search"},
+            embedding_function=None
         )
 
         self.patient_documents = self.client.get_or_create_collection(
-            name="patient_documents",
-            metadata={"description": "Patient records for RAG queries"}
+            name="patient_documents" + suffix,
+            metadata={"description": "Patient records for RAG queries"},
+            embedding_function=None
+        )
+
+        # Documents embedded vs skipped because their content hash matched
+        self.index_stats: Dict[str, int] = {"embedded": 0, "unchanged": 0, "deleted": 0}
+
+    # ============== EMBEDDING ==============
+
+    def _record_timing(self, name: str, duration_ms: float, **tags):
+        """Send a timing to the metrics collector when monitoring is running."""
+        collector = get_metrics_collector()
+        if collector is not None:
+            collector.record_timing(name, duration_ms, tags={"model": self.embedder.model_name, **tags})
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed document texts for an upsert, recording rag.embed_documents."""
+        start = time.perf_counter()
+        vectors = self.embedder.embed_documents(texts)
+        self._record_timing(
+            "rag.embed_documents", (time.perf_counter() - start) * 1000, count=str(len(texts))
+        )
+        return vectors
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, served from the query cache when possible.
+
+        Records rag.embed_query separately from rag.vector_search, tagged
+        with whether the cache was hit.
+        """
+        start = time.perf_counter()
+        vector = self.query_cache.get(query) if self.query_cache is not None else None
+        cache = "hit"
+        if vector is None:
+            cache = "miss"
+            vector = self.embedder.embed_query(query)
+            if self.query_cache is not None:
+                self.query_cache.put(query, vector)
+        self._record_timing("rag.embed_query", (time.perf_counter() - start) * 1000, cache=cache)
+        return vector
+
+    def _vector_query(self, collection, query: str, **kwargs) -> dict:
+        """Embed ``query`` and search ``collection``, timing each step separately."""
+        query_embedding = self.embed_query(query)
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[query_embedding], **kwargs)
+        self._record_timing(
+            "rag.vector_search", (time.perf_counter() - start) * 1000, collection=collection.name
         )
+        return results
 
     def _generate_doc_id(self, patient_id: int, doc_type: str, content: str) -> str:
         """Generate unique document ID."""
         hash_input = f"{patient_id}_{doc_type}_{content[:100]}"
         return hashlib.md5(hash_input.encode()).hexdigest()[:16]
 
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """Hash of document text, stored in metadata to detect changes."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def summary_id(patient_id: int) -> str:
+        """Chroma ID of a patient's summary."""
+        return f"patient_{patient_id}"
+
+    @staticmethod
+    def document_id(patient_id: int, doc_id: str) -> str:
+        """Chroma ID of one of a patient's documents."""
+        return f"p{patient_id}_{doc_id}"
+
     # ============== PATIENT SUMMARY OPERATIONS ==============
 
-    def index_patient_summary(self, patient_id: int, summary: str):
+    def index_patient_summary(self, patient_id: int, summary: str) -> bool:
         """Index or update a patient's summary for natural language search.
 
+        The summary is only embedded when its text changed since the last
+        time it was indexed.
+
         Args:
             patient_id: The patient's database ID
             summary: Text summary including name, UHID, diagnoses, procedures
+
+        Returns:
+            True if the summary was (re-)embedded, False if unchanged
         """
-        doc_id = f"patient_{patient_id}"
+        doc_id = self.summary_id(patient_id)
+        content_hash = self._content_hash(summary)
 
-        # Check if exists and delete first (ChromaDB doesn't have upsert)
         try:
-            existing = self.patient_summaries.get(ids=[doc_id])
-            if existing and existing["ids"]:
-                self.patient_summaries.delete(ids=[doc_id])
+            existing = self.patient_summaries.get(ids=[doc_id], include=["metadatas"])
+            if existing and existing["ids"] and existing["metadatas"][0].get("content_hash") == content_hash:
+                self.index_stats["unchanged"] += 1
+                return False
         except Exception as e:
-            logger.warning(f"Could not check/delete existing patient summary for patient {patient_id}: {e}")
+            logger.warning(f"Could not check existing patient summary for patient {patient_id}: {e}")
 
-        self.patient_summaries.add(
+        self.patient_summaries.upsert(
             documents=[summary],
+            embeddings=self.embed_documents([summary]),
             ids=[doc_id],
-            metadatas=[{"patient_id": patient_id}]
+            metadatas=[{"patient_id": patient_id, "content_hash": content_hash}]
         )
+        self.index_stats["embedded"] += 1
+        return True
 
     def search_patients(self, query: str, n_results: int = 10) -> List[Tuple[int, float, str]]:
         """Search patients using natural language.
@@ -78,8 +180,9 @@ class RAGService:
             List of (patient_id, relevance_score, summary) tuples
         """
         try:
-            results = self.patient_summaries.query(
-                query_texts=[query],
+            results = self._vector_query(
+                self.patient_summaries,
+                query,
                 n_results=n_results
             )
 
@@ -101,36 +204,71 @@ class RAGService:
 
     # ============== PATIENT DOCUMENT OPERATIONS ==============
 
-    def index_patient_documents(self, patient_id: int, documents: List[Tuple[str, str, dict]]):
-        """Index all documents for a patient.
+    def index_patient_documents(self, patient_id: int, documents: List[Tuple[str, str, dict]]) -> int:
+        """Bring a patient's indexed documents in line with ``documents``.
+
+        Only new or changed documents are embedded (compared by content
+        hash); indexed documents missing from ``documents`` are removed.
 
         Args:
             patient_id: Patient's database ID
-            documents: List of (doc_id, content, metadata) tuples
-        """
-        if not documents:
-            return
+            documents: Complete list of (doc_id, content, metadata) tuples
 
-        # First, remove all existing documents for this patient
-        self.clear_patient_documents(patient_id)
+        Returns:
+            Number of documents embedded
+        """
+        existing = self._get_indexed_hashes(patient_id)
 
-        # Add new documents
         ids = []
         contents = []
         metadatas = []
+        seen = set()
 
         for doc_id, content, metadata in documents:
-            ids.append(f"p{patient_id}_{doc_id}")
+            chroma_id = self.document_id(patient_id, doc_id)
+            content_hash = self._content_hash(content)
+            seen.add(chroma_id)
+            if existing.get(chroma_id) == content_hash:
+                self.index_stats["unchanged"] += 1
+                continue
+
+            ids.append(chroma_id)
             contents.append(content)
-            metadata["patient_id"] = patient_id
-            metadatas.append(metadata)
+            metadatas.append({**metadata, "patient_id": patient_id, "content_hash": content_hash})
+
+        stale = [doc_id for doc_id in existing if doc_id not in seen]
+        if stale:
+            self.patient_documents.delete(ids=stale)
+            self.index_stats["deleted"] += len(stale)
 
         if ids:
-            self.patient_documents.add(
+            self.patient_documents.upsert(
                 documents=contents,
+                embeddings=self.embed_documents(contents),
                 ids=ids,
                 metadatas=metadatas
             )
+            self.index_stats["embedded"] += len(ids)
+
+        return len(ids)
+
+    def _get_indexed_hashes(self, patient_id: int) -> Dict[str, Optional[str]]:
+        """Map indexed document IDs to their stored content hashes."""
+        try:
+            results = self.patient_documents.get(
+                where={"patient_id": patient_id},
+                include=["metadatas"]
+            )
+        except Exception as e:
+            logger.warning(f"Could not read indexed documents for patient {patient_id}: {e}")
+            return {}
+
+        if not results or not results["ids"]:
+            return {}
+        return {
+            doc_id: (metadata or {}).get("content_hash")
+            for doc_id, metadata in zip(results["ids"], results["metadatas"])
+        }
 
     def clear_patient_documents(self, patient_id: int):
         """Remove all indexed documents for a patient."""
@@ -161,8 +299,9 @@ class RAGService:
             Combined context string from relevant documents
         """
         try:
-            results = self.patient_documents.query(
-                query_texts=[query],
+            results = self._vector_query(
+                self.patient_documents,
+                query,
                 n_results=n_results,
                 where={"patient_id": patient_id}
             )
@@ -210,3 +349,11 @@ class RAGService:
         """Reindex both summary and documents for a patient."""
         self.index_patient_summary(patient_id, summary)
         self.index_patient_documents(patient_id, documents)
+
+    def remove_patient(self, patient_id: int):
+        """Remove a patient's summary and documents from the index."""
+        try:
+            self.patient_summaries.delete(ids=[self.summary_id(patient_id)])
+        except Exception as e:
+            logger.warning(f"Could not remove patient summary for patient {patient_id}: {e}")
+        self.clear_patient_documents(patient_id)
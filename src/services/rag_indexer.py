@@ -0,0 +1,173 @@
+"""Background worker that keeps the RAG vector index in sync with the database.
+
+DatabaseService triggers append a row to ``rag_change_journal`` for every
+visit, investigation, procedure or patient write. The indexer drains that
+journal in batches: changed patients are loaded with one batched query per
+table, and RAGService re-embeds only documents whose content hash changed.
+"""
+
+import logging
+import threading
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RAGIndexer:
+    """Drains the RAG change journal into the vector store.
+
+    Features:
+    - Batched journal draining (one bundle load per batch of patients)
+    - Content-hash diffing, so unchanged documents cost no embeddings
+    - Background thread woken on demand or on a fixed poll interval
+    - Journal entries are only acknowledged after indexing succeeds
+    """
+
+    DOCUMENT_PARTS = ("visits", "investigations", "procedures")
+
+    def __init__(
+        self,
+        db_service,
+        rag_service,
+        batch_size: int = 200,
+        poll_interval: float = 5.0
+    ):
+        """Initialize indexer.
+
+        Args:
+            db_service: DatabaseService instance (journal source)
+            rag_service: RAGService instance (vector store)
+            batch_size: Journal entries processed per batch
+            poll_interval: Seconds between journal checks when idle
+        """
+        self.db = db_service
+        self.rag = rag_service
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+        # State
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._lock = threading.Lock()
+
+        # Callbacks
+        self.on_batch_indexed: Optional[Callable[[int, int], None]] = None
+
+    # ============== INDEXING ==============
+
+    def index_patient(self, patient_id: int) -> int:
+        """Index one patient now (e.g. on selection).
+
+        Returns:
+            Number of documents embedded (0 when nothing changed)
+        """
+        return self._index_patients([patient_id])
+
+    def drain_once(self) -> int:
+        """Apply one batch of journal entries.
+
+        Returns:
+            Number of journal entries applied
+        """
+        with self._lock:
+            entries = self.db.get_rag_changes(limit=self.batch_size)
+            if not entries:
+                return 0
+
+            patient_ids = list(dict.fromkeys(entry["patient_id"] for entry in entries))
+            embedded = self._index_patients(patient_ids)
+            self.db.ack_rag_changes(entries[-1]["id"])
+
+        logger.debug(
+            f"RAG indexer applied {len(entries)} changes for {len(patient_ids)} patients "
+            f"({embedded} documents embedded)"
+        )
+        if self.on_batch_indexed:
+            self.on_batch_indexed(len(entries), embedded)
+        return len(entries)
+
+    def drain(self) -> int:
+        """Apply journal entries until the journal is empty.
+
+        Returns:
+            Total number of journal entries applied
+        """
+        total = 0
+        while not self._stop_event.is_set():
+            applied = self.drain_once()
+            if not applied:
+                break
+            total += applied
+        return total
+
+    def _index_patients(self, patient_ids: Iterable[int]) -> int:
+        """Sync summaries and documents for the given patients."""
+        patient_ids = list(patient_ids)
+        bundles = self.db.get_patient_bundles(
+            patient_ids, include=self.DOCUMENT_PARTS
+        )
+
+        embedded = 0
+        for patient_id in patient_ids:
+            bundle = bundles.get(patient_id)
+            if bundle is None:
+                # Patient was deleted
+                self.rag.remove_patient(patient_id)
+                continue
+
+            if self.rag.index_patient_summary(patient_id, self.db.summarize_bundle(bundle)):
+                embedded += 1
+            embedded += self.rag.index_patient_documents(
+                patient_id, self.db.bundle_documents_for_rag(bundle)
+            )
+        return embedded
+
+    # ============== BACKGROUND THREAD ==============
+
+    def start(self):
+        """Start the indexer thread."""
+        if self._running:
+            logger.warning("RAG indexer already running")
+            return
+
+        self._running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._indexer_loop, daemon=True, name="RAGIndexer")
+        self._thread.start()
+        logger.info(f"RAG indexer started (batch size: {self.batch_size})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the indexer thread."""
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        logger.info("RAG indexer stopped")
+
+    def wake(self):
+        """Ask the thread to drain the journal now instead of at the next poll."""
+        self._wake_event.set()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the indexer thread is running."""
+        return self._running
+
+    def _indexer_loop(self):
+        """Main loop: drain the journal, then sleep until woken or polled."""
+        while not self._stop_event.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                # Entries stay in the journal and are retried next round
+                logger.error(f"RAG indexer error: {e}", exc_info=True)
+
+            self._wake_event.wait(timeout=self.poll_interval)
+            self._wake_event.clear()
@@ -0,0 +1,283 @@
+"""Bulk offline reindexing of the RAG vector store.
+
+Used after a backup restore or clinic migration, when the Chroma
+collections are empty or stale. Patients are streamed from the database in
+pages, documents are embedded in large batches (optionally across a process
+pool) and written with batched upserts. Progress is checkpointed after every
+page so an interrupted run resumes where it stopped.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Embedding function held by each pool worker process
+_worker_embed = None
+
+
+def _init_worker(factory: Callable):
+    """Process pool initializer: load the embedding model once per worker."""
+    global _worker_embed
+    _worker_embed = factory()
+
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embed one batch of texts inside a pool worker."""
+    return [list(map(float, vector)) for vector in _worker_embed(texts)]
+
+
+@dataclass
+class ReindexStats:
+    """Counters for a reindex run."""
+    patients: int = 0
+    documents: int = 0
+    embedded: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    elapsed_seconds: float = 0.0
+    last_patient_id: int = 0
+
+    @property
+    def docs_per_second(self) -> float:
+        """Embedding throughput (documents written per second)."""
+        return self.embedded / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class BulkReindexer:
+    """Rebuilds patient_summaries and patient_documents from the database.
+
+    Documents whose content hash already matches the index are skipped, so
+    re-running over a complete index is cheap.
+    """
+
+    def __init__(
+        self,
+        db_service,
+        rag_service,
+        page_size: int = 500,
+        batch_size: int = 256,
+        workers: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        embedding_factory: Optional[Callable] = None,
+    ):
+        """Initialize reindexer.
+
+        Args:
+            db_service: DatabaseService to read patients from
+            rag_service: RAGService whose collections are rebuilt
+            page_size: Patients loaded per page (one checkpoint per page)
+            batch_size: Documents per embedding / upsert call
+            workers: Embedding processes; 0 embeds in-process with the
+                RAGService's provider (default: CPU count - 1)
+            checkpoint_path: Resume file (default: <chroma dir>/reindex_checkpoint.json)
+            embedding_factory: Picklable callable returning an embedding function
+                (default: a fresh copy of the RAGService's provider)
+        """
+        self.db = db_service
+        self.rag = rag_service
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.workers = max((os.cpu_count() or 2) - 1, 1) if workers is None else workers
+        self.checkpoint_path = Path(
+            checkpoint_path or Path(rag_service.persist_dir) / "reindex_checkpoint.json"
+        )
+        self.embedding_factory = embedding_factory or rag_service.embedder.clone
+
+    # ============== CHECKPOINT ==============
+
+    def load_checkpoint(self) -> Optional[ReindexStats]:
+        """Read the checkpoint left by an interrupted run, if any."""
+        if not self.checkpoint_path.exists():
+            return None
+        try:
+            data = json.loads(self.checkpoint_path.read_text())
+            return ReindexStats(**data)
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable reindex checkpoint {self.checkpoint_path}: {e}")
+            return None
+
+    def _save_checkpoint(self, stats: ReindexStats):
+        """Atomically persist progress after a completed page."""
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(stats)))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        """Forget any saved progress."""
+        self.checkpoint_path.unlink(missing_ok=True)
+
+    # ============== REINDEX ==============
+
+    def run(
+        self,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[ReindexStats, int], None]] = None
+    ) -> ReindexStats:
+        """Reindex every patient.
+
+        Args:
+            resume: Continue from the checkpoint if one exists
+            progress_callback: Called with (stats, total_patients) after each page
+
+        Returns:
+            ReindexStats for the whole run (including resumed progress)
+        """
+        stats = (self.load_checkpoint() if resume else None) or ReindexStats()
+        if stats.last_patient_id:
+            logger.info(f"Resuming reindex after patient {stats.last_patient_id}")
+
+        total = self.db.get_total_patients()
+        started = time.perf_counter() - stats.elapsed_seconds
+
+        pool = None
+        if self.workers > 0:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.embedding_factory,)
+            )
+
+        try:
+            bundles = self.db.iter_patient_bundles(
+                batch_size=self.page_size,
+                include=("visits", "investigations", "procedures"),
+                start_after=stats.last_patient_id
+            )
+            while True:
+                page = list(islice(bundles, self.page_size))
+                if not page:
+                    break
+
+                self._index_page(page, stats, pool)
+
+                stats.patients += len(page)
+                stats.last_patient_id = page[-1].patient.id
+                stats.elapsed_seconds = time.perf_counter() - started
+                self._save_checkpoint(stats)
+
+                if progress_callback:
+                    progress_callback(stats, total)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        stats.deleted += self._remove_deleted_patients()
+        stats.elapsed_seconds = time.perf_counter() - started
+        self.clear_checkpoint()
+        logger.info(
+            f"Reindexed {stats.patients} patients / {stats.documents} documents in "
+            f"{stats.elapsed_seconds:.1f}s ({stats.docs_per_second:.1f} docs/sec)"
+        )
+        return stats
+
+    def _index_page(self, page, stats: ReindexStats, pool: Optional[ProcessPoolExecutor]):
+        """Embed and upsert the summaries and documents of one page of patients."""
+        patient_ids = [bundle.patient.id for bundle in page]
+
+        summaries: List[Tuple[str, str, dict]] = []
+        documents: List[Tuple[str, str, dict]] = []
+        for bundle in page:
+            patient_id = bundle.patient.id
+            summaries.append((
+                self.rag.summary_id(patient_id),
+                self.db.summarize_bundle(bundle),
+                {"patient_id": patient_id},
+            ))
+            for doc_id, content, metadata in self.db.bundle_documents_for_rag(bundle):
+                documents.append((
+                    self.rag.document_id(patient_id, doc_id),
+                    content,
+                    {**metadata, "patient_id": patient_id},
+                ))
+        stats.documents += len(documents)
+
+        # One lookup per collection per page for stored hashes (and stale docs)
+        summary_hashes = self._indexed_hashes(
+            self.rag.patient_summaries, ids=[doc_id for doc_id, _, _ in summaries]
+        )
+        document_hashes = self._indexed_hashes(
+            self.rag.patient_documents, where={"patient_id": {"$in": patient_ids}}
+        )
+
+        stale = set(document_hashes) - {doc_id for doc_id, _, _ in documents}
+        if stale:
+            self.rag.patient_documents.delete(ids=sorted(stale))
+            stats.deleted += len(stale)
+
+        for collection, records, hashes in (
+            (self.rag.patient_summaries, summaries, summary_hashes),
+            (self.rag.patient_documents, documents, document_hashes),
+        ):
+            changed = []
+            for doc_id, content, metadata in records:
+                content_hash = self.rag._content_hash(content)
+                if hashes.get(doc_id) == content_hash:
+                    stats.unchanged += 1
+                    continue
+                changed.append((doc_id, content, {**metadata, "content_hash": content_hash}))
+
+            self._upsert(collection, changed, pool)
+            stats.embedded += len(changed)
+
+    def _remove_deleted_patients(self) -> int:
+        """Delete indexed summaries and documents of patients no longer in the database.
+
+        Pages only see patients that still exist, so this sweep runs once
+        after the pass. Returns the number of entries deleted.
+        """
+        patient_ids = self.db.get_all_patient_ids()
+        deleted = 0
+        for collection in (self.rag.patient_summaries, self.rag.patient_documents):
+            results = collection.get(include=["metadatas"])
+            if not results or not results["ids"]:
+                continue
+            orphaned = [
+                doc_id for doc_id, metadata in zip(results["ids"], results["metadatas"])
+                if (metadata or {}).get("patient_id") not in patient_ids
+            ]
+            if orphaned:
+                collection.delete(ids=orphaned)
+                deleted += len(orphaned)
+        if deleted:
+            logger.info(f"Removed {deleted} indexed entries of deleted patients")
+        return deleted
+
+    def _indexed_hashes(self, collection, **query) -> Dict[str, Optional[str]]:
+        """Map already-indexed IDs to their stored content hashes."""
+        results = collection.get(include=["metadatas"], **query)
+        if not results or not results["ids"]:
+            return {}
+        return {
+            doc_id: (metadata or {}).get("content_hash")
+            for doc_id, metadata in zip(results["ids"], results["metadatas"])
+        }
+
+    def _upsert(self, collection, records: Sequence[Tuple[str, str, dict]],
+                pool: Optional[ProcessPoolExecutor]):
+        """Write records in batch_size chunks, embedding in the pool if there is one."""
+        if not records:
+            return
+
+        batches = [records[i:i + self.batch_size] for i in range(0, len(records), self.batch_size)]
+        if pool:
+            # Ordered map: embeddings line up with their batch
+            embedded = pool.map(_embed_batch, [[content for _, content, _ in batch] for batch in batches])
+        else:
+            embedded = (self.rag.embed_documents([content for _, content, _ in batch]) for batch in batches)
+
+        for batch, embeddings in zip(batches, embedded):
+            collection.upsert(
+                ids=[doc_id for doc_id, _, _ in batch],
+                documents=[content for _, content, _ in batch],
+                embeddings=embeddings,
+                metadatas=[metadata for _, _, metadata in batch],
+            )
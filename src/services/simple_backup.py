@@ -263,7 +263,9 @@ class SimpleBackupService:
             backup_db = backup_path / "clinic.db"
             if backup_db.exists():
                 update_progress("Restoring database...", 20)
-                shutil.copy2(backup_db, self.db_path)
+                # Copy pages into the live file so open (pooled)
+                # connections see the restored data
+                self._backup_sqlite(backup_db, self.db_path)
                 logger.info(f"Database restored to {self.db_path}")
 
             # Restore ChromaDB
@@ -312,7 +314,7 @@ class SimpleBackupService:
 
             # Just backup the essentials
             if self.db_path.exists():
-                shutil.copy2(self.db_path, safety_path / "clinic.db")
+                self._backup_sqlite(self.db_path, safety_path / "clinic.db")
 
             if self.settings_file.exists():
                 shutil.copy2(self.settings_file, safety_path / "settings.json")
@@ -5,6 +5,8 @@ from datetime import date, datetime, timedelta
 import json
 import logging
 
+from ..llm_scheduler import LLMPriority
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,6 +86,10 @@ Return ONLY the summary text, no JSON.'''
         self.llm = llm_service
         self.db = db_service
 
+    def _query(self, prompt: str, json_mode: bool = False):
+        """Run a summary prompt as background LLM work (behind the doctor's requests)."""
+        return self.llm.generate(prompt, json_mode=json_mode, priority=LLMPriority.BACKGROUND)
+
     def generate_summary(self, patient_id: int) -> PatientSummary:
         """Generate comprehensive patient summary"""
         try:
@@ -119,7 +125,10 @@ Return ONLY the summary text, no JSON.'''
             )
 
             # Call LLM
-            response = self.llm.query(prompt)
+            success, response = self._query(prompt, json_mode=True)
+            if not success:
+                logger.error(f"LLM summary failed: {response}")
+                return self._generate_fallback_summary(patient, visits, investigations)
 
             # Parse JSON response
             try:
@@ -172,7 +181,8 @@ Return ONLY the summary text, no JSON.'''
                     diagnosis=visit_dict.get("diagnosis", "Not recorded"),
                 )
 
-                return self.llm.query(prompt)
+                success, response = self._query(prompt)
+                return response if success else "Error generating summary"
 
         except Exception as e:
             logger.error(f"Error generating visit summary: {e}")
@@ -11,9 +11,14 @@ The cloud service never sees plaintext data.
 
 import os
 import json
+import base64
+import shutil
 import hashlib
 import tempfile
 import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
@@ -65,6 +70,38 @@ class SyncProgress:
     error: Optional[str] = None
 
 
+class TransferError(Exception):
+    """Raised when a multipart transfer cannot proceed."""
+    pass
+
+
+class ChecksumMismatchError(TransferError):
+    """Raised when a transferred part does not match its checksum."""
+    pass
+
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024  # S3 needs >= 5 MiB for all but the last part
+DEFAULT_TRANSFER_WORKERS = 4
+PART_MANIFEST_SUFFIX = ".parts.json"
+TRANSFER_STATE_DIR = ".transfers"  # Under the local backup directory
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _md5_file(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
@@ -100,6 +137,83 @@ class StorageBackend(ABC):
         """Get metadata for a remote file."""
         pass
 
+    # Multipart uploads: parts may be uploaded concurrently and in any
+    # order. Backends without native support stage parts in a local temp
+    # directory and upload the assembled file on completion; backends
+    # that cannot take multipart uploads at all clear supports_multipart.
+
+    supports_multipart = True
+
+    def _staging_dir(self, upload_id: str) -> Path:
+        return Path(tempfile.gettempdir()) / "docassist-multipart" / upload_id
+
+    def _part_path(self, upload_id: str, part_number: int) -> Path:
+        return self._staging_dir(upload_id) / f"part-{part_number:05d}"
+
+    def create_multipart_upload(self, remote_key: str) -> str:
+        """Start a multipart upload; returns its upload ID."""
+        upload_id = uuid.uuid4().hex
+        self._staging_dir(upload_id).mkdir(parents=True, exist_ok=True)
+        return upload_id
+
+    def upload_part(self, remote_key: str, upload_id: str, part_number: int, data: bytes,
+                    checksum: Optional[str] = None) -> str:
+        """Upload one part (numbered from 1); returns its ETag.
+
+        Args:
+            checksum: Hex SHA-256 of data; the stored part is verified
+                against it
+
+        Raises:
+            ChecksumMismatchError: The stored part does not match checksum
+        """
+        part_path = self._part_path(upload_id, part_number)
+        if not part_path.parent.exists():
+            raise TransferError(f"Unknown upload {upload_id}")
+        temp_path = part_path.with_suffix(".partial")
+        temp_path.write_bytes(data)
+        if checksum is not None and _sha256_file(temp_path) != checksum:
+            temp_path.unlink(missing_ok=True)
+            raise ChecksumMismatchError(f"Part {part_number} of {remote_key} corrupted in transfer")
+        os.replace(temp_path, part_path)
+        return hashlib.md5(data).hexdigest()
+
+    def list_parts(self, remote_key: str, upload_id: str) -> Optional[Dict[int, str]]:
+        """ETags of the parts already stored, or None if the upload is gone."""
+        staging = self._staging_dir(upload_id)
+        if not staging.is_dir():
+            return None
+        parts = {}
+        for path in staging.glob("part-*"):
+            if path.suffix != ".partial":
+                parts[int(path.name[5:])] = _md5_file(path)
+        return parts
+
+    def complete_multipart_upload(self, remote_key: str, upload_id: str,
+                                  parts: List[Dict[str, Any]]) -> bool:
+        """Assemble parts, given as [{'PartNumber': n, 'ETag': etag}, ...]."""
+        staging = self._staging_dir(upload_id)
+        assembled = staging / "assembled"
+        try:
+            with open(assembled, 'wb') as out:
+                for part in sorted(parts, key=lambda p: p['PartNumber']):
+                    with open(self._part_path(upload_id, part['PartNumber']), 'rb') as src:
+                        shutil.copyfileobj(src, out, 1024 * 1024)
+            return self.upload(assembled, remote_key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def abort_multipart_upload(self, remote_key: str, upload_id: str):
+        """Discard a multipart upload and its parts."""
+        shutil.rmtree(self._staging_dir(upload_id), ignore_errors=True)
+
+    # Ranged reads, used for parallel and resumable downloads. Backends
+    # that set supports_range implement
+    # download_range(remote_key, start, length) -> bytes; callers check
+    # the flag before calling it.
+
+    supports_range = False
+
 
 class LocalStorageBackend(StorageBackend):
     """Local folder storage backend (for testing and local network shares)."""
@@ -109,10 +223,43 @@ class LocalStorageBackend(StorageBackend):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
 
+    MULTIPART_DIR = ".multipart"
+
     def _get_full_path(self, remote_key: str) -> Path:
         """Get full local path for a remote key."""
         return self.base_path / remote_key
 
+    def _staging_dir(self, upload_id: str) -> Path:
+        return self.base_path / self.MULTIPART_DIR / upload_id
+
+    supports_range = True
+
+    def download_range(self, remote_key: str, start: int, length: int) -> bytes:
+        """Read length bytes of a remote file starting at offset start."""
+        with open(self._get_full_path(remote_key), 'rb') as f:
+            f.seek(start)
+            return f.read(length)
+
+    def complete_multipart_upload(self, remote_key: str, upload_id: str,
+                                  parts: List[Dict[str, Any]]) -> bool:
+        staging = self._staging_dir(upload_id)
+        dest_path = self._get_full_path(remote_key)
+        temp_path = dest_path.with_name(dest_path.name + ".partial")
+        try:
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'wb') as out:
+                for part in sorted(parts, key=lambda p: p['PartNumber']):
+                    with open(self._part_path(upload_id, part['PartNumber']), 'rb') as src:
+                        shutil.copyfileobj(src, out, 1024 * 1024)
+            os.replace(temp_path, dest_path)
+            return True
+        except Exception as e:
+            print(f"Multipart upload failed: {e}")
+            temp_path.unlink(missing_ok=True)
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
     def upload(self, local_path: Path, remote_key: str,
                progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
         try:
@@ -181,7 +328,7 @@ class LocalStorageBackend(StorageBackend):
             return files
 
         for path in search_path.rglob('*'):
-            if path.is_file():
+            if path.is_file() and self.MULTIPART_DIR not in path.relative_to(self.base_path).parts:
                 files.append({
                     'key': str(path.relative_to(self.base_path)),
                     'size': path.stat().st_size,
@@ -277,6 +424,73 @@ class S3StorageBackend(StorageBackend):
             print(f"S3 upload failed: {e}")
             return False
 
+    def create_multipart_upload(self, remote_key: str) -> str:
+        response = self._get_client().create_multipart_upload(Bucket=self.bucket, Key=remote_key)
+        return response['UploadId']
+
+    def upload_part(self, remote_key: str, upload_id: str, part_number: int, data: bytes,
+                    checksum: Optional[str] = None) -> str:
+        kwargs = {}
+        if checksum is not None:
+            # S3 rejects the part (BadDigest) if the received bytes differ
+            kwargs['ChecksumSHA256'] = base64.b64encode(bytes.fromhex(checksum)).decode()
+        try:
+            response = self._get_client().upload_part(
+                Bucket=self.bucket, Key=remote_key, UploadId=upload_id,
+                PartNumber=part_number, Body=data, **kwargs
+            )
+        except Exception as e:
+            if 'BadDigest' in str(e) or 'checksum' in str(e).lower():
+                raise ChecksumMismatchError(f"Part {part_number} of {remote_key} corrupted in transfer") from e
+            raise
+        return response['ETag']
+
+    def list_parts(self, remote_key: str, upload_id: str) -> Optional[Dict[int, str]]:
+        client = self._get_client()
+        parts = {}
+        marker = 0
+        try:
+            while True:
+                response = client.list_parts(
+                    Bucket=self.bucket, Key=remote_key, UploadId=upload_id,
+                    PartNumberMarker=marker
+                )
+                for part in response.get('Parts', []):
+                    parts[part['PartNumber']] = part['ETag']
+                if not response.get('IsTruncated'):
+                    return parts
+                marker = response['NextPartNumberMarker']
+        except Exception as e:
+            print(f"S3 list parts failed: {e}")
+            return None
+
+    def complete_multipart_upload(self, remote_key: str, upload_id: str,
+                                  parts: List[Dict[str, Any]]) -> bool:
+        try:
+            self._get_client().complete_multipart_upload(
+                Bucket=self.bucket, Key=remote_key, UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda p: p['PartNumber'])}
+            )
+            return True
+        except Exception as e:
+            print(f"S3 multipart upload failed: {e}")
+            return False
+
+    def abort_multipart_upload(self, remote_key: str, upload_id: str):
+        try:
+            self._get_client().abort_multipart_upload(Bucket=self.bucket, Key=remote_key, UploadId=upload_id)
+        except Exception as e:
+            print(f"S3 abort multipart failed: {e}")
+
+    supports_range = True
+
+    def download_range(self, remote_key: str, start: int, length: int) -> bytes:
+        """Read length bytes of a remote file starting at offset start."""
+        response = self._get_client().get_object(
+            Bucket=self.bucket, Key=remote_key, Range=f"bytes={start}-{start + length - 1}"
+        )
+        return response['Body'].read()
+
     def download(self, remote_key: str, local_path: Path,
                  progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
         try:
@@ -509,6 +723,12 @@ class DocAssistCloudBackend(StorageBackend):
         except Exception:
             return None
 
+    # The DocAssist API takes each backup as one PUT; there is no part API
+    supports_multipart = False
+
+    def create_multipart_upload(self, remote_key: str) -> str:
+        raise TransferError("DocAssist Cloud does not support multipart uploads")
+
     def get_account_info(self) -> Optional[Dict[str, Any]]:
         """Get account information (quota, usage, tier)."""
         try:
@@ -520,6 +740,331 @@ class DocAssistCloudBackend(StorageBackend):
             return None
 
 
+class MultipartTransfer:
+    """Parallel, resumable multipart uploads and downloads.
+
+    Files are moved in fixed-size parts by a thread pool. Every part is
+    checksummed (SHA-256): the backend verifies uploaded parts, and a
+    part manifest stored next to the file (<key>.parts.json) lets
+    downloads verify each part they fetch.
+
+    Progress is persisted in state_dir after every part, so a transfer
+    interrupted by a dropped connection or an app restart resumes with
+    the parts still missing instead of starting again from zero.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        state_dir: Path,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = DEFAULT_TRANSFER_WORKERS,
+        retries: int = 3
+    ):
+        """Initialize transfer manager.
+
+        Args:
+            backend: Storage backend to transfer with
+            state_dir: Directory for persisted transfer state
+            part_size: Bytes per part
+            max_workers: Parts transferred concurrently
+            retries: Attempts per part before the transfer is paused
+        """
+        self.backend = backend
+        self.state_dir = Path(state_dir)
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self.retries = retries
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------- state
+
+    def _state_path(self, kind: str, remote_key: str) -> Path:
+        name = hashlib.sha1(remote_key.encode('utf-8')).hexdigest()[:20]
+        return self.state_dir / f"{kind}-{name}.json"
+
+    def _load_state(self, kind: str, remote_key: str) -> Optional[Dict[str, Any]]:
+        path = self._state_path(kind, remote_key)
+        try:
+            state = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        return state if state.get('remote_key') == remote_key else None
+
+    def _save_state(self, kind: str, state: Dict[str, Any]):
+        """Persist state atomically (caller holds the lock)."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._state_path(kind, state['remote_key'])
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(state))
+        os.replace(temp_path, path)
+
+    def _clear_state(self, kind: str, remote_key: str):
+        self._state_path(kind, remote_key).unlink(missing_ok=True)
+
+    def pending_uploads(self) -> List[Dict[str, Any]]:
+        """Interrupted uploads that can be resumed."""
+        if not self.state_dir.exists():
+            return []
+        pending = []
+        for path in sorted(self.state_dir.glob("upload-*.json")):
+            try:
+                pending.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return pending
+
+    def discard_upload(self, remote_key: str):
+        """Abandon an interrupted upload and free its stored parts."""
+        state = self._load_state('upload', remote_key)
+        if state is not None:
+            self.backend.abort_multipart_upload(remote_key, state['upload_id'])
+            self._clear_state('upload', remote_key)
+
+    def track_stream(self, remote_key: str, upload_id: str):
+        """Record a streamed multipart upload until untrack_stream()."""
+        with self._lock:
+            self._save_state('stream', {'remote_key': remote_key, 'upload_id': upload_id})
+
+    def untrack_stream(self, remote_key: str):
+        self._clear_state('stream', remote_key)
+
+    def discard_streams(self) -> int:
+        """Abort streamed uploads left unfinished by a crash or restart.
+
+        A streamed backup is encrypted with a fresh salt each run, so its
+        stored parts cannot be continued; they are freed instead.
+
+        Returns:
+            Number of uploads aborted
+        """
+        if not self.state_dir.exists():
+            return 0
+        discarded = 0
+        for path in sorted(self.state_dir.glob("stream-*.json")):
+            try:
+                state = json.loads(path.read_text())
+            except (OSError, ValueError):
+                path.unlink(missing_ok=True)
+                continue
+            self.backend.abort_multipart_upload(state['remote_key'], state['upload_id'])
+            path.unlink(missing_ok=True)
+            discarded += 1
+        return discarded
+
+    def _retry(self, action: Callable[[], Any]) -> Any:
+        for attempt in range(self.retries):
+            try:
+                return action()
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    def _run_parts(self, work: Callable[[int], None], part_numbers: List[int]):
+        """Run work for each part in the pool; re-raise the first failure."""
+        if not part_numbers:
+            return
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="Transfer") as pool:
+            futures = [pool.submit(work, n) for n in part_numbers]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    # ---------------------------------------------------------------- upload
+
+    def upload(self, local_path: Path, remote_key: str,
+               progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Upload a file in parallel parts, resuming a previous attempt.
+
+        Returns:
+            True if the upload completed. On failure the state is kept and
+            calling upload() again continues with the missing parts.
+            Backends without multipart support get one plain upload.
+        """
+        local_path = Path(local_path)
+        if not self.backend.supports_multipart:
+            return self.backend.upload(local_path, remote_key, progress_callback)
+        try:
+            stat = local_path.stat()
+            size = stat.st_size
+            part_count = max(1, -(-size // self.part_size))
+            state = self._resumable_upload(local_path, remote_key, stat)
+            if state is None:
+                state = {
+                    'remote_key': remote_key,
+                    'local_path': str(local_path),
+                    'size': size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'part_size': self.part_size,
+                    'upload_id': self.backend.create_multipart_upload(remote_key),
+                    'parts': {},
+                }
+                with self._lock:
+                    self._save_state('upload', state)
+
+            done = [sum(p['size'] for p in state['parts'].values())]
+            if progress_callback:
+                progress_callback(done[0], size)
+
+            def send(number: int):
+                offset = (number - 1) * self.part_size
+                with open(local_path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read(self.part_size)
+                checksum = hashlib.sha256(data).hexdigest()
+                etag = self._retry(lambda: self.backend.upload_part(
+                    remote_key, state['upload_id'], number, data, checksum=checksum
+                ))
+                with self._lock:
+                    state['parts'][str(number)] = {'etag': etag, 'sha256': checksum, 'size': len(data)}
+                    self._save_state('upload', state)
+                    done[0] += len(data)
+                    if progress_callback:
+                        progress_callback(done[0], size)
+
+            missing = [n for n in range(1, part_count + 1) if str(n) not in state['parts']]
+            self._run_parts(send, missing)
+
+            parts = [
+                {'PartNumber': n, 'ETag': state['parts'][str(n)]['etag']}
+                for n in range(1, part_count + 1)
+            ]
+            if not self.backend.complete_multipart_upload(remote_key, state['upload_id'], parts):
+                # The upload ID is spent either way; start over next time
+                self._clear_state('upload', remote_key)
+                return False
+
+            write_part_manifest(
+                self.backend, remote_key, size, self.part_size,
+                [state['parts'][str(n)]['sha256'] for n in range(1, part_count + 1)]
+            )
+            self._clear_state('upload', remote_key)
+            return True
+
+        except Exception as e:
+            print(f"Multipart upload failed: {e}")
+            return False
+
+    def _resumable_upload(self, local_path: Path, remote_key: str, stat) -> Optional[Dict[str, Any]]:
+        """Previous upload state for this file, if it can still be continued."""
+        state = self._load_state('upload', remote_key)
+        if state is None:
+            return None
+        unchanged = (
+            state['local_path'] == str(local_path)
+            and state['size'] == stat.st_size
+            and state['mtime_ns'] == stat.st_mtime_ns
+            and state['part_size'] == self.part_size
+        )
+        stored = self.backend.list_parts(remote_key, state['upload_id']) if unchanged else None
+        if stored is None:
+            self.backend.abort_multipart_upload(remote_key, state['upload_id'])
+            self._clear_state('upload', remote_key)
+            return None
+        # Keep only parts the backend confirms it holds
+        state['parts'] = {
+            n: part for n, part in state['parts'].items()
+            if stored.get(int(n)) == part['etag']
+        }
+        return state
+
+    # -------------------------------------------------------------- download
+
+    def download(self, remote_key: str, local_path: Path,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+        """Download a file in parallel verified parts, resuming if interrupted.
+
+        Falls back to the backend's single-request download for files
+        without a part manifest or backends without ranged reads.
+        """
+        local_path = Path(local_path)
+        manifest = read_part_manifest(self.backend, remote_key) if self.backend.supports_range else None
+        if manifest is None:
+            return self.backend.download(remote_key, local_path, progress_callback)
+
+        try:
+            size, part_size, hashes = manifest['size'], manifest['part_size'], manifest['parts']
+            partial_path = local_path.with_name(local_path.name + ".partial")
+            state = self._load_state('download', remote_key)
+            if (state is None or state['parts'] != hashes or state['part_size'] != part_size
+                    or state.get('size') != size or not partial_path.exists()):
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(partial_path, 'wb') as f:
+                    f.truncate(size)
+                state = {'remote_key': remote_key, 'size': size, 'part_size': part_size,
+                         'parts': hashes, 'done': []}
+                with self._lock:
+                    self._save_state('download', state)
+
+            def part_length(index: int) -> int:
+                return min(part_size, size - index * part_size)
+
+            done = [sum(part_length(i) for i in state['done'])]
+            if progress_callback:
+                progress_callback(done[0], size)
+
+            def fetch(index: int):
+                def attempt():
+                    data = self.backend.download_range(remote_key, index * part_size, part_length(index))
+                    if hashlib.sha256(data).hexdigest() != hashes[index]:
+                        raise ChecksumMismatchError(f"Part {index + 1} of {remote_key} corrupted in transfer")
+                    return data
+
+                data = self._retry(attempt)
+                with open(partial_path, 'r+b') as f:
+                    f.seek(index * part_size)
+                    f.write(data)
+                with self._lock:
+                    state['done'].append(index)
+                    self._save_state('download', state)
+                    done[0] += len(data)
+                    if progress_callback:
+                        progress_callback(done[0], size)
+
+            fetched = set(state['done'])
+            missing = [i for i in range(len(hashes)) if i not in fetched]
+            self._run_parts(fetch, missing)
+
+            os.replace(partial_path, local_path)
+            self._clear_state('download', remote_key)
+            return True
+
+        except Exception as e:
+            print(f"Multipart download failed: {e}")
+            return False
+
+
+def write_part_manifest(backend: StorageBackend, remote_key: str, size: int,
+                        part_size: int, hashes: List[str]) -> bool:
+    """Store the per-part SHA-256 list used to verify downloads."""
+    manifest = {'version': 1, 'size': size, 'part_size': part_size, 'parts': hashes}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "parts.json"
+        path.write_text(json.dumps(manifest))
+        return backend.upload(path, remote_key + PART_MANIFEST_SUFFIX)
+
+
+def read_part_manifest(backend: StorageBackend, remote_key: str) -> Optional[Dict[str, Any]]:
+    """Fetch a file's part manifest, or None if it has none."""
+    manifest_key = remote_key + PART_MANIFEST_SUFFIX
+    if not backend.exists(manifest_key):
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "parts.json"
+        if not backend.download(manifest_key, path):
+            return None
+        try:
+            manifest = json.loads(path.read_text())
+        except ValueError:
+            return None
+    return manifest if manifest.get('version') == 1 else None
+
+
 class SyncService:
     """Orchestrates backup synchronization with cloud storage.
 
@@ -534,7 +1079,9 @@ class SyncService:
         self,
         backend: StorageBackend,
         local_backup_dir: Path,
-        progress_callback: Optional[Callable[[SyncProgress], None]] = None
+        progress_callback: Optional[Callable[[SyncProgress], None]] = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = DEFAULT_TRANSFER_WORKERS
     ):
         """Initialize sync service.
 
@@ -542,10 +1089,16 @@ class SyncService:
             backend: Storage backend to use
             local_backup_dir: Local directory for backups
             progress_callback: Called with progress updates
+            part_size: Files larger than this move as parallel, resumable parts
+            max_workers: Parts transferred concurrently
         """
         self.backend = backend
         self.local_backup_dir = Path(local_backup_dir)
         self.progress_callback = progress_callback
+        self.transfer = MultipartTransfer(
+            backend, self.local_backup_dir / TRANSFER_STATE_DIR,
+            part_size=part_size, max_workers=max_workers
+        )
         self._status = SyncStatus.IDLE
         self._current_progress = SyncProgress(
             status=SyncStatus.IDLE,
@@ -613,7 +1166,10 @@ class SyncService:
                     f"Uploading... {percent:.1f}%"
                 )
 
-            success = self.backend.upload(backup_path, remote_key, progress_cb)
+            if file_size > self.transfer.part_size and self.backend.supports_multipart:
+                success = self.transfer.upload(backup_path, remote_key, progress_cb)
+            else:
+                success = self.backend.upload(backup_path, remote_key, progress_cb)
 
             if success:
                 # Upload metadata if provided
@@ -676,7 +1232,7 @@ class SyncService:
                     f"Downloading... {percent:.1f}%"
                 )
 
-            success = self.backend.download(remote_key, local_path, progress_cb)
+            success = self.transfer.download(remote_key, local_path, progress_cb)
 
             if success:
                 self._update_progress(
@@ -698,6 +1254,25 @@ class SyncService:
             )
             return None
 
+    def resume_pending_uploads(self) -> int:
+        """Finish uploads interrupted by a lost connection or app restart.
+
+        Interrupted streamed backups cannot be continued; their stored
+        parts are discarded.
+
+        Returns:
+            Number of uploads completed
+        """
+        self.transfer.discard_streams()
+        completed = 0
+        for state in self.transfer.pending_uploads():
+            backup_path = Path(state['local_path'])
+            if not backup_path.exists():
+                self.transfer.discard_upload(state['remote_key'])
+            elif self.upload_backup(backup_path):
+                completed += 1
+        return completed
+
     def list_cloud_backups(self) -> List[Dict[str, Any]]:
         """List all backups in cloud storage.
 
@@ -705,8 +1280,8 @@ class SyncService:
             List of backup info dicts
         """
         files = self.backend.list_files("backups/")
-        # Filter to only .zip files (not metadata)
-        return [f for f in files if f['key'].endswith('.zip')]
+        # Filter to zip and streamed (.tar.*.enc) backups, not metadata
+        return [f for f in files if f['key'].endswith(('.zip', '.enc'))]
 
     def sync_to_cloud(self, backup_path: Path, password: str) -> bool:
         """Encrypt and upload a backup to cloud.
@@ -0,0 +1,122 @@
+"""Token estimates and budget-aware prompt packing.
+
+Ollama's num_ctx bounds prompt plus answer in tokens, so prompts are sized
+in (estimated) tokens rather than characters. Context is packed section by
+section in order of relevance: sections that fit go in whole, a section
+that does not fit keeps its heading and as many leading lines as the budget
+allows, and anything left over is dropped. The question and the most
+relevant records are never cut off the end of the prompt.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Sequence
+
+# Words, single digits, newlines and runs of one symbol, roughly as a BPE
+# tokenizer splits clinical text (Qwen encodes each digit separately)
+_PIECES = re.compile(r"[A-Za-z]+|\d|\n|([^\sA-Za-z\d])\1*")
+
+# Characters per token for ASCII words
+_CHARS_PER_TOKEN = 4
+
+# Repeated symbols ("=====", "═════") merge into tokens of about this many
+_SYMBOLS_PER_TOKEN = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Conservative token count for text sent to the LLM.
+
+    Errs on the high side (long words, symbols and non-ASCII characters
+    such as Hindi or emoji cost more), so packed prompts stay within
+    num_ctx.
+    """
+    count = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group(0)
+        if piece[0].isalpha() and piece.isascii():
+            count += -(-len(piece) // _CHARS_PER_TOKEN)
+        else:
+            # Symbols, digits and newlines: per character, more for multi-byte
+            per_char = 1 if piece.isascii() else max(1, (len(piece[0].encode("utf-8")) + 1) // 2)
+            count += per_char * -(-len(piece) // _SYMBOLS_PER_TOKEN)
+    return count
+
+
+@dataclass
+class ContextSection:
+    """A block of prompt context.
+
+    The first line is treated as the section heading and kept when the
+    section has to be shortened.
+    """
+    text: str
+    # Lower packs first
+    priority: int = 0
+    name: str = ""
+
+
+def shorten_section(text: str, budget: int) -> str:
+    """Keep a section's heading and leading lines within ``budget`` tokens.
+
+    Returns:
+        Shortened text ending with an omission note, or "" if not even
+        the heading and one line fit
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    lines = text.split("\n")
+    kept = [lines[0]]
+    used = estimate_tokens(lines[0])
+    for i, line in enumerate(lines[1:], start=1):
+        note = f"[... {len(lines) - i - 1} more lines omitted]"
+        cost = estimate_tokens(line) + 1
+        if used + cost + estimate_tokens(note) + 1 > budget:
+            break
+        kept.append(line)
+        used += cost
+
+    omitted = len(lines) - len(kept)
+    if len(kept) < 2:
+        return ""
+    kept.append(f"[... {omitted} more lines omitted]")
+    return "\n".join(kept)
+
+
+def pack_sections(sections: Sequence[ContextSection], budget: int, separator: str = "\n\n") -> str:
+    """Greedily fill ``budget`` tokens with the most relevant sections.
+
+    Sections are taken by priority (ties keep their given order). Each
+    either fits whole, is shortened to the space left, or is dropped;
+    lower-priority sections may still fill space a large one could not.
+
+    Returns:
+        Packed sections joined by ``separator``, in priority order
+    """
+    separator_tokens = estimate_tokens(separator)
+    ordered = sorted(enumerate(sections), key=lambda item: (item[1].priority, item[0]))
+
+    packed: List[str] = []
+    remaining = budget
+    for _, section in ordered:
+        if not section.text:
+            continue
+        room = remaining - (separator_tokens if packed else 0)
+        text = section.text if estimate_tokens(section.text) <= room else shorten_section(section.text, room)
+        if text:
+            packed.append(text)
+            remaining = room - estimate_tokens(text)
+    return separator.join(packed)
+
+
+def fit_context(context: str, budget: int) -> str:
+    """Fit already-formatted context into ``budget`` tokens.
+
+    The context is split into blank-line separated blocks, which are
+    assumed to be in order of relevance (as RAGService and ContextBuilder
+    produce them), and packed with pack_sections.
+    """
+    if estimate_tokens(context) <= budget:
+        return context
+    blocks = [ContextSection(text=block, priority=i) for i, block in enumerate(context.split("\n\n"))]
+    return pack_sections(blocks, budget)
@@ -1,4 +1,5 @@
 """AI-powered conversation handling for patient messages"""
+import asyncio
 import json
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Callable
@@ -6,6 +7,8 @@ from datetime import datetime
 from enum import Enum
 import logging
 
+from ..llm_scheduler import LLMPriority
+
 logger = logging.getLogger(__name__)
 
 
@@ -201,8 +204,12 @@ Respond in JSON:
                 recent_visits=json.dumps(recent_visits, indent=2)
             )
 
-            # Get LLM response
-            llm_response = await self.llm.generate(prompt, temperature=0.3)
+            # Get LLM response; triage queues behind the doctor's requests
+            success, llm_response = await asyncio.to_thread(
+                self.llm.generate, prompt, json_mode=True, priority=LLMPriority.BACKGROUND
+            )
+            if not success:
+                return await self._escalate_to_doctor(message, context, f"LLM unavailable: {llm_response}")
 
             # Parse JSON response
             try:
@@ -292,7 +292,11 @@ class AgentPanel:
             doc_count = 0
             self.doc_count.value = "Error loading records"
 
-        # Clear chat history
+        # Clear chat history (an answer still streaming for the previous
+        # patient is cancelled by the app)
+        self.loading_indicator.visible = False
+        self.send_btn.disabled = False
+        self.typing_indicator.visible = False
         self.messages = []
         self.chat_list.controls.clear()
         self._add_assistant_message(
@@ -309,25 +313,32 @@ class AgentPanel:
         self.messages.append(msg)
         self._render_message(msg)
 
-    def _add_assistant_message(self, content: str):
-        """Add an assistant message to the chat."""
+    def _add_assistant_message(self, content: str) -> ft.Text:
+        """Add an assistant message to the chat.
+
+        Returns:
+            The bubble's text control, for filling in a streamed answer
+        """
         msg = ChatMessage(role="assistant", content=content)
         self.messages.append(msg)
-        self._render_message(msg)
+        return self._render_message(msg)
 
-    def _render_message(self, msg: ChatMessage):
-        """Render a premium chat bubble."""
+    def _render_message(self, msg: ChatMessage) -> ft.Text:
+        """Render a premium chat bubble and return its text control."""
         is_user = msg.role == "user"
+        text = ft.Text(
+            msg.content,
+            size=Typography.BODY_MEDIUM.size,
+            color=Colors.NEUTRAL_0 if is_user else (
+                Colors.NEUTRAL_800 if not self.is_dark else Colors.NEUTRAL_200
+            ),
+            selectable=True,
+        )
 
         # Premium bubble styling
         if is_user:
             bubble = ft.Container(
-                content=ft.Text(
-                    msg.content,
-                    size=Typography.BODY_MEDIUM.size,
-                    color=Colors.NEUTRAL_0,
-                    selectable=True,
-                ),
+                content=text,
                 bgcolor=Colors.PRIMARY_500,
                 padding=ft.padding.all(Spacing.SM),
                 border_radius=ft.border_radius.only(
@@ -351,12 +362,7 @@ class AgentPanel:
                         size=14,
                         color=Colors.PRIMARY_400,
                     ),
-                    ft.Text(
-                        msg.content,
-                        size=Typography.BODY_MEDIUM.size,
-                        color=Colors.NEUTRAL_800 if not self.is_dark else Colors.NEUTRAL_200,
-                        selectable=True,
-                    ),
+                    text,
                 ], spacing=Spacing.XS),
                 bgcolor=Colors.NEUTRAL_100 if not self.is_dark else Colors.NEUTRAL_800,
                 padding=ft.padding.all(Spacing.SM),
@@ -399,6 +405,7 @@ class AgentPanel:
 
         if self.chat_list.page:
             self.chat_list.update()
+        return text
 
     def _on_query_change(self, e):
         """Handle query field change - update language indicator."""
@@ -448,12 +455,29 @@ class AgentPanel:
         if self.loading_indicator.page:
             self.loading_indicator.page.update()
 
+        # Bubble filled in token by token once the answer starts streaming
+        streaming = {}
+
+        def on_token(token: str):
+            if "text" not in streaming:
+                self.typing_indicator.visible = False
+                streaming["message"] = len(self.messages)
+                streaming["text"] = self._add_assistant_message("")
+            streaming["text"].value += token
+            self.messages[streaming["message"]].content = streaming["text"].value
+            if self.chat_list.page:
+                self.chat_list.update()
+
         def callback(success: bool, response: str):
             self.loading_indicator.visible = False
             self.send_btn.disabled = False
             self.typing_indicator.visible = False
 
-            if success:
+            if success and "text" in streaming:
+                logger.debug("RAG query successful, finalizing streamed response")
+                streaming["text"].value = response
+                self.messages[streaming["message"]].content = response
+            elif success:
                 logger.debug("RAG query successful, displaying response")
                 self._add_assistant_message(response)
             else:
@@ -463,7 +487,7 @@ class AgentPanel:
             if self.loading_indicator.page:
                 self.loading_indicator.page.update()
 
-        self.on_query(query, callback)
+        self.on_query(query, callback, on_token=on_token)
 
     def clear_chat(self):
         """Clear the chat history."""
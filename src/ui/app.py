@@ -7,8 +7,11 @@ import logging
 import os
 
 from ..services.database import DatabaseService
-from ..services.llm import LLMService
+from ..services.llm import LLMService, CancellationToken
+from ..services.llm_residency import ModelResidencyManager
 from ..services.rag import RAGService
+from ..services.rag_indexer import RAGIndexer
+from ..services.hybrid_search import HybridSearchEngine
 from ..services.pdf import PDFService
 from ..services.backup import BackupService
 from ..services.simple_backup import SimpleBackupService
@@ -37,8 +40,10 @@ class DocAssistApp:
         self.db = DatabaseService()
         self.llm = LLMService()
         self.rag = RAGService()
+        self.rag_indexer = RAGIndexer(self.db, self.rag)
+        self.search_engine = HybridSearchEngine(self.db, self.rag)
         self.pdf = PDFService()
-        self.backup = BackupService()
+        self.backup = BackupService(database_service=self.db)
         self.simple_backup = SimpleBackupService()  # Simple local backup without encryption
         self.settings = SettingsService()
 
@@ -71,8 +76,15 @@ class DocAssistApp:
             service_registry=self.service_registry,
         )
 
+        # Keep the model warm during consultations, unload it when idle
+        self.llm_residency = ModelResidencyManager(self.llm)
+        self.llm_residency.attach_workflow(self.clinical_flow.workflow)
+        self.llm_residency.attach_event_bus(self.event_bus)
+
         self.current_patient: Optional[Patient] = None
         self.page: Optional[ft.Page] = None
+        # Shared by every LLM generation for the current patient
+        self._llm_cancel = CancellationToken()
 
         # UI components (initialized in build)
         self.main_layout: Optional[MainLayout] = None
@@ -197,6 +209,12 @@ class DocAssistApp:
         if self.scheduler:
             self.scheduler.start()
 
+        # Keep the vector index in sync with database changes
+        self.rag_indexer.start()
+
+        # Warm the LLM in the background so the first prescription is fast
+        self.llm_residency.start()
+
         # Publish app started event
         self.event_bus.publish_sync(
             EventType.SERVICE_STARTED,
@@ -276,6 +294,10 @@ class DocAssistApp:
         """Handle patient selection (delegated from MainLayout)."""
         self.current_patient = patient
 
+        # Stop answers still streaming for the previous patient
+        self._llm_cancel.cancel()
+        self._llm_cancel = CancellationToken()
+
         # Index patient documents for RAG in background
         self._index_patient_for_rag(patient.id)
 
@@ -283,19 +305,15 @@ class DocAssistApp:
         logger.info(f"App: Patient selected - {patient.name} ({patient.uhid})")
 
     def _index_patient_for_rag(self, patient_id: int):
-        """Index patient documents for RAG in background."""
+        """Index patient documents for RAG in background.
+
+        Only new or changed documents are embedded, so re-selecting an
+        unchanged patient costs no embeddings.
+        """
         def index():
             try:
-                # Get patient summary
-                summary = self.db.get_patient_summary(patient_id)
-                if summary:
-                    self.rag.index_patient_summary(patient_id, summary)
-
-                # Get all documents
-                documents = self.db.get_patient_documents_for_rag(patient_id)
-                if documents:
-                    self.rag.index_patient_documents(patient_id, documents)
-                logger.debug(f"Indexed patient {patient_id} for RAG")
+                embedded = self.rag_indexer.index_patient(patient_id)
+                logger.debug(f"Indexed patient {patient_id} for RAG ({embedded} documents embedded)")
             except Exception as e:
                 logger.error(f"Error indexing patient {patient_id} for RAG: {e}", exc_info=True)
 
@@ -309,15 +327,8 @@ class DocAssistApp:
                 return
 
             logger.debug(f"Searching patients with query: {query}")
-            # First try basic search
-            patients = self.db.search_patients_basic(query)
-
-            # If no results and query looks like natural language, try RAG search
-            if not patients and len(query.split()) > 2:
-                results = self.rag.search_patients(query, n_results=10)
-                if results:
-                    patient_ids = [r[0] for r in results]
-                    patients = [self.db.get_patient(pid) for pid in patient_ids if self.db.get_patient(pid)]
+            # Exact, FTS, phonetic and (for multi-word queries) vector search, rank-fused
+            patients = self.search_engine.search_as_you_type(query)
 
             if self.main_layout and self.main_layout.patient_panel:
                 self.main_layout.patient_panel.set_patients(patients)
@@ -332,13 +343,8 @@ class DocAssistApp:
             saved_patient = self.db.add_patient(patient)
             logger.info(f"Created new patient: {saved_patient.name} (ID: {saved_patient.id})")
 
-            # Index for RAG
-            summary = f"Patient: {saved_patient.name}. UHID: {saved_patient.uhid}"
-            if saved_patient.age:
-                summary += f". Age: {saved_patient.age}"
-            if saved_patient.gender:
-                summary += f". Gender: {saved_patient.gender}"
-            self.rag.index_patient_summary(saved_patient.id, summary)
+            # Index for RAG (the change journal already has the new patient)
+            self.rag_indexer.wake()
 
             self._load_patients()
 
@@ -354,18 +360,37 @@ class DocAssistApp:
         except Exception as e:
             logger.error(f"Error creating new patient: {e}", exc_info=True)
 
-    def _on_generate_prescription(self, clinical_notes: str, callback):
-        """Handle prescription generation."""
+    def _stream_to_ui(self, on_token, cancel_token: CancellationToken):
+        """Wrap a UI token callback so it runs on the UI thread and stops after cancellation."""
+        if on_token is None or self.page is None:
+            return None
+
+        def deliver(token: str):
+            if not cancel_token.cancelled:
+                self.page.run_thread_safe(lambda: on_token(token))
+
+        return deliver
+
+    def _on_generate_prescription(self, clinical_notes: str, callback, on_token=None):
+        """Handle prescription generation, streaming raw JSON to ``on_token``."""
         if not self.llm.is_available():
             logger.warning("Prescription generation attempted but Ollama not available")
             callback(False, None, "Ollama is not running. Please start Ollama first.")
             return
 
         logger.debug("Starting prescription generation")
+        cancel_token = self._llm_cancel
 
         def generate():
             try:
-                success, prescription, raw = self.llm.generate_prescription(clinical_notes)
+                success, prescription, raw = self.llm.generate_prescription(
+                    clinical_notes,
+                    on_token=self._stream_to_ui(on_token, cancel_token),
+                    cancel_token=cancel_token
+                )
+                if cancel_token.cancelled:
+                    logger.info("Prescription generation cancelled (patient changed)")
+                    return
                 if success:
                     logger.info("Prescription generated successfully")
 
@@ -402,8 +427,8 @@ class DocAssistApp:
             saved_visit = self.db.add_visit(visit)
             logger.info(f"Visit saved for patient {self.current_patient.id} (Visit ID: {saved_visit.id})")
 
-            # Reindex patient for RAG
-            self._index_patient_for_rag(self.current_patient.id)
+            # Reindex patient for RAG (only the new visit gets embedded)
+            self.rag_indexer.wake()
 
             # Stop consultation timer
             if self.main_layout and self.main_layout.status_bar:
@@ -452,8 +477,8 @@ class DocAssistApp:
             logger.error(f"Error generating PDF: {e}", exc_info=True)
             return None
 
-    def _on_rag_query(self, question: str, callback):
-        """Handle RAG query."""
+    def _on_rag_query(self, question: str, callback, on_token=None):
+        """Handle RAG query, streaming the answer to ``on_token``."""
         if not self.current_patient:
             logger.warning("RAG query attempted without current patient")
             callback(False, "Please select a patient first.")
@@ -465,18 +490,29 @@ class DocAssistApp:
             return
 
         logger.debug(f"RAG query for patient {self.current_patient.id}: {question}")
+        patient_id = self.current_patient.id
+        cancel_token = self._llm_cancel
 
         def query():
             try:
                 # Get relevant context
                 context = self.rag.query_patient_context(
-                    patient_id=self.current_patient.id,
+                    patient_id=patient_id,
                     query=question,
                     n_results=5
                 )
 
-                # Generate answer
-                success, answer = self.llm.query_patient_records(context, question)
+                # Generate answer (cached until this patient's records change)
+                success, answer = self.llm.query_patient_records(
+                    context,
+                    question,
+                    on_token=self._stream_to_ui(on_token, cancel_token),
+                    cancel_token=cancel_token,
+                    data_version=self.db.get_patient_data_version(patient_id)
+                )
+                if cancel_token.cancelled:
+                    logger.info("RAG query cancelled (patient changed)")
+                    return
 
                 if success:
                     logger.info("RAG query completed successfully")
@@ -599,6 +635,12 @@ class DocAssistApp:
             # Stop the scheduler
             self.scheduler.stop()
 
+        # Stop background RAG indexing
+        self.rag_indexer.stop()
+        self.search_engine.close()
+        self._llm_cancel.cancel()
+        self.llm_residency.stop()
+
     def _check_database_integrity(self):
         """Check database integrity and offer to restore if corrupted."""
         import sqlite3
@@ -27,8 +27,8 @@ from .components.voice_input_button_enhanced import VoiceInputButtonEnhanced, Tr
 from ..services.voice import is_voice_available
 from .reminder_dialog import show_reminder_settings
 from ..services.diagnosis.differential_engine import DifferentialEngine
-from ..services.diagnosis.red_flag_detector import RedFlagDetector
-from ..services.diagnosis.symptom_parser import parse_symptoms, extract_vitals_from_notes
+from ..services.diagnosis.red_flag_detector import RedFlagDetector, RedFlagEvaluation
+from ..services.diagnosis.symptom_parser import ParsedNote, get_symptom_parser, extract_vitals_from_notes
 from .components.differential_panel import DifferentialPanel
 from .components.red_flag_banner import RedFlagBanner
 from .components.care_gap_alert import CareGapAlert
@@ -75,6 +75,12 @@ class CentralPanel:
         # Debounce timer for updating differentials
         self._update_timer: Optional[threading.Timer] = None
 
+        # Last parse of the notes, so edits only re-scan the changed lines
+        self._parsed_note: Optional[ParsedNote] = None
+
+        # Running red flag evaluation, updated with the features that changed
+        self._red_flag_evaluation: Optional[RedFlagEvaluation] = None
+
         # Debounce timer for entity extraction
         self._extraction_timer: Optional[threading.Timer] = None
 
@@ -814,7 +820,9 @@ class CentralPanel:
             ], spacing=0),
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
 
-        # Enable generate and templates buttons
+        # Enable generate and templates buttons (a generation for the
+        # previous patient is cancelled by the app)
+        self.loading_indicator.visible = False
         self.generate_btn.disabled = False
         self.templates_btn.disabled = False
         self.save_btn.disabled = True
@@ -1624,8 +1632,17 @@ class CentralPanel:
         # Show loading
         self.loading_indicator.visible = True
         self.generate_btn.disabled = True
+        self.rx_display.controls.clear()
+        preview = ft.Text("", size=11, font_family="monospace", color=ft.Colors.GREY_600)
+        self.rx_display.controls.append(preview)
         e.page.update()
 
+        def on_token(token: str):
+            # Raw JSON preview while the model is still writing
+            preview.value += token
+            if preview.page:
+                preview.update()
+
         def callback(success: bool, prescription: Optional[Prescription], raw: str):
             self.loading_indicator.visible = False
             self.generate_btn.disabled = False
@@ -1646,7 +1663,7 @@ class CentralPanel:
             if e.page:
                 e.page.update()
 
-        self.on_generate_rx(clinical_notes, callback)
+        self.on_generate_rx(clinical_notes, callback, on_token=on_token)
 
     def _display_prescription(self, rx: Prescription):
         """Display the prescription in the UI."""
@@ -2094,7 +2111,8 @@ class CentralPanel:
 
         try:
             # Parse symptoms from clinical notes
-            symptoms = parse_symptoms(clinical_notes)
+            self._parsed_note = get_symptom_parser().parse_note(clinical_notes, self._parsed_note)
+            symptoms = self._parsed_note.symptoms
 
             # Extract vitals for red flag detection
             vitals_from_notes = extract_vitals_from_notes(clinical_notes)
@@ -2152,7 +2170,11 @@ class CentralPanel:
             if self.current_patient.age:
                 red_flag_presentation['age'] = self.current_patient.age
 
-            red_flags = self.red_flag_detector.check(red_flag_presentation)
+            if self._red_flag_evaluation is None:
+                self._red_flag_evaluation = self.red_flag_detector.evaluate(red_flag_presentation)
+            else:
+                self._red_flag_evaluation.update(red_flag_presentation)
+            red_flags = self._red_flag_evaluation.flags
 
             # Update UI in main thread
             if self.differential_panel and self.differential_panel.page:
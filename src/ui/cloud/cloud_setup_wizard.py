@@ -205,6 +205,13 @@ class CloudSetupWizard:
             width=400,
             value=self.config['credentials'].get('api_key', ''),
         )
+        self.account_email_field = ft.TextField(
+            label="Account Email (optional)",
+            hint_text="Same email you sign in with on the mobile app",
+            helper_text="Lets the phone download only what changed",
+            width=400,
+            value=self.config['credentials'].get('email', ''),
+        )
 
         return ft.Column([
             ft.Text("DocAssist Cloud Credentials", size=18, weight=ft.FontWeight.BOLD),
@@ -216,6 +223,7 @@ class CloudSetupWizard:
             ft.Divider(),
 
             self.api_key_field,
+            self.account_email_field,
 
             ft.Container(
                 content=ft.Column([
@@ -784,6 +792,7 @@ class CloudSetupWizard:
 
         if provider == 'docassist':
             config['api_key'] = self.api_key_field.value if hasattr(self, 'api_key_field') else self.config['credentials'].get('api_key', '')
+            config['email'] = (self.account_email_field.value if hasattr(self, 'account_email_field') else self.config['credentials'].get('email', '')).strip()
         elif provider == 's3':
             config.update({
                 'bucket': self.s3_bucket.value if hasattr(self, 's3_bucket') else self.config['credentials'].get('bucket', ''),
@@ -876,6 +885,7 @@ class CloudSetupWizard:
             provider = self.config['provider']
             if provider == 'docassist':
                 self.config['credentials']['api_key'] = self.api_key_field.value
+                self.config['credentials']['email'] = self.account_email_field.value
             elif provider == 's3':
                 self.config['credentials'].update({
                     'bucket': self.s3_bucket.value,
@@ -412,7 +412,7 @@ class MainLayout(ft.UserControl):
         if self.patient_panel:
             self.patient_panel.load_all_patients()
 
-    def _on_generate_prescription(self, clinical_notes: str, callback):
+    def _on_generate_prescription(self, clinical_notes: str, callback, on_token=None):
         """Handle prescription generation (delegated to app)."""
         pass  # Will be handled by app.py
 
@@ -424,7 +424,7 @@ class MainLayout(ft.UserControl):
         """Handle PDF generation (delegated to app)."""
         pass  # Will be handled by app.py
 
-    def _on_rag_query(self, question: str, callback):
+    def _on_rag_query(self, question: str, callback, on_token=None):
         """Handle RAG query (delegated to app)."""
         pass  # Will be handled by app.py
 
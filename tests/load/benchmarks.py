@@ -54,6 +54,11 @@ BENCHMARKS = {
         'max_ms': 600,
         'description': 'Search with age/gender filters'
     },
+    'drug_autocomplete': {
+        'target_ms': 5,
+        'max_ms': 20,
+        'description': 'Drug search per keystroke in a 50K-brand formulary'
+    },
 
     # Report generation
     'daily_summary': {
@@ -99,6 +104,33 @@ BENCHMARKS = {
         'description': 'Process 10 queued LLM requests'
     },
 
+    # Backups
+    'full_backup': {
+        'target_ms': 5000,
+        'max_ms': 20000,
+        'description': 'Full zip backup of DB + vector store'
+    },
+    'incremental_backup': {
+        'target_ms': 2000,
+        'max_ms': 10000,
+        'description': 'Incremental backup after a few new visits'
+    },
+    'stream_encrypt_64mb': {
+        'target_ms': 1000,
+        'max_ms': 8000,
+        'description': 'Streaming encryption of a 64 MB backup file'
+    },
+    'stream_decrypt_64mb': {
+        'target_ms': 1000,
+        'max_ms': 8000,
+        'description': 'Streaming decryption of a 64 MB backup file'
+    },
+    'pipelined_cloud_backup': {
+        'target_ms': 3000,
+        'max_ms': 15000,
+        'description': 'Streamed cloud backup of 24 MB over a 20 MB/s link'
+    },
+
     # Startup and initialization
     'app_startup': {
         'target_ms': 2000,
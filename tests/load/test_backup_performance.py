@@ -0,0 +1,168 @@
+"""Backup load tests.
+
+Compares the full zip backup with incremental (chunk-deduplicated) backups:
+wall time, and bytes written for a backup taken after a few new visits.
+Also measures streaming encryption throughput in MB/s, and the pipelined
+cloud backup against the old create-zip, encrypt, then upload sequence.
+"""
+
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.models.schemas import Visit
+from src.services.backup import BackupService
+from src.services.backup_pipeline import BackupPipeline
+from src.services.crypto import CryptoService, is_crypto_available
+from src.services.sync import LocalStorageBackend, SyncService
+from src.services.database import DatabaseService
+from tests.load.benchmarks import BENCHMARKS, format_benchmark_result
+
+
+@pytest.fixture
+def clinic_data(small_db):
+    """Data directory with the small DB and a few MB of vector-store files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_dir = Path(tmpdir) / "data"
+        (data_dir / "chroma").mkdir(parents=True)
+        source = sqlite3.connect(small_db.db_path)
+        dest = sqlite3.connect(data_dir / "clinic.db")
+        source.backup(dest)
+        source.close()
+        dest.close()
+        rng = random.Random(0)
+        for i in range(4):
+            (data_dir / "chroma" / f"segment_{i}.bin").write_bytes(rng.randbytes(1024 * 1024))
+        yield data_dir
+
+
+def add_visits(data_dir: Path, count: int):
+    db = DatabaseService(db_path=str(data_dir / "clinic.db"))
+    for _ in range(count):
+        db.add_visit(Visit(patient_id=1, chief_complaint="Follow up", diagnosis="Hypertension"))
+    db.close()
+
+
+class TestBackupPerformance:
+    """Full vs incremental backup cost."""
+
+    def test_incremental_after_small_change(self, clinic_data, timer):
+        """A backup after 5 new visits should write a fraction of a full zip."""
+        service = BackupService(data_dir=clinic_data, backup_dir=clinic_data / "backups", max_backups=100)
+        service.create_incremental_backup()  # First backup stores everything
+        add_visits(clinic_data, 5)
+
+        with timer("Full zip backup") as full_t:
+            full_path = service.create_backup()
+        with timer("Incremental backup") as inc_t:
+            manifest_path = service.create_incremental_backup()
+
+        full_bytes = full_path.stat().st_size
+        inc_bytes = service.incremental_store.read_manifest(manifest_path)["stats"]["bytes_written"]
+
+        print(f"\n  {full_t}: {full_bytes:,} bytes written")
+        print(f"  {inc_t}: {inc_bytes:,} bytes written ({inc_bytes / full_bytes:.1%} of full)")
+        print(f"\n{format_benchmark_result('full_backup', full_t.elapsed_ms, BENCHMARKS['full_backup'])}")
+        print(f"{format_benchmark_result('incremental_backup', inc_t.elapsed_ms, BENCHMARKS['incremental_backup'])}")
+
+        assert inc_bytes < full_bytes / 5
+        assert inc_t.elapsed_ms <= BENCHMARKS['incremental_backup']['max_ms']
+
+
+@pytest.mark.skipif(not is_crypto_available(), reason="Cryptography libraries not available")
+class TestEncryptionThroughput:
+    """Streaming encryption of large backup files."""
+
+    SIZE_MB = 64
+
+    def test_stream_encrypt_decrypt_throughput(self, tmp_path, timer):
+        """Encrypt and decrypt a 64 MB file; report MB/s."""
+        crypto = CryptoService()
+        source = tmp_path / "backup.zip"
+        rng = random.Random(0)
+        with open(source, 'wb') as f:
+            for _ in range(self.SIZE_MB):
+                f.write(rng.randbytes(1024 * 1024))
+
+        # Key derivation is a fixed ~0.5s cost; measure it separately
+        with timer("Key derivation") as kdf_t:
+            crypto.derive_key("password", crypto.generate_salt())
+        with timer("Stream encrypt") as enc_t:
+            assert crypto.encrypt_file(source, tmp_path / "backup.enc", "password")
+        with timer("Stream decrypt") as dec_t:
+            assert crypto.decrypt_file(tmp_path / "backup.enc", tmp_path / "restored.zip", "password")
+
+        enc_ms = enc_t.elapsed_ms - kdf_t.elapsed_ms
+        dec_ms = dec_t.elapsed_ms - kdf_t.elapsed_ms
+        print(f"\n  {kdf_t}")
+        print(f"  Encrypt: {self.SIZE_MB / (enc_ms / 1000):.0f} MB/s (excluding key derivation)")
+        print(f"  Decrypt: {self.SIZE_MB / (dec_ms / 1000):.0f} MB/s (excluding key derivation)")
+        print(f"\n{format_benchmark_result('stream_encrypt_64mb', enc_ms, BENCHMARKS['stream_encrypt_64mb'])}")
+        print(f"{format_benchmark_result('stream_decrypt_64mb', dec_ms, BENCHMARKS['stream_decrypt_64mb'])}")
+
+        assert (tmp_path / "restored.zip").stat().st_size == source.stat().st_size
+        assert enc_ms <= BENCHMARKS['stream_encrypt_64mb']['max_ms']
+        assert dec_ms <= BENCHMARKS['stream_decrypt_64mb']['max_ms']
+
+
+class ThrottledBackend(LocalStorageBackend):
+    """Local backend limited to a fixed upload bandwidth."""
+
+    BYTES_PER_SECOND = 20 * 1024 * 1024
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self._link = threading.Lock()
+
+    def upload(self, local_path, remote_key, progress_callback=None):
+        time.sleep(local_path.stat().st_size / self.BYTES_PER_SECOND)
+        return super().upload(local_path, remote_key, progress_callback)
+
+    def upload_part(self, remote_key, upload_id, part_number, data, checksum=None):
+        # One link shared by all parts in flight
+        with self._link:
+            time.sleep(len(data) / self.BYTES_PER_SECOND)
+        return super().upload_part(remote_key, upload_id, part_number, data, checksum=checksum)
+
+
+@pytest.mark.skipif(not is_crypto_available(), reason="Cryptography libraries not available")
+class TestPipelinedCloudBackup:
+    """Streamed cloud backup vs zip -> encrypt -> upload."""
+
+    def test_pipelined_faster_than_sequential(self, clinic_data, timer, monkeypatch):
+        """Pipelined wall time should track the slowest stage, not the sum."""
+        rng = random.Random(1)
+        for i in range(5):
+            (clinic_data / "chroma" / f"extra_{i}.bin").write_bytes(rng.randbytes(4 * 1024 * 1024))
+        service = BackupService(data_dir=clinic_data, backup_dir=clinic_data / "backups", max_backups=100)
+        backend = ThrottledBackend(clinic_data / "cloud")
+        service._create_backend = lambda config: backend
+
+        with timer("Sequential (zip, encrypt, upload)") as seq_t:
+            path = service.create_backup(encrypt=True, password="password")
+            assert SyncService(backend, service.backup_dir).upload_backup(path)
+
+        stages = {}
+        original = BackupPipeline.upload
+
+        def capture(self, *args, **kwargs):
+            result = original(self, *args, **kwargs)
+            stages.update(result.stage_seconds)
+            return result
+
+        monkeypatch.setattr(BackupPipeline, "upload", capture)
+        with timer("Pipelined") as pipe_t:
+            assert service.sync_to_cloud("password", {"type": "local"})
+
+        print(f"\n  {seq_t}")
+        print(f"  {pipe_t}")
+        print("  Stage busy time: " + ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in stages.items()))
+        print(f"\n{format_benchmark_result('pipelined_cloud_backup', pipe_t.elapsed_ms, BENCHMARKS['pipelined_cloud_backup'])}")
+
+        assert pipe_t.elapsed_ms < seq_t.elapsed_ms
+        assert pipe_t.elapsed_ms <= BENCHMARKS['pipelined_cloud_backup']['max_ms']
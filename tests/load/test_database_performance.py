@@ -328,6 +328,143 @@ class TestDatabasePerformance:
         assert t.elapsed_ms <= 1000, \
             f"Concurrent reads too slow: {t.elapsed_ms:.2f}ms"
 
+    def test_bundle_loader_vs_per_patient_queries(self, medium_db, timer):
+        """Whole-clinic loads should take a fixed number of queries, not 3 per patient."""
+        db = medium_db
+        patient_ids = [p.id for p in db.get_all_patients()]
+
+        with timer("Per-patient getters") as t_per_patient:
+            per_patient_rows = 0
+            for patient_id in patient_ids:
+                per_patient_rows += len(db.get_patient_visits(patient_id))
+                per_patient_rows += len(db.get_patient_investigations(patient_id))
+                per_patient_rows += len(db.get_patient_procedures(patient_id))
+
+        statements = []
+        with db.get_read_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                with timer("Batched bundles") as t_bundles:
+                    bundles = db.get_patient_bundles(
+                        patient_ids, include=("visits", "investigations", "procedures")
+                    )
+            finally:
+                conn.set_trace_callback(None)
+
+        bundle_rows = sum(
+            len(b.visits) + len(b.investigations) + len(b.procedures)
+            for b in bundles.values()
+        )
+
+        print(f"\n  {t_per_patient} - {len(patient_ids) * 3} queries")
+        print(f"  {t_bundles} - {len(statements)} queries")
+
+        assert bundle_rows == per_patient_rows
+        batches = -(-len(patient_ids) // db.BUNDLE_BATCH_SIZE)
+        assert len(statements) == 4 * batches
+        assert t_bundles.elapsed_ms <= 1000, \
+            f"Bundle loading too slow: {t_bundles.elapsed_ms:.2f}ms > 1000ms"
+
+
+class TestConnectionPoolPerformance:
+    """Benchmark pooled connections against opening one per call."""
+
+    ITERATIONS = 500
+
+    def test_pooled_vs_per_call_reads(self, small_db, timer):
+        """Pooled reads should beat a fresh sqlite3.connect() per query."""
+        import sqlite3
+
+        db = small_db
+        patient_ids = [p.id for p in db.get_all_patients()]
+        assert patient_ids, "No patients in database"
+
+        def per_call_read(patient_id):
+            conn = sqlite3.connect(db.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                return conn.execute(
+                    "SELECT * FROM patients WHERE id = ?", (patient_id,)
+                ).fetchone()
+            finally:
+                conn.close()
+
+        with timer("Per-call connect") as t_per_call:
+            for i in range(self.ITERATIONS):
+                per_call_read(patient_ids[i % len(patient_ids)])
+
+        with timer("Pooled connection") as t_pooled:
+            for i in range(self.ITERATIONS):
+                db.get_patient(patient_ids[i % len(patient_ids)])
+
+        per_call_avg = t_per_call.elapsed_ms / self.ITERATIONS
+        pooled_avg = t_pooled.elapsed_ms / self.ITERATIONS
+        print(f"\n  Per-call open: {per_call_avg:.3f}ms/read")
+        print(f"  Pooled:        {pooled_avg:.3f}ms/read")
+        print(f"  Speedup:       {per_call_avg / max(pooled_avg, 1e-6):.1f}x")
+
+        # Connections are reused, not reopened per call
+        assert db._reader_pool.stats.opened <= db.READER_POOL_SIZE
+        assert t_pooled.elapsed_ms < t_per_call.elapsed_ms, \
+            "Pooled reads should be faster than per-call connections"
+
+    def test_reads_not_blocked_by_open_write(self, small_db, timer):
+        """A long write transaction must not stall readers (WAL)."""
+        db = small_db
+        patient = db.get_all_patients()[0]
+        write_started = threading.Event()
+        release_write = threading.Event()
+
+        def hold_write_transaction():
+            with db.get_connection() as conn:
+                conn.execute(
+                    "UPDATE patients SET address = ? WHERE id = ?",
+                    ("pending", patient.id)
+                )
+                write_started.set()
+                release_write.wait(timeout=5)
+
+        writer = threading.Thread(target=hold_write_transaction)
+        writer.start()
+        try:
+            assert write_started.wait(timeout=5)
+
+            with timer("Read during write") as t:
+                result = db.get_patient(patient.id)
+
+            print(f"  {t}")
+            assert result is not None
+            # Reader sees the last committed snapshot, not the pending write
+            assert result.address != "pending"
+            assert t.elapsed_ms <= 100, \
+                f"Read blocked behind writer: {t.elapsed_ms:.2f}ms"
+        finally:
+            release_write.set()
+            writer.join()
+
+    def test_concurrent_mixed_workload(self, small_db, timer):
+        """Concurrent readers and writers finish without 'database is locked'."""
+        db = small_db
+        patient_ids = [p.id for p in db.get_all_patients()[:20]]
+
+        def writer(i):
+            visit_data = generate_visit(patient_ids[i % len(patient_ids)])
+            return db.add_visit(Visit(**visit_data)).id
+
+        def reader(i):
+            return len(db.get_patient_visits(patient_ids[i % len(patient_ids)]))
+
+        with timer("Mixed read/write workload") as t:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [executor.submit(writer, i) for i in range(20)]
+                futures += [executor.submit(reader, i) for i in range(100)]
+                for future in as_completed(futures):
+                    future.result()
+
+        print(f"  {t}")
+        assert t.elapsed_ms <= 5000, \
+            f"Mixed workload too slow: {t.elapsed_ms:.2f}ms"
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
@@ -0,0 +1,129 @@
+"""Drug autocomplete performance tests.
+
+Types queries a keystroke at a time against a synthetic formulary of 50K
+brands and compares the indexed search with the substring scan it
+replaced: prefixes, infixes and typos.
+"""
+
+import json
+import random
+
+import pytest
+
+from src.services.drugs import DrugDatabase
+from tests.load.benchmarks import BENCHMARKS, format_benchmark_result
+
+BRAND_COUNT = 50_000
+
+SYLLABLES = [
+    'am', 'lo', 'di', 'pine', 'met', 'for', 'min', 'pa', 'ra', 'ce', 'ta', 'mol', 'cef', 'ix',
+    'ime', 'tor', 'va', 'sta', 'tin', 'az', 'ith', 'ro', 'my', 'cin', 'pan', 'to', 'zole',
+    'glim', 'epi', 'ride', 'tel', 'mi', 'sar', 'tan', 'mox', 'cil', 'lin', 'ol', 'dex', 'ine',
+]
+SUFFIXES = ['', '', ' Forte', ' DS', ' Plus', '-XR', ' 500', ' Duo']
+
+
+def scan_search(db, query, limit):
+    """The substring scan DrugDatabase.search() used before indexing."""
+    query_lower = query.lower()
+    results = []
+    seen = set()
+    for name, drug in db.drugs.items():
+        if query_lower in name and drug.generic_name not in seen:
+            results.append(drug)
+            seen.add(drug.generic_name)
+    for brand, generic in db.brand_index.items():
+        if query_lower in brand and generic not in seen and generic.lower() in db.drugs:
+            results.append(db.drugs[generic.lower()])
+            seen.add(generic)
+    for salt, generics in db.salt_index.items():
+        if query_lower in salt:
+            for generic in generics:
+                if generic not in seen and generic.lower() in db.drugs:
+                    results.append(db.drugs[generic.lower()])
+                    seen.add(generic)
+    return results[:limit]
+
+
+@pytest.fixture(scope='module')
+def formulary(tmp_path_factory):
+    """DrugDatabase with ~2K generics and 50K brands, plus a prescribing history."""
+    rng = random.Random(42)
+
+    def word(parts):
+        return ''.join(rng.choice(SYLLABLES) for _ in range(parts))
+
+    generics = sorted({word(rng.randint(3, 4)) for _ in range(2500)})[:2000]
+    drugs = {g: [] for g in generics}
+    brands = set()
+    while len(brands) < BRAND_COUNT:
+        brand = word(rng.randint(2, 3)).title() + rng.choice(SUFFIXES)
+        if brand.lower() not in brands:
+            brands.add(brand.lower())
+            generic = rng.choice(generics)
+            drugs[generic].append({
+                'brand_name': brand,
+                'salt': generic.title() + rng.choice(['', ' HCl', ' Sodium']),
+                'strength': '500mg',
+                'form': 'tablet',
+                'manufacturer': 'Synthetic',
+                'price_approx': 1.0,
+            })
+
+    path = tmp_path_factory.mktemp('formulary')
+    (path / 'drug_database.json').write_text(json.dumps({'drugs': [
+        {'generic_name': g, 'drug_class': 'synthetic', 'category': 'synthetic', 'formulations': forms}
+        for g, forms in drugs.items()
+    ]}))
+
+    db = DrugDatabase(data_path=str(path))
+    db.set_prescribing_frequency({rng.choice(generics): rng.randint(1, 50) for _ in range(200)})
+    return db
+
+
+def keystrokes(word):
+    """Queries as typed, from two characters on (as the autocomplete does)."""
+    return [word[:i] for i in range(2, len(word) + 1)]
+
+
+class TestDrugSearchPerformance:
+    """Test suite for drug autocomplete performance."""
+
+    def test_formulary_size(self, formulary):
+        assert len(formulary.brand_index) == BRAND_COUNT
+
+    @pytest.mark.parametrize('label, words', [
+        ('prefix', ['paracetamol', 'glimepiride', 'telmisartan']),
+        ('infix', ['cetamol', 'misartan', 'moxicil']),
+        ('typo', ['paracetmol', 'glimepride', 'amoxicilin']),
+    ])
+    def test_keystroke_search(self, formulary, timer, label, words):
+        """Per-keystroke search should meet the target and beat the scan."""
+        benchmark = BENCHMARKS['drug_autocomplete']
+        queries = [q for w in words for q in keystrokes(w)]
+
+        with timer(f"Indexed {label} search") as indexed:
+            for query in queries:
+                formulary.search(query, limit=10)
+        with timer(f"Scan {label} search") as scanned:
+            for query in queries:
+                scan_search(formulary, query, limit=10)
+
+        avg_ms = indexed.elapsed_ms / len(queries)
+        scan_ms = scanned.elapsed_ms / len(queries)
+        print(f"\n{format_benchmark_result('drug_autocomplete', avg_ms, benchmark)}")
+        print(f"  Substring scan: {scan_ms:.2f}ms per keystroke ({scan_ms / avg_ms:.0f}x slower)")
+
+        assert avg_ms <= benchmark['target_ms'], \
+            f"Drug {label} search too slow: {avg_ms:.2f}ms > {benchmark['target_ms']}ms"
+
+    def test_results_cover_substring_matches(self, formulary):
+        """Indexed results include every drug the scan finds."""
+        for query in ['pa', 'cetamol', 'sar', 'mox', 'forte']:
+            scanned = {d.generic_name for d in scan_search(formulary, query, limit=10_000)}
+            indexed = {d.generic_name for d in formulary.search(query, limit=10_000)}
+            assert scanned <= indexed
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '-s'])
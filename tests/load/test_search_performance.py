@@ -6,6 +6,8 @@ fuzzy, and natural language search.
 
 import pytest
 import time
+from src.services.hybrid_search import HybridSearchEngine
+from src.services.phonetic import PhoneticIndex
 from tests.load.benchmarks import BENCHMARKS, format_benchmark_result
 
 
@@ -13,9 +15,11 @@ class TestSearchPerformance:
     """Test suite for search performance."""
 
     def test_phonetic_search_10k(self, large_db, timer):
-        """Phonetic search for common surname in 10K patients should complete in <500ms."""
+        """Phonetic search for common surname in 10K patients should meet the 200ms target."""
         db = large_db
         benchmark = BENCHMARKS['phonetic_search']
+        index = PhoneticIndex(db)
+        index.search('warm up')  # Load the typo-tolerance tree once
 
         # Common Indian surnames
         surnames = ['Sharma', 'Kumar', 'Singh', 'Patel', 'Gupta']
@@ -23,8 +27,7 @@ class TestSearchPerformance:
         total_time = 0
         for surname in surnames:
             with timer(f"Phonetic search '{surname}'") as t:
-                # Basic search (phonetic would need additional implementation)
-                results = db.search_patients_basic(surname)
+                results = index.search(surname, limit=50)
 
             print(f"  {t} - Found {len(results)} patients")
             total_time += t.elapsed_ms
@@ -32,8 +35,8 @@ class TestSearchPerformance:
         avg_time = total_time / len(surnames)
         print(f"\n{format_benchmark_result('phonetic_search', avg_time, benchmark)}")
 
-        assert avg_time <= benchmark['max_ms'], \
-            f"Phonetic search too slow: {avg_time:.2f}ms > {benchmark['max_ms']}ms"
+        assert avg_time <= benchmark['target_ms'], \
+            f"Phonetic search too slow: {avg_time:.2f}ms > {benchmark['target_ms']}ms"
 
     def test_fuzzy_search_performance(self, large_db, timer):
         """Fuzzy search with typos should complete in <800ms."""
@@ -64,13 +67,13 @@ class TestSearchPerformance:
             f"Fuzzy search too slow: {avg_time:.2f}ms > {benchmark['max_ms']}ms"
 
     def test_natural_language_search(self, large_db, timer):
-        """Natural language search should complete in <2000ms.
+        """Hybrid (exact + FTS + clinical + phonetic) search should meet the 500ms target.
 
-        Note: This test simulates natural language search. Full implementation
-        would require semantic search with embeddings.
+        Vector retrieval is left out here; it needs an embedding model.
         """
         db = large_db
         benchmark = BENCHMARKS['natural_language_search']
+        engine = HybridSearchEngine(db)
 
         # Natural language queries
         queries = [
@@ -83,27 +86,17 @@ class TestSearchPerformance:
         total_time = 0
         for query in queries:
             with timer(f"NL search '{query}'") as t:
-                # Simulate NL search by searching diagnosis
-                # Full implementation would use RAG/embeddings
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        SELECT DISTINCT p.*
-                        FROM patients p
-                        JOIN visits v ON p.id = v.patient_id
-                        WHERE v.diagnosis LIKE ?
-                        LIMIT 100
-                    """, (f'%{query.split()[0]}%',))
-                    results = cursor.fetchall()
+                results = engine.search(query, limit=100)
 
             print(f"  {t} - Query '{query}' found {len(results)} patients")
             total_time += t.elapsed_ms
+        engine.close()
 
         avg_time = total_time / len(queries)
         print(f"\n{format_benchmark_result('natural_language_search', avg_time, benchmark)}")
 
-        assert avg_time <= benchmark['max_ms'], \
-            f"Natural language search too slow: {avg_time:.2f}ms > {benchmark['max_ms']}ms"
+        assert avg_time <= benchmark['target_ms'], \
+            f"Natural language search too slow: {avg_time:.2f}ms > {benchmark['target_ms']}ms"
 
     def test_search_with_filters(self, large_db, timer):
         """Search with age and gender filters should complete in <600ms."""
@@ -323,6 +316,47 @@ class TestSearchPerformance:
             assert avg <= 300, \
                 f"Case-insensitive search too slow: {avg:.2f}ms > 300ms"
 
+    def test_fts_patient_search_10k(self, large_db, timer):
+        """FTS5 patient search should meet the patient_search target (<100ms)."""
+        db = large_db
+        benchmark = BENCHMARKS['patient_search']
+
+        queries = ['Sharma', 'Kumar', 'Priya', 'Raj', 'EMR-2024']
+
+        total_time = 0
+        for query in queries:
+            with timer(f"FTS search '{query}'") as t:
+                results = db.fts_search_patients(query, limit=50)
+
+            print(f"  {t} - Found {len(results)} patients")
+            total_time += t.elapsed_ms
+
+        avg_time = total_time / len(queries)
+        print(f"\n{format_benchmark_result('patient_search', avg_time, benchmark)}")
+
+        assert avg_time <= benchmark['target_ms'], \
+            f"FTS search too slow: {avg_time:.2f}ms > {benchmark['target_ms']}ms"
+
+    def test_fts_clinical_search(self, large_db, timer):
+        """FTS5 clinical search across all visits should stay interactive."""
+        db = large_db
+
+        queries = ['diabetes', 'hypertension metformin', 'fever cough', 'asthma']
+
+        total_time = 0
+        for query in queries:
+            with timer(f"Clinical FTS '{query}'") as t:
+                results = db.fts_search_clinical(query, limit=20)
+
+            print(f"  {t} - Found {len(results)} records")
+            total_time += t.elapsed_ms
+
+        avg_time = total_time / len(queries)
+        print(f"\nAverage clinical FTS search: {avg_time:.2f}ms")
+
+        assert avg_time <= 200, \
+            f"Clinical FTS search too slow: {avg_time:.2f}ms > 200ms"
+
     def test_empty_result_search(self, large_db, timer):
         """Search with no results should be fast."""
         db = large_db
@@ -0,0 +1,164 @@
+"""Tests for token estimates and budget-aware context packing."""
+
+import pytest
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch, MagicMock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.context_builder import ContextBuilder
+from src.services.database import DatabaseService
+from src.services.llm import LLMService
+from src.services.token_budget import (
+    ContextSection,
+    estimate_tokens,
+    fit_context,
+    pack_sections,
+    shorten_section,
+)
+from src.models.schemas import Investigation, Patient, Visit
+
+
+def lines(heading, count):
+    return "\n".join([heading] + [f"• 2024-01-{i + 1:02d}: Creatinine = 1.{i} mg/dL" for i in range(count)])
+
+
+@pytest.fixture
+def db_service():
+    """Patient with many hemoglobin results and visits."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        patient = db.add_patient(Patient(name="Ram Lal", age=60, gender="M"))
+        for i in range(15):
+            db.add_investigation(Investigation(
+                patient_id=patient.id, test_name="Hemoglobin", result=f"1{i % 5}.{i}",
+                unit="g/dL", test_date=date(2024, 1, 1) + timedelta(days=30 * i)
+            ))
+            db.add_visit(Visit(
+                patient_id=patient.id, chief_complaint="Follow up", diagnosis="CKD stage 3",
+                clinical_notes="Stable on current medication. " * 10
+            ))
+        yield db
+        db.close()
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens."""
+
+    def test_counts_words_digits_and_symbols(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("creatinine") == 3
+        assert estimate_tokens("1.4") == 3
+
+    def test_repeated_symbols_merge(self):
+        """Test a divider line costs far less than one token per character."""
+        assert estimate_tokens("═" * 50) < 50
+
+    def test_non_ascii_costs_more(self):
+        """Test Hindi and emoji are counted per character, above ASCII."""
+        assert estimate_tokens("सिर दर्द") > estimate_tokens("headache")
+
+
+class TestPackSections:
+    """Tests for pack_sections and fit_context."""
+
+    def test_everything_fits(self):
+        sections = [ContextSection("B", priority=1), ContextSection("A", priority=0)]
+
+        assert pack_sections(sections, 100) == "A\n\nB"
+
+    def test_large_section_shortened_to_heading_and_first_lines(self):
+        """Test a section over budget keeps its heading, newest lines and a note."""
+        packed = pack_sections([ContextSection(lines("=== CREATININE ===", 20))], 40)
+
+        assert packed.startswith("=== CREATININE ===\n• 2024-01-01")
+        assert packed.endswith("more lines omitted]")
+        assert estimate_tokens(packed) <= 40
+
+    def test_low_priority_dropped_before_high(self):
+        """Test the least relevant section is the one that goes."""
+        header = ContextSection("PATIENT: Ram Lal, 60M", priority=0)
+        routed = ContextSection(lines("=== CREATININE ===", 3), priority=1)
+        fts = ContextSection(lines("=== RELATED RECORDS ===", 20), priority=2)
+        budget = estimate_tokens(header.text) + estimate_tokens(routed.text) + 5
+
+        packed = pack_sections([fts, routed, header], budget)
+
+        assert packed == f"{header.text}\n\n{routed.text}"
+
+    def test_smaller_section_fills_leftover_space(self):
+        """Test a section too big to use does not block a later small one."""
+        big = ContextSection("ONE LINE THAT IS FAR TOO LONG " * 20, priority=1)
+        small = ContextSection("No procedures on record.", priority=2)
+
+        assert pack_sections([big, small], 20) == "No procedures on record."
+
+    def test_fit_context_keeps_leading_blocks(self):
+        """Test retrieved context keeps its most relevant (first) blocks whole."""
+        blocks = [f"[VISIT - 2024-0{i}-01]\nDiagnosis: CKD stage {i}" for i in range(1, 10)]
+        context = "\n\n".join(blocks)
+        budget = estimate_tokens("\n\n".join(blocks[:3])) + 2
+
+        fitted = fit_context(context, budget)
+
+        assert fitted.startswith("\n\n".join(blocks[:3]))
+        assert "CKD stage 9" not in fitted
+        assert fit_context(context, 10_000) == context
+
+    def test_shorten_needs_heading_and_one_line(self):
+        assert shorten_section(lines("=== LABS ===", 5), 5) == ""
+
+
+class TestContextBuilderBudget:
+    """Tests for ContextBuilder.build_context with a token budget."""
+
+    def test_unbudgeted_context_unchanged(self, db_service):
+        """Test build_context without a budget still joins every section."""
+        builder = ContextBuilder(db_service)
+        sections = builder.build_sections(1, "last hemoglobin")
+
+        assert builder.build_context(1, "last hemoglobin") == "\n\n".join(s.text for s in sections)
+        assert [s.name for s in sections] == ["header", "lab", "history"]
+
+    def test_budget_respected_with_header_first(self, db_service):
+        """Test a tight budget keeps the snapshot header and trims the history."""
+        builder = ContextBuilder(db_service)
+        full = builder.build_context(1, "visit history and hemoglobin")
+
+        packed = builder.build_context(1, "visit history and hemoglobin", max_tokens=200)
+
+        assert estimate_tokens(full) > 200
+        assert estimate_tokens(packed) <= 200
+        assert packed.startswith("═")
+        assert "PATIENT:" in packed
+
+
+class TestLLMContextBudget:
+    """Tests for prompt budgeting in LLMService."""
+
+    @pytest.fixture
+    def llm(self):
+        with patch("src.services.llm.psutil") as mock_psutil:
+            # 3GB free -> num_ctx 1024
+            mock_psutil.virtual_memory.return_value = MagicMock(
+                total=16 * 1024 ** 3, available=3 * 1024 ** 3, percent=80.0
+            )
+            service = LLMService(model_override="qwen2.5:3b", response_cache_size=0)
+            service.generate = MagicMock(return_value=(True, "answer"))
+            yield service
+
+    def test_question_survives_long_context(self, llm):
+        """Test oversized context loses its tail, never the question."""
+        blocks = [f"[INVESTIGATION - 2024-01-{i % 28 + 1:02d}]\nCreatinine = 1.{i} mg/dL" for i in range(300)]
+
+        llm.query_patient_records("\n\n".join(blocks), "What was the last creatinine?")
+
+        prompt = llm.generate.call_args[0][0]
+        assert prompt.rstrip().endswith("ANSWER (be concise and clinical):")
+        assert "What was the last creatinine?" in prompt
+        assert blocks[0] in prompt
+        assert blocks[-1] not in prompt
+        assert estimate_tokens(prompt) <= llm.prompt_token_budget()
@@ -0,0 +1,223 @@
+"""Tests for embedding providers and the query embedding cache."""
+
+import pickle
+import pytest
+import tempfile
+import types
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import rag as rag_module
+from src.services.embeddings import (
+    EmbeddingProvider,
+    OnnxMiniLMEmbeddingProvider,
+    QueryEmbeddingCache,
+    SentenceTransformerEmbeddingProvider,
+    create_embedding_provider,
+    normalize_query,
+)
+from src.services.rag import RAGService
+from tests.services.test_rag_indexer import FakeCollection, FakeEmbeddingProvider
+
+
+class QueryableCollection(FakeCollection):
+    """FakeCollection that answers queries with every stored document."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = []
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.queries.append(query_embeddings)
+        results = self.get(where=where)
+        return {
+            "ids": [results["ids"][:n_results]],
+            "documents": [results["documents"][:n_results]],
+            "metadatas": [results["metadatas"][:n_results]],
+            "distances": [[0.0] * len(results["ids"][:n_results])],
+        }
+
+
+class RecordingCollector:
+    """Stand-in for MetricsCollector that keeps recorded timings."""
+
+    def __init__(self):
+        self.timings = []
+
+    def record_timing(self, name, duration_ms, tags=None):
+        self.timings.append((name, tags))
+
+
+@pytest.fixture
+def rag_service():
+    """RAGService with a fake provider and queryable in-memory collections."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rag = RAGService(persist_directory=tmpdir, embedding_provider=FakeEmbeddingProvider())
+        rag.patient_summaries = QueryableCollection()
+        rag.patient_documents = QueryableCollection()
+        yield rag
+        rag.query_cache.close()
+
+
+class TestEmbeddingProvider:
+    """Tests for EmbeddingProvider."""
+
+    def test_embeds_in_batches(self):
+        """Test texts are split into batch_size model calls."""
+        provider = FakeEmbeddingProvider(batch_size=2)
+        calls = []
+        embed = provider._embed
+        provider._embed = lambda texts: calls.append(len(texts)) or embed(texts)
+
+        vectors = provider.embed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+
+        assert calls == [2, 2, 1]
+        assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    def test_pickles_without_model(self):
+        """Test a loaded provider pickles without its model."""
+        provider = FakeEmbeddingProvider()
+        provider.embed_query("warm up")
+
+        restored = pickle.loads(pickle.dumps(provider))
+
+        assert provider._model is not None
+        assert restored._model is None
+        assert restored.embed_query("abc") == [3.0, 1.0]
+
+    def test_collection_suffix_per_model(self):
+        """Test non-default models get their own collections."""
+        assert create_embedding_provider("default").collection_suffix == ""
+        assert SentenceTransformerEmbeddingProvider(
+            "sentence-transformers/paraphrase-MiniLM-L3-v2"
+        ).collection_suffix == "__sentence_transformers_paraphrase_minilm_l3_v2"
+
+    def test_base_class_is_abstract(self):
+        """Test providers must implement _load and _embed."""
+        with pytest.raises(TypeError):
+            EmbeddingProvider("incomplete")
+
+    def test_onnx_session_uses_thread_limit(self, monkeypatch):
+        """Test num_threads reaches onnxruntime through the session options."""
+        sessions = []
+
+        class FakeDefaultEmbeddingFunction:
+            DOWNLOAD_PATH = "/models/onnx"
+            EXTRACTED_FOLDER_NAME = "minilm"
+
+            def _download_model_if_not_exists(self):
+                pass
+
+        class FakeSessionOptions:
+            pass
+
+        onnxruntime = types.SimpleNamespace(
+            SessionOptions=FakeSessionOptions,
+            InferenceSession=lambda path, sess_options, providers: sessions.append((path, sess_options)) or "session",
+        )
+        embedding_functions = types.SimpleNamespace(DefaultEmbeddingFunction=FakeDefaultEmbeddingFunction)
+        monkeypatch.setitem(sys.modules, "onnxruntime", onnxruntime)
+        monkeypatch.setitem(sys.modules, "chromadb", types.SimpleNamespace())
+        monkeypatch.setitem(sys.modules, "chromadb.utils", types.SimpleNamespace(embedding_functions=embedding_functions))
+
+        model = OnnxMiniLMEmbeddingProvider(num_threads=2).model
+
+        [(path, options)] = sessions
+        assert model.model == "session"
+        assert path == str(Path("/models/onnx/minilm/model.onnx"))
+        assert options.intra_op_num_threads == 2
+
+    def test_settings_from_environment(self, monkeypatch):
+        """Test DOCASSIST_EMBEDDING_* variables configure the provider."""
+        monkeypatch.setenv("DOCASSIST_EMBEDDING_MODEL", "paraphrase-MiniLM-L3-v2")
+        monkeypatch.setenv("DOCASSIST_EMBEDDING_BATCH_SIZE", "8")
+        monkeypatch.setenv("DOCASSIST_EMBEDDING_THREADS", "2")
+
+        provider = create_embedding_provider()
+
+        assert isinstance(provider, SentenceTransformerEmbeddingProvider)
+        assert provider.batch_size == 8
+        assert provider.num_threads == 2
+
+
+class TestQueryEmbeddingCache:
+    """Tests for QueryEmbeddingCache."""
+
+    def test_normalized_keys(self):
+        """Test case and whitespace differences share one entry."""
+        cache = QueryEmbeddingCache("fake")
+        cache.put("Last  HbA1c", [1.0, 2.0])
+
+        assert normalize_query(" last hba1c ") == "last hba1c"
+        assert cache.get("last hba1c") == [1.0, 2.0]
+        assert cache.hits == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted when full."""
+        cache = QueryEmbeddingCache("fake", max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert len(cache) == 2
+
+    def test_persists_across_instances(self):
+        """Test vectors survive a restart and stay namespaced by model."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = str(Path(tmpdir) / "cache.db")
+            cache = QueryEmbeddingCache("fake", path=path)
+            cache.put("last hba1c", [0.5, 0.25])
+            cache.close()
+
+            reopened = QueryEmbeddingCache("fake", path=path)
+            other_model = QueryEmbeddingCache("other", path=path)
+
+            assert reopened.get("last hba1c") == [0.5, 0.25]
+            assert other_model.get("last hba1c") is None
+            reopened.close()
+            other_model.close()
+
+
+class TestRAGServiceQueryEmbeddings:
+    """Tests for explicit, cached query embedding in RAGService."""
+
+    def test_repeat_query_skips_model(self, rag_service):
+        """Test a repeated question is embedded only once."""
+        rag_service.index_patient_documents(1, [("inv_1", "HbA1c 7.2%", {"type": "investigation"})])
+        rag_service.index_patient_documents(2, [("inv_2", "HbA1c 6.1%", {"type": "investigation"})])
+        before = rag_service.embedder.texts_embedded
+
+        rag_service.query_patient_context(1, "last HbA1c")
+        rag_service.query_patient_context(2, "Last HbA1c ")
+
+        assert rag_service.embedder.texts_embedded - before == 1
+        assert rag_service.query_cache.hits == 1
+        assert len(rag_service.patient_documents.queries) == 2
+
+    def test_search_uses_precomputed_query_embedding(self, rag_service):
+        """Test patient search passes the provider's vector to the collection."""
+        rag_service.index_patient_summary(1, "Patient: Ram Lal")
+
+        results = rag_service.search_patients("Ram")
+
+        assert rag_service.patient_summaries.queries == [[[3.0, 1.0]]]
+        assert [patient_id for patient_id, _, _ in results] == [1]
+
+    def test_embedding_and_search_timed_separately(self, rag_service, monkeypatch):
+        """Test embedding latency is recorded apart from vector search latency."""
+        collector = RecordingCollector()
+        monkeypatch.setattr(rag_module, "get_metrics_collector", lambda: collector)
+
+        rag_service.search_patients("Ram")
+        rag_service.search_patients("ram")
+
+        names = [name for name, _ in collector.timings]
+        assert names == ["rag.embed_query", "rag.vector_search"] * 2
+        assert [tags["cache"] for name, tags in collector.timings if name == "rag.embed_query"] == [
+            "miss", "hit"
+        ]
@@ -0,0 +1,165 @@
+"""Tests for the hybrid (rank-fused) patient search engine."""
+
+import pytest
+import tempfile
+import time
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.database import DatabaseService
+from src.services.hybrid_search import HybridSearchEngine, reciprocal_rank_fusion
+from src.models.schemas import Patient, Visit
+
+
+class FakeRAG:
+    """Vector retriever stand-in returning fixed patient IDs."""
+
+    def __init__(self, patient_ids, delay=0.0):
+        self.patient_ids = patient_ids
+        self.delay = delay
+        self.queries = []
+
+    def search_patients(self, query, n_results=10):
+        self.queries.append(query)
+        time.sleep(self.delay)
+        return [(pid, 0.9, "") for pid in self.patient_ids[:n_results]]
+
+
+@pytest.fixture
+def db_service():
+    """Database with a handful of patients."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        ram = db.add_patient(Patient(name="Ram Lal", phone="9876543210"))
+        db.add_patient(Patient(name="Raam Kumar"))
+        db.add_patient(Patient(name="Shyam Sharma"))
+        sita = db.add_patient(Patient(name="Sita Devi"))
+        db.add_visit(Visit(patient_id=sita.id, diagnosis="Type 2 diabetes"))
+        db.add_visit(Visit(patient_id=ram.id, diagnosis="Hypertension"))
+        yield db
+        db.close()
+
+
+@pytest.fixture
+def engine(db_service):
+    engine = HybridSearchEngine(db_service)
+    yield engine
+    engine.close()
+
+
+def names(results):
+    return [result.patient.name for result in results]
+
+
+class TestReciprocalRankFusion:
+    """Tests for reciprocal_rank_fusion."""
+
+    def test_agreement_beats_single_top_rank(self):
+        """Test an ID ranked by two retrievers outranks one ranked first by one."""
+        fused = reciprocal_rank_fusion({"a": [1, 2], "b": [3, 2]})
+
+        assert fused[0][0] == 2
+        assert fused[0][2] == {"a": 2, "b": 2}
+
+    def test_weights(self):
+        """Test a heavier retriever wins ties."""
+        fused = reciprocal_rank_fusion({"a": [1], "b": [2]}, weights={"b": 2.0})
+
+        assert [pid for pid, _, _ in fused] == [2, 1]
+
+
+class TestHybridSearchEngine:
+    """Tests for HybridSearchEngine."""
+
+    def test_uhid_exact_first(self, db_service, engine):
+        """Test an exact UHID puts that patient first."""
+        uhid = db_service.get_patient(3).uhid
+
+        results = engine.search(uhid)
+
+        assert results[0].patient.id == 3
+        assert results[0].ranks["exact"] == 1
+
+    def test_phone_suffix(self, engine):
+        """Test the last digits of a phone number find the patient."""
+        assert names(engine.search("3210")) == ["Ram Lal"]
+
+    def test_phonetic_variants(self, engine):
+        """Test spelling variants are found through the phonetic retriever."""
+        results = engine.search("Raam")
+
+        assert {"Ram Lal", "Raam Kumar"} <= set(names(results))
+
+    def test_clinical_text(self, engine):
+        """Test diagnoses find their patients."""
+        assert names(engine.search("diabetes"))[0] == "Sita Devi"
+
+    def test_vector_only_for_multiword_queries(self, db_service):
+        """Test vector search runs for descriptions but not single words."""
+        rag = FakeRAG([4])
+        engine = HybridSearchEngine(db_service, rag_service=rag)
+
+        engine.search("Ram")
+        results = engine.search("sugar patient on insulin")
+        engine.close()
+
+        assert rag.queries == ["sugar patient on insulin"]
+        assert names(results) == ["Sita Devi"]
+
+    def test_slow_retriever_left_out(self, db_service):
+        """Test a retriever past the timeout does not block or get cached."""
+        rag = FakeRAG([4], delay=0.3)
+        engine = HybridSearchEngine(db_service, rag_service=rag, timeout=0.05)
+
+        start = time.perf_counter()
+        results = engine.search("ram lal")
+        elapsed = time.perf_counter() - start
+        engine.search("ram lal")
+        engine.close()
+
+        assert elapsed < 0.25
+        assert "Sita Devi" not in names(results)
+        assert len(rag.queries) == 2
+
+    def test_results_cached_per_query(self, db_service, engine, monkeypatch):
+        """Test repeating a query (e.g. after backspace) skips the retrievers."""
+        engine.search("ram")
+        calls = []
+        monkeypatch.setattr(engine, "_fuse", lambda *args: calls.append(args))
+
+        patients = engine.search_as_you_type("Ram ")
+
+        assert [p.name for p in patients] == names(engine.search("ram"))
+        assert calls == []
+
+    def test_cache_invalidated_by_writes(self, db_service, engine):
+        """Test a new patient shows up in a previously cached query."""
+        before = names(engine.search("Ram"))
+        time.sleep(0.001)
+        db_service.add_patient(Patient(name="Ramesh Gupta"))
+
+        after = names(engine.search("Ram"))
+
+        assert "Ramesh Gupta" not in before
+        assert "Ramesh Gupta" in after
+
+    def test_empty_query(self, engine):
+        """Test blank input returns nothing."""
+        assert engine.search("   ") == []
+
+
+class TestBatchedLookups:
+    """Tests for the database helpers used by hybrid search."""
+
+    def test_get_patients_by_ids_keeps_order(self, db_service):
+        """Test patients come back in the requested order, unknown IDs dropped."""
+        patients = db_service.get_patients_by_ids([3, 1, 99, 3])
+
+        assert list(patients) == [3, 1]
+        assert patients[1].name == "Ram Lal"
+
+    def test_fts_search_patient_ids(self, db_service):
+        """Test FTS ID search matches name prefixes."""
+        assert db_service.fts_search_patient_ids("shy") == [3]
@@ -0,0 +1,195 @@
+"""Tests for the LLM response cache and per-patient data versions."""
+
+import pytest
+import tempfile
+from unittest.mock import patch, MagicMock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import llm_cache as llm_cache_module
+from src.services.clinical_nlp.note_extractor import ClinicalNoteExtractor
+from src.services.database import DatabaseService
+from src.services.llm import LLMService
+from src.services.llm_cache import LLMResponseCache, response_cache_key
+from src.models.schemas import Patient, Visit
+
+
+class CountingCollector:
+    """Stand-in for MetricsCollector that keeps recorded counts."""
+
+    def __init__(self):
+        self.counts = []
+
+    def record_count(self, name, value=1, tags=None):
+        self.counts.append((name, tags["flow"]))
+
+
+@pytest.fixture
+def db_service():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        db.add_patient(Patient(name="Ram Lal"))
+        db.add_patient(Patient(name="Sita Devi"))
+        yield db
+        db.close()
+
+
+@pytest.fixture
+def llm():
+    """LLMService with a temporary cache whose generation is mocked."""
+    with tempfile.TemporaryDirectory() as tmpdir, patch("src.services.llm.psutil") as mock_psutil:
+        mock_psutil.virtual_memory.return_value = MagicMock(
+            total=16 * 1024 ** 3, available=12 * 1024 ** 3, percent=25.0
+        )
+        service = LLMService(model_override="qwen2.5:3b", response_cache_path=str(Path(tmpdir) / "cache.db"))
+        service.generate = MagicMock(return_value=(True, "Creatinine was 1.4"))
+        yield service
+        service.response_cache.close()
+
+
+class TestLLMResponseCache:
+    """Tests for LLMResponseCache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched entry is evicted when full."""
+        cache = LLMResponseCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_persists_across_instances(self):
+        """Test answers survive a restart, and the file is only created when used."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "cache.db"
+            cache = LLMResponseCache(path=str(path))
+            assert not path.exists()
+            cache.put("k", "answer")
+            cache.close()
+
+            reopened = LLMResponseCache(path=str(path))
+            assert reopened.get("k") == "answer"
+            reopened.close()
+
+    def test_key_parts(self):
+        """Test model, template, data version and question all separate entries."""
+        base = response_cache_key("m", "tmpl", "Last HbA1c?", "1.0")
+
+        assert response_cache_key("m", "tmpl", "  last hba1c? ", "1.0") == base
+        assert response_cache_key("m2", "tmpl", "Last HbA1c?", "1.0") != base
+        assert response_cache_key("m", "tmpl v2", "Last HbA1c?", "1.0") != base
+        assert response_cache_key("m", "tmpl", "Last HbA1c?", "1.1") != base
+
+    def test_exact_key_keeps_case(self):
+        """Test normalize=False separates prompts differing only in case."""
+        assert response_cache_key("m", "json", "Tab ABC 5MG", normalize=False) != \
+            response_cache_key("m", "json", "tab abc 5mg", normalize=False)
+
+    def test_hits_and_misses_reported(self, monkeypatch):
+        """Test lookups are counted on the metrics collector by flow."""
+        collector = CountingCollector()
+        monkeypatch.setattr(llm_cache_module, "get_metrics_collector", lambda: collector)
+        cache = LLMResponseCache()
+        cache.get("k", flow="patient_query")
+        cache.put("k", "v")
+        cache.get("k", flow="patient_query")
+
+        assert collector.counts == [("llm.cache_miss", "patient_query"), ("llm.cache_hit", "patient_query")]
+
+
+class TestPatientDataVersion:
+    """Tests for DatabaseService.get_patient_data_version."""
+
+    def test_changes_with_patient_records(self, db_service):
+        """Test a new visit changes only that patient's version."""
+        ram, sita = db_service.get_patient_data_version(1), db_service.get_patient_data_version(2)
+
+        db_service.add_visit(Visit(patient_id=1, diagnosis="Hypertension"))
+
+        assert db_service.get_patient_data_version(1) != ram
+        assert db_service.get_patient_data_version(2) == sita
+        assert ram != sita
+
+    def test_changes_on_patient_update(self, db_service):
+        """Test editing the patient row changes the version."""
+        before = db_service.get_patient_data_version(1)
+        patient = db_service.get_patient(1)
+        patient.phone = "9876543210"
+        db_service.update_patient(patient)
+
+        assert db_service.get_patient_data_version(1) != before
+
+
+class TestCachedPatientQueries:
+    """Tests for response caching in LLMService.query_patient_records."""
+
+    def test_repeat_question_served_from_cache(self, llm):
+        """Test the same question on unchanged records skips generation."""
+        first = llm.query_patient_records("ctx", "Last creatinine?", data_version="1.3")
+        second = llm.query_patient_records("ctx", "last  creatinine?", data_version="1.3")
+
+        assert first == second == (True, "Creatinine was 1.4")
+        assert llm.generate.call_count == 1
+
+    def test_new_data_version_regenerates(self, llm):
+        """Test changed records miss the cache."""
+        llm.query_patient_records("ctx", "Last creatinine?", data_version="1.3")
+        llm.query_patient_records("ctx", "Last creatinine?", data_version="1.4")
+
+        assert llm.generate.call_count == 2
+
+    def test_opt_out(self, llm):
+        """Test use_cache=False and a missing data version always generate."""
+        llm.query_patient_records("ctx", "q", data_version="1.3", use_cache=False)
+        llm.query_patient_records("ctx", "q", data_version="1.3", use_cache=False)
+        llm.query_patient_records("ctx", "q")
+
+        assert llm.generate.call_count == 3
+        assert len(llm.response_cache) == 0
+
+    def test_failures_not_cached(self, llm):
+        """Test errors are retried instead of served from the cache."""
+        llm.generate.return_value = (False, "Ollama is not running.")
+        llm.query_patient_records("ctx", "q", data_version="1.3")
+        llm.query_patient_records("ctx", "q", data_version="1.3")
+
+        assert llm.generate.call_count == 2
+
+    def test_hit_delivered_to_token_callback(self, llm):
+        """Test a streamed caller receives a cached answer in one piece."""
+        llm.query_patient_records("ctx", "q", data_version="1.3")
+        received = []
+
+        llm.query_patient_records("ctx", "q", on_token=received.append, data_version="1.3")
+
+        assert received == ["Creatinine was 1.4"]
+
+
+class TestCachedGeneration:
+    """Tests for generate_cached and its callers."""
+
+    def test_prompts_differing_in_case_not_shared(self, llm):
+        """Test transcript prompts are keyed on their exact text."""
+        llm.generate_cached("Tab Metformin 500mg BD", json_mode=True)
+        llm.generate_cached("tab metformin 500MG bd", json_mode=True)
+        llm.generate_cached("Tab Metformin 500mg BD", json_mode=True)
+
+        assert llm.generate.call_count == 2
+
+    def test_note_extractor_uses_cache(self, llm):
+        """Test repeat medication extraction from one transcript is served from the cache."""
+        llm.generate.return_value = (True, '[{"drug_name": "Metformin", "strength": "500mg", "frequency": "BD"}]')
+        llm.is_available = MagicMock(return_value=True)
+        extractor = ClinicalNoteExtractor(llm_service=llm)
+
+        first = extractor._extract_medications_with_llm("Tab Metformin 500mg BD")
+        second = extractor._extract_medications_with_llm("Tab Metformin 500mg BD")
+
+        assert [m.drug_name for m in first] == [m.drug_name for m in second] == ["Metformin"]
+        assert llm.generate.call_count == 1
@@ -0,0 +1,217 @@
+"""Tests for keeping the Ollama model resident only while needed."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import llm as llm_module
+from src.services.llm import LLMService
+from src.services.llm_residency import ModelResidencyManager
+from src.services.integration.workflow_engine import WorkflowEngine, WorkflowState
+
+
+class RecordingCollector:
+    """Stand-in for MetricsCollector."""
+
+    def __init__(self):
+        self.timings = []
+
+    def record_timing(self, name, duration_ms, tags=None):
+        self.timings.append(name)
+
+
+def ok_response(**body):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"done": True, **body}
+    return response
+
+
+@pytest.fixture
+def mem():
+    with patch("src.services.llm.psutil") as mock_psutil:
+        memory = MagicMock(total=16 * 1024 ** 3, available=12 * 1024 ** 3, percent=25.0)
+        mock_psutil.virtual_memory.return_value = memory
+        yield memory
+
+
+@pytest.fixture
+def llm(mem):
+    service = LLMService(model_override="qwen2.5:3b", response_cache_size=0)
+    service.is_available = lambda: True
+    return service
+
+
+@pytest.fixture
+def manager(llm):
+    return ModelResidencyManager(llm, idle_unload_seconds=600, warm_up_on_start=False)
+
+
+class TestWarmUpAndPinning:
+    """Tests for loading and keep_alive handling."""
+
+    def test_warm_up_loads_with_idle_keep_alive(self, manager, llm):
+        """Test warm-up sends a prompt-less load that expires when we would unload."""
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            assert manager.warm_up() is True
+
+        payload = post.call_args[1]["json"]
+        assert "prompt" not in payload
+        assert payload["keep_alive"] == "600s"
+        assert llm._model_loaded
+
+    def test_pinned_requests_keep_model_loaded(self, manager, llm):
+        """Test generations during a consultation ask Ollama to keep the model."""
+        manager.pin()
+        with patch("src.services.llm.requests.post", return_value=ok_response(response="ok")) as post:
+            llm.generate("prompt")
+        assert post.call_args[1]["json"]["keep_alive"] == -1
+
+        manager.unpin()
+        with patch("src.services.llm.requests.post", return_value=ok_response(response="ok")) as post:
+            llm.generate("prompt")
+        assert post.call_args[1]["json"]["keep_alive"] == "600s"
+
+    def test_pin_loads_unloaded_model(self, manager, llm):
+        """Test the next check after pinning loads the model."""
+        manager.pin()
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            assert manager.check() == "loaded"
+        assert post.call_args[1]["json"]["keep_alive"] == -1
+
+    def test_pin_refreshes_warm_model_keep_alive(self, manager, llm):
+        """Test pinning an already loaded model re-sends keep_alive, and unpinning restores it."""
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            manager.warm_up()
+            manager.pin()
+            assert post.call_count == 1
+            manager.check()
+            pinned = post.call_args[1]["json"]
+            manager.unpin()
+            manager.check()
+            unpinned = post.call_args[1]["json"]
+
+        assert "prompt" not in pinned
+        assert pinned["keep_alive"] == -1
+        assert unpinned["keep_alive"] == "600s"
+        assert post.call_count == 3
+
+    def test_pin_during_generation_applied_after_it(self, manager, llm):
+        """Test a pin while a generation runs is sent once it has finished."""
+        llm._model_loaded = True
+        llm._begin_request()
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            manager.pin()
+            post.assert_not_called()
+
+            llm._end_request()
+            manager.check()
+        assert post.call_args[1]["json"]["keep_alive"] == -1
+
+        with patch("src.services.llm.requests.post") as post:
+            manager.check()
+        post.assert_not_called()
+
+    def test_pin_sends_nothing_on_caller_thread(self, manager, llm):
+        """Test pin() only records the keep_alive; the residency thread sends it."""
+        llm._model_loaded = True
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            manager.pin()
+            post.assert_not_called()
+            assert manager._wake_event.is_set()
+
+            manager.pin()
+            manager.unpin()
+            manager.check()
+        assert post.call_count == 1
+        assert post.call_args[1]["json"]["keep_alive"] == "600s"
+
+    def test_workflow_states_drive_pinning(self, manager):
+        """Test consultation states pin the model and finishing releases it."""
+        workflow = WorkflowEngine()
+        manager.attach_workflow(workflow)
+
+        for callback in workflow._state_entry_callbacks[WorkflowState.PRESCRIBING]:
+            callback(WorkflowState.PRESCRIBING)
+        assert manager.pinned
+
+        for callback in workflow._state_entry_callbacks[WorkflowState.COMPLETED]:
+            callback(WorkflowState.COMPLETED)
+        assert not manager.pinned
+
+
+class TestUnloading:
+    """Tests for idle and low-RAM unloading."""
+
+    @pytest.fixture
+    def loaded(self, llm):
+        llm._model_loaded = True
+        llm._last_used = datetime.now()
+        return llm
+
+    def test_idle_model_unloaded(self, manager, loaded):
+        """Test an unpinned model is unloaded after the idle period, not before."""
+        with patch("src.services.llm.requests.post", return_value=ok_response()) as post:
+            assert manager.check() is None
+            loaded._last_used = datetime.now() - timedelta(minutes=11)
+            assert manager.check() == "unloaded"
+
+        assert post.call_args[1]["json"]["keep_alive"] == 0
+        assert not loaded._model_loaded
+
+    def test_pinned_model_survives_idle(self, manager, loaded):
+        with patch("src.services.llm.requests.post", return_value=ok_response()):
+            manager.pin()
+            manager.check()
+        loaded._last_used = datetime.now() - timedelta(hours=2)
+
+        with patch("src.services.llm.requests.post") as post:
+            assert manager.check() is None
+        post.assert_not_called()
+
+    def test_low_ram_unloads_even_when_pinned(self, manager, loaded, mem):
+        """Test RAM below the reserve frees the model straight away."""
+        with patch("src.services.llm.requests.post", return_value=ok_response()):
+            manager.pin()
+        mem.available = 0.5 * 1024 ** 3
+
+        with patch("src.services.llm.requests.post", return_value=ok_response()):
+            assert manager.check() == "unloaded"
+
+    def test_never_unloads_mid_generation(self, manager, loaded, mem):
+        """Test an in-flight generation blocks unloading."""
+        mem.available = 0.5 * 1024 ** 3
+        loaded._begin_request()
+
+        with patch("src.services.llm.requests.post") as post:
+            assert manager.check() is None
+        post.assert_not_called()
+        loaded._end_request()
+
+
+class TestResidencyMetrics:
+    """Tests for load, unload and cold-start timings."""
+
+    def test_timings_recorded(self, manager, llm, monkeypatch):
+        collector = RecordingCollector()
+        monkeypatch.setattr(llm_module, "get_metrics_collector", lambda: collector)
+
+        with patch("src.services.llm.requests.post", return_value=ok_response(load_duration=12_000_000_000)):
+            manager.warm_up()
+            llm.unload_model()
+
+        assert collector.timings == ["llm.model_load", "llm.cold_start", "llm.model_unload"]
+
+    def test_cold_start_only_when_unloaded(self, llm, monkeypatch):
+        """Test a generation on a resident model is not counted as a cold start."""
+        collector = RecordingCollector()
+        monkeypatch.setattr(llm_module, "get_metrics_collector", lambda: collector)
+
+        with patch("src.services.llm.requests.post", return_value=ok_response(response="a", load_duration=9_000_000)):
+            llm.generate("prompt")
+            llm.generate("prompt")
+
+        assert collector.timings == ["llm.cold_start"]
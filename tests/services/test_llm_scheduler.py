@@ -0,0 +1,267 @@
+"""Tests for LLM request scheduling, pre-emption and coalescing."""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import llm_scheduler as llm_scheduler_module
+from src.services.llm import LLMService
+from src.services.llm_scheduler import LLMPriority, LLMScheduler
+
+INTERACTIVE = LLMPriority.INTERACTIVE
+BACKGROUND = LLMPriority.BACKGROUND
+
+
+class RecordingCollector:
+    """Stand-in for MetricsCollector."""
+
+    def __init__(self):
+        self.timings = []
+        self.gauges = []
+        self.counts = []
+
+    def record_timing(self, name, duration_ms, tags=None):
+        self.timings.append((name, tags["priority"]))
+
+    def record_gauge(self, name, value, tags=None):
+        self.gauges.append((name, tags["priority"], value))
+
+    def record_count(self, name, value=1, tags=None):
+        self.counts.append((name, tags["priority"]))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def start(target, *args, **kwargs):
+    thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def blocked():
+    """Scheduler with its single slot held until the returned event is set."""
+    scheduler = LLMScheduler(max_workers=1)
+    release = threading.Event()
+    holder = start(scheduler.run, release.wait, BACKGROUND)
+    wait_for(lambda: scheduler.running == 1)
+    yield scheduler, release
+    release.set()
+    holder.join(timeout=2)
+
+
+class TestLLMScheduler:
+    """Tests for LLMScheduler."""
+
+    def test_limits_concurrency(self):
+        """Test no more than max_workers generations run at once."""
+        scheduler = LLMScheduler(max_workers=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+        threads = [start(scheduler.run, job, INTERACTIVE) for _ in range(6)]
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert peak[0] == 2
+
+    def test_interactive_served_before_queued_background(self, blocked):
+        """Test a doctor request overtakes background work that queued earlier."""
+        scheduler, release = blocked
+        order = []
+
+        summary = start(scheduler.run, lambda: order.append("summary"), BACKGROUND)
+        wait_for(lambda: scheduler.queue_depth(BACKGROUND) == 1)
+        query = start(scheduler.run, lambda: order.append("query"), INTERACTIVE)
+        wait_for(lambda: scheduler.queue_depth() == 2)
+        release.set()
+        summary.join(timeout=2)
+        query.join(timeout=2)
+
+        assert order == ["query", "summary"]
+
+    def test_slot_kept_for_interactive(self):
+        """Test background work cannot take every slot."""
+        scheduler = LLMScheduler(max_workers=2)
+        release = threading.Event()
+        first = start(scheduler.run, release.wait, BACKGROUND)
+        wait_for(lambda: scheduler.running == 1)
+
+        second = start(scheduler.run, lambda: None, BACKGROUND)
+        wait_for(lambda: scheduler.queue_depth(BACKGROUND) == 1)
+        assert scheduler.run(lambda: "answer", INTERACTIVE) == "answer"
+        assert scheduler.queue_depth(BACKGROUND) == 1
+
+        release.set()
+        for thread in (first, second):
+            thread.join(timeout=2)
+        assert scheduler.running == 0
+
+    def test_identical_requests_coalesced(self, blocked):
+        """Test duplicates share one generation and its result."""
+        scheduler, release = blocked
+        calls, results = [], []
+
+        def generate():
+            calls.append(1)
+            return "Creatinine 1.4"
+
+        threads = [start(lambda: results.append(scheduler.run(generate, INTERACTIVE, key="k"))) for _ in range(3)]
+        wait_for(lambda: scheduler.queue_depth() == 1 and len(scheduler._in_flight) == 1)
+        time.sleep(0.02)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert calls == [1]
+        assert results == ["Creatinine 1.4"] * 3
+
+    def test_interactive_duplicate_promotes_background(self, blocked):
+        """Test a doctor asking for queued background work moves it up the queue."""
+        scheduler, release = blocked
+        order = []
+
+        summary = start(scheduler.run, lambda: order.append("summary") or "s", BACKGROUND, key="summary")
+        wait_for(lambda: scheduler.queue_depth(BACKGROUND) == 1)
+        other = start(scheduler.run, lambda: order.append("other"), INTERACTIVE)
+        wait_for(lambda: scheduler.queue_depth() == 2)
+        doctor = start(scheduler.run, lambda: order.append("duplicate"), INTERACTIVE, key="summary")
+        wait_for(lambda: scheduler.queue_depth(INTERACTIVE) == 2)
+        release.set()
+        for thread in (summary, other, doctor):
+            thread.join(timeout=2)
+
+        assert order == ["summary", "other"]
+
+    def test_errors_shared_with_duplicates(self, blocked):
+        scheduler, release = blocked
+        errors = []
+
+        def fail():
+            raise RuntimeError("Ollama crashed")
+
+        def call():
+            try:
+                scheduler.run(fail, INTERACTIVE, key="k")
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [start(call) for _ in range(2)]
+        wait_for(lambda: len(scheduler._in_flight) == 1 and scheduler.queue_depth() == 1)
+        time.sleep(0.02)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert errors == ["Ollama crashed"] * 2
+        assert scheduler._in_flight == {}
+
+    def test_leader_acquire_failure_shared_with_duplicates(self):
+        """Test a duplicate is not left waiting when the leader never gets a slot."""
+        scheduler = LLMScheduler()
+        entered = threading.Event()
+        fail = threading.Event()
+        errors = []
+
+        def acquire(waiter):
+            entered.set()
+            fail.wait()
+            raise RuntimeError("interrupted")
+
+        def call():
+            try:
+                scheduler.run(lambda: "summary", INTERACTIVE, key="k")
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        with patch.object(scheduler, "_acquire", side_effect=acquire):
+            leader = start(call)
+            entered.wait(timeout=2)
+            duplicate = start(call)
+            time.sleep(0.02)
+            fail.set()
+            leader.join(timeout=2)
+            duplicate.join(timeout=2)
+
+        assert not duplicate.is_alive()
+        assert errors == ["interrupted"] * 2
+        assert scheduler._in_flight == {} and scheduler._leaders == {}
+
+    def test_metrics_by_priority(self, monkeypatch):
+        """Test queue depth, wait time and coalescing are reported per priority."""
+        collector = RecordingCollector()
+        monkeypatch.setattr(llm_scheduler_module, "get_metrics_collector", lambda: collector)
+        scheduler = LLMScheduler()
+
+        scheduler.run(lambda: None, INTERACTIVE)
+        scheduler.run(lambda: None, BACKGROUND)
+
+        assert collector.timings == [("llm.queue_wait", "interactive"), ("llm.queue_wait", "background")]
+        assert ("llm.queue_depth", "background", 1) in collector.gauges
+
+
+class TestLLMServiceScheduling:
+    """Tests for generations going through the scheduler."""
+
+    @pytest.fixture
+    def llm(self):
+        with patch("src.services.llm.psutil") as mock_psutil:
+            mock_psutil.virtual_memory.return_value = MagicMock(
+                total=16 * 1024 ** 3, available=12 * 1024 ** 3, percent=25.0
+            )
+            service = LLMService(model_override="qwen2.5:3b", response_cache_size=0)
+            service.is_available = lambda: True
+            yield service
+
+    def test_duplicate_prompts_sent_once(self, llm):
+        """Test the same prompt asked twice concurrently reaches Ollama once."""
+        release = threading.Event()
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"response": "ok", "done": True}
+
+        def slow_post(*args, **kwargs):
+            release.wait()
+            return response
+
+        results = []
+        with patch("src.services.llm.requests.post", side_effect=slow_post) as post:
+            threads = [start(lambda: results.append(llm.generate("Summarize visit"))) for _ in range(2)]
+            wait_for(lambda: llm.busy)
+            time.sleep(0.02)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=2)
+
+        assert post.call_count == 1
+        assert results == [(True, "ok")] * 2
+
+    def test_stream_holds_slot(self, llm):
+        """Test a background generation waits while a stream is being read."""
+        response = MagicMock(status_code=200)
+        response.iter_lines.return_value = [b'{"response": "a", "done": false}', b'{"done": true}']
+
+        with patch("src.services.llm.requests.post", return_value=response):
+            stream = llm.generate_stream("prompt")
+            assert next(stream) == "a"
+            assert llm.scheduler.running == 1
+            list(stream)
+
+        assert llm.scheduler.running == 0
@@ -0,0 +1,199 @@
+"""Tests for streamed LLM generation and cancellation."""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services import llm as llm_module
+from src.services.llm import CancellationToken, LLMError, LLMService
+from src.services.llm_cache import LLMResponseCache
+
+
+class FakeStreamResponse:
+    """Stand-in for a streaming requests.Response over Ollama NDJSON."""
+
+    def __init__(self, tokens, status_code=200, text="", final=None, done=True):
+        self.status_code = status_code
+        self.text = text
+        self.closed = False
+        self.lines_read = 0
+        self._lines = [json.dumps({"response": t, "done": False}).encode() for t in tokens]
+        if done:
+            self._lines.append(json.dumps({"response": "", "done": True, **(final or {})}).encode())
+
+    def iter_lines(self):
+        for line in self._lines:
+            self.lines_read += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+class RecordingCollector:
+    """Stand-in for MetricsCollector."""
+
+    def __init__(self):
+        self.timings = []
+        self.gauges = []
+
+    def record_timing(self, name, duration_ms, tags=None):
+        self.timings.append((name, tags))
+
+    def record_gauge(self, name, value, tags=None):
+        self.gauges.append((name, value))
+
+
+@pytest.fixture
+def llm():
+    """LLMService with plenty of RAM and Ollama reported as running."""
+    with patch("src.services.llm.psutil") as mock_psutil:
+        mock_psutil.virtual_memory.return_value = MagicMock(
+            total=16 * 1024 ** 3, available=12 * 1024 ** 3, percent=25.0
+        )
+        service = LLMService(model_override="qwen2.5:3b")
+        service.is_available = lambda: True
+        yield service
+
+
+def stream_post(response):
+    return patch("src.services.llm.requests.post", return_value=response)
+
+
+class TestGenerateStream:
+    """Tests for LLMService.generate_stream."""
+
+    def test_yields_tokens_in_order(self, llm):
+        """Test tokens arrive one by one and the request asks for streaming."""
+        response = FakeStreamResponse(["The ", "last ", "HbA1c"])
+
+        with stream_post(response) as post:
+            tokens = list(llm.generate_stream("prompt"))
+
+        assert tokens == ["The ", "last ", "HbA1c"]
+        assert post.call_args[1]["stream"] is True
+        assert post.call_args[1]["json"]["stream"] is True
+        assert response.closed
+
+    def test_cancellation_stops_reading(self, llm):
+        """Test a cancelled token ends the stream and closes the connection."""
+        response = FakeStreamResponse(["a", "b", "c", "d"])
+        cancel = CancellationToken()
+
+        tokens = []
+        with stream_post(response):
+            for token in llm.generate_stream("prompt", cancel_token=cancel):
+                tokens.append(token)
+                cancel.cancel()
+
+        assert tokens == ["a"]
+        assert response.lines_read == 2
+        assert response.closed
+
+    def test_already_cancelled_sends_nothing(self, llm):
+        """Test a cancelled token skips the request entirely."""
+        cancel = CancellationToken()
+        cancel.cancel()
+
+        with stream_post(FakeStreamResponse(["a"])) as post:
+            assert list(llm.generate_stream("prompt", cancel_token=cancel)) == []
+        post.assert_not_called()
+
+    def test_errors_raise(self, llm):
+        """Test API failures surface as LLMError with the usual messages."""
+        response = FakeStreamResponse([], status_code=500, text="CUDA out of memory")
+
+        with stream_post(response), pytest.raises(LLMError, match="Out of memory"):
+            list(llm.generate_stream("prompt"))
+
+        llm.is_available = lambda: False
+        with pytest.raises(LLMError, match="not running"):
+            list(llm.generate_stream("prompt"))
+
+    def test_truncated_stream_raises(self, llm):
+        """Test a stream that ends without Ollama's done chunk is an error."""
+        response = FakeStreamResponse(["The ", "last "], done=False)
+
+        tokens = []
+        with stream_post(response), pytest.raises(LLMError, match="incomplete"):
+            for token in llm.generate_stream("prompt"):
+                tokens.append(token)
+
+        assert tokens == ["The ", "last "]
+        assert response.closed
+
+    def test_records_latency_metrics(self, llm, monkeypatch):
+        """Test time-to-first-token, total time and tokens/sec are recorded."""
+        collector = RecordingCollector()
+        monkeypatch.setattr(llm_module, "get_metrics_collector", lambda: collector)
+        response = FakeStreamResponse(["a", "b"], final={"eval_count": 40, "eval_duration": 2_000_000_000})
+
+        with stream_post(response):
+            list(llm.generate_stream("prompt"))
+
+        assert [name for name, _ in collector.timings] == ["llm.time_to_first_token", "llm.generation"]
+        assert collector.timings[1][1] == {"model": "qwen2.5:3b", "cancelled": "false"}
+        assert collector.gauges == [("llm.tokens_per_second", 20.0)]
+
+    def test_async_iterator(self, llm):
+        """Test agenerate_stream yields the same tokens to asyncio callers."""
+        async def collect():
+            return [token async for token in llm.agenerate_stream("prompt")]
+
+        with stream_post(FakeStreamResponse(["x", "y"])):
+            assert asyncio.run(collect()) == ["x", "y"]
+
+
+class TestStreamingCallers:
+    """Tests for streaming through query_patient_records and generate_prescription."""
+
+    def test_query_streams_to_callback(self, llm):
+        """Test answers are passed to on_token as they arrive and returned whole."""
+        received = []
+
+        with stream_post(FakeStreamResponse(["Creatinine ", "1.4"])):
+            success, answer = llm.query_patient_records("ctx", "q", on_token=received.append)
+
+        assert success is True
+        assert answer == "Creatinine 1.4"
+        assert received == ["Creatinine ", "1.4"]
+
+    def test_prescription_from_streamed_json(self, llm):
+        """Test streamed JSON fragments are parsed into a Prescription."""
+        body = json.dumps({"diagnosis": ["Viral fever"], "medications": []})
+        fragments = [body[i:i + 7] for i in range(0, len(body), 7)]
+
+        with stream_post(FakeStreamResponse(fragments)) as post:
+            success, prescription, _ = llm.generate_prescription("Fever", on_token=lambda t: None)
+
+        assert success is True
+        assert prescription.diagnosis == ["Viral fever"]
+        assert post.call_args[1]["json"]["format"] == "json"
+
+    def test_cancelled_query_fails(self, llm):
+        """Test a cancelled answer is reported as unsuccessful, not truncated text."""
+        cancel = CancellationToken()
+
+        with stream_post(FakeStreamResponse(["partial", "answer"])):
+            success, message = llm.query_patient_records(
+                "ctx", "q", on_token=lambda t: cancel.cancel(), cancel_token=cancel
+            )
+
+        assert success is False
+        assert "cancelled" in message.lower()
+
+    def test_truncated_query_fails_and_is_not_cached(self, llm):
+        """Test a dropped stream is reported as a failure and never cached."""
+        llm.response_cache = LLMResponseCache()
+
+        with stream_post(FakeStreamResponse(["Creatinine "], done=False)):
+            success, message = llm.query_patient_records("ctx", "q", on_token=lambda t: None, data_version="v1")
+
+        assert success is False
+        assert "incomplete" in message
+        assert len(llm.response_cache) == 0
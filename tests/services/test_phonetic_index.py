@@ -0,0 +1,189 @@
+"""Tests for the stored phonetic code index."""
+
+import pytest
+import sqlite3
+import tempfile
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.database import DatabaseService
+from src.services.phonetic import (
+    BKTree,
+    IndianPhoneticSearch,
+    MultiStrategySearch,
+    PhoneticIndex,
+    levenshtein,
+)
+from src.models.schemas import Patient
+
+
+@pytest.fixture
+def db_service():
+    """Database with a few phonetically related names."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        for name in ("Ram Lal", "Raam Kumar", "Shyam Sharma", "Pradeep Gupta", "Vijay Singh"):
+            db.add_patient(Patient(name=name))
+        yield db
+        db.close()
+
+
+def codes(db, patient_id):
+    with db.get_read_connection() as conn:
+        row = conn.execute(
+            "SELECT phonetic_code, phonetic_code_aggressive FROM patient_phonetic_codes WHERE patient_id = ?",
+            (patient_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+
+class TestLevenshtein:
+    """Tests for the bounded edit distance."""
+
+    def test_exact_distance(self):
+        assert levenshtein("kitten", "sitting") == 3
+        assert levenshtein("", "abc") == 3
+
+    def test_stops_past_bound(self):
+        """Test distances over the bound report bound + 1."""
+        assert levenshtein("kitten", "sitting", max_distance=1) == 2
+        assert levenshtein("abcdefgh", "a", max_distance=2) == 3
+        assert levenshtein("kitten", "sitting", max_distance=3) == 3
+
+
+class TestBKTree:
+    """Tests for BKTree."""
+
+    def test_radius_search(self):
+        tree = BKTree(["SRM", "SRMA", "KMR", "GPT", "SRM"])
+
+        assert len(tree) == 4
+        assert sorted(tree.search("SRM", 1)) == [("SRM", 0), ("SRMA", 1)]
+        assert tree.search("XYZ", 0) == []
+
+
+class TestStoredCodes:
+    """Tests for codes maintained by DatabaseService."""
+
+    def test_codes_written_on_add(self, db_service):
+        """Test add_patient stores both codes and the code words."""
+        phonetic = IndianPhoneticSearch()
+
+        assert codes(db_service, 2) == (
+            phonetic.get_phonetic_code("Raam Kumar"),
+            phonetic.get_phonetic_code_aggressive("Raam Kumar"),
+        )
+
+    def test_codes_follow_rename(self, db_service):
+        """Test update_patient re-encodes the new name."""
+        patient = db_service.get_patient(1)
+        patient.name = "Suresh Verma"
+        db_service.update_patient(patient)
+
+        index = PhoneticIndex(db_service)
+        assert [pid for pid, _, _ in index.search("Sooresh")] == [1]
+        assert 1 not in [pid for pid, _, _ in index.search("Ram")]
+
+    def test_backfill_existing_patients(self, db_service):
+        """Test patients inserted directly get codes on backfill."""
+        with db_service.get_connection() as conn:
+            conn.execute("INSERT INTO patients (uhid, name) VALUES ('X-1', 'Dhiraj Reddy')")
+
+        assert db_service.backfill_phonetic_codes() == 1
+        assert codes(db_service, 6)[0] == IndianPhoneticSearch().get_phonetic_code("Dhiraj Reddy")
+
+    def test_migration_backfills(self):
+        """Test opening a pre-v5 database encodes its patients."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = str(Path(tmpdir) / "old.db")
+            db = DatabaseService(db_path=path)
+            db.add_patient(Patient(name="Ram Lal"))
+            db.close()
+
+            conn = sqlite3.connect(path)
+            conn.execute("DELETE FROM patient_phonetic_codes")
+            conn.execute("DELETE FROM schema_versions WHERE version >= 5")
+            conn.commit()
+            conn.close()
+
+            reopened = DatabaseService(db_path=path)
+            assert codes(reopened, 1) is not None
+            reopened.close()
+
+    def test_delete_removes_codes(self, db_service):
+        """Test deleting a patient drops their codes."""
+        with db_service.get_connection() as conn:
+            conn.execute("DELETE FROM patients WHERE id = 1")
+
+        assert codes(db_service, 1) is None
+
+
+class TestPhoneticIndex:
+    """Tests for PhoneticIndex lookups."""
+
+    def test_spelling_variants(self, db_service):
+        """Test vowel and aspiration variants find the same patients."""
+        index = PhoneticIndex(db_service)
+
+        assert {name for _, name, _ in index.search("Ram")} == {"Ram Lal", "Raam Kumar"}
+        assert [name for _, name, _ in index.search("Pradip")] == ["Pradeep Gupta"]
+        assert [name for _, name, _ in index.search("Wijay")] == ["Vijay Singh"]
+
+    def test_any_word_prefix(self, db_service):
+        """Test a surname finds the patient."""
+        assert [name for _, name, _ in PhoneticIndex(db_service).search("Sharma")] == ["Shyam Sharma"]
+
+    def test_typo_tolerance(self, db_service):
+        """Test a one-letter typo in a long name is still found."""
+        db_service.add_patient(Patient(name="Ramakrishnan"))
+        index = PhoneticIndex(db_service)
+
+        assert "Ramakrishnan" in [name for _, name, _ in index.search("Ramakrisnam")]
+
+    def test_new_patients_reach_index_without_rescan(self, db_service, monkeypatch):
+        """Test codes written after the first search are added by the write path."""
+        index = PhoneticIndex(db_service)
+        index.search("Ram")
+
+        def fail(*args):
+            raise AssertionError("search rescanned or wrote phonetic codes")
+
+        monkeypatch.setattr(db_service, "get_phonetic_codes_aggressive", fail)
+        monkeypatch.setattr(db_service, "backfill_phonetic_codes", fail)
+        db_service.add_patient(Patient(name="Ramakrishnan"))
+
+        assert "Ramakrishnan" in [name for _, name, _ in index.search("Ramakrisnam")]
+
+    def test_matches_full_scan(self, db_service):
+        """Test the indexed search agrees with scoring every patient."""
+        # Codes contained in a longer query word ("Suresh" in "Sureshkumar")
+        for name in ("Suresh", "Raj", "Lakshmi", "Anil"):
+            db_service.add_patient(Patient(name=name))
+        index = PhoneticIndex(db_service)
+        phonetic = IndianPhoneticSearch()
+        candidates = [(p.id, p.name) for p in db_service.get_all_patients()]
+
+        for query in ("Kumar", "Sharma", "Gupta", "Vijay", "Raam Kumar", "Ram Lal Sharma",
+                      "Sureshkumar", "Rajesh", "Lakshman", "Anilkumar"):
+            expected = {pid for pid, _, _ in phonetic.search(query, candidates)}
+            assert expected and {pid for pid, _, _ in index.search(query)} == expected
+
+    def test_no_mid_word_matches(self, db_service):
+        """Test a code inside another word ("RM" in sha-RM-a) is not a match."""
+        assert "Shyam Sharma" not in [name for _, name, _ in PhoneticIndex(db_service).search("Ram")]
+
+    def test_no_letters(self, db_service):
+        """Test digits-only queries return nothing."""
+        assert PhoneticIndex(db_service).search("12345") == []
+
+    def test_multi_strategy_uses_index(self, db_service, monkeypatch):
+        """Test MultiStrategySearch no longer loads every patient."""
+        def fail():
+            raise AssertionError("get_all_patients called")
+
+        monkeypatch.setattr(db_service, "get_all_patients", fail)
+        results = MultiStrategySearch(db_service).search_patients("Raam")
+
+        assert {patient.name for patient, _, _ in results} >= {"Ram Lal", "Raam Kumar"}
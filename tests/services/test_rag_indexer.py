@@ -0,0 +1,240 @@
+"""Tests for incremental RAG indexing (content hashes + change journal)."""
+
+import pytest
+import tempfile
+import time
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.database import DatabaseService
+from src.services.embeddings import EmbeddingProvider
+from src.services.rag import RAGService
+from src.services.rag_indexer import RAGIndexer
+from src.models.schemas import Patient, Visit, Investigation
+
+
+class FakeEmbeddingProvider(EmbeddingProvider):
+    """Deterministic two-dimensional embeddings that counts texts embedded."""
+
+    def __init__(self, model_name="fake", batch_size=32):
+        super().__init__(model_name, batch_size=batch_size)
+        self.texts_embedded = 0
+
+    def _load(self):
+        return object()
+
+    def _embed(self, texts):
+        assert self.model is not None
+        self.texts_embedded += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection that counts embeddings."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.docs = {}
+        self.embedded = 0
+
+    def get(self, ids=None, where=None, include=None):
+        def matches_where(metadata):
+            return all(
+                metadata.get(k) in v["$in"] if isinstance(v, dict) else metadata.get(k) == v
+                for k, v in (where or {}).items()
+            )
+
+        matches = [
+            doc_id for doc_id, (_, metadata) in self.docs.items()
+            if (ids is None or doc_id in ids) and matches_where(metadata)
+        ]
+        return {
+            "ids": matches,
+            "documents": [self.docs[i][0] for i in matches],
+            "metadatas": [self.docs[i][1] for i in matches],
+        }
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        assert embeddings is not None and len(embeddings) == len(ids)
+        self.embedded += len(ids)
+        for doc_id, document, metadata in zip(ids, documents, metadatas):
+            self.docs[doc_id] = (document, metadata)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.docs.pop(doc_id, None)
+
+
+@pytest.fixture
+def db_service():
+    """Create database service with temp database."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        yield db
+        db.close()
+
+
+@pytest.fixture
+def rag_service():
+    """RAGService backed by in-memory collections."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rag = RAGService(persist_directory=tmpdir, embedding_provider=FakeEmbeddingProvider())
+        rag.patient_summaries = FakeCollection()
+        rag.patient_documents = FakeCollection()
+        yield rag
+
+
+@pytest.fixture
+def indexer(db_service, rag_service):
+    """Indexer over the temp database and fake vector store."""
+    return RAGIndexer(db_service, rag_service, batch_size=50)
+
+
+def embeddings(rag):
+    return rag.patient_summaries.embedded + rag.patient_documents.embedded
+
+
+class TestContentHashing:
+    """Tests for hash-based skipping in RAGService."""
+
+    def test_unchanged_documents_not_reembedded(self, rag_service):
+        """Test re-indexing identical documents costs no embeddings."""
+        docs = [("visit_1", "Fever", {"type": "visit"}), ("visit_2", "Cough", {"type": "visit"})]
+
+        assert rag_service.index_patient_documents(1, docs) == 2
+        assert rag_service.index_patient_documents(1, docs) == 0
+        assert rag_service.patient_documents.embedded == 2
+
+    def test_only_changed_document_reembedded(self, rag_service):
+        """Test editing one document embeds just that one."""
+        rag_service.index_patient_documents(1, [("visit_1", "Fever", {}), ("visit_2", "Cough", {})])
+
+        embedded = rag_service.index_patient_documents(
+            1, [("visit_1", "Fever", {}), ("visit_2", "Cough, wheeze", {})]
+        )
+
+        assert embedded == 1
+        assert rag_service.patient_documents.docs["p1_visit_2"][0] == "Cough, wheeze"
+
+    def test_removed_documents_deleted(self, rag_service):
+        """Test documents missing from the new set are removed."""
+        rag_service.index_patient_documents(1, [("visit_1", "Fever", {}), ("visit_2", "Cough", {})])
+        rag_service.index_patient_documents(1, [("visit_1", "Fever", {})])
+
+        assert rag_service.get_patient_document_count(1) == 1
+        assert rag_service.index_stats["deleted"] == 1
+
+    def test_summary_skipped_when_unchanged(self, rag_service):
+        """Test summary is upserted only when its text changes."""
+        assert rag_service.index_patient_summary(1, "Patient: Ram") is True
+        assert rag_service.index_patient_summary(1, "Patient: Ram") is False
+        assert rag_service.index_patient_summary(1, "Patient: Ram. Age: 65") is True
+        assert rag_service.patient_summaries.embedded == 2
+
+    def test_metadata_not_mutated(self, rag_service):
+        """Test caller's metadata dicts are left untouched."""
+        metadata = {"type": "visit"}
+        rag_service.index_patient_documents(1, [("visit_1", "Fever", metadata)])
+
+        assert metadata == {"type": "visit"}
+
+
+class TestChangeJournal:
+    """Tests for the database change journal."""
+
+    def test_writes_are_journaled(self, db_service):
+        """Test inserts and updates append journal entries."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar"))
+        visit = db_service.add_visit(Visit(patient_id=patient.id, diagnosis="Fever"))
+        visit.diagnosis = "Dengue"
+        db_service.update_visit(visit)
+
+        entries = db_service.get_rag_changes()
+
+        assert [(e["doc_type"], e["operation"]) for e in entries] == [
+            ("patient", "insert"), ("visit", "insert"), ("visit", "update")
+        ]
+        assert all(e["patient_id"] == patient.id for e in entries)
+
+    def test_ack_removes_processed_entries(self, db_service):
+        """Test acknowledging clears entries up to the given ID only."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar"))
+        db_service.add_visit(Visit(patient_id=patient.id))
+        first, second = db_service.get_rag_changes()
+
+        assert db_service.ack_rag_changes(first["id"]) == 1
+        assert [e["id"] for e in db_service.get_rag_changes()] == [second["id"]]
+        assert db_service.has_pending_rag_changes(patient.id)
+
+
+class TestRAGIndexer:
+    """Tests for the background journal drainer."""
+
+    def test_drain_indexes_changed_patients(self, db_service, rag_service, indexer):
+        """Test draining indexes new patients and empties the journal."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar"))
+        db_service.add_visit(Visit(patient_id=patient.id, diagnosis="Hypertension"))
+        db_service.add_investigation(Investigation(patient_id=patient.id, test_name="HbA1c"))
+
+        assert indexer.drain() == 3
+        assert not db_service.has_pending_rag_changes()
+        assert rag_service.get_patient_document_count(patient.id) == 2
+        assert embeddings(rag_service) == 3  # summary + 2 documents
+
+    def test_new_visit_embeds_only_new_documents(self, db_service, rag_service, indexer):
+        """Test a new visit embeds the visit plus the changed summary."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar"))
+        db_service.add_visit(Visit(patient_id=patient.id, diagnosis="Hypertension"))
+        indexer.drain()
+        before = embeddings(rag_service)
+
+        db_service.add_visit(Visit(patient_id=patient.id, diagnosis="Diabetes"))
+        indexer.drain()
+
+        assert embeddings(rag_service) - before == 2
+
+    def test_reselecting_unchanged_patient_costs_nothing(self, db_service, rag_service, indexer):
+        """Test indexing an unchanged patient makes zero embeddings."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar"))
+        db_service.add_visit(Visit(patient_id=patient.id, diagnosis="Hypertension"))
+        indexer.index_patient(patient.id)
+        before = embeddings(rag_service)
+
+        assert indexer.index_patient(patient.id) == 0
+        assert indexer.drain() > 0  # Journal still drains...
+        assert embeddings(rag_service) == before  # ...without re-embedding
+
+    def test_entries_kept_when_indexing_fails(self, db_service, rag_service, indexer):
+        """Test journal entries survive a failed batch for retry."""
+        db_service.add_patient(Patient(name="Ram Kumar"))
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("vector store unavailable")
+
+        rag_service.patient_summaries.upsert = fail
+        with pytest.raises(RuntimeError):
+            indexer.drain_once()
+
+        assert db_service.has_pending_rag_changes()
+
+    def test_background_thread_drains_on_wake(self, db_service, rag_service):
+        """Test the worker thread picks up changes when woken."""
+        indexer = RAGIndexer(db_service, rag_service, poll_interval=60)
+        done = []
+        indexer.on_batch_indexed = lambda applied, embedded: done.append(applied)
+        indexer.start()
+        try:
+            db_service.add_patient(Patient(name="Ram Kumar"))
+            indexer.wake()
+            for _ in range(100):
+                if not db_service.has_pending_rag_changes():
+                    break
+                time.sleep(0.02)
+        finally:
+            indexer.stop()
+
+        assert not db_service.has_pending_rag_changes()
+        assert done
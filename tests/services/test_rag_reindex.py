@@ -0,0 +1,167 @@
+"""Tests for bulk offline RAG reindexing."""
+
+import pytest
+import tempfile
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.services.database import DatabaseService
+from src.services.rag import RAGService
+from src.services.rag_reindex import BulkReindexer
+from src.models.schemas import Patient, Visit, Investigation
+from tests.services.test_rag_indexer import FakeCollection, FakeEmbeddingProvider
+
+
+def fake_embedding_function():
+    """Picklable embedding factory for pool workers."""
+    return lambda texts: [[float(len(text)), 1.0] for text in texts]
+
+
+class Interrupted(Exception):
+    """Raised from a progress callback to simulate a crash."""
+
+
+def crash_after_first_page(stats, total):
+    raise Interrupted()
+
+
+@pytest.fixture
+def db_service():
+    """Database with five patients, two documents each."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DatabaseService(db_path=str(Path(tmpdir) / "test.db"))
+        for i in range(5):
+            patient = db.add_patient(Patient(name=f"Patient {i}"))
+            db.add_visit(Visit(patient_id=patient.id, diagnosis=f"Diagnosis {i}"))
+            db.add_investigation(Investigation(patient_id=patient.id, test_name="HbA1c"))
+        yield db
+        db.close()
+
+
+@pytest.fixture
+def rag_service():
+    """RAGService backed by in-memory collections."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rag = RAGService(persist_directory=tmpdir, embedding_provider=FakeEmbeddingProvider())
+        rag.patient_summaries = FakeCollection()
+        rag.patient_documents = FakeCollection()
+        yield rag
+
+
+def make_reindexer(db_service, rag_service, **kwargs):
+    kwargs.setdefault("workers", 0)
+    return BulkReindexer(db_service, rag_service, page_size=2, batch_size=3, **kwargs)
+
+
+class TestBulkReindexer:
+    """Tests for BulkReindexer."""
+
+    def test_indexes_every_patient(self, db_service, rag_service):
+        """Test a full run indexes all summaries and documents."""
+        pages = []
+        stats = make_reindexer(db_service, rag_service).run(
+            progress_callback=lambda s, total: pages.append((s.patients, total))
+        )
+
+        assert stats.patients == 5
+        assert stats.documents == 10
+        assert stats.embedded == 15
+        assert len(rag_service.patient_summaries.docs) == 5
+        assert len(rag_service.patient_documents.docs) == 10
+        assert pages == [(2, 5), (4, 5), (5, 5)]
+        assert stats.docs_per_second > 0
+
+    def test_second_run_skips_unchanged(self, db_service, rag_service):
+        """Test re-running over a complete index embeds nothing."""
+        make_reindexer(db_service, rag_service).run()
+
+        stats = make_reindexer(db_service, rag_service).run()
+
+        assert stats.embedded == 0
+        assert stats.unchanged == 15
+
+    def test_matches_incremental_indexing(self, db_service, rag_service):
+        """Test bulk output uses the same IDs and hashes as incremental indexing."""
+        make_reindexer(db_service, rag_service).run()
+
+        for patient in db_service.get_all_patients():
+            assert rag_service.index_patient_summary(
+                patient.id, db_service.get_patient_summary(patient.id)
+            ) is False
+            assert rag_service.index_patient_documents(
+                patient.id, db_service.get_patient_documents_for_rag(patient.id)
+            ) == 0
+
+    def test_removes_stale_documents(self, db_service, rag_service):
+        """Test documents no longer in the database are deleted."""
+        rag_service.index_patient_documents(1, [("visit_999", "Old record", {"type": "visit"})])
+
+        stats = make_reindexer(db_service, rag_service).run()
+
+        assert stats.deleted == 1
+        assert "p1_visit_999" not in rag_service.patient_documents.docs
+
+    def test_removes_deleted_patients(self, db_service, rag_service):
+        """Test patients deleted from the database are dropped from the index."""
+        make_reindexer(db_service, rag_service).run()
+        with db_service.get_connection() as conn:
+            for table in ("visits", "investigations"):
+                conn.execute(f"DELETE FROM {table} WHERE patient_id = 5")
+            conn.execute("DELETE FROM patients WHERE id = 5")
+
+        stats = make_reindexer(db_service, rag_service).run()
+
+        assert stats.deleted == 3
+        assert rag_service.summary_id(5) not in rag_service.patient_summaries.docs
+        assert not any(doc_id.startswith("p5_") for doc_id in rag_service.patient_documents.docs)
+        assert len(rag_service.patient_summaries.docs) == 4
+
+    def test_resume_from_checkpoint(self, db_service, rag_service):
+        """Test an interrupted run resumes after the last completed page."""
+        reindexer = make_reindexer(db_service, rag_service)
+
+        with pytest.raises(Interrupted):
+            reindexer.run(progress_callback=crash_after_first_page)
+
+        checkpoint = reindexer.load_checkpoint()
+        assert checkpoint.patients == 2
+        upserts_before = rag_service.patient_summaries.embedded
+
+        stats = reindexer.run()
+
+        assert stats.patients == 5
+        assert rag_service.patient_summaries.embedded - upserts_before == 3
+        assert reindexer.load_checkpoint() is None
+
+    def test_restart_ignores_checkpoint(self, db_service, rag_service):
+        """Test resume=False starts from the first patient."""
+        reindexer = make_reindexer(db_service, rag_service)
+        with pytest.raises(Interrupted):
+            reindexer.run(progress_callback=crash_after_first_page)
+
+        stats = reindexer.run(resume=False)
+
+        assert stats.patients == 5
+
+    def test_process_pool_embeddings(self, db_service, rag_service):
+        """Test embeddings computed in worker processes are passed to upsert."""
+        stats = make_reindexer(
+            db_service, rag_service, workers=2, embedding_factory=fake_embedding_function
+        ).run()
+
+        assert stats.embedded == 15
+        # Workers embedded everything; the in-process model was never used
+        assert rag_service.embedder.texts_embedded == 0
+        assert len(rag_service.patient_documents.docs) == 10
+
+    def test_default_factory_clones_rag_provider(self, db_service, rag_service):
+        """Test pool workers get an unloaded copy of the RAGService's model."""
+        reindexer = make_reindexer(db_service, rag_service)
+
+        worker_embedder = reindexer.embedding_factory()
+
+        assert worker_embedder is not rag_service.embedder
+        assert worker_embedder.model_name == rag_service.embedder.model_name
+        assert worker_embedder._model is None
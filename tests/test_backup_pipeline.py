@@ -0,0 +1,295 @@
+"""Tests for the streaming cloud backup pipeline."""
+
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.services.crypto import is_crypto_available, DecryptionError
+from src.services.sync import LocalStorageBackend, StorageBackend, SyncService, TRANSFER_STATE_DIR
+
+pytestmark = pytest.mark.skipif(
+    not is_crypto_available(),
+    reason="Cryptography libraries not available"
+)
+
+from src.services import backup_pipeline
+from src.services.backup import BackupService
+from src.services.backup_pipeline import BackupPipeline, GZIP_SUFFIX, ZSTD_SUFFIX
+
+MB = 1024 * 1024
+
+
+def random_bytes(n, seed=0):
+    return random.Random(seed).randbytes(n)
+
+
+class MemoryBackend(StorageBackend):
+    """Backend without native multipart support, to exercise the default."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload(self, local_path, remote_key, progress_callback=None):
+        self.objects[remote_key] = Path(local_path).read_bytes()
+        return True
+
+    def download(self, remote_key, local_path, progress_callback=None):
+        Path(local_path).write_bytes(self.objects[remote_key])
+        return True
+
+    def delete(self, remote_key):
+        return self.objects.pop(remote_key, None) is not None
+
+    def list_files(self, prefix=""):
+        return [{'key': k, 'size': len(v), 'modified': ''} for k, v in self.objects.items()]
+
+    def exists(self, remote_key):
+        return remote_key in self.objects
+
+    def get_metadata(self, remote_key):
+        return None
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A database snapshot and a chroma directory to back up."""
+    db = tmp_path / "src" / "clinic.db"
+    chroma = tmp_path / "src" / "chroma"
+    (chroma / "segments").mkdir(parents=True)
+    db.write_bytes(random_bytes(300_000, seed=1) + b"\0" * 200_000)
+    (chroma / "segments" / "data.bin").write_bytes(random_bytes(400_000, seed=2))
+    (chroma / "index.json").write_text('{"dim": 384}')
+    return {"clinic.db": db, "chroma": chroma}
+
+
+@pytest.fixture
+def local(tmp_path):
+    return LocalStorageBackend(tmp_path / "cloud")
+
+
+def small_pipeline(backend, **kwargs):
+    kwargs.setdefault("compression", "gzip")
+    return BackupPipeline(backend, part_size=64 * 1024, upload_workers=3, **kwargs)
+
+
+def assert_restored(dest, source):
+    assert (dest / "clinic.db").read_bytes() == source["clinic.db"].read_bytes()
+    assert (dest / "chroma" / "segments" / "data.bin").read_bytes() == \
+        (source["chroma"] / "segments" / "data.bin").read_bytes()
+    assert (dest / "chroma" / "index.json").read_text() == '{"dim": 384}'
+
+
+class TestBackupPipeline:
+    """Tests for BackupPipeline."""
+
+    def test_roundtrip_in_multiple_parts(self, local, source, tmp_path):
+        pipeline = small_pipeline(local)
+
+        result = pipeline.upload(source, "password", members={"backup_manifest.json": b"{}"})
+
+        assert result.remote_key.endswith(GZIP_SUFFIX)
+        assert result.parts > 3
+        assert result.bytes_uploaded == local.get_metadata(result.remote_key)["size"]
+        assert result.bytes_compressed < result.bytes_read
+        assert sorted(f["key"] for f in local.list_files()) == [result.remote_key, result.remote_key + ".parts.json"]
+
+        dest = pipeline.restore(result.remote_key, "password", tmp_path / "restored")
+        assert_restored(dest, source)
+        assert (dest / "backup_manifest.json").read_bytes() == b"{}"
+
+    def test_default_multipart_staging(self, source, tmp_path):
+        """Test backends without native multipart get assembled uploads."""
+        backend = MemoryBackend()
+        pipeline = small_pipeline(backend)
+
+        result = pipeline.upload(source, "password")
+
+        assert result.remote_key in backend.objects
+        assert_restored(pipeline.restore(result.remote_key, "password", tmp_path / "out"), source)
+
+    def test_backend_without_multipart_uploads_whole(self, source, tmp_path):
+        backend = MemoryBackend()
+        backend.supports_multipart = False
+        backend.create_multipart_upload = None  # Must not be called
+        pipeline = small_pipeline(backend)
+
+        result = pipeline.upload(source, "password")
+
+        assert result.parts == 1
+        assert result.bytes_uploaded == len(backend.objects[result.remote_key])
+        assert list(backend.objects) == [result.remote_key]
+        assert_restored(pipeline.restore(result.remote_key, "password", tmp_path / "out"), source)
+
+    def test_interrupted_upload_discarded_on_resume(self, local, source, tmp_path):
+        """Test parts of a streamed upload cut off by a crash are freed on the next sync."""
+        state_dir = tmp_path / "backups" / TRANSFER_STATE_DIR
+
+        def killed(remote_key, upload_id, parts):
+            raise SystemExit()  # App closed before the upload finished
+
+        complete = local.complete_multipart_upload
+        local.complete_multipart_upload = killed
+        with pytest.raises(SystemExit):
+            small_pipeline(local, state_dir=state_dir).upload(source, "password")
+
+        staging = local.base_path / LocalStorageBackend.MULTIPART_DIR
+        assert any(staging.iterdir())
+
+        local.complete_multipart_upload = complete
+        SyncService(local, tmp_path / "backups").resume_pending_uploads()
+
+        assert not any(staging.iterdir())
+        assert not list(state_dir.glob("stream-*.json"))
+
+    def test_restore_resumes_interrupted_download(self, local, source, tmp_path):
+        state_dir = tmp_path / "backups" / TRANSFER_STATE_DIR
+        pipeline = small_pipeline(local, state_dir=state_dir)
+        result = pipeline.upload(source, "password")
+        assert not list(state_dir.glob("stream-*.json"))
+
+        download_range = local.download_range
+        fetched = []
+
+        def dropping(remote_key, start, length):
+            if start >= 3 * pipeline.part_size:
+                raise ConnectionError("broadband dropped")
+            fetched.append(start)
+            return download_range(remote_key, start, length)
+
+        local.download_range = dropping
+        with pytest.raises(IOError):
+            pipeline.restore(result.remote_key, "password", tmp_path / "out")
+
+        def counting(remote_key, start, length):
+            fetched.append(start)
+            return download_range(remote_key, start, length)
+
+        local.download_range = counting
+        assert_restored(pipeline.restore(result.remote_key, "password", tmp_path / "out"), source)
+        assert len(fetched) == result.parts
+        assert not any((state_dir / "downloads").iterdir())
+
+    def test_zstd(self, local, source, tmp_path):
+        pytest.importorskip("zstandard")
+        pipeline = small_pipeline(local, compression="zstd", compression_level=5, compression_threads=2)
+
+        result = pipeline.upload(source, "password")
+
+        assert result.remote_key.endswith(ZSTD_SUFFIX)
+        assert_restored(pipeline.restore(result.remote_key, "password", tmp_path / "out"), source)
+
+    def test_missing_zstd_falls_back_to_gzip(self, local, monkeypatch):
+        monkeypatch.setattr(backup_pipeline, "zstandard", None)
+
+        assert BackupPipeline(local, compression="zstd").suffix == GZIP_SUFFIX
+
+    def test_progress_reports_bytes_per_stage(self, local, source):
+        seen = {}
+
+        def progress(stage, done, total):
+            assert done >= seen.get(stage, 0)
+            seen[stage] = done
+
+        result = small_pipeline(local, progress_callback=progress).upload(source, "password")
+
+        assert set(seen) == {"read", "compress", "encrypt", "upload"}
+        assert seen["read"] == result.bytes_read
+        assert seen["upload"] == result.bytes_uploaded == seen["encrypt"]
+
+    def test_slow_upload_applies_backpressure(self, local, tmp_path):
+        """Test a stalled upload stops reading instead of buffering the backup."""
+        big = tmp_path / "big.bin"
+        big.write_bytes(random_bytes(32 * MB, seed=5))
+        release = threading.Event()
+        upload_part = local.upload_part
+
+        def stalled(*args, **kwargs):
+            release.wait()
+            return upload_part(*args, **kwargs)
+
+        local.upload_part = stalled
+        pipeline = BackupPipeline(local, compression="gzip", compression_level=1,
+                                  part_size=MB, upload_workers=1, queue_blocks=1)
+        progress = {}
+        pipeline.progress_callback = lambda stage, done, total: progress.__setitem__(stage, done)
+
+        uploader = threading.Thread(target=pipeline.upload, args=({"big.bin": big}, "password"))
+        uploader.start()
+        time.sleep(1.0)
+        read_while_stalled = progress.get("read", 0)
+        release.set()
+        uploader.join(timeout=30)
+
+        # A block queued and one in hand per stage, plus the parts in flight
+        assert read_while_stalled < 12 * MB
+        assert progress["read"] > 32 * MB
+
+    def test_stage_failure_aborts_upload(self, local, source):
+        """Test a failing part leaves nothing behind in the bucket."""
+        calls = []
+
+        def failing(remote_key, upload_id, part_number, data, checksum=None):
+            calls.append(part_number)
+            if part_number == 2:
+                raise ConnectionError("broadband dropped")
+            return "etag"
+
+        local.upload_part = failing
+
+        with pytest.raises(ConnectionError):
+            small_pipeline(local).upload(source, "password")
+
+        assert local.list_files() == []
+        assert not (local.base_path / LocalStorageBackend.MULTIPART_DIR).exists() or \
+            not any((local.base_path / LocalStorageBackend.MULTIPART_DIR).iterdir())
+
+    def test_wrong_password(self, local, source, tmp_path):
+        pipeline = small_pipeline(local)
+        result = pipeline.upload(source, "password")
+
+        with pytest.raises(DecryptionError):
+            pipeline.restore(result.remote_key, "wrong", tmp_path / "out")
+
+
+class TestBackupServiceCloudSync:
+    """Tests for BackupService.sync_to_cloud through the pipeline."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        conn = sqlite3.connect(data_dir / "clinic.db")
+        conn.execute("CREATE TABLE patients (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute("CREATE TABLE visits (id INTEGER PRIMARY KEY, patient_id INTEGER)")
+        conn.executemany("INSERT INTO patients (name) VALUES (?)", [(f"Patient {i}",) for i in range(200)])
+        conn.commit()
+        conn.close()
+        (data_dir / "chroma").mkdir()
+        (data_dir / "chroma" / "index.bin").write_bytes(random_bytes(50_000))
+        return BackupService(data_dir=data_dir, backup_dir=tmp_path / "backups")
+
+    def test_sync_and_restore(self, service, tmp_path):
+        config = {"type": "local", "path": str(tmp_path / "cloud")}
+        messages = []
+
+        assert service.sync_to_cloud("password", config, lambda msg, pct: messages.append(pct))
+        assert messages[-1] == 100
+        assert messages == sorted(messages)
+        assert not list(service.backup_dir.glob("*.zip"))  # Nothing staged locally
+
+        backups = service.list_cloud_backups(config)
+        assert len(backups) == 1
+
+        conn = sqlite3.connect(service.db_path)
+        conn.execute("DELETE FROM patients")
+        conn.commit()
+        conn.close()
+
+        assert service.restore_from_cloud(backups[0]["key"], "password", config)
+        conn = sqlite3.connect(service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0] == 200
+        conn.close()
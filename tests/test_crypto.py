@@ -1,14 +1,19 @@
 """Tests for the crypto service."""
 
+import io
+import os
 import pytest
 import tempfile
+import tracemalloc
+import zipfile
 from pathlib import Path
 
 # Skip if crypto not available
 try:
     from src.services.crypto import (
         CryptoService, EncryptedData, DecryptionError,
-        is_crypto_available, get_crypto_backend
+        is_crypto_available, get_crypto_backend,
+        STREAM_HEADER_SIZE, STREAM_VERSION
     )
     CRYPTO_AVAILABLE = is_crypto_available()
 except ImportError:
@@ -200,3 +205,110 @@ class TestCryptoAvailability:
         """Test getting crypto backend name."""
         backend = get_crypto_backend()
         assert backend in ["PyNaCl (libsodium)", "cryptography", "none"]
+
+
+class TestStreamingEncryption:
+    """Tests for the chunked streaming format."""
+
+    @pytest.fixture
+    def crypto(self):
+        return CryptoService()
+
+    def encrypt(self, crypto, data, chunk_size=1024):
+        out = io.BytesIO()
+        crypto.encrypt_stream(io.BytesIO(data), out, "password", chunk_size=chunk_size)
+        return out.getvalue()
+
+    def decrypt(self, crypto, blob, password="password"):
+        out = io.BytesIO()
+        crypto.decrypt_stream(io.BytesIO(blob), out, password)
+        return out.getvalue()
+
+    @pytest.mark.parametrize("size", [0, 1, 1023, 1024, 1025, 5000])
+    def test_roundtrip_at_chunk_boundaries(self, crypto, size):
+        data = os.urandom(size)
+        blob = self.encrypt(crypto, data)
+
+        assert blob[0] == STREAM_VERSION
+        assert len(blob) == STREAM_HEADER_SIZE + size + 16 * max(1, -(-size // 1024))
+        assert self.decrypt(crypto, blob) == data
+
+    def test_wrong_password_fails(self, crypto):
+        blob = self.encrypt(crypto, b"Patient notes")
+
+        with pytest.raises(DecryptionError, match="wrong password"):
+            self.decrypt(crypto, blob, "wrong")
+
+    def test_truncation_detected(self, crypto):
+        """Test dropping whole trailing chunks is caught, not silently accepted."""
+        blob = self.encrypt(crypto, os.urandom(3000))
+
+        with pytest.raises(DecryptionError):
+            self.decrypt(crypto, blob[:STREAM_HEADER_SIZE + 2 * (1024 + 16)])
+
+    def test_reordered_chunks_detected(self, crypto):
+        blob = self.encrypt(crypto, os.urandom(3000))
+        body = blob[STREAM_HEADER_SIZE:]
+        sealed = 1024 + 16
+        swapped = blob[:STREAM_HEADER_SIZE] + body[sealed:2 * sealed] + body[:sealed] + body[2 * sealed:]
+
+        with pytest.raises(DecryptionError, match="corrupted|wrong password"):
+            self.decrypt(crypto, swapped)
+
+    def test_appended_data_detected(self, crypto):
+        blob = self.encrypt(crypto, os.urandom(3000))
+
+        with pytest.raises(DecryptionError):
+            self.decrypt(crypto, blob + os.urandom(1024 + 16))
+
+    def test_header_tampering_detected(self, crypto):
+        """Test the header is authenticated along with the chunks."""
+        blob = bytearray(self.encrypt(crypto, os.urandom(100)))
+        blob[STREAM_HEADER_SIZE - 1] ^= 1  # File nonce
+
+        with pytest.raises(DecryptionError):
+            self.decrypt(crypto, bytes(blob))
+
+    def test_reads_legacy_files(self, crypto):
+        """Test files written in the old single-message format still decrypt."""
+        legacy = crypto.encrypt(b"Old backup", "password").to_bytes()
+
+        assert self.decrypt(crypto, legacy) == b"Old backup"
+
+    def test_zip_written_through_encrypted_writer(self, crypto):
+        """Test zipfile can stream straight into the encrypting writer."""
+        out = io.BytesIO()
+        with crypto.open_encrypted_writer(out, "password", chunk_size=4096) as writer:
+            with zipfile.ZipFile(writer, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.writestr("clinic.db", os.urandom(20000))
+
+        restored = io.BytesIO(self.decrypt(crypto, out.getvalue()))
+        with zipfile.ZipFile(restored) as zipf:
+            assert len(zipf.read("clinic.db")) == 20000
+
+    def test_file_encryption_constant_memory(self, crypto, tmp_path):
+        """Test peak memory stays near the chunk size, not the file size."""
+        source = tmp_path / "backup.zip"
+        with open(source, 'wb') as f:
+            for _ in range(32):
+                f.write(os.urandom(1024 * 1024))
+
+        tracemalloc.start()
+        try:
+            assert crypto.encrypt_file(source, tmp_path / "backup.enc", "password")
+            assert crypto.decrypt_file(tmp_path / "backup.enc", tmp_path / "restored.zip", "password")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < 8 * 1024 * 1024
+        assert (tmp_path / "restored.zip").read_bytes() == source.read_bytes()
+
+    def test_failed_decrypt_leaves_no_output(self, crypto, tmp_path):
+        source = tmp_path / "backup.zip"
+        source.write_bytes(b"x" * 5000)
+        crypto.encrypt_file(source, tmp_path / "backup.enc", "password")
+
+        assert not crypto.decrypt_file(tmp_path / "backup.enc", tmp_path / "out.zip", "wrong")
+        assert not (tmp_path / "out.zip").exists()
+        assert not (tmp_path / "out.zip.partial").exists()
@@ -7,7 +7,7 @@ from pathlib import Path
 from datetime import date, datetime, timedelta
 
 from src.services.database import DatabaseService
-from src.models.schemas import Patient, Visit, Investigation, Procedure
+from src.models.schemas import Patient, Visit, Investigation, Procedure, Vitals
 
 
 class TestDatabaseService:
@@ -516,3 +516,376 @@ class TestChangeTracking:
 
         # Should return True because patients exist
         assert db_service.has_changes_since(datetime.now()) is True
+
+
+class TestFullTextSearch:
+    """Tests for FTS5 patient and clinical search."""
+
+    @pytest.fixture
+    def db_service(self):
+        """Create database service with temp database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            yield DatabaseService(db_path=str(db_path))
+
+    @pytest.fixture
+    def patients(self, db_service):
+        """Create two patients with clinical records."""
+        ram = db_service.add_patient(Patient(name="Ram Lal Sharma", age=62, phone="9876543210"))
+        vikram = db_service.add_patient(Patient(name="Vikram Singh", age=45))
+
+        db_service.add_visit(Visit(
+            patient_id=ram.id,
+            chief_complaint="Increased thirst",
+            diagnosis="Type 2 Diabetes",
+            prescription_json='{"medications": [{"drug_name": "Metformin"}]}'
+        ))
+        db_service.add_investigation(Investigation(
+            patient_id=ram.id,
+            test_name="HbA1c",
+            result="8.2",
+            unit="%",
+            is_abnormal=True
+        ))
+        db_service.add_visit(Visit(
+            patient_id=vikram.id,
+            chief_complaint="Fever and body ache",
+            diagnosis="Viral fever",
+            prescription_json="not json"
+        ))
+        db_service.add_procedure(Procedure(
+            patient_id=vikram.id,
+            procedure_name="Angiography",
+            details="Normal coronaries"
+        ))
+        return ram, vikram
+
+    def test_fts_tables_created(self, db_service):
+        """Test FTS virtual tables exist after migration."""
+        with db_service.get_connection() as conn:
+            tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+            )}
+
+        assert 'patients_fts' in tables
+        assert 'clinical_fts' in tables
+
+    def test_search_basic_ranks_word_prefix_first(self, db_service, patients):
+        """Test whole-word prefix matches come before infix matches."""
+        results = db_service.search_patients_basic("Ram")
+
+        assert [p.name for p in results] == ["Ram Lal Sharma", "Vikram Singh"]
+
+    def test_search_basic_keeps_like_matches(self, db_service, patients):
+        """Test a prefix hit does not hide other substring matches."""
+        db_service.add_patient(Patient(name="Ram Harmesh"))
+
+        results = db_service.search_patients_basic("harm")
+
+        assert [p.name for p in results] == ["Ram Harmesh", "Ram Lal Sharma"]
+
+    def test_search_basic_infix_falls_back_to_like(self, db_service, patients):
+        """Test infix fragments still match via LIKE fallback."""
+        results = db_service.search_patients_basic("kram")
+
+        assert [p.name for p in results] == ["Vikram Singh"]
+
+    def test_search_basic_empty_query_returns_all(self, db_service, patients):
+        """Test empty query lists every patient."""
+        assert len(db_service.search_patients_basic("")) == 2
+
+    def test_fts_search_patients_by_phone(self, db_service, patients):
+        """Test FTS patient search covers phone numbers."""
+        results = db_service.fts_search_patients("98765")
+
+        assert [p.name for p in results] == ["Ram Lal Sharma"]
+
+    def test_fts_search_patients_special_characters(self, db_service, patients):
+        """Test FTS syntax characters in queries are neutralised."""
+        assert db_service.fts_search_patients('"') == []
+        assert [p.name for p in db_service.fts_search_patients('ram* "sharma')] == ["Ram Lal Sharma"]
+
+    def test_patient_update_reindexed(self, db_service, patients):
+        """Test updating a patient keeps the index in sync."""
+        ram, _ = patients
+        ram.name = "Ramesh Sharma"
+        db_service.update_patient(ram)
+
+        assert [p.name for p in db_service.fts_search_patients("ramesh")] == ["Ramesh Sharma"]
+        assert db_service.fts_search_patients("lal") == []
+
+    def test_fts_search_clinical_scoped_to_patient(self, db_service, patients):
+        """Test clinical search honours patient_id scoping."""
+        ram, vikram = patients
+
+        ram_results = db_service.fts_search_clinical("metformin fever", patient_id=ram.id)
+        vikram_results = db_service.fts_search_clinical("metformin fever", patient_id=vikram.id)
+
+        assert [r['doc_type'] for r in ram_results] == ['visit']
+        assert 'Metformin' in ram_results[0]['content']
+        assert [r['patient_id'] for r in vikram_results] == [vikram.id]
+
+    def test_fts_search_clinical_snippet_and_rank(self, db_service, patients):
+        """Test results carry a highlighted snippet and are ranked."""
+        results = db_service.fts_search_clinical("hba1c")
+
+        assert results[0]['doc_type'] == 'investigation'
+        assert '[HbA1c]' in results[0]['snippet']
+        assert results[0]['score'] > 0
+
+    def test_visit_update_reindexed(self, db_service, patients):
+        """Test updating a visit replaces its indexed text."""
+        _, vikram = patients
+        visit = db_service.get_patient_visits(vikram.id)[0]
+        visit.diagnosis = "Dengue"
+        db_service.update_visit(visit)
+
+        assert db_service.fts_search_clinical("dengue")[0]['doc_id'] == visit.id
+        assert all(r['doc_id'] != visit.id for r in db_service.fts_search_clinical("viral"))
+
+    def test_migration_backfills_existing_database(self):
+        """Test upgrading a v1 database indexes rows created before FTS existed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "legacy.db"
+
+            conn = sqlite3.connect(db_path)
+            conn.executescript("""
+                CREATE TABLE schema_versions (version INTEGER PRIMARY KEY, applied_at TIMESTAMP);
+                INSERT INTO schema_versions (version) VALUES (1);
+                CREATE TABLE patients (id INTEGER PRIMARY KEY AUTOINCREMENT, uhid TEXT UNIQUE,
+                    name TEXT NOT NULL, age INTEGER, gender TEXT, phone TEXT, address TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE visits (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_id INTEGER NOT NULL,
+                    visit_date DATE, chief_complaint TEXT, clinical_notes TEXT, diagnosis TEXT,
+                    prescription_json TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE investigations (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_id INTEGER NOT NULL,
+                    test_name TEXT NOT NULL, result TEXT, unit TEXT, reference_range TEXT, test_date DATE,
+                    is_abnormal BOOLEAN DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE procedures (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_id INTEGER NOT NULL,
+                    procedure_name TEXT NOT NULL, details TEXT, procedure_date DATE, notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT, updated_at TIMESTAMP);
+                INSERT INTO patients (uhid, name) VALUES ('EMR-2024-0001', 'Legacy Patient');
+                INSERT INTO visits (patient_id, diagnosis) VALUES (1, 'Hypothyroidism');
+            """)
+            conn.close()
+
+            db = DatabaseService(db_path=str(db_path))
+
+            assert [p.name for p in db.fts_search_patients("legacy")] == ["Legacy Patient"]
+            assert db.fts_search_clinical("hypothyroidism")[0]['patient_id'] == 1
+            db.close()
+
+
+class TestPatientSnapshots:
+    """Tests for materialized patient snapshots."""
+
+    @pytest.fixture
+    def db_service(self):
+        """Create database service with temp database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            db = DatabaseService(db_path=str(db_path))
+            yield db
+            db.close()
+
+    @pytest.fixture
+    def patient(self, db_service):
+        """Create a patient with a visit, lab, allergy and vitals."""
+        patient = db_service.add_patient(Patient(name="Ram Kumar", age=65, gender="M"))
+        db_service.add_visit(Visit(
+            patient_id=patient.id,
+            diagnosis="Atrial fibrillation",
+            prescription_json='{"medications": [{"drug_name": "Warfarin", "strength": "5mg"}]}'
+        ))
+        db_service.add_investigation(Investigation(
+            patient_id=patient.id, test_name="Creatinine", result="1.4", unit="mg/dL"
+        ))
+        db_service.add_allergy(patient.id, "Penicillin", "Rash")
+        db_service.add_vitals(Vitals(
+            patient_id=patient.id, bp_systolic=130, bp_diastolic=80, weight=70, height=170
+        ))
+        return patient
+
+    def _is_dirty(self, db_service, patient_id):
+        with db_service.get_read_connection() as conn:
+            row = conn.execute(
+                "SELECT is_dirty FROM patient_snapshots WHERE patient_id = ?", (patient_id,)
+            ).fetchone()
+            return row[0] if row else None
+
+    def test_snapshot_contents(self, db_service, patient):
+        """Test the snapshot summarizes the patient's record."""
+        snapshot = db_service.get_patient_snapshot(patient.id)
+
+        assert snapshot.demographics == "Ram Kumar, 65M"
+        assert snapshot.active_problems == ["Atrial fibrillation"]
+        assert [m.drug_name for m in snapshot.current_medications] == ["Warfarin"]
+        assert snapshot.on_anticoagulation is True
+        assert snapshot.allergies == ["Penicillin"]
+        assert snapshot.key_labs["creatinine"]["value"] == "1.4"
+        assert snapshot.vitals["BP"] == "130/80"
+        assert snapshot.vitals["BMI"] == "24.2"
+
+    def test_snapshot_cached_after_first_read(self, db_service, patient):
+        """Test a clean snapshot is served from the table, not recomputed."""
+        db_service.get_patient_snapshot(patient.id)
+        assert self._is_dirty(db_service, patient.id) == 0
+
+        db_service.compute_patient_snapshot = None  # Would fail if called
+        assert db_service.get_patient_snapshot(patient.id).patient_id == patient.id
+
+    def test_writes_mark_snapshot_dirty(self, db_service, patient):
+        """Test every feeding table flags the snapshot stale."""
+        writes = [
+            lambda: db_service.add_visit(Visit(patient_id=patient.id, diagnosis="CKD")),
+            lambda: db_service.add_investigation(Investigation(patient_id=patient.id, test_name="INR")),
+            lambda: db_service.add_procedure(Procedure(patient_id=patient.id, procedure_name="Echo")),
+            lambda: db_service.add_allergy(patient.id, "Sulfa"),
+            lambda: db_service.add_vitals(Vitals(patient_id=patient.id, pulse=72)),
+            lambda: db_service.update_patient(patient.model_copy(update={"age": 66})),
+        ]
+        for write in writes:
+            db_service.get_patient_snapshot(patient.id)
+            assert self._is_dirty(db_service, patient.id) == 0
+            write()
+            assert self._is_dirty(db_service, patient.id) == 1
+
+    def test_dirty_snapshot_recomputed_on_read(self, db_service, patient):
+        """Test a read after a change reflects the change."""
+        db_service.get_patient_snapshot(patient.id)
+        db_service.add_allergy(patient.id, "Sulfa")
+
+        assert db_service.get_patient_snapshot(patient.id).allergies == ["Penicillin", "Sulfa"]
+
+    def test_refresh_dirty_snapshots(self, db_service, patient):
+        """Test refreshing only touches dirty snapshots."""
+        other = db_service.add_patient(Patient(name="Priya Sharma"))
+        db_service.rebuild_patient_snapshots()
+        assert db_service.refresh_dirty_snapshots() == 0
+
+        db_service.add_allergy(other.id, "Aspirin")
+        assert db_service.refresh_dirty_snapshots() == 1
+        assert self._is_dirty(db_service, other.id) == 0
+
+    def test_rebuild_in_batches(self, db_service):
+        """Test rebuild covers every patient and reports progress per batch."""
+        for i in range(5):
+            db_service.add_patient(Patient(name=f"Patient {i}"))
+        progress = []
+
+        count = db_service.rebuild_patient_snapshots(
+            batch_size=2, progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        assert count == 5
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    def test_unknown_patient(self, db_service):
+        """Test missing patients return None instead of raising."""
+        assert db_service.get_patient_snapshot(9999) is None
+        with pytest.raises(ValueError):
+            db_service.compute_patient_snapshot(9999)
+
+    def test_allergy_and_vitals_helpers(self, db_service, patient):
+        """Test allergy lookups and latest vitals."""
+        assert db_service.check_allergy(patient.id, "penicillin")
+        assert not db_service.check_allergy(patient.id, "aspirin")
+
+        db_service.add_vitals(Vitals(patient_id=patient.id, weight=68))
+        assert db_service.get_latest_vitals(patient.id)["weight"] == 68
+
+
+class TestPatientRecordBundles:
+    """Tests for the batched patient record loader."""
+
+    @pytest.fixture
+    def db_service(self):
+        """Create database service with temp database."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "test.db"
+            db = DatabaseService(db_path=str(db_path))
+            yield db
+            db.close()
+
+    @pytest.fixture
+    def patients(self, db_service):
+        """Create three patients with varying amounts of history."""
+        created = []
+        for i in range(3):
+            patient = db_service.add_patient(Patient(name=f"Patient {i}"))
+            for day in range(i + 1):
+                db_service.add_visit(Visit(
+                    patient_id=patient.id,
+                    visit_date=date(2024, 1, day + 1),
+                    diagnosis=f"Diagnosis {day}"
+                ))
+            db_service.add_investigation(Investigation(patient_id=patient.id, test_name="HbA1c"))
+            created.append(patient)
+        db_service.add_procedure(Procedure(patient_id=created[0].id, procedure_name="ECG"))
+        db_service.add_allergy(created[0].id, "Penicillin")
+        db_service.add_vitals(Vitals(patient_id=created[0].id, pulse=70,
+                                     recorded_at=datetime(2024, 1, 1)))
+        db_service.add_vitals(Vitals(patient_id=created[0].id, pulse=80,
+                                     recorded_at=datetime(2024, 2, 1)))
+        return created
+
+    def test_bundle_matches_per_table_getters(self, db_service, patients):
+        """Test a bundle holds the same rows, in the same order, as the getters."""
+        for patient in patients:
+            bundle = db_service.get_patient_bundle(patient.id)
+
+            assert bundle.patient == db_service.get_patient(patient.id)
+            assert bundle.visits == db_service.get_patient_visits(patient.id)
+            assert bundle.investigations == db_service.get_patient_investigations(patient.id)
+            assert bundle.procedures == db_service.get_patient_procedures(patient.id)
+
+    def test_bundle_allergies_and_latest_vitals(self, db_service, patients):
+        """Test allergies and only the most recent vitals are attached."""
+        bundle = db_service.get_patient_bundle(patients[0].id)
+
+        assert bundle.allergies == ["Penicillin"]
+        assert bundle.latest_vitals["pulse"] == 80
+        assert db_service.get_patient_bundle(patients[1].id).latest_vitals is None
+
+    def test_bundles_keep_requested_order(self, db_service, patients):
+        """Test bundles come back keyed in request order, skipping unknown IDs."""
+        ids = [patients[2].id, 9999, patients[0].id]
+
+        bundles = db_service.get_patient_bundles(ids)
+
+        assert list(bundles) == [patients[2].id, patients[0].id]
+        assert len(bundles[patients[2].id].visits) == 3
+
+    def test_bundles_use_fixed_query_count(self, db_service, patients, monkeypatch):
+        """Test query count does not grow with the number of patients."""
+        monkeypatch.setattr(DatabaseService, "BUNDLE_BATCH_SIZE", 2)
+        statements = []
+
+        with db_service.get_read_connection() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                db_service.get_patient_bundles([p.id for p in patients])
+            finally:
+                conn.set_trace_callback(None)
+
+        # patients + 5 child tables, once per batch of 2
+        assert len(statements) == 12
+
+    def test_include_limits_parts(self, db_service, patients):
+        """Test include loads only the requested child records."""
+        bundle = db_service.get_patient_bundle(patients[0].id, include=("visits",))
+
+        assert len(bundle.visits) == 1
+        assert bundle.investigations == []
+        assert bundle.allergies == []
+
+        with pytest.raises(ValueError):
+            db_service.get_patient_bundle(patients[0].id, include=("notes",))
+
+    def test_iter_patient_bundles_pages(self, db_service, patients):
+        """Test streaming visits every patient once, by ID."""
+        bundles = list(db_service.iter_patient_bundles(batch_size=2))
+
+        assert [b.patient.id for b in bundles] == [p.id for p in patients]
+        assert [len(b.visits) for b in bundles] == [1, 2, 3]
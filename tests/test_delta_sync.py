@@ -0,0 +1,404 @@
+"""Tests for record-level delta sync."""
+
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services.crypto import DecryptionError, is_crypto_available
+from src.services.database import DatabaseService
+from src.services.delta_sync import (
+    DeltaSyncError,
+    DeltaSyncPublisher,
+    changeset_row_count,
+    decode_changeset,
+    derive_sync_key,
+    encode_changeset,
+    sync_key_salt,
+)
+from src.models.schemas import Patient, Visit
+
+pytestmark = pytest.mark.skipif(
+    not is_crypto_available(),
+    reason="Cryptography libraries not available"
+)
+
+MOBILE_SERVICES = Path(__file__).parent.parent / "docassist_mobile" / "src" / "services"
+
+KEY = bytes(range(32))
+
+
+def load_mobile_module(name):
+    """Load a mobile service module by path (its `src` package shadows ours)."""
+    spec = importlib.util.spec_from_file_location(f"mobile_{name}", MOBILE_SERVICES / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def db(tmp_path):
+    return DatabaseService(db_path=str(tmp_path / "clinic.db"))
+
+
+def add_patient(db, name="Ram Kumar"):
+    return db.add_patient(Patient(name=name, age=45, gender="M"))
+
+
+class RecordingPublisher(DeltaSyncPublisher):
+    """Publisher whose uploads land in a list instead of the cloud API."""
+
+    def __init__(self, db, fail=False, **kwargs):
+        super().__init__(db, "http://cloud.invalid", "token", KEY, "desktop-1", **kwargs)
+        self.uploads = []
+        self.fail = fail
+
+    def _post_changeset(self, blob, changeset):
+        if self.fail:
+            raise DeltaSyncError("Network error: unreachable")
+        self.uploads.append((blob, changeset))
+        return len(self.uploads)
+
+
+class TestChangeLog:
+    """Tests for the trigger-maintained change log."""
+
+    def test_changes_collapse_to_current_row(self, db):
+        patient = add_patient(db)
+        patient.phone = "9876543210"
+        db.update_patient(patient)
+
+        to_seq, tables = db.get_sync_changes()
+
+        assert to_seq == db.get_sync_seq() == 2
+        patients = tables["patients"]
+        assert len(patients["upserts"]) == 1
+        row = dict(zip(patients["columns"], patients["upserts"][0]))
+        assert row["phone"] == "9876543210"
+        assert patients["deletes"] == []
+
+    def test_deleted_rows_become_deletes(self, db):
+        patient = add_patient(db)
+        db.add_visit(Visit(patient_id=patient.id, chief_complaint="Fever"))
+        with db.get_connection() as conn:
+            conn.execute("DELETE FROM visits WHERE patient_id = ?", (patient.id,))
+
+        _, tables = db.get_sync_changes()
+
+        assert tables["visits"]["upserts"] == []
+        assert len(tables["visits"]["deletes"]) == 1
+        assert len(tables["patients"]["upserts"]) == 1
+
+    def test_limit_and_published_version(self, db):
+        for i in range(5):
+            add_patient(db, f"Patient {i}")
+
+        to_seq, tables = db.get_sync_changes(0, limit=3)
+        assert to_seq == 3
+        assert len(tables["patients"]["upserts"]) == 3
+
+        db.set_sync_version("desktop-1", to_seq)
+        assert db.get_sync_version("desktop-1") == 3
+        assert db.get_sync_version("other") == 0
+
+        with db.get_read_connection() as conn:
+            remaining = conn.execute("SELECT MIN(seq), COUNT(*) FROM sync_change_log").fetchone()
+        assert tuple(remaining) == (4, 2)
+
+    def test_no_changes(self, db):
+        add_patient(db)
+        db.set_sync_version("desktop-1", db.get_sync_seq())
+
+        assert db.get_sync_changes(db.get_sync_seq()) == (db.get_sync_seq(), {})
+
+    def test_old_entries_pruned_even_if_unpublished(self, db):
+        for i in range(4):
+            add_patient(db, f"Patient {i}")
+        with db.get_connection() as conn:
+            conn.execute("UPDATE sync_change_log SET changed_at = datetime('now', '-40 days') WHERE seq <= 3")
+
+        assert db.prune_sync_change_log("desktop-1") == 3
+        assert db.prune_sync_change_log("desktop-1") == 0
+
+        # The next change set starts after the gap, so phones fall back to a snapshot
+        publisher = RecordingPublisher(db)
+        publisher.publish()
+        assert [(c["from_seq"], c["to_seq"]) for _, c in publisher.uploads] == [(3, 4)]
+
+
+class TestChangesetEncoding:
+    """Tests for change set serialization and encryption."""
+
+    def test_round_trip(self):
+        changeset = {
+            "format": 1, "device_id": "d", "from_seq": 0, "to_seq": 2,
+            "tables": {"patients": {"columns": ["id", "name"], "upserts": [[1, "Ram"]], "deletes": [7]}},
+        }
+        blob = encode_changeset(changeset, KEY)
+
+        assert decode_changeset(blob, KEY) == changeset
+        assert changeset_row_count(changeset) == 2
+        assert b"Ram" not in blob
+
+    def test_wrong_key_rejected(self):
+        blob = encode_changeset({"format": 1, "tables": {}}, KEY)
+
+        with pytest.raises(DecryptionError):
+            decode_changeset(blob, bytes(32))
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            decode_changeset(encode_changeset({"format": 99, "tables": {}}, KEY), KEY)
+
+    def test_key_depends_on_account(self):
+        assert sync_key_salt("Doctor@Example.com ") == sync_key_salt("doctor@example.com")
+        assert sync_key_salt("a@example.com") != sync_key_salt("b@example.com")
+        assert derive_sync_key("pw", "doctor@example.com") == derive_sync_key("pw", "DOCTOR@example.com")
+
+
+class TestPublisher:
+    """Tests for DeltaSyncPublisher."""
+
+    def test_publishes_pending_changes_in_batches(self, db):
+        for i in range(5):
+            add_patient(db, f"Patient {i}")
+        publisher = RecordingPublisher(db, max_changes=2)
+        assert publisher.pending_changes() == 5
+
+        assert publisher.publish() == 3
+        assert [(c["from_seq"], c["to_seq"]) for _, c in publisher.uploads] == [(0, 2), (2, 4), (4, 5)]
+        assert publisher.pending_changes() == 0
+        assert publisher.publish() == 0
+
+    def test_failed_upload_is_retried(self, db):
+        add_patient(db)
+        publisher = RecordingPublisher(db, fail=True)
+
+        with pytest.raises(DeltaSyncError):
+            publisher.publish()
+        assert db.get_sync_version("desktop-1") == 0
+
+        publisher.fail = False
+        assert publisher.publish() == 1
+        assert publisher.uploads[0][1]["from_seq"] == 0
+
+
+class TestMobileApply:
+    """Tests for applying change sets to the mobile database."""
+
+    @pytest.fixture
+    def snapshot(self, db, tmp_path):
+        """Desktop with published data and a mobile copy restored from its backup."""
+        add_patient(db, "Ram Kumar")
+        add_patient(db, "Sita Devi")
+        RecordingPublisher(db).publish()
+
+        mobile_path = tmp_path / "mobile.db"
+        with db.get_read_connection() as conn, sqlite3.connect(mobile_path) as copy:
+            conn.backup(copy)
+        LocalDatabase = load_mobile_module("local_db").LocalDatabase
+        mobile = LocalDatabase(str(mobile_path))
+        yield mobile
+        mobile.close()
+
+    def test_changeset_applies_upserts_and_deletes(self, db, snapshot):
+        ram = db.get_patient(1)
+        ram.phone = "9876543210"
+        db.update_patient(ram)
+        add_patient(db, "Gita Rao")
+        db.add_visit(Visit(patient_id=1, chief_complaint="Fever"))
+        with db.get_connection() as conn:
+            conn.execute("DELETE FROM patients WHERE id = 2")
+
+        publisher = RecordingPublisher(db)
+        publisher.publish()
+        blob, _ = publisher.uploads[0]
+        snapshot.apply_changeset(decode_changeset(blob, KEY), cursor=5)
+
+        conn = snapshot._get_connection()
+        names = {row["id"]: (row["name"], row["phone"]) for row in conn.execute("SELECT * FROM patients")}
+        assert names == {1: ("Ram Kumar", "9876543210"), 3: ("Gita Rao", None)}
+        assert conn.execute("SELECT chief_complaint FROM visits").fetchone()[0] == "Fever"
+        assert snapshot.get_sync_cursor() == 5
+        assert snapshot.get_version_vector() == {"desktop-1": db.get_sync_seq()}
+        assert conn.execute("SELECT COUNT(*) FROM sync_change_log").fetchone()[0] == 0
+
+    def test_failed_apply_rolls_back(self, db, snapshot):
+        add_patient(db, "Gita Rao")
+        publisher = RecordingPublisher(db)
+        publisher.publish()
+        changeset = decode_changeset(publisher.uploads[0][0], KEY)
+        changeset["tables"]["patients"]["upserts"].append([None] * len(changeset["tables"]["patients"]["columns"]))
+
+        with pytest.raises(sqlite3.IntegrityError):
+            snapshot.apply_changeset(changeset, cursor=9)
+
+        assert snapshot.get_patient_count() == 2
+        assert snapshot.get_sync_cursor() == 0
+
+
+class TestMobileSyncClient:
+    """Tests for the mobile delta sync loop against an in-memory server."""
+
+    @pytest.fixture
+    def client(self, db, tmp_path):
+        """SyncClient wired to a fake cloud API serving this desktop's change sets."""
+        add_patient(db, "Ram Kumar")
+        publisher = RecordingPublisher(db, max_changes=1)
+        publisher.publish()
+
+        sync_client = load_mobile_module("sync_client")
+        LocalDatabase = load_mobile_module("local_db").LocalDatabase
+        client = sync_client.SyncClient(api_url="http://cloud.invalid", data_dir=str(tmp_path / "mobile"))
+        client.set_credentials("token", b"backup-key", KEY)
+        local_db = LocalDatabase(str(tmp_path / "mobile" / "clinic.db"))
+        client.attach_database(local_db)
+
+        server = {"pruned": 0, "snapshots": 0}
+
+        def list_changesets(since):
+            changesets = [
+                {"cursor": cursor, "device_id": "desktop-1",
+                 "from_seq": changeset["from_seq"], "to_seq": changeset["to_seq"]}
+                for cursor, (_, changeset) in enumerate(publisher.uploads, start=1)
+                if cursor > max(since, server["pruned"])
+            ]
+            return {"changesets": changesets, "has_more": False,
+                    "pruned_cursor": server["pruned"], "snapshot_required": since < server["pruned"]}
+
+        def restore_snapshot():
+            server["snapshots"] += 1
+            local_db.close()
+            with db.get_read_connection() as conn, sqlite3.connect(local_db.db_path) as copy:
+                conn.backup(copy)
+
+        client._list_changesets = list_changesets
+        client._download_changeset = lambda cursor: publisher.uploads[cursor - 1][0]
+        client._restore_snapshot = restore_snapshot
+        client.publisher, client.server = publisher, server
+        yield client
+        local_db.close()
+
+    def names(self, client):
+        return sorted(row["name"] for row in client.local_db._get_connection().execute("SELECT name FROM patients"))
+
+    def test_first_sync_restores_snapshot_then_applies_changes(self, db, client):
+        client.sync(background=False)
+
+        assert client.state.status.value == "success"
+        assert client.server["snapshots"] == 1
+        assert self.names(client) == ["Ram Kumar"]
+
+        add_patient(db, "Sita Devi")
+        client.publisher.publish()
+        client.sync(background=False)
+
+        assert client.server["snapshots"] == 1
+        assert self.names(client) == ["Ram Kumar", "Sita Devi"]
+        assert client.local_db.get_sync_cursor() == len(client.publisher.uploads)
+
+    def test_falls_back_to_snapshot_when_changes_were_pruned(self, db, client):
+        client.sync(background=False)
+        add_patient(db, "Sita Devi")
+        add_patient(db, "Gita Rao")
+        client.publisher.publish()
+        client.server["pruned"] = len(client.publisher.uploads) - 1
+
+        client.sync(background=False)
+
+        assert client.state.status.value == "success"
+        assert client.server["snapshots"] == 2
+        assert self.names(client) == ["Gita Rao", "Ram Kumar", "Sita Devi"]
+
+
+    def test_restores_full_backup_without_changeset_feed(self, db, client):
+        client._list_changesets = lambda since: None
+        client.sync(background=False)
+        add_patient(db, "Sita Devi")
+        client.sync(background=False)
+
+        assert client.state.status.value == "success"
+        assert client.server["snapshots"] == 2
+        assert self.names(client) == ["Ram Kumar", "Sita Devi"]
+
+
+class TestBackupServicePublish:
+    """Tests for publishing change sets from BackupService.sync_to_cloud."""
+
+    @pytest.fixture
+    def service(self, db, tmp_path, monkeypatch):
+        from src.services.backup import BackupService
+        from src.services.sync import LocalStorageBackend
+
+        service = BackupService(data_dir=tmp_path, backup_dir=tmp_path / "backups", database_service=db)
+        service._create_backend = lambda config: LocalStorageBackend(tmp_path / "cloud")
+        service.posted = []
+        monkeypatch.setattr(DeltaSyncPublisher, "_post_changeset",
+                            lambda publisher, blob, changeset: service.posted.append((publisher, changeset)))
+        return service
+
+    def test_publishes_after_docassist_sync(self, db, service):
+        add_patient(db, "Ram Kumar")
+        config = {"type": "docassist", "api_key": "token", "email": "doctor@example.com"}
+
+        assert service.sync_to_cloud("password", config)
+
+        publisher, changeset = service.posted[0]
+        assert publisher.token == "token"
+        assert publisher.sync_key == derive_sync_key("password", "doctor@example.com")
+        patients = changeset["tables"]["patients"]
+        name = patients["columns"].index("name")
+        assert [row[name] for row in patients["upserts"]] == ["Ram Kumar"]
+        assert db.get_sync_version(publisher.device_id) == db.get_sync_seq()
+
+    def test_other_backends_keep_full_backups(self, db, service):
+        add_patient(db, "Ram Kumar")
+
+        assert service.sync_to_cloud("password", {"type": "local", "path": "unused"})
+        assert service.posted == []
+
+
+class TestMobileSnapshotRestore:
+    """Tests for the mobile full-backup restore against desktop backup formats."""
+
+    PASSWORD = "backup-password"
+
+    def restore(self, tmp_path, blob):
+        sync_client = load_mobile_module("sync_client")
+        client = sync_client.SyncClient(api_url="http://cloud.invalid", data_dir=str(tmp_path / "mobile"))
+        client.set_credentials("token", self.PASSWORD)
+        client._check_for_updates = lambda: {"id": "backup_1"}
+        client._download_backup = lambda backup_id: blob
+        client._restore_snapshot()
+        return tmp_path / "mobile" / "clinic.db"
+
+    def test_restores_streamed_backup(self, db, tmp_path):
+        from src.services.backup_pipeline import BackupPipeline
+        from src.services.sync import LocalStorageBackend
+
+        add_patient(db, "Ram Kumar")
+        snapshot = tmp_path / "snapshot.db"
+        with db.get_read_connection() as conn, sqlite3.connect(snapshot) as copy:
+            conn.backup(copy)
+        backend = LocalStorageBackend(tmp_path / "cloud")
+        result = BackupPipeline(backend, compression="gzip").upload(
+            {"clinic.db": snapshot}, self.PASSWORD, members={"manifest.json": b"{}"}
+        )
+
+        restored = self.restore(tmp_path, (tmp_path / "cloud" / result.remote_key).read_bytes())
+
+        assert restored.read_bytes() == snapshot.read_bytes()
+        assert not (tmp_path / "mobile" / "manifest.json").exists()
+
+    def test_restores_legacy_zip_backup(self, tmp_path):
+        import io
+        import zipfile
+        from src.services.crypto import CryptoService
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("clinic.db", b"legacy database")
+        blob = CryptoService().encrypt(archive.getvalue(), self.PASSWORD).to_bytes()
+
+        assert self.restore(tmp_path, blob).read_bytes() == b"legacy database"
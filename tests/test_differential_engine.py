@@ -0,0 +1,150 @@
+"""Tests for compiled Bayesian scoring in DifferentialEngine."""
+
+import math
+import random
+
+import pytest
+
+from src.services.diagnosis import differential_engine
+from src.services.diagnosis.differential_engine import DifferentialEngine
+
+
+def reference_differentials(engine, symptoms, patient=None):
+    """The original per-diagnosis, per-symptom loop, as (diagnosis, probability) pairs."""
+    if not symptoms:
+        return []
+
+    priors = dict(engine.prevalence)
+    if patient:
+        for key in engine._prior_context(patient):
+            for dx, multiplier in engine.PRIOR_ADJUSTMENTS[key].items():
+                priors[dx] *= multiplier
+        priors = {dx: min(max(p, 0.0001), 0.99) for dx, p in priors.items()}
+
+    posterior = {}
+    for dx, prior in priors.items():
+        log_odds = math.log(prior / (1 - prior))
+        for symptom in symptoms:
+            lr = engine.likelihood_ratios.get(symptom, {}).get(dx)
+            if lr:
+                log_odds += math.log(lr)
+        odds = math.exp(log_odds)
+        posterior[dx] = odds / (1 + odds)
+
+    significant = {dx: p for dx, p in posterior.items() if p >= 0.01}
+    total = sum(significant.values())
+    ranked = sorted(((dx, p / total) for dx, p in significant.items()), key=lambda x: x[1], reverse=True)
+    return ranked[:10]
+
+
+PATIENTS = [
+    None,
+    {"age": 8},
+    {"age": 72, "gender": "F"},
+    {"age": 35, "season": "monsoon", "location": "rural"},
+    {"age": 40, "gender": "M", "season": "summer"},
+]
+
+
+@pytest.fixture(scope="module")
+def presentations():
+    symptoms = list(DifferentialEngine().likelihood_ratios)
+    rng = random.Random(7)
+    return [
+        (rng.sample(symptoms, rng.randint(1, 6)) + ["not_a_symptom"] * (i % 5 == 0), PATIENTS[i % len(PATIENTS)])
+        for i in range(200)
+    ]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(differential_engine, "np", None)
+    return DifferentialEngine()
+
+
+def as_pairs(differentials):
+    return [(d.diagnosis, d.probability) for d in differentials]
+
+
+def assert_same_ranking(got, expected):
+    assert [dx for dx, _ in got] == [dx for dx, _ in expected]
+    assert [p for _, p in got] == pytest.approx([p for _, p in expected], rel=1e-9)
+
+
+class TestCompiledScoring:
+    """Tests that compiled scoring matches the sequential Bayesian update."""
+
+    def test_matches_reference(self, engine, presentations):
+        for symptoms, patient in presentations:
+            got = as_pairs(engine.calculate_differentials(symptoms, patient))
+            assert_same_ranking(got, reference_differentials(engine, symptoms, patient))
+
+    def test_batch_matches_single(self, engine, presentations):
+        symptoms = [s for s, _ in presentations]
+        patients = [p for _, p in presentations]
+
+        batch = engine.calculate_differentials_batch(symptoms, patients)
+
+        assert len(batch) == len(presentations)
+        for result, (s, p) in zip(batch, presentations):
+            single = engine.calculate_differentials(s, p)
+            assert_same_ranking(as_pairs(result), as_pairs(single))
+            assert [d.supporting_features for d in result] == [d.supporting_features for d in single]
+
+    def test_batch_spans_blocks(self, engine, presentations, monkeypatch):
+        monkeypatch.setattr(DifferentialEngine, "BATCH_BLOCK", 16)
+        symptoms = [s for s, _ in presentations]
+
+        batch = engine.calculate_differentials_batch(symptoms)
+
+        assert [as_pairs(r)[:1] for r in batch] == [
+            as_pairs(engine.calculate_differentials(s))[:1] for s in symptoms
+        ]
+
+    def test_supporting_features_and_tests(self, engine):
+        results = engine.calculate_differentials(["fever_with_body_ache", "fever_with_rash", "unknown"])
+        dengue = next(d for d in results if d.diagnosis == "dengue")
+
+        assert dengue.supporting_features == ["fever_with_body_ache", "fever_with_rash"]
+        assert "NS1 antigen" in dengue.suggested_tests
+        assert sum(d.probability for d in results) <= 1.0 + 1e-9
+
+    def test_repeated_symptom_counts_twice(self, engine):
+        once = engine.calculate_differentials(["fever_with_rash"])
+        twice = engine.calculate_differentials(["fever_with_rash", "fever_with_rash"])
+
+        assert_same_ranking(as_pairs(twice), reference_differentials(engine, ["fever_with_rash"] * 2))
+        assert as_pairs(once) != as_pairs(twice)
+
+    def test_empty_presentations(self, engine):
+        assert engine.calculate_differentials([]) == []
+        assert engine.calculate_differentials_batch([[], ["fever_with_rash"]])[0] == []
+        assert engine.calculate_differentials_batch([]) == []
+
+    def test_patients_length_must_match(self, engine):
+        with pytest.raises(ValueError):
+            engine.calculate_differentials_batch([["fever_with_rash"]], [None, None])
+
+
+class TestPriors:
+    """Tests for patient-context prior adjustment."""
+
+    def test_adjustments_applied_and_clipped(self, engine):
+        priors = engine._adjust_priors({"age": 30, "season": "monsoon", "location": "rural"})
+
+        assert priors["leptospirosis"] == pytest.approx(engine.prevalence["leptospirosis"] * 10.0 * 3.0)
+        assert priors["testicular_torsion"] == 0.0001
+        assert max(priors.values()) <= 0.99
+
+    def test_no_patient_uses_raw_prevalence(self, engine):
+        assert engine._adjust_priors(None) == pytest.approx(engine.prevalence)
+
+    def test_prior_vectors_are_cached_per_context(self, engine):
+        first = engine._log_priors({"age": 70, "gender": "F", "name": "A"})
+        second = engine._log_priors({"age": 65, "gender": "F", "name": "B"})
+
+        assert first is second
+        assert engine._log_priors({"age": 70}) is not first
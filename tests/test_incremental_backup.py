@@ -0,0 +1,193 @@
+"""Tests for content-addressed incremental backups."""
+
+import io
+import random
+import sqlite3
+import pytest
+
+from src.services import incremental_backup
+from src.services.backup import BackupService
+from src.services.incremental_backup import (
+    ChunkStore,
+    CorruptChunkError,
+    IncrementalBackupStore,
+    find_cut,
+    iter_chunks,
+)
+
+# Small chunks so test files span many of them
+SMALL = dict(min_size=2048, max_size=16384, mask_bits=12)
+
+
+def random_bytes(n, seed=0):
+    return random.Random(seed).randbytes(n)
+
+
+def chunk_sizes(data, **params):
+    return [len(c) for c in iter_chunks(io.BytesIO(data), **(params or SMALL))]
+
+
+class TestChunking:
+    """Tests for content-defined chunking."""
+
+    def test_chunks_reassemble_within_bounds(self):
+        data = random_bytes(300_000)
+        chunks = list(iter_chunks(io.BytesIO(data), **SMALL))
+
+        assert b"".join(chunks) == data
+        assert all(2048 <= len(c) <= 16384 for c in chunks[:-1])
+
+    def test_insertion_only_changes_nearby_chunks(self):
+        """Test bytes inserted near the start leave later chunks unchanged."""
+        data = random_bytes(300_000)
+        edited = data[:5000] + b"new visit" + data[5000:]
+
+        before = set(iter_chunks(io.BytesIO(data), **SMALL))
+        after = list(iter_chunks(io.BytesIO(edited), **SMALL))
+
+        changed = [c for c in after if c not in before]
+        assert len(changed) <= 2
+        assert len(after) > 10
+
+    def test_python_and_numpy_boundaries_match(self, monkeypatch):
+        """Test the vectorized boundary search agrees with the reference loop."""
+        pytest.importorskip("numpy")
+        data = random_bytes(200_000, seed=3)
+        fast = chunk_sizes(data)
+        monkeypatch.setattr(incremental_backup, "np", None)
+
+        assert chunk_sizes(data) == fast
+
+    def test_short_input_is_one_chunk(self):
+        assert find_cut(b"abc", 2048, 16384, 12) == 3
+        assert list(iter_chunks(io.BytesIO(b""), **SMALL)) == []
+
+
+class TestChunkStore:
+    """Tests for ChunkStore."""
+
+    def test_stores_each_chunk_once(self, tmp_path):
+        store = ChunkStore(tmp_path)
+
+        digest, written = store.put(b"vitals" * 1000)
+        again, rewritten = store.put(b"vitals" * 1000)
+
+        assert digest == again
+        assert 0 < written < 6000
+        assert rewritten == 0
+        assert store.get(digest) == b"vitals" * 1000
+
+    def test_detects_corruption(self, tmp_path):
+        store = ChunkStore(tmp_path)
+        digest, _ = store.put(b"original")
+        path = tmp_path / digest[:2] / digest
+        path.write_bytes(path.read_bytes()[:-1] + b"x")
+
+        with pytest.raises(CorruptChunkError):
+            store.get(digest)
+
+
+class TestIncrementalBackupStore:
+    """Tests for manifests, restore and garbage collection."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return IncrementalBackupStore(tmp_path / "store", min_chunk_size=2048, max_chunk_size=16384, mask_bits=12)
+
+    def test_second_backup_writes_only_changes(self, store, tmp_path):
+        """Test an unchanged file costs no chunk writes, a small edit a few."""
+        source = tmp_path / "clinic.db"
+        source.write_bytes(random_bytes(400_000))
+
+        _, first = store.write_backup({"clinic.db": source}, name="backup_1")
+        _, second = store.write_backup({"clinic.db": source}, name="backup_2")
+        data = bytearray(source.read_bytes())
+        data[200_000:200_010] = b"0123456789"
+        source.write_bytes(bytes(data))
+        _, third = store.write_backup({"clinic.db": source}, name="backup_3")
+
+        assert first["stats"]["chunks_new"] > 10
+        assert second["stats"]["chunks_new"] == 0
+        assert second["stats"]["bytes_skipped"] == 400_000
+        assert third["stats"]["chunks_new"] <= 2
+        assert third["stats"]["bytes_written"] < first["stats"]["bytes_written"] / 10
+
+    def test_any_point_in_time_restores(self, store, tmp_path):
+        source = tmp_path / "clinic.db"
+        versions = [random_bytes(50_000, seed=1), random_bytes(60_000, seed=2)]
+        manifests = []
+        for i, content in enumerate(versions):
+            source.write_bytes(content)
+            manifests.append(store.write_backup({"clinic.db": source, "chroma/a.bin": source}, name=f"backup_{i}")[0])
+
+        for manifest, content in zip(manifests, versions):
+            out = tmp_path / f"restore_{manifest.stem}"
+            store.restore(manifest, out)
+            assert (out / "clinic.db").read_bytes() == content
+            assert (out / "chroma" / "a.bin").read_bytes() == content
+
+    def test_garbage_collection_keeps_referenced_chunks(self, store, tmp_path):
+        source = tmp_path / "clinic.db"
+        source.write_bytes(random_bytes(50_000, seed=1))
+        old, _ = store.write_backup({"clinic.db": source}, name="backup_1")
+        source.write_bytes(random_bytes(50_000, seed=2))
+        new, _ = store.write_backup({"clinic.db": source}, name="backup_2")
+
+        old.unlink()
+        assert store.collect_garbage() > 0
+
+        store.restore(new, tmp_path / "out")
+        assert (tmp_path / "out" / "clinic.db").read_bytes() == source.read_bytes()
+
+
+class TestBackupServiceIncremental:
+    """Tests for incremental backups through BackupService."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        conn = sqlite3.connect(data_dir / "clinic.db")
+        conn.execute("CREATE TABLE patients (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.execute("CREATE TABLE visits (id INTEGER PRIMARY KEY, patient_id INTEGER, notes TEXT)")
+        conn.executemany("INSERT INTO patients (name) VALUES (?)", [(f"Patient {i}",) for i in range(500)])
+        conn.commit()
+        conn.close()
+        (data_dir / "chroma").mkdir()
+        (data_dir / "chroma" / "index.bin").write_bytes(random_bytes(100_000))
+        return BackupService(data_dir=data_dir, backup_dir=tmp_path / "backups", max_backups=2)
+
+    def test_auto_backup_is_incremental_and_restorable(self, service):
+        """Test automatic backups are manifests that restore the database."""
+        assert service.auto_backup()
+        backups = service.list_backups()
+        assert len(backups) == 1
+        assert backups[0].path.suffix == ".json"
+        assert backups[0].patient_count == 500
+
+        conn = sqlite3.connect(service.db_path)
+        conn.execute("DELETE FROM patients")
+        conn.commit()
+        conn.close()
+
+        assert service.restore_backup(backups[0].path)
+        conn = sqlite3.connect(service.db_path)
+        assert conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0] == 500
+        conn.close()
+        assert (service.chroma_dir / "index.bin").stat().st_size == 100_000
+
+    def test_cleanup_removes_unreferenced_chunks(self, service):
+        """Test pruning old manifests also frees their chunks."""
+        import time
+        for i in range(3):
+            (service.chroma_dir / "index.bin").write_bytes(random_bytes(100_000, seed=i))
+            service.create_incremental_backup()
+            time.sleep(1.1)  # Distinct timestamps
+
+        chunk_dir = service.incremental_store.chunks.root
+        before = sum(f.stat().st_size for f in chunk_dir.rglob("*") if f.is_file())
+        service.cleanup_old_backups()
+        after = sum(f.stat().st_size for f in chunk_dir.rglob("*") if f.is_file())
+
+        assert len(service.list_backups()) == 2
+        assert after < before
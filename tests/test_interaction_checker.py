@@ -0,0 +1,182 @@
+"""Tests for the normalized interaction graph in InteractionChecker."""
+
+import json
+import os
+
+import pytest
+
+from src.services.drugs import DrugDatabase, InteractionChecker, Severity
+from src.services.drugs.interaction_checker import PatientMedications
+
+
+def interaction(drug1, drug2, severity, effect=""):
+    return {"drug1": drug1, "drug2": drug2, "severity": severity, "clinical_effect": effect or f"{drug1}+{drug2}"}
+
+
+def formulation(brand, salt):
+    return {"brand_name": brand, "salt": salt, "strength": "", "form": "tablet", "manufacturer": "", "price_approx": 0}
+
+
+def drug(generic, drug_class, *formulations):
+    return {"generic_name": generic, "drug_class": drug_class, "category": "", "formulations": list(formulations)}
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    files = {
+        "common_interactions.json": {"interactions": [
+            interaction("Warfarin", "Aspirin", "major", "Bleeding risk"),
+            interaction("warfarin", "nsaid", "moderate", "Bleeding risk with NSAIDs"),
+            interaction("warfarin", "ibuprofen", "critical", "Specific warfarin-ibuprofen effect"),
+            interaction("ace inhibitor", "potassium", "major", "Hyperkalemia"),
+        ]},
+        "contraindications.json": {"contraindications": [
+            {"drug": "metformin", "condition": "Chronic Kidney Disease", "severity": "critical", "reason": "Lactic acidosis"},
+        ]},
+        "cross_allergies.json": {"cross_allergies": {"cephalosporin": ["penicillin"]}},
+        "drug_classes.json": {"drug_classes": {
+            "ibuprofen": "nsaid", "diclofenac": "nsaid", "naproxen": "nsaid",
+            "enalapril": "ace inhibitor", "lisinopril": "ace inhibitor",
+            "amoxicillin": "penicillin", "cefixime": "cephalosporin",
+        }},
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_text(json.dumps(data))
+    return tmp_path
+
+
+@pytest.fixture
+def drug_database(tmp_path):
+    path = tmp_path / "drugs"
+    path.mkdir()
+    (path / "drug_database.json").write_text(json.dumps({"drugs": [
+        drug("aspirin", "antiplatelet", formulation("Ecosprin", "Acetylsalicylic Acid")),
+        drug("warfarin", "anticoagulant", formulation("Warf", "Warfarin Sodium")),
+        drug("ibuprofen", "nsaid", formulation("Brufen", "Ibuprofen")),
+        drug("metformin", "biguanide", formulation("Glycomet", "Metformin HCl")),
+    ]}))
+    return DrugDatabase(data_path=str(path))
+
+
+@pytest.fixture
+def checker(data_path, drug_database):
+    return InteractionChecker(data_path=str(data_path), drug_database=drug_database)
+
+
+def check(checker, new_drugs, current_drugs=(), **kwargs):
+    kwargs.setdefault("patient_conditions", [])
+    kwargs.setdefault("patient_allergies", [])
+    kwargs.setdefault("patient_age", 40)
+    kwargs.setdefault("patient_gender", "M")
+    return checker.check_prescription(new_drugs=list(new_drugs), current_drugs=list(current_drugs), **kwargs)
+
+
+class TestInteractionGraph:
+    """Tests for alias resolution and graph construction."""
+
+    def test_pairs_are_symmetric(self, checker):
+        assert checker.check_pair("warfarin", "aspirin").clinical_effect == "Bleeding risk"
+        assert checker.check_pair("ASPIRIN", "Warfarin ").clinical_effect == "Bleeding risk"
+        assert checker.check_pair("aspirin", "metformin") is None
+
+    def test_brand_and_salt_names_resolve(self, checker):
+        assert checker.resolve("Ecosprin") == "aspirin"
+        assert checker.resolve("metformin hcl") == "metformin"
+        assert checker.check_pair("Ecosprin", "Warf").clinical_effect == "Bleeding risk"
+
+    def test_class_edges_expand_to_members(self, checker):
+        assert checker.check_pair("diclofenac", "warfarin").clinical_effect == "Bleeding risk with NSAIDs"
+        assert checker.check_pair("potassium", "lisinopril").clinical_effect == "Hyperkalemia"
+        # The class name itself still matches
+        assert checker.check_pair("nsaid", "warfarin") is not None
+
+    def test_drug_specific_entry_beats_class_edge(self, checker):
+        assert checker.check_pair("Brufen", "warfarin").severity == Severity.CRITICAL
+
+    def test_without_drug_database(self, data_path):
+        checker = InteractionChecker(data_path=str(data_path))
+
+        assert checker.check_pair("warfarin", "aspirin") is not None
+        assert checker.check_pair("Ecosprin", "warfarin") is None
+
+
+class TestPrescriptionCheck:
+    """Tests for check_prescription over the graph."""
+
+    def test_brand_prescription_alerts(self, checker):
+        alerts = check(checker, ["Brufen"], ["Warf", "Ecosprin"])
+
+        assert [a.title for a in alerts if a.alert_type == "interaction"] == [
+            "Drug Interaction: Brufen + Warf"
+        ]
+
+    def test_contraindication_through_alias(self, checker):
+        alerts = check(checker, ["Glycomet"], patient_conditions=["chronic kidney disease", "asthma"])
+
+        assert [(a.alert_type, a.severity) for a in alerts] == [("contraindication", Severity.CRITICAL)]
+
+    def test_allergy_and_cross_allergy(self, checker):
+        assert checker.check_allergy("Ecosprin", ["aspirin"]).alert_type == "allergy"
+        assert checker.check_allergy("cefixime", ["amoxicillin"]).alert_type == "cross_allergy"
+
+    def test_cross_allergy_classes_ignore_case(self, data_path, drug_database):
+        (data_path / "cross_allergies.json").write_text(json.dumps({"cross_allergies": {"Penicillin": ["Cephalosporin"]}}))
+        (data_path / "drug_classes.json").write_text(json.dumps({"drug_classes": {
+            "amoxicillin": "Penicillin", "cefixime": "Cephalosporin",
+        }}))
+        checker = InteractionChecker(data_path=str(data_path), drug_database=drug_database)
+
+        alert = checker.check_allergy("amoxicillin", ["Cefixime"])
+        assert (alert.alert_type, alert.severity) == ("cross_allergy", Severity.MAJOR)
+
+    def test_special_population_lists_expand_classes(self, checker):
+        pregnant = check(checker, ["enalapril", "Warf", "metformin"], patient_pregnant=True)
+        renal = check(checker, ["Glycomet"], egfr=40.0)
+
+        assert sorted(a.title for a in pregnant if a.alert_type == "pregnancy") == [
+            "Pregnancy Contraindication: Enalapril",
+            "Pregnancy Contraindication: Warf",
+        ]
+        assert [a.alert_type for a in renal] == ["renal"]
+
+    def test_duplicate_therapy(self, checker):
+        alerts = checker.check_duplicate_therapy(["Brufen", "naproxen", "aspirin"])
+
+        assert [a.details["drugs"] for a in alerts] == [["Brufen", "naproxen"]]
+
+
+class TestBatchScreening:
+    """Tests for clinic-wide re-screening."""
+
+    def test_batch_matches_single_checks(self, checker):
+        patients = [
+            PatientMedications(1, ["Warf", "Brufen"], age=70),
+            PatientMedications(2, ["metformin"], conditions=["chronic kidney disease"], egfr=30.0),
+            PatientMedications(3, ["aspirin"]),
+            PatientMedications(4, ["lisinopril", "potassium"], pregnant=True),
+        ]
+
+        results = checker.check_prescriptions_batch(patients)
+
+        assert sorted(results) == [1, 2, 4]
+        for patient in patients:
+            expected = check(
+                checker, patient.drugs, patient_conditions=patient.conditions, patient_age=patient.age,
+                patient_pregnant=patient.pregnant, egfr=patient.egfr,
+            )
+            assert results.get(patient.patient_id, []) == expected
+
+    def test_reload_if_changed(self, checker, data_path):
+        assert checker.reload_if_changed() is False
+        assert checker.check_pair("aspirin", "metformin") is None
+
+        interactions_file = data_path / "common_interactions.json"
+        data = json.loads(interactions_file.read_text())
+        data["interactions"].append(interaction("aspirin", "metformin", "minor"))
+        interactions_file.write_text(json.dumps(data))
+        stat = interactions_file.stat()
+        os.utime(interactions_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert checker.reload_if_changed() is True
+        assert checker.check_pair("Glycomet", "Ecosprin").severity == Severity.MINOR
+        assert checker.reload_if_changed() is False
@@ -0,0 +1,118 @@
+"""Tests for indexed rule evaluation in RedFlagDetector."""
+
+import random
+
+import pytest
+
+from src.services.diagnosis.red_flag_detector import RedFlagDetector, UrgencyLevel
+
+
+def reference_check(detector, presentation):
+    """The original walk over every pattern, as (description, matching_features) pairs."""
+    present = detector._present_features(presentation)
+    flags = []
+    for pattern in detector.patterns:
+        if not all(req in present for req in pattern["required"]):
+            continue
+        if sum(1 for feat in pattern["any_of"] if feat in present) < pattern.get("threshold", 1):
+            continue
+        features = [f for f in pattern["required"] if f in present] + [f for f in pattern["any_of"] if f in present]
+        flags.append((pattern["urgency"], pattern["description"], features))
+
+    order = {UrgencyLevel.EMERGENCY: 0, UrgencyLevel.URGENT: 1, UrgencyLevel.WARNING: 2}
+    flags.sort(key=lambda flag: order[flag[0]])
+    return [(description, features) for _, description, features in flags]
+
+
+def as_pairs(flags):
+    return [(flag.description, flag.matching_features) for flag in flags]
+
+
+@pytest.fixture
+def detector():
+    return RedFlagDetector()
+
+
+@pytest.fixture
+def features(detector):
+    """Every feature any pattern mentions, plus features none do."""
+    names = {f for p in detector.patterns for f in p["required"] + p["any_of"]}
+    return sorted(names) + ["not_a_feature", "headache"]
+
+
+def random_presentations(features, count, seed=17):
+    rng = random.Random(seed)
+    for _ in range(count):
+        presentation = {f: True for f in rng.sample(features, rng.randint(0, 8))}
+        if rng.random() < 0.3:
+            presentation[rng.choice(features)] = False
+        if rng.random() < 0.3:
+            presentation["spo2"] = rng.choice([82, 95])
+        if rng.random() < 0.3:
+            presentation["age"] = rng.choice([1, 40])
+        if rng.random() < 0.2:
+            presentation["onset"] = rng.choice(["sudden onset", "Gradual"])
+        yield presentation
+
+
+class TestIndexedCheck:
+    """Tests that indexed evaluation matches walking every pattern."""
+
+    def test_matches_reference(self, detector, features):
+        for presentation in random_presentations(features, 2000):
+            assert as_pairs(detector.check(presentation)) == reference_check(detector, presentation)
+
+    def test_known_presentation(self, detector):
+        flags = detector.check({"chest_pain": True, "sweating": True, "age": 55})
+
+        assert flags[0].description == "Possible Acute Coronary Syndrome"
+        assert flags[0].matching_features == ["chest_pain", "sweating"]
+
+    def test_edge_case_patterns(self, detector, features):
+        base = dict(detector.patterns[0])
+        detector.patterns = [
+            dict(base, description="unconditional", required=[], any_of=["sweating"], threshold=0),
+            dict(base, description="required only", required=["chest_pain", "nausea"], any_of=[], threshold=0),
+            dict(base, description="repeated", required=["chest_pain", "chest_pain"], any_of=["nausea", "nausea"], threshold=2),
+            dict(base, description="impossible", required=[], any_of=["sweating"], threshold=2),
+        ]
+        detector._compile_rules()
+
+        assert as_pairs(detector.check({})) == [("unconditional", [])]
+        for presentation in random_presentations(features, 300):
+            assert as_pairs(detector.check(presentation)) == reference_check(detector, presentation)
+
+
+class TestIncrementalEvaluation:
+    """Tests for re-evaluating as features toggle."""
+
+    def test_toggles_match_check(self, detector, features):
+        rng = random.Random(23)
+        evaluation = detector.evaluate({})
+
+        for _ in range(2000):
+            feature = rng.choice(features)
+            before = [flag.description for flag in evaluation.flags]
+            changed = evaluation.set_feature(feature, rng.random() < 0.5)
+            presentation = {f: True for f in evaluation.features}
+
+            assert as_pairs(evaluation.flags) == reference_check(detector, presentation)
+            assert changed == ([flag.description for flag in evaluation.flags] != before)
+
+    def test_update_applies_presentation_changes(self, detector, features):
+        presentations = list(random_presentations(features, 300, seed=29))
+        evaluation = detector.evaluate(presentations[0])
+
+        for presentation in presentations[1:]:
+            evaluation.update(presentation)
+            assert as_pairs(evaluation.flags) == as_pairs(detector.check(presentation))
+
+    def test_set_feature_reports_changes(self, detector):
+        evaluation = detector.evaluate({"chest_pain": True})
+
+        assert evaluation.set_feature("sweating", True) is True
+        assert evaluation.set_feature("sweating", True) is False
+        assert evaluation.set_feature("radiation_to_arm", True) is False
+        assert [f.description for f in evaluation.flags] == ["Possible Acute Coronary Syndrome"]
+        assert evaluation.set_feature("chest_pain", False) is True
+        assert evaluation.flags == []
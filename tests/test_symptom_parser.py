@@ -0,0 +1,125 @@
+"""Tests for the compiled, incremental SymptomParser."""
+
+import random
+import re
+
+import pytest
+
+from src.services.diagnosis.symptom_parser import SymptomParser, _required_tokens
+
+
+def reference_parse(parser, clinical_notes):
+    """The original sequential re.sub / re.search passes."""
+    if not clinical_notes:
+        return []
+
+    text = clinical_notes.lower()
+    for pattern, replacement in parser.abbreviations.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    for pattern, replacement in parser.hinglish_phrases.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+
+    return sorted(
+        key for key, patterns in parser.symptom_patterns.items()
+        if any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+    )
+
+
+NOTE = (
+    "Pt c/o fever x 3 days with body ache.\n"
+    "Bukhar aur sir dard since monday, SOB on exertion.\n"
+    "\n"
+    "h/o chest pain radiating to left arm -\n"
+    "no vomiting."
+)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return SymptomParser()
+
+
+@pytest.fixture(scope="module")
+def vocabulary(parser):
+    """Words from every table, plus separators, to assemble random notes from."""
+    words = set()
+    for patterns in parser.symptom_patterns.values():
+        for pattern in patterns:
+            words.update(re.findall(r"[A-Za-z]+", pattern))
+    for pattern in list(parser.abbreviations) + list(parser.hinglish_phrases):
+        words.update(re.findall(r"[A-Za-z/]+", pattern))
+    return sorted(words) + ["x", "3", "days", ".", ",", "-", ":", "\n", "\n\n"]
+
+
+def random_notes(vocabulary, count, seed=11):
+    rng = random.Random(seed)
+    for _ in range(count):
+        note = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 40)))
+        yield note.upper() if rng.random() < 0.2 else note
+
+
+class TestCompiledParse:
+    """Tests that the compiled parser matches the sequential passes."""
+
+    def test_matches_reference(self, parser, vocabulary):
+        for note in random_notes(vocabulary, 1000):
+            assert parser.parse(note) == reference_parse(parser, note), note
+
+    def test_known_note(self, parser):
+        assert parser.parse(NOTE) == reference_parse(parser, NOTE)
+        assert {"fever", "headache", "breathlessness", "chest_pain"} <= set(parser.parse(NOTE))
+
+    def test_empty_note(self, parser):
+        assert parser.parse("") == []
+        assert parser.parse(None) == []
+        assert parser.parse_note("").symptoms == []
+
+    def test_spans_point_into_original_note(self, parser):
+        matches = {(m.key, NOTE[m.start:m.end]) for m in parser.parse_note(NOTE).matches}
+
+        assert ("breathlessness", "SOB") in matches
+        assert ("chest_pain", "chest pain") in matches
+        # Rewritten phrases map back to the Hinglish the doctor typed
+        assert ("fever", "Bukhar") in matches
+        assert ("headache", "sir dard") in matches
+
+    def test_required_tokens(self):
+        assert _required_tokens(r"\bchest\s+pain\b.*\b(left\s+)?arm\b") == {"chest", "pain"}
+        assert _required_tokens(r"\bfluid[\s-]?filled\s+lesions\b") == {"lesions"}
+        assert _required_tokens(r"\brigors?\b") == set()
+        assert _required_tokens(r"\bfever\b|\bpyrexia\b") == set()
+
+
+class TestIncrementalParse:
+    """Tests for re-parsing an edited note."""
+
+    def test_matches_full_parse_after_edits(self, parser, vocabulary):
+        rng = random.Random(5)
+        notes = list(random_notes(vocabulary, 200, seed=3))
+        previous = parser.parse_note(notes[0])
+
+        for note in notes[1:]:
+            # Replace a span of the previous note with part of the new one
+            start = rng.randint(0, len(previous.text))
+            end = min(len(previous.text), start + rng.randint(0, 80))
+            edited = previous.text[:start] + note[: rng.randint(0, 80)] + previous.text[end:]
+            result = parser.parse_note(edited, previous)
+            full = parser.parse_note(edited)
+
+            assert result.symptoms == full.symptoms == reference_parse(parser, edited)
+            assert result.matches == full.matches
+            previous = result
+
+    def test_unchanged_lines_are_not_rescanned(self, parser, monkeypatch):
+        previous = parser.parse_note(NOTE)
+        scanned = []
+        original_scan = SymptomParser._scan_chunk
+        monkeypatch.setattr(
+            SymptomParser, "_scan_chunk",
+            lambda self, chunk: scanned.append(chunk) or original_scan(self, chunk),
+        )
+
+        result = parser.parse_note(NOTE.replace("no vomiting", "vomiting twice"), previous)
+
+        assert scanned == ["vomiting twice."]
+        assert "vomiting" in result.symptoms
@@ -0,0 +1,287 @@
+"""Tests for parallel, resumable multipart transfers."""
+
+import base64
+import hashlib
+import io
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from src.services.sync import (
+    ChecksumMismatchError, LocalStorageBackend, MultipartTransfer,
+    S3StorageBackend, SyncService, PART_MANIFEST_SUFFIX
+)
+
+PART = 64 * 1024
+
+
+class FakeS3Client:
+    """In-memory stand-in for a boto3 S3 client (multipart, ranges, checksums)."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.corrupt_next_part = False
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = {}
+        return {'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ChecksumSHA256=None):
+        if UploadId not in self.uploads:
+            raise Exception("NoSuchUpload")
+        if self.corrupt_next_part:
+            self.corrupt_next_part = False
+            Body = Body[:-1] + bytes([Body[-1] ^ 1])
+        if ChecksumSHA256 and base64.b64encode(hashlib.sha256(Body).digest()).decode() != ChecksumSHA256:
+            raise Exception("An error occurred (BadDigest) when calling the UploadPart operation")
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        self.uploads[UploadId][PartNumber] = (etag, Body)
+        return {'ETag': etag}
+
+    def list_parts(self, Bucket, Key, UploadId, PartNumberMarker=0):
+        if UploadId not in self.uploads:
+            raise Exception("NoSuchUpload")
+        numbers = sorted(n for n in self.uploads[UploadId] if n > PartNumberMarker)
+        page = numbers[:2]  # Small pages to exercise pagination
+        return {
+            'Parts': [{'PartNumber': n, 'ETag': self.uploads[UploadId][n][0]} for n in page],
+            'IsTruncated': len(numbers) > 2,
+            'NextPartNumberMarker': page[-1] if page else 0,
+        }
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        stored = self.uploads.pop(UploadId)
+        body = b""
+        for part in MultipartUpload['Parts']:
+            etag, data = stored[part['PartNumber']]
+            assert etag == part['ETag']
+            body += data
+        self.objects[Key] = body
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId, None)
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = map(int, Range.split('=')[1].split('-'))
+        return {'Body': io.BytesIO(self.objects[Key][start:end + 1])}
+
+    def upload_file(self, Filename, Bucket, Key, Callback=None):
+        self.objects[Key] = Path(Filename).read_bytes()
+
+    def download_file(self, Bucket, Key, Filename, Callback=None):
+        Path(Filename).write_bytes(self.objects[Key])
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise Exception("404")
+        return {'ContentLength': len(self.objects[Key]), 'LastModified': datetime.now()}
+
+
+class FlakyBackend(LocalStorageBackend):
+    """Local backend whose parts fail on demand, like a dropped connection."""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self.fail_parts = set()
+        self.fail_ranges = set()
+        self.part_calls = []
+        self.range_calls = []
+
+    def upload_part(self, remote_key, upload_id, part_number, data, checksum=None):
+        self.part_calls.append(part_number)
+        if part_number in self.fail_parts:
+            raise ConnectionError("connection reset")
+        return super().upload_part(remote_key, upload_id, part_number, data, checksum)
+
+    def download_range(self, remote_key, start, length):
+        self.range_calls.append(start)
+        if start in self.fail_ranges:
+            raise ConnectionError("connection reset")
+        return super().download_range(remote_key, start, length)
+
+
+@pytest.fixture
+def backup_file(tmp_path):
+    path = tmp_path / "backup.zip.enc"
+    path.write_bytes(random.Random(7).randbytes(10 * PART + 123))
+    return path
+
+
+@pytest.fixture
+def flaky(tmp_path):
+    return FlakyBackend(tmp_path / "cloud")
+
+
+def transfer(backend, tmp_path, **kwargs):
+    kwargs.setdefault("retries", 1)
+    return MultipartTransfer(backend, tmp_path / "state", part_size=PART, max_workers=3, **kwargs)
+
+
+class TestMultipartUpload:
+    """Tests for resumable parallel uploads."""
+
+    def test_parallel_upload(self, flaky, backup_file, tmp_path):
+        progress = []
+
+        assert transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc", lambda d, t: progress.append((d, t)))
+
+        assert (flaky.base_path / "backups/b.enc").read_bytes() == backup_file.read_bytes()
+        assert sorted(flaky.part_calls) == list(range(1, 12))
+        assert progress[-1] == (backup_file.stat().st_size,) * 2
+        assert not list((tmp_path / "state").glob("*.json"))
+        assert flaky.exists("backups/b.enc" + PART_MANIFEST_SUFFIX)
+
+    def test_resumes_after_restart(self, flaky, backup_file, tmp_path):
+        """Test a second attempt (new process) uploads only the missing parts."""
+        flaky.fail_parts = {4, 9}
+        assert not transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc")
+        assert not flaky.exists("backups/b.enc")
+        uploaded = set(flaky.part_calls) - {4, 9}
+
+        flaky.fail_parts = set()
+        flaky.part_calls = []
+        assert transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc")
+
+        assert uploaded and not uploaded & set(flaky.part_calls)
+        assert uploaded | set(flaky.part_calls) == set(range(1, 12))
+        assert (flaky.base_path / "backups/b.enc").read_bytes() == backup_file.read_bytes()
+
+    def test_changed_file_restarts(self, flaky, backup_file, tmp_path):
+        flaky.fail_parts = {4}
+        transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc")
+        backup_file.write_bytes(os.urandom(3 * PART))
+
+        flaky.fail_parts = set()
+        flaky.part_calls = []
+        assert transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc")
+
+        assert sorted(flaky.part_calls) == [1, 2, 3]
+        assert (flaky.base_path / "backups/b.enc").read_bytes() == backup_file.read_bytes()
+        assert len(list((flaky.base_path / ".multipart").iterdir())) == 0
+
+    def test_corrupted_part_rejected(self, tmp_path):
+        """Test the backend refuses a part that does not match its checksum."""
+        backend = LocalStorageBackend(tmp_path / "cloud")
+        upload_id = backend.create_multipart_upload("k")
+
+        with pytest.raises(ChecksumMismatchError):
+            backend.upload_part("k", upload_id, 1, b"data", checksum=hashlib.sha256(b"date").hexdigest())
+
+
+class TestMultipartDownload:
+    """Tests for verified parallel downloads."""
+
+    @pytest.fixture
+    def uploaded(self, flaky, backup_file, tmp_path):
+        assert transfer(flaky, tmp_path).upload(backup_file, "backups/b.enc")
+        return "backups/b.enc"
+
+    def test_parallel_download(self, flaky, uploaded, backup_file, tmp_path):
+        dest = tmp_path / "out" / "b.enc"
+
+        assert transfer(flaky, tmp_path).download(uploaded, dest)
+
+        assert dest.read_bytes() == backup_file.read_bytes()
+        assert len(flaky.range_calls) == 11
+
+    def test_resumes_interrupted_download(self, flaky, uploaded, backup_file, tmp_path):
+        dest = tmp_path / "out" / "b.enc"
+        flaky.fail_ranges = {2 * PART, 7 * PART}
+        assert not transfer(flaky, tmp_path).download(uploaded, dest)
+        assert not dest.exists()
+        fetched = set(flaky.range_calls) - flaky.fail_ranges
+
+        flaky.fail_ranges = set()
+        flaky.range_calls = []
+        assert transfer(flaky, tmp_path).download(uploaded, dest)
+
+        assert fetched and not fetched & set(flaky.range_calls)
+        assert fetched | set(flaky.range_calls) == {i * PART for i in range(11)}
+        assert dest.read_bytes() == backup_file.read_bytes()
+
+    def test_corrupted_remote_detected(self, flaky, uploaded, tmp_path):
+        remote = flaky.base_path / uploaded
+        data = bytearray(remote.read_bytes())
+        data[5 * PART + 10] ^= 0xFF
+        remote.write_bytes(bytes(data))
+
+        assert not transfer(flaky, tmp_path).download(uploaded, tmp_path / "b.enc")
+        assert not (tmp_path / "b.enc").exists()
+
+    def test_without_manifest_falls_back(self, flaky, backup_file, tmp_path):
+        flaky.upload(backup_file, "backups/plain.zip")
+
+        assert transfer(flaky, tmp_path).download("backups/plain.zip", tmp_path / "p.zip")
+        assert flaky.range_calls == []
+        assert (tmp_path / "p.zip").read_bytes() == backup_file.read_bytes()
+
+    def test_backend_without_ranges_falls_back(self, flaky, uploaded, backup_file, tmp_path):
+        flaky.supports_range = False
+
+        assert transfer(flaky, tmp_path).download(uploaded, tmp_path / "b.enc")
+        assert flaky.range_calls == []
+        assert (tmp_path / "b.enc").read_bytes() == backup_file.read_bytes()
+
+
+class TestS3Multipart:
+    """Tests against an S3-compatible stand-in."""
+
+    @pytest.fixture
+    def s3(self):
+        backend = S3StorageBackend("clinic-backups", "key", "secret")
+        backend._client = FakeS3Client()
+        return backend
+
+    def test_roundtrip_and_resume(self, s3, backup_file, tmp_path):
+        upload_part = s3.upload_part
+        calls = []
+        dropped = []
+
+        def dropping(remote_key, upload_id, number, data, checksum=None):
+            calls.append(number)
+            if number == 6 and not dropped:
+                dropped.append(number)
+                raise ConnectionError("connection reset")
+            return upload_part(remote_key, upload_id, number, data, checksum)
+
+        s3.upload_part = dropping
+        assert not transfer(s3, tmp_path).upload(backup_file, "backups/b.enc")
+        sent = set(calls) - {6}
+        calls.clear()
+        assert transfer(s3, tmp_path).upload(backup_file, "backups/b.enc")
+        assert 6 in calls and not sent & set(calls)
+
+        dest = tmp_path / "b.enc"
+        assert transfer(s3, tmp_path).download("backups/b.enc", dest)
+        assert dest.read_bytes() == backup_file.read_bytes()
+
+    def test_corrupted_part_retried(self, s3, backup_file, tmp_path):
+        """Test a part damaged in transit is rejected by S3 and sent again."""
+        s3._client.corrupt_next_part = True
+
+        assert transfer(s3, tmp_path, retries=2).upload(backup_file, "backups/b.enc")
+        assert s3._client.objects["backups/b.enc"] == backup_file.read_bytes()
+
+
+class TestSyncServiceMultipart:
+    """Tests for SyncService using multipart transfers."""
+
+    def test_resume_pending_uploads(self, flaky, tmp_path):
+        backup_dir = tmp_path / "backups"
+        backup_dir.mkdir()
+        backup = backup_dir / "backup_2024-01-15_10-30-00.encrypted.zip"
+        backup.write_bytes(os.urandom(5 * PART))
+        sync = SyncService(flaky, backup_dir, part_size=PART)
+        sync.transfer.retries = 1
+
+        flaky.fail_parts = {3}
+        assert not sync.upload_backup(backup)
+
+        flaky.fail_parts = set()
+        assert SyncService(flaky, backup_dir, part_size=PART).resume_pending_uploads() == 1
+        assert sync.download_backup(f"backups/{backup.name}").read_bytes() == backup.read_bytes()